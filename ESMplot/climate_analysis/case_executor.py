@@ -0,0 +1,283 @@
+#######################################################################################################
+#
+# Runs the same calculation for every case of a comparison in parallel worker processes and stacks the
+# results along a 'case' dimension. Cases are independent (one file each), so a comparison of several
+# cases takes about as long as its slowest case when enough cores and memory are available.
+#
+#######################################################################################################
+
+import os
+import sys
+import multiprocessing
+import xarray as xr
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from ESMplot.climate_analysis import dataset_cache
+from ESMplot.climate_analysis.dataset_cache import resolve_store
+from ESMplot.climate_analysis.derived_cache import set_derived_cache, derived_cache_info
+from ESMplot.climate_analysis.profiling import worker_profiling, init_worker_profiling
+from ESMplot.watertagging.virtual_tags import combined_tags, set_combined_tags
+
+# Fraction of the available memory that cases may use together when no limit is given
+default_memory_fraction = 0.8
+
+# Worker processes are started from a fork server where available (spawned elsewhere) rather than forked
+# from the calling process, so they share none of its open files, locks or thread pools and open the
+# files they read themselves. The workers import the calling script, so a script that runs cases in
+# parallel keeps its work under "if __name__ == '__main__':" (see the example scripts).
+start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Modules imported once by the fork server, if the calling process has imported them, rather than by
+# every worker (ESMplot's own modules are always included)
+preload_modules = ['xarray','dask.array','netCDF4','matplotlib.pyplot','cartopy.crs','geocat.viz.util']
+
+#######################################################################################################
+# Memory available to new cases
+#######################################################################################################
+
+def available_memory() -> float:
+
+  '''Returns the memory in bytes that can be used by new processes without swapping (MemAvailable in
+  /proc/meminfo, or the free physical memory where that is not available), or None if unknown.'''
+
+  try:
+   with open('/proc/meminfo') as meminfo:
+    for line in meminfo:
+     if line.startswith('MemAvailable:'):
+      return float(line.split()[1])*1024.
+  except OSError:
+   pass
+
+  try:
+   return float(os.sysconf('SC_AVPHYS_PAGES')*os.sysconf('SC_PAGE_SIZE'))
+  except (ValueError,OSError,AttributeError):
+   return None
+
+def file_bytes(path: str) -> float:
+
+  '''Returns the size in bytes of the file at 'path', or the total size of the files in a directory
+  (ex. a Zarr store), or None if 'path' does not exist.'''
+
+  path = resolve_store(path)
+  if os.path.isdir(path):
+   return float(sum(os.path.getsize(os.path.join(root,name)) for root, _, names in os.walk(path)
+                    for name in names))
+  if os.path.isfile(path):
+   return float(os.path.getsize(path))
+
+  return None
+
+#######################################################################################################
+# Start worker processes
+#######################################################################################################
+
+def worker_context():
+
+  '''Returns the multiprocessing context that worker processes are started with (see start_method). With
+  a fork server, the calling script and the modules in preload_modules and ESMplot that this process has
+  imported are imported by the server when it starts, so each worker is forked from it ready to run.'''
+
+  context = multiprocessing.get_context(start_method)
+  if start_method == 'forkserver':
+   modules = [name for name in sys.modules if name in preload_modules or name.startswith('ESMplot.')]
+   context.set_forkserver_preload(['__main__']+sorted(modules))
+
+  return context
+
+#######################################################################################################
+# Work done in each worker process
+#######################################################################################################
+
+def _init_worker(cache_dir: str,
+                 cache_gb: float,
+                 tags: dict,
+                 datasets: dict,
+                 profile: tuple):
+
+  # Workers use the same derived product cache, combined water tags, dataset cache settings and
+  # profiling as the calling process
+  if cache_dir != None:
+   set_derived_cache(cache_dir,max_size_gb=cache_gb)
+  set_combined_tags(tags)
+  dataset_cache.set_dataset_cache_size(datasets['size'])
+  dataset_cache.prefer_zarr_stores = datasets['prefer_zarr_stores']
+  init_worker_profiling(profile)
+
+def _run_case(func,
+              kwargs: dict) -> tuple:
+
+  # Result of one case and the peak memory of the worker process in bytes (None if unknown)
+  result = func(**kwargs)
+
+  try:
+   import resource
+   # ru_maxrss is in bytes on macOS and in kilobytes on Linux and the BSDs
+   peak = float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+   peak = peak if sys.platform == 'darwin' else peak*1024.
+  except (ImportError,OSError):
+   peak = None
+
+  return result, peak
+
+#######################################################################################################
+# Stack results along the case dimension
+#######################################################################################################
+
+def stack_cases(results: list,
+                cases: list,
+                case_dim: str = 'case'):
+
+  '''Stacks per-case results (each an xr.DataArray or a tuple of them) along a new leading dimension
+  'case_dim' labelled by 'cases'. Cases are stacked by position, as when filling a preallocated
+  [case x ...] array one case at a time, so the coordinates of the first case are used for all.'''
+
+  labels = xr.DataArray(list(cases),dims=[case_dim],name=case_dim)
+
+  def stack(values):
+   return xr.concat(list(values),dim=labels,join='override',coords='minimal',compat='override')
+
+  if isinstance(results[0],tuple):
+   return tuple(stack(result[k] for result in results) for k in range(len(results[0])))
+
+  return stack(results)
+
+#######################################################################################################
+# Run every case
+#######################################################################################################
+
+def run_cases(func,
+              paths: list,
+              cases: list = None,
+              kwargs: dict = None,
+              case_kwargs: dict = None,
+              path_arg: str = 'path',
+              case_dim: str = 'case',
+              max_workers: int = None,
+              memory_gb: float = None,
+              case_memory_gb: float = None):
+
+  '''Calls 'func' once for each case (file) in 'paths', in parallel worker processes, and returns the
+  results stacked along a 'case' dimension. At most 'max_workers' cases run at once, and a new case is
+  only started while the memory expected for the running cases plus one more fits within 'memory_gb'.
+  The memory of a case is 'case_memory_gb' if given, otherwise the largest peak memory measured for a
+  finished case. Until a case has finished, the size of the largest case file is used as the estimate.
+
+  Required Parameters
+  --------------------------------------------------------------------------------------------------------
+  func
+   class: 'function', Calculation for one case, returning an xr.DataArray or a tuple of them. Must be
+                      defined at the top level of a module (ex. seasavg.seasavg_var_LL or
+                      watertag_case_products) so it can be sent to the worker processes. The worker
+                      processes import the calling script, so its work must be under
+                      "if __name__ == '__main__':" when more than one worker is used.
+
+  paths
+   class: 'list', File paths of the cases, passed to 'func' as its 'path_arg' parameter.
+
+  Optional Parameters
+  --------------------------------------------------------------------------------------------------------
+  cases: class 'list', Labels of the cases for the 'case' coordinate. Default = None uses 'paths'.
+  kwargs: class 'dict', Parameters passed to 'func' for every case, ex. dict(var1='TS',months=[5,6,7]).
+  case_kwargs: class 'dict', Parameters that differ between cases, as lists with one value per case,
+                             ex. dict(wgt_mon=[wgt_mon[i,:] for i in range(len(CASES))]).
+  path_arg: class 'string', Name of the parameter of 'func' that takes the file path. Default = 'path'
+  case_dim: class 'string', Name of the dimension the results are stacked along. Default = 'case'
+  max_workers: class 'int', Largest number of cases run at once. 1 runs the cases one after another in
+                            this process. Default = None uses one process per case, up to the number of
+                            cores.
+  memory_gb: class 'float', Memory in GB the running cases may use together. Default = None uses 80% of
+                            the memory available when called.
+  case_memory_gb: class 'float', Expected peak memory of one case in GB. Default = None measures it from
+                                 the cases that have finished (estimated from the file sizes before).
+  ________________________________________________________________________________________________________
+
+  Returns
+  ---------------------
+  output: :class:'xarray.DataArray' or tuple of them
+          Results of 'func' stacked by case, ex. [case x lat x lon]
+
+  Example
+  ---------------------
+  var_avg_by_case = run_cases(seasavg.seasavg_prect_LL,CASES,cases=cases,kwargs=dict(months=MON),
+                              case_kwargs=dict(wgt_mon=[wgt_mon[i,:] for i in range(len(CASES))]))
+
+  '''
+
+  #-----------------------------
+  # Ensure type of parameters
+  #-----------------------------
+
+  paths = [str(path) for path in paths]
+  cases = paths if cases == None else list(cases)
+  kwargs = {} if kwargs == None else dict(kwargs)
+  case_kwargs = {} if case_kwargs == None else dict(case_kwargs)
+
+  if len(cases) != len(paths):
+   raise ValueError('cases and paths must have the same length')
+  for name, values in case_kwargs.items():
+   if len(values) != len(paths):
+    raise ValueError("case_kwargs['"+str(name)+"'] must have one value per case")
+
+  # Parameters of each case
+  calls = []
+  for i, path in enumerate(paths):
+   call = dict(kwargs)
+   call[path_arg] = path
+   for name, values in case_kwargs.items():
+    call[name] = values[i]
+   calls.append(call)
+
+  if max_workers == None:
+   max_workers = min(len(paths),os.cpu_count() or 1)
+  max_workers = max(int(max_workers),1)
+
+  #-----------------------------
+  # Run cases one at a time
+  #-----------------------------
+
+  if max_workers == 1 or len(paths) == 1:
+   return stack_cases([func(**call) for call in calls],cases,case_dim)
+
+  #-----------------------------------------
+  # Run cases in parallel worker processes
+  #-----------------------------------------
+
+  if memory_gb != None:
+   budget = float(memory_gb)*1e9
+  else:
+   available = available_memory()
+   budget = None if available == None else default_memory_fraction*available
+  case_bytes = None if case_memory_gb == None else float(case_memory_gb)*1e9
+
+  # Until a case has finished, a case is expected to need at least the size of its file
+  measured = case_memory_gb != None
+  if case_bytes == None:
+   sizes = [size for size in (file_bytes(path) for path in paths) if size != None]
+   case_bytes = max(sizes) if sizes else None
+
+  cache = derived_cache_info()
+  results = [None]*len(paths)
+  pending = list(range(len(paths)))
+  running = {}
+
+  datasets = dict(size=dataset_cache.dataset_cache_info()['size'],prefer_zarr_stores=dataset_cache.prefer_zarr_stores)
+  with ProcessPoolExecutor(max_workers=max_workers,mp_context=worker_context(),initializer=_init_worker,
+                           initargs=(cache['directory'],cache['max_size_gb'],combined_tags(),datasets,
+                                     worker_profiling())) as pool:
+   while pending or running:
+
+    # Admit cases while workers are free and the expected memory fits (always at least one case)
+    while pending and len(running) < max_workers:
+     if running and budget != None and case_bytes != None and (len(running)+1)*case_bytes > budget:
+      break
+     i = pending.pop(0)
+     running[pool.submit(_run_case,func,calls[i])] = i
+
+    done, _ = wait(list(running),return_when=FIRST_COMPLETED)
+    for future in done:
+     i = running.pop(future)
+     results[i], peak = future.result()
+     if case_memory_gb == None and peak != None:
+      case_bytes = peak if not measured or case_bytes == None else max(case_bytes,peak)
+      measured = True
+
+  return stack_cases(results,cases,case_dim)
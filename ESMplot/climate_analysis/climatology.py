@@ -6,13 +6,20 @@
 
 import numpy as np
 import xarray as xr
+from ESMplot.climate_analysis.profiling import profiled
 
 #######################################################################################################
 # Calculate 12 month climatology variables 
 #######################################################################################################
 
+@profiled
 def clmMonTLL(var_time: xr.DataArray,
-              time_dim: str = 'time'):
+              time_dim: str = 'time',
+              block_years: int = None):
+   if block_years != None:
+    return clmMonBlocks(lambda t0,t1: var_time[t0:t1],0,len(var_time[time_dim]),block_years,time_dim)
+   if var_time.chunks is not None:
+    return clmMonLazy(var_time,time_dim)
    return xr.DataArray(np.array(var_time).reshape(int(len(var_time[time_dim])/12),
                                                   12,
                                                   len(var_time.lat),
@@ -28,12 +35,20 @@ def clmMonTLL(var_time: xr.DataArray,
    Returned variable will be of size (12 x lat x lon), with 12 corresponding to the mean value for
    each month (first element = Jan avg., etc.) from the original time series. Dimension for months
    is named 'time' for ease of future weighting the variable by time, but can be specified as a
-   different name if desired (ex. 'month') '''
+   different name if desired (ex. 'month'). If 'block_years' is given, the time series is read
+   'block_years' years at a time and accumulated with 'clmMonBlocks' instead of being loaded whole.
+   If 'var_time' is a dask array, the climatology is built lazily with 'clmMonLazy'. '''
 
 
+@profiled
 def clmMonTLLL(var_time: xr.DataArray,
               time_dim: str = 'time',
-              lev_dim: str = 'plev'):
+              lev_dim: str = 'plev',
+              block_years: int = None):
+   if block_years != None:
+    return clmMonBlocks(lambda t0,t1: var_time[t0:t1],0,len(var_time[time_dim]),block_years,time_dim)
+   if var_time.chunks is not None:
+    return clmMonLazy(var_time,time_dim)
    return xr.DataArray(np.array(var_time).reshape(int(len(var_time[time_dim])/12),
                                                   12,
                                                   len(var_time[lev_dim]),
@@ -49,9 +64,15 @@ def clmMonTLLL(var_time: xr.DataArray,
    indicates pressure levels) such that the input has dimensions (time,lev or plev,lat,lon). 
    Returned variable will be of size (12 x # of atmospheric levels x lat x lon), hence TLLL. '''
 
+@profiled
 def clmMonTSLL(var_time: xr.DataArray,
                time_dim: str = 'time',
-               soil_dim: str = 'levgrnd'):
+               soil_dim: str = 'levgrnd',
+               block_years: int = None):
+   if block_years != None:
+    return clmMonBlocks(lambda t0,t1: var_time[t0:t1],0,len(var_time[time_dim]),block_years,time_dim)
+   if var_time.chunks is not None:
+    return clmMonLazy(var_time,time_dim)
    return xr.DataArray(np.array(var_time).reshape(int(len(var_time[time_dim])/12),
                                                   12,
                                                   len(var_time[soil_dim]),
@@ -66,3 +87,125 @@ def clmMonTSLL(var_time: xr.DataArray,
    Identical to 'clmMonTLL' above but requires a 'lev' dimension such that the input has dimensions
    (time,lev,lat,lon). Returned variable will be of size (12 x lev x lat x lon), hence TLLL. '''
 
+
+#######################################################################################################
+# Lazy 12 month climatology for dask arrays 
+#######################################################################################################
+
+@profiled
+def clmMonLazy(var_time: xr.DataArray,
+               time_dim: str = 'time') -> xr.DataArray:
+
+   '''Calculates a 12 month climatology of a dask-backed (time x ...) variable without computing it. The time
+   dimension is split into (year x 12 months) with coarsen/construct and averaged over years, skipping
+   NaN values as in clmMonTLL, clmMonTLLL and clmMonTSLL. Only dimension coordinates other than time
+   are kept, matching the output of those functions. The result stays lazy until computed. '''
+
+   if len(var_time[time_dim]) % 12 != 0:
+    raise ValueError('Length of '+time_dim+' must be a multiple of 12, got '+str(len(var_time[time_dim])))
+
+   var = var_time.reset_coords(drop=True)
+   if time_dim in var.coords:
+    var = var.drop_vars(time_dim)
+
+   var_clim = var.coarsen({time_dim:12}).construct({time_dim:('year',time_dim)}).mean('year')
+
+   return var_clim.assign_coords({time_dim:np.arange(12)})
+
+#######################################################################################################
+# Streaming 12 month climatology for long time series 
+#######################################################################################################
+
+class MonthlyAccumulator:
+
+   '''Running 12 month sums and counts for building a climatology from consecutive blocks of a time series.
+   Each block passed to 'add' must have time as its first dimension, start in January and hold whole
+   years. NaN values are skipped and the years are summed one at a time, in order, in the type of the
+   input (float64 for integers), which is how xarray's mean('year') in clmMonTLL adds them, so the
+   climatology is identical to the in-memory one. Peak memory is one block plus (12 x [lev] x lat x lon)
+   regardless of the length of the record. '''
+
+   def __init__(self,
+                time_dim: str = 'time'):
+      self.time_dim = time_dim
+      self.sums = None
+      self.counts = None
+      self.template = None
+
+   def add(self,
+           block: xr.DataArray):
+
+      values = np.asarray(block)
+      if values.shape[0] % 12 != 0:
+       raise ValueError('Climatology blocks must contain whole years, got '+str(values.shape[0])+' months')
+      values = values.reshape(values.shape[0]//12,12,*values.shape[1:])
+
+      if self.sums is None:
+       dtype = values.dtype if np.issubdtype(values.dtype,np.floating) else np.float64
+       self.sums = np.zeros(values.shape[1:],dtype=dtype)
+       self.counts = np.zeros(values.shape[1:],dtype=np.intp)
+       self.template = block
+
+      # One year at a time, in order, as numpy adds along the year dimension of the whole time series
+      for year in values:
+       valid = ~np.isnan(year) if np.issubdtype(year.dtype,np.floating) else np.ones(year.shape,dtype=bool)
+       self.sums += np.where(valid,year,0)
+       self.counts += valid
+
+      return self
+
+   def result(self) -> xr.DataArray:
+
+      if self.sums is None:
+       raise ValueError('No data has been added to the climatology')
+
+      with np.errstate(invalid='ignore',divide='ignore'):
+       clim = self.sums / self.counts
+
+      # Match the output type of the in-memory climatology functions
+      dtype = self.template.dtype if np.issubdtype(self.template.dtype,np.floating) else np.float64
+      dims = list(self.template.dims)
+      coords = {self.time_dim: np.arange(12)}
+      for dim in dims[1:]:
+       if dim in self.template.coords:
+        coords[dim] = self.template[dim]
+
+      return xr.DataArray(clim.astype(dtype),dims=[self.time_dim]+dims[1:],coords=coords)
+
+@profiled
+def clmMonBlocks(read_block,
+                 begi: int,
+                 endi: int,
+                 block_years: int = 10,
+                 time_dim: str = 'time'):
+
+   '''Calculates a 12 month climatology of any (time x ...) variable without holding the whole time series
+   in memory. 'read_block(t0,t1)' must return the variable for time indices t0 to t1 as an
+   xr.DataArray with time as its first dimension; it is called for consecutive blocks of 'block_years'
+   years between 'begi' and 'endi'. (endi-begi) must be a multiple of 12. If 'read_block' returns a
+   tuple of variables, a tuple of climatologies is returned, so several variables built from the same
+   reads are averaged together. Years are summed in the same order and type as in clmMonTLL, clmMonTLLL
+   and clmMonTSLL (see MonthlyAccumulator), so the results are identical to theirs. '''
+
+   begi, endi, block_years = int(begi), int(endi), int(block_years)
+   if (endi - begi) % 12 != 0:
+    raise ValueError('(endi-begi) must be a multiple of 12, got '+str(endi-begi))
+   if block_years < 1:
+    raise ValueError('block_years must be at least 1')
+
+   accumulators = None
+   for t0 in range(begi,endi,12*block_years):
+    blocks = read_block(t0,min(t0+12*block_years,endi))
+    single = not isinstance(blocks,tuple)
+    if single:
+     blocks = (blocks,)
+    if accumulators is None:
+     accumulators = [MonthlyAccumulator(time_dim=time_dim) for _ in blocks]
+    for accumulator, block in zip(accumulators,blocks):
+     accumulator.add(block)
+
+   if accumulators is None:
+    raise ValueError('No time steps between begi and endi')
+   clims = tuple(accumulator.result() for accumulator in accumulators)
+
+   return clims[0] if single else clims
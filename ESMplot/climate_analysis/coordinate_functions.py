@@ -6,6 +6,190 @@
 
 import numpy as np
 import xarray as xr
+from collections import OrderedDict
+from ESMplot.climate_analysis.profiling import profiled
+
+#######################################################################################################
+# Region lookups on a lat/lon grid
+#######################################################################################################
+
+# Number of grids whose RegionIndex is kept by region_index
+default_region_index_cache_size = 8
+
+# Cached RegionIndex objects, most recently used last
+_region_index_cache = OrderedDict()
+
+def _nearest_index(values: np.ndarray,
+                   descending: bool,
+                   target: float) -> int:
+
+   # Index of the value nearest 'target' in a monotonic array, with ties going to the larger value as in
+   # xarray's sel(method='nearest'). 'values' is the array in increasing order.
+   n = len(values)
+   below = np.searchsorted(values,target,side='right') - 1
+   above = np.searchsorted(values,target,side='left')
+   if below < 0:
+    ind = above
+   elif above >= n:
+    ind = below
+   else:
+    ind = below if (target - values[below]) < (values[above] - target) else above
+
+   return int(n - 1 - ind) if descending else int(ind)
+
+class RegionIndex:
+
+   '''Grid indices of regions and points on one lat/lon grid. The latitude direction (N->S or S->N) and
+   longitude convention (degW = 180-360 or -180-0) are found once when the index is built, and each bound
+   is then matched to the nearest grid point with np.searchsorted, so a region lookup takes microseconds.
+   Bounds are given as in lat_lon_index_array: + latitude = °N, - latitude = °S, + longitude = °E and
+   - longitude = °W, on either longitude convention. Regions where wlon is east of elon cross the prime
+   meridian (0-360 grids) or the date line (-180-180 grids) and wrap around the end of the longitude
+   array. Use region_index to get the cached index of a grid rather than building a new one.
+
+   Required Parameters
+   --------------------------------------------------------------------------------------------------------
+   lat, lon
+    class: 'xarray.DataArray' or 'numpy.ndarray', Monotonic latitude and longitude coordinates.
+   ________________________________________________________________________________________________________
+
+   Example
+   ---------------------
+   index = region_index(var.lat,var.lon)
+   latarray, lonarray = index.index_arrays(slat=-10.,nlat=10.,wlon=-20.,elon=20.)
+   var_reg = var[...,latarray,lonarray]
+
+   '''
+
+   def __init__(self,
+                lat: xr.DataArray,
+                lon: xr.DataArray):
+
+      self.lat = np.asarray(lat,dtype=np.float64)
+      self.lon = np.asarray(lon,dtype=np.float64)
+
+      # Discover direction of coordinate arrays
+      self.lat_descending = bool(self.lat[0] > self.lat[-1])
+      self.lon_descending = bool(self.lon[0] > self.lon[-1])
+      self._lat_sorted = self.lat[::-1] if self.lat_descending else self.lat
+      self._lon_sorted = self.lon[::-1] if self.lon_descending else self.lon
+
+      # Discover treatment of longitude array (True if degW = 180-360)
+      self.lon_360 = bool(np.any(self.lon > 180.)) or not bool(np.any(self.lon < 0.))
+
+   def nearest(self,
+               latpt: float,
+               lonpt: float) -> tuple:
+
+      '''Returns the indices (lat_ind, lon_ind) of the grid point nearest (latpt, lonpt).'''
+
+      lonpt = float(lonpt)
+      if self.lon_360 and lonpt < 0.:
+       lonpt = lonpt + 360
+      elif not self.lon_360 and lonpt > 180.:
+       lonpt = lonpt - 360
+
+      return (_nearest_index(self._lat_sorted,self.lat_descending,float(latpt)),
+              _nearest_index(self._lon_sorted,self.lon_descending,lonpt))
+
+   def bounds(self,
+              slat: float,
+              nlat: float,
+              wlon: float,
+              elon: float) -> tuple:
+
+      '''Returns the indices (lats, latn, lonw, lone) of the grid points nearest the southern, northern,
+      western and eastern bounds of a region.'''
+
+      lats, lonw = self.nearest(slat,wlon)
+      latn, lone = self.nearest(nlat,elon)
+
+      return lats, latn, lonw, lone
+
+   def slices(self,
+              slat: float,
+              nlat: float,
+              wlon: float,
+              elon: float) -> tuple:
+
+      '''Returns (lat slice, lon slice) selecting a region, ex. var[...,latslice,lonslice]. For regions
+      that wrap around the end of the longitude array an index array is returned for lon instead.'''
+
+      lats, latn, lonw, lone = self.bounds(slat,nlat,wlon,elon)
+
+      if self.lat_descending:
+       latslice = slice(latn,lats+1)
+      else:
+       latslice = slice(lats,latn+1)
+
+      if lonw <= lone:
+       lonslice = slice(lonw,lone+1)
+      else:
+       lonslice = np.append(np.arange(lonw,len(self.lon)),np.arange(0,lone+1))
+
+      return latslice, lonslice
+
+   def index_arrays(self,
+                    slat: float,
+                    nlat: float,
+                    wlon: float,
+                    elon: float) -> tuple:
+
+      '''Returns (latarray, lonarray), 1-D arrays of the lat and lon indices in a region.'''
+
+      latslice, lonslice = self.slices(slat,nlat,wlon,elon)
+      latarray = np.arange(len(self.lat))[latslice]
+      lonarray = np.arange(len(self.lon))[lonslice] if isinstance(lonslice,slice) else lonslice
+
+      return latarray, lonarray
+
+   def perimeter(self,
+                 slat: float,
+                 nlat: float,
+                 wlon: float,
+                 elon: float) -> tuple:
+
+      '''Returns (rlats, rlatn, rlonw, rlone), the grid cell edges bounding a region in degrees, with
+      longitudes in -180-180, for drawing or printing the region.'''
+
+      lats, latn, lonw, lone = self.bounds(slat,nlat,wlon,elon)
+
+      # Spacing to show lat/lon values as edge of grid cells rather than midpoint
+      latadj = abs((self.lat[2]-self.lat[1])/2)
+      lonadj = abs((self.lon[2]-self.lon[1])/2)
+
+      rlats = np.float64(self.lat[lats]-latadj)
+      rlatn = np.float64(self.lat[latn]+latadj)
+      rlonw = np.float64(self.lon[lonw]-lonadj)
+      rlone = np.float64(self.lon[lone]+lonadj)
+      if rlonw > 180:
+       rlonw = rlonw - 360
+      if rlone > 180:
+       rlone = rlone - 360
+
+      return rlats, rlatn, rlonw, rlone
+
+def region_index(lat = xr.DataArray,
+                 lon = xr.DataArray) -> RegionIndex:
+
+   ''' Returns the RegionIndex of the grid given by lat and lon, building it only the first time the grid 
+   is seen. Grids are matched by their coordinate values, so all variables on the same grid share one 
+   index. The most recently used grids are kept (default = 8). '''
+
+   lat = np.asarray(lat,dtype=np.float64)
+   lon = np.asarray(lon,dtype=np.float64)
+   key = (lat.tobytes(),lon.tobytes())
+
+   if key in _region_index_cache:
+    _region_index_cache.move_to_end(key)
+    return _region_index_cache[key]
+
+   index = RegionIndex(lat,lon)
+   _region_index_cache[key] = index
+   while len(_region_index_cache) > default_region_index_cache_size:
+    _region_index_cache.popitem(last=False)
+
+   return index
 
 #######################################################################################################
 # Calculate index arrays for lat and lon based on given value ranges
@@ -20,79 +204,65 @@ def lat_lon_index_array(lat = xr.DataArray,
 
    ''' Input lat/lon boundaries for a region (can be 1D along lat or lon) and return arrays of lat and
    lon indices corresponding to the coordinate range. This function can handle lat/lon coordinate 
-   arrays of different sizes and sequential order. ''' 
-
-   # Discover direction of latitude array
-   if lat[0] > 0:
-    lat_direction = 'N->S'
-   elif lat[0] < 0:
-    lat_direction = 'S->N'
-
-   # Discover treatment of longitude array
-   if any(i > 180. for i in lon):
-    lon_treatment = 'degW = 180-360'
-   elif any(i < 0. for i in lon):
-    lon_treatment = 'degW = -180-0'
-
-   # If longitude array treats degW as 180-360, modify lonw,lone
-   if lon_treatment == 'degW = 180-360':
-    if wlon < 0.:
-     wlon = wlon + 360
-    if elon < 0.:
-     elon = elon + 360
-
-   # Select coordinate indices
-   lats = list(lat.values).index(lat.sel(lat=slat, method='nearest').lat)
-   latn = list(lat.values).index(lat.sel(lat=nlat, method='nearest').lat)
-   lonw = list(lon.values).index(lon.sel(lon=wlon, method='nearest').lon)
-   lone = list(lon.values).index(lon.sel(lon=elon, method='nearest').lon)
-
-   # Coordinate index arrays: latitude 
-   if lat_direction == 'N->S':
-    latarray = np.arange(latn,lats+1,1)
-   elif lat_direction == 'S->N':
-    latarray = np.arange(lats,latn+1,1)
-
-   # Coordinate index arrays: longitude
-
-   if lon_treatment == 'degW = 180-360':
-    # if lonarray crosses prime meridian
-    if lon[lonw] > lon[lone]:
-     lonarray_west = np.arange(lonw,list(lon.values).index(lon.sel(lon=lon[-1]).lon)+1,1) # from index lonw to lon=0
-     lonarray_east = np.arange(0,list(lon.values).index(lon.sel(lon=lon[lone]).lon)+1,1)  # from lon=0 to index lone
-     lonarray = np.append(lonarray_west,lonarray_east)
-    # if lonarray crosses international date line
-    elif lon[lonw] < 180. and lon[lone] > 180.:
-     lonarray_west = np.arange(lonw,list(lon.values).index(lon.sel(lon=180, method='nearest').lon),1) # from index lonw to lon=180
-     lonarray_east = np.arange(list(lon.values).index(lon.sel(lon=180, method='nearest').lon),lone+1,1) # from lon=180 to index lone
-     lonarray = np.append(lonarray_west,lonarray_east)
-    elif lon[lonw] < lon[lone]:
-     lonarray = np.arange(lonw,lone+1)
-    elif lonw == lone:
-     lonarray = lonw
-
-   if lon_treatment == 'degW = -180-0':
-    # if lonarray crosses prime meridian
-    if lon[lonw] < 0. and lon[lone] > 0.:
-     lonarray_west = np.arange(lonw,list(lon.values).index(lon.sel(lon=0, method='nearest').lon),1) # from index lonw to lon=0
-     lonarray_east = np.arange(list(lon.values).index(lon.sel(lon=0, method='nearest').lon),lone+1,1) # from lon=0 to index lone      
-     lonarray = np.append(lonarray_west,lonarray_east)
-    # if lonarray crosses international date line
-    elif lon[lonw] > 0. and lon[lone] < 0.:
-     lonarray_west = np.arange(lonw,list(lon.values).index(lon.sel(lon=180, method='nearest').lon),1) # from index lonw to lon=180
-     lonarray_east = np.arange(list(lon.values).index(lon.sel(lon=180, method='nearest').lon),lone+1,1) # from index lonw to lon=180
-     lonarray = np.append(lonarray_west,lonarray_east)
-    elif lonw < lone:
-     lonarray = np.arange(lonw,lone+1)
-    elif lonw == lone:
-     lonarray = lonw
-
-   return latarray, lonarray
+   arrays of different sizes and sequential order. Lookups use the cached RegionIndex of the grid. ''' 
+
+   return region_index(lat,lon).index_arrays(slat=slat,nlat=nlat,wlon=wlon,elon=elon)
+
+#######################################################################################################
+# Area-weighted regional averages as a single contraction over lat and lon
+#######################################################################################################
+
+def region_weights(lat = xr.DataArray,
+                   lon = xr.DataArray,
+                   slat = float,
+                   nlat = float,
+                   wlon = float,
+                   elon = float) -> xr.DataArray:
+
+   ''' Build once per grid and region: returns a (lat x lon) matrix of cos(latitude) weights inside the 
+   region given by slat, nlat, wlon and elon (as selected by lat_lon_index_array) and zero outside it, 
+   normalized to sum to 1. Matrices for several regions can be stacked along a new leading dimension 
+   (ex. xr.concat(..., dim='region')) and averaged together with region_mean. '''
+
+   latarray, lonarray = lat_lon_index_array(lat=lat,lon=lon,slat=slat,nlat=nlat,wlon=wlon,elon=elon)
+
+   # Grid cells selected by the index arrays, counted as many times as they are selected
+   mask = np.zeros((len(lat),len(lon)),dtype=float)
+   np.add.at(mask,np.ix_(np.atleast_1d(latarray),np.atleast_1d(lonarray)),1.)
+
+   wgt = mask * np.cos(np.deg2rad(np.asarray(lat,dtype=float)))[:,np.newaxis]
 
+   return xr.DataArray(wgt/wgt.sum(),dims=['lat','lon'],coords=dict(lat=lat,lon=lon))
 
+@profiled(name='weighted_mean')
+def region_mean(var = xr.DataArray,
+                weights = xr.DataArray) -> xr.DataArray:
 
+   ''' Area-weighted average of 'var' (any dimensions, ex. case x tag x month, followed by lat x lon) 
+   over the region(s) in 'weights' (from region_weights), computed for the whole array with one tensor 
+   contraction. Grid cells where 'var' is NaN are left out and the remaining weights renormalized, so 
+   results equal var[...,latarray,lonarray].weighted(lat_wgts[latarray]).mean(('lon','lat')). Returns the 
+   leading dimensions of 'var' followed by any leading dimensions of 'weights' (ex. region). '''
 
+   var = xr.DataArray(var).transpose(...,'lat','lon')
+   weights = xr.DataArray(weights).transpose(...,'lat','lon')
 
+   values = np.asarray(var,dtype=float)
+   wgt = np.asarray(weights,dtype=float)
+   valid = ~np.isnan(values)
+   axes = ([-2,-1],[-2,-1])
 
+   # Weighted sum, divided by the sum of weights of valid grid cells
+   total = np.tensordot(np.where(valid,values,0.),wgt,axes=axes)
+   if valid.all():
+    norm = np.tensordot(np.ones(values.shape[-2:]),wgt,axes=axes)
+   else:
+    norm = np.tensordot(valid.astype(float),wgt,axes=axes)
+   with np.errstate(invalid='ignore',divide='ignore'):
+    mean = np.where(norm > 0.,total/norm,np.nan)
 
+   dims = list(var.dims[:-2]) + list(weights.dims[:-2])
+   coords = {name: coord for name, coord in list(var.coords.items()) + list(weights.coords.items())
+             if set(coord.dims) <= set(dims)}
 
+   return xr.DataArray(mean,dims=dims,coords=coords)
@@ -0,0 +1,201 @@
+#######################################################################################################
+#
+# Process-wide cache of open netCDF datasets (or Zarr stores) shared by every reader in the package
+#
+#######################################################################################################
+
+import os
+import sys
+from collections import OrderedDict
+import xarray as xr
+from ESMplot.climate_analysis.profiling import span
+
+# Default number of datasets held open at once
+default_cache_size = 16
+
+# Open datasets, most recently used last: ((path, size, mtime), chunks) -> xr.Dataset
+_dataset_cache = OrderedDict()
+_cache_size = default_cache_size
+
+# Datasets evicted while still referenced outside the cache, closed once released (see _close_released)
+_evicted = []
+
+# Read a converted Zarr store next to a netCDF file instead of the file itself (see resolve_store)
+prefer_zarr_stores = True
+
+# Consolidated metadata of Zarr stores (format 2, written by history_to_zarr)
+zarr_metadata_files = ['.zmetadata']
+
+#######################################################################################################
+# Fingerprint of a file on disk
+#######################################################################################################
+
+def file_fingerprint(path: str) -> tuple:
+
+  '''Returns a tuple (absolute path, size in bytes, modification time in ns) identifying the current
+  contents of the file at 'path'. A file that is rewritten in place gets a new fingerprint, so cached
+  handles to the old contents are never reused. For a Zarr store (a directory), the size and time are
+  those of its consolidated metadata, which is written last when the store is (re)written.'''
+
+  path = os.path.abspath(str(path))
+  stat = os.stat(zarr_metadata(path) or path)
+
+  return (path, stat.st_size, stat.st_mtime_ns)
+
+#######################################################################################################
+# Zarr stores used in place of netCDF files
+#######################################################################################################
+
+def zarr_metadata(path: str) -> str:
+
+  '''Returns the path of the consolidated metadata file of the Zarr store at 'path', or None if 'path' 
+  is not a Zarr store.'''
+
+  for name in zarr_metadata_files:
+   metadata = os.path.join(str(path),name)
+   if os.path.isfile(metadata):
+    return metadata
+
+  return None
+
+def resolve_store(path: str) -> str:
+
+  '''Returns the path that should be opened for 'path': 'path' itself if it is a Zarr store or no store
+  has been made from it, or the Zarr store next to a netCDF file (ex. case.zarr for case.nc, written by
+  history_to_zarr in zarr_store.py) if it is at least as new as the netCDF file. Readers can then keep
+  the .nc paths in their scripts and transparently read the converted store. history_to_zarr writes
+  a store under a temporary name and only moves it into place once complete, so an interrupted
+  conversion is never picked up here.'''
+
+  path = str(path)
+  if not prefer_zarr_stores or zarr_metadata(path) != None:
+   return path
+
+  store = os.path.splitext(path)[0]+'.zarr'
+  metadata = zarr_metadata(store)
+  if metadata == None:
+   return path
+  if os.path.exists(path) and os.stat(metadata).st_mtime_ns < os.stat(path).st_mtime_ns:
+   return path
+
+  return store
+
+#######################################################################################################
+# Open a dataset through the cache
+#######################################################################################################
+
+def open_cached_dataset(path: str,
+                        chunks: dict = None) -> xr.Dataset:
+
+  '''Returns an open xr.Dataset for the netCDF file or Zarr store at 'path', reusing a previously opened
+  handle if the file has not changed since it was opened. If a Zarr store has been made from a netCDF
+  file (see resolve_store), the store is opened in its place. Datasets are kept in a bounded least-
+  recently-used cache and closed when evicted. A dataset that a caller still holds when it is evicted is
+  closed once the caller releases it (the next time the cache is used after that). The returned dataset
+  is shared, so callers must not close it themselves.
+
+  Required Parameters
+  --------------------------------------------------------------------------------------------------------
+  path
+   class: 'string', The file path to the netCDF file or Zarr store to be opened.
+
+  Optional Parameters
+  --------------------------------------------------------------------------------------------------------
+  chunks: class 'dict', Dask chunk sizes passed to xr.open_dataset, ex. {'time': 120}. Variables are then
+                        dask arrays and calculations on them stay lazy until computed. The same file opened
+                        with different chunks is cached separately. For a Zarr store, {} gives one dask 
+                        chunk per stored chunk, so variables are read chunk by chunk in parallel. 
+                        Default = None opens without dask.
+  ________________________________________________________________________________________________________
+
+  Returns
+  ---------------------
+  output: :class:'xarray.Dataset'
+          Lazily loaded dataset for the file at 'path'
+
+  '''
+
+  fingerprint = file_fingerprint(resolve_store(path))
+  key = (fingerprint,tuple(sorted(chunks.items())) if isinstance(chunks,dict) else chunks)
+  _close_released()
+
+  # Caching disabled
+  if _cache_size == 0:
+   return _open_dataset(fingerprint[0],chunks)
+
+  # Cache hit: mark as most recently used
+  if key in _dataset_cache:
+   _dataset_cache.move_to_end(key)
+   return _dataset_cache[key]
+
+  # Drop stale handles to an older version of the same file
+  for old_key in [k for k in _dataset_cache if k[0][0] == fingerprint[0] and k[0] != fingerprint]:
+   _evicted.append(_dataset_cache.pop(old_key))
+
+  data = _open_dataset(fingerprint[0],chunks)
+  _dataset_cache[key] = data
+
+  # Evict least recently used datasets beyond the cache size
+  while len(_dataset_cache) > _cache_size:
+   _evicted.append(_dataset_cache.popitem(last=False)[1])
+  _close_released()
+
+  return data
+
+def _open_dataset(path: str,
+                  chunks: dict) -> xr.Dataset:
+
+  # netCDF file or Zarr store (chunks = {} gives one dask chunk per Zarr chunk)
+  with span('open_dataset',path=path):
+   if zarr_metadata(path) != None:
+    return xr.open_dataset(path,engine='zarr',chunks=chunks,consolidated=True)
+
+   return xr.open_dataset(path,chunks=chunks)
+
+#######################################################################################################
+# Close evicted datasets
+#######################################################################################################
+
+def _close_released():
+
+  # Closes the evicted datasets that are no longer referenced outside '_evicted'. Callers holding one
+  # keep it open, so it is never closed while they read from it.
+  i = 0
+  while i < len(_evicted):
+   # References: the list entry and the argument of getrefcount
+   if sys.getrefcount(_evicted[i]) <= 2:
+    _evicted.pop(i).close()
+   else:
+    i += 1
+
+#######################################################################################################
+# Manage the cache
+#######################################################################################################
+
+def clear_dataset_cache():
+
+  '''Empties the cache and closes its datasets. Datasets still held by a caller are closed once
+  released.'''
+
+  while _dataset_cache:
+   _evicted.append(_dataset_cache.popitem(last=False)[1])
+  _close_released()
+
+def set_dataset_cache_size(size: int):
+
+  '''Sets the maximum number of datasets held open at once (default = 16). Datasets beyond the new
+  size are closed immediately (or once released, see open_cached_dataset), least recently used first.
+  A size of 0 disables caching.'''
+
+  global _cache_size
+  _cache_size = max(int(size), 0)
+
+  while len(_dataset_cache) > _cache_size:
+   _evicted.append(_dataset_cache.popitem(last=False)[1])
+  _close_released()
+
+def dataset_cache_info() -> dict:
+
+  '''Returns a dictionary with the cache size limit and the paths of the datasets currently open.'''
+
+  return dict(size=_cache_size,paths=[k[0][0] for k in _dataset_cache])
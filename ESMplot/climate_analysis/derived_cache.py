@@ -0,0 +1,287 @@
+#######################################################################################################
+#
+# Persistent on-disk cache of derived products (seasonal cycles and seasonal averages). Results are
+# stored as compressed netCDF files named by a hash of the function, its arguments and the fingerprints
+# of the model output files it reads, so re-running a script (ex. to change a color table) reads the
+# stored result instead of the model output.
+#
+#######################################################################################################
+
+import os
+import glob
+import hashlib
+import inspect
+import functools
+import numpy as np
+import xarray as xr
+from ESMplot.climate_analysis.dataset_cache import file_fingerprint, zarr_metadata
+
+# Version of the stored format; changing it invalidates every entry
+cache_version = 1
+
+# Default size limit of the cache directory
+default_max_size_gb = 10.
+
+# Arguments that change how a result is computed but not its values
+ignored_arguments = ['chunks','scheduler']
+
+# Arguments naming the model output files (or Zarr stores) a function reads
+path_arguments = ['path']
+
+# Cache settings: directory = None disables the cache
+_cache_dir = None
+_max_bytes = int(default_max_size_gb*1e9)
+
+# Counters since the cache was configured
+_stats = dict(hits=0,misses=0,stores=0,evictions=0,errors=0)
+
+# Hash of the climate_analysis sources (see _package_hash)
+_source_hash = None
+
+#######################################################################################################
+# Configure the cache
+#######################################################################################################
+
+def set_derived_cache(directory: str,
+                      max_size_gb: float = default_max_size_gb):
+
+  '''Turns on the derived product cache, storing results in 'directory' (created if needed). When the
+  files in 'directory' exceed 'max_size_gb', the least recently used results are deleted. Passing
+  directory = None turns the cache off. Results are only reused while the model output files they were
+  calculated from are unchanged (same path, size and modification time).'''
+
+  global _cache_dir, _max_bytes
+
+  if directory == None:
+   _cache_dir = None
+  else:
+   _cache_dir = os.path.abspath(str(directory))
+   os.makedirs(_cache_dir,exist_ok=True)
+  _max_bytes = int(float(max_size_gb)*1e9)
+
+  for name in _stats:
+   _stats[name] = 0
+
+  if _cache_dir != None:
+   _evict()
+
+def clear_derived_cache():
+
+  '''Deletes every result stored in the cache directory.'''
+
+  for path, _, _ in _entries():
+   os.remove(path)
+
+def derived_cache_info() -> dict:
+
+  '''Returns a dictionary describing the cache: its directory, size limit, number of stored results and
+  their total size, counts of hits, misses, stores, evictions and errors since it was configured, and
+  the number of stored results for each function.'''
+
+  entries = _entries()
+  by_function = {}
+  for path, _, _ in entries:
+   name = os.path.basename(path).rsplit('-',1)[0]
+   by_function[name] = by_function.get(name,0) + 1
+
+  return dict(directory=_cache_dir,
+              max_size_gb=_max_bytes/1e9,
+              entries=len(entries),
+              size_gb=sum(size for _, size, _ in entries)/1e9,
+              by_function=by_function,
+              **_stats)
+
+#######################################################################################################
+# Cache keys
+#######################################################################################################
+
+def _normalize(value,
+               is_path: bool = False):
+
+  # Hashable, order-independent representation of an argument. Existing files (or Zarr stores) given to a
+  # path argument are replaced by their fingerprint and numbers by floats, so ex. level=850 and level=850.
+  # give the same key. Other strings are kept as they are, even if a file of that name exists (ex. var1='T').
+  if value is None or isinstance(value,(bool,np.bool_)):
+   return None if value is None else bool(value)
+  if isinstance(value,str):
+   if is_path and (os.path.isfile(value) or zarr_metadata(value) != None):
+    return ('file',)+file_fingerprint(value)
+   return value
+  if isinstance(value,(int,float,np.integer,np.floating)):
+   return float(value)
+  if isinstance(value,(np.ndarray,xr.DataArray)):
+   return tuple(_normalize(v) for v in np.asarray(value).ravel().tolist())
+  if isinstance(value,(list,tuple)):
+   return tuple(_normalize(v,is_path) for v in value)
+  if isinstance(value,dict):
+   return tuple(sorted((str(k),_normalize(v,is_path)) for k, v in value.items()))
+
+  return repr(value)
+
+def _package_hash() -> str:
+
+  # Hash of every module in climate_analysis, computed once per process. The cached functions call
+  # readers, climatologies and interpolation in other modules, so a change to any of them must
+  # invalidate stored results along with a change to the cached function itself.
+  global _source_hash
+
+  if _source_hash == None:
+   digest = hashlib.sha256()
+   for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)),'*.py'))):
+    digest.update(os.path.basename(path).encode())
+    with open(path,'rb') as source:
+     digest.update(source.read())
+   _source_hash = digest.hexdigest()
+
+  return _source_hash
+
+def _cache_key(func,
+               args: tuple,
+               kwargs: dict) -> str:
+
+  # Hash of the function (name and source), the package sources, its normalized arguments and the input
+  # file fingerprints
+  bound = inspect.signature(func).bind(*args,**kwargs)
+  bound.apply_defaults()
+  arguments = tuple((name,_normalize(value,name in path_arguments)) for name, value in bound.arguments.items()
+                    if name not in ignored_arguments)
+
+  try:
+   source = inspect.getsource(func)
+  except (OSError,TypeError):
+   source = ''
+
+  key = repr((cache_version,func.__module__,func.__qualname__,hashlib.sha256(source.encode()).hexdigest(),
+              _package_hash(),arguments))
+
+  return hashlib.sha256(key.encode()).hexdigest()
+
+#######################################################################################################
+# Reading, writing and evicting stored results
+#######################################################################################################
+
+def _entries() -> list:
+
+  # (path, size in bytes, last use) of each stored result, least recently used first
+  if _cache_dir == None or not os.path.isdir(_cache_dir):
+   return []
+
+  entries = []
+  for name in os.listdir(_cache_dir):
+   if name.endswith('.nc'):
+    path = os.path.join(_cache_dir,name)
+    try:
+     stat = os.stat(path)
+    except FileNotFoundError:
+     continue
+    entries.append((path,stat.st_size,stat.st_mtime))
+
+  return sorted(entries,key=lambda entry: entry[2])
+
+def _evict():
+
+  # Delete least recently used results until the cache fits within its size limit
+  entries = _entries()
+  total = sum(size for _, size, _ in entries)
+  for path, size, _ in entries:
+   if total <= _max_bytes:
+    break
+   try:
+    os.remove(path)
+   except FileNotFoundError:
+    pass
+   total -= size
+   _stats['evictions'] += 1
+
+def _read(path: str):
+
+  # Load a stored result and mark it as most recently used
+  with xr.open_dataset(path,engine='netcdf4') as stored:
+   stored = stored.load()
+  os.utime(path)
+
+  outputs = []
+  for i in range(int(stored.attrs['n_outputs'])):
+   var = stored['out'+str(i)]
+   name = var.attrs.pop('_derived_name','')
+   var.name = name if name != '' else None
+   outputs.append(var)
+
+  return tuple(outputs) if stored.attrs['is_tuple'] else outputs[0]
+
+def _write(path: str,
+           result,
+           func_name: str):
+
+  # Store a result (xr.DataArray or tuple of them) as one compressed netCDF file. Written to a temporary
+  # file first so other processes never read a partial result.
+  outputs = list(result) if isinstance(result,tuple) else [result]
+  variables = {}
+  for i, var in enumerate(outputs):
+   var = var.copy()
+   var.attrs['_derived_name'] = '' if var.name == None else str(var.name)
+   variables['out'+str(i)] = var
+
+  stored = xr.Dataset(variables,attrs=dict(function=func_name,n_outputs=len(outputs),
+                                            is_tuple=int(isinstance(result,tuple))))
+  encoding = {name: dict(zlib=True,complevel=4) for name in variables}
+
+  tmp = path+'.'+str(os.getpid())+'.tmp'
+  try:
+   stored.to_netcdf(tmp,engine='netcdf4',encoding=encoding)
+   os.replace(tmp,path)
+  finally:
+   if os.path.exists(tmp):
+    os.remove(tmp)
+
+#######################################################################################################
+# Decorator for cached functions
+#######################################################################################################
+
+def cached_derived(func):
+
+  '''Decorator that stores the result of a function returning an xr.DataArray (or a tuple of them) in the
+  derived product cache when it is turned on (see set_derived_cache), and returns the stored result when
+  the function is called again with the same arguments on unchanged input files. Only the arguments
+  listed in path_arguments ('path') are treated as input files. Arguments that only affect how the
+  result is computed ('chunks', 'scheduler') are not part of the key. Editing any module in
+  climate_analysis (ex. a reader or climatology helper) invalidates every stored result. Results that
+  cannot be stored are returned as usual. The undecorated function is available as 'func.__wrapped__'.'''
+
+  @functools.wraps(func)
+  def wrapper(*args,**kwargs):
+
+   if _cache_dir == None:
+    return func(*args,**kwargs)
+
+   try:
+    key = _cache_key(func,args,kwargs)
+   except (OSError,TypeError,ValueError):
+    _stats['errors'] += 1
+    return func(*args,**kwargs)
+   path = os.path.join(_cache_dir,func.__name__+'-'+key[:32]+'.nc')
+
+   # Cache hit
+   if os.path.exists(path):
+    try:
+     result = _read(path)
+     _stats['hits'] += 1
+     return result
+    except Exception:
+     _stats['errors'] += 1
+
+   # Cache miss: calculate and store
+   _stats['misses'] += 1
+   result = func(*args,**kwargs)
+   outputs = result if isinstance(result,tuple) else (result,)
+   if all(isinstance(var,xr.DataArray) for var in outputs):
+    try:
+     _write(path,result,func.__name__)
+     _stats['stores'] += 1
+     _evict()
+    except Exception:
+     _stats['errors'] += 1
+
+   return result
+
+  return wrapper
@@ -0,0 +1,81 @@
+#######################################################################################################
+#
+# Helpers for the optional dask execution mode. Functions that accept 'chunks' open their datasets
+# lazily, build the whole calculation as a dask graph and call 'compute' once on the final result.
+#
+# The readers (seas_avg_LL.py, seas_cycle_TLL.py, seas_cycle_TSLL.py, ...) take two parameters for it:
+#  chunks     Dask chunk sizes used to open the file, ex. {'time': 120}. The calculation then stays lazy
+#             and is computed once at the end on all cores. Requires dask. None (the default) reads the
+#             variables into memory with NumPy.
+#  scheduler  Dask scheduler used when 'chunks' is given: 'threads', 'processes' or 'synchronous'. None
+#             (the default) uses dask's default (threads).
+#
+#######################################################################################################
+
+import xarray as xr
+
+# Schedulers accepted by 'compute'
+schedulers = ['threads','processes','synchronous']
+
+#######################################################################################################
+# Check whether a variable is backed by dask
+#######################################################################################################
+
+def is_lazy(var) -> bool:
+
+  '''Returns True if 'var' is an xr.DataArray or xr.Dataset holding dask arrays that have not been
+  computed yet.'''
+
+  if isinstance(var,xr.DataArray):
+   return var.chunks is not None
+  if isinstance(var,xr.Dataset):
+   return any(v.chunks is not None for v in var.data_vars.values())
+
+  return False
+
+#######################################################################################################
+# Compute lazy results
+#######################################################################################################
+
+def compute(*variables,
+            scheduler: str = None,
+            num_workers: int = None):
+
+  '''Computes any dask-backed xarray variables in one pass, so work shared between them (ex. a common
+  precipitation climatology) is only done once. Variables that are already in memory are returned
+  unchanged, so this is a no-op unless the calculation was started with 'chunks'.
+
+  Required Parameters
+  --------------------------------------------------------------------------------------------------------
+  variables
+   class: 'xarray.DataArray' or 'xarray.Dataset', One or more results to be computed.
+
+  Optional Parameters
+  --------------------------------------------------------------------------------------------------------
+  scheduler: class 'string', Dask scheduler to compute with. Options are 'threads' (shared memory, all
+                             cores), 'processes' (one process per core) and 'synchronous' (single thread,
+                             useful for debugging). Default = None uses dask's configured scheduler.
+  num_workers: class 'int', Number of threads or processes used by the scheduler. Default = None uses
+                            one per core.
+  ________________________________________________________________________________________________________
+
+  Returns
+  ---------------------
+  output: :class:'xarray.DataArray' or tuple of them
+          The computed variable, or a tuple of computed variables if more than one was given
+
+  '''
+
+  if scheduler != None and scheduler not in schedulers:
+   raise ValueError("scheduler must be one of "+", ".join(schedulers)+", got '"+str(scheduler)+"'")
+
+  if any(is_lazy(var) for var in variables):
+   import dask
+   kwargs = {}
+   if scheduler != None:
+    kwargs['scheduler'] = scheduler
+   if num_workers != None:
+    kwargs['num_workers'] = int(num_workers)
+   variables = dask.compute(*variables,**kwargs)
+
+  return variables[0] if len(variables) == 1 else tuple(variables)
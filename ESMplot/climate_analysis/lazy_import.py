@@ -0,0 +1,48 @@
+#######################################################################################################
+#
+# Deferred imports of modules that are slow to import (cartopy, cmaps, geocat.viz, matplotlib.pyplot)
+# or only needed by some functions (ex. the base map and tagged region drawing modules). A module
+# returned by lazy_import is not imported until one of its attributes is used, so scripts that only
+# calculate and print values do not pay for the plotting libraries that the plotting modules use.
+#
+#######################################################################################################
+
+import sys
+import types
+import importlib
+
+#######################################################################################################
+# Module imported on first use
+#######################################################################################################
+
+class LazyModule(types.ModuleType):
+
+   ''' Stand-in for the module 'name' that imports it the first time one of its attributes is used, and
+   then behaves like the module itself. Use lazy_import rather than this class.'''
+
+   def __getattr__(self,attr):
+
+      # Only called for attributes not yet copied from the module
+      module = importlib.import_module(self.__name__)
+      self.__dict__.update(module.__dict__)
+
+      return getattr(module,attr)
+
+   def __dir__(self):
+
+      return dir(importlib.import_module(self.__name__))
+
+def lazy_import(name: str) -> types.ModuleType:
+
+  '''Returns the module 'name' (ex. 'cartopy.crs') if it has already been imported, otherwise a stand-in
+  that imports it when one of its attributes is first used. Used in place of 'import name as alias':
+
+  ccrs = lazy_import('cartopy.crs')    # nothing is imported yet
+  proj = ccrs.PlateCarree()            # cartopy.crs is imported here
+
+  A missing module raises ImportError when it is first used rather than when it is named here.'''
+
+  if name in sys.modules:
+   return sys.modules[name]
+
+  return LazyModule(name)
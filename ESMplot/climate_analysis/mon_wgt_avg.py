@@ -6,12 +6,14 @@
 
 import numpy as np
 import xarray as xr
+from ESMplot.climate_analysis.profiling import profiled
 
 # Default arrays
-default_wgt_mon = xr.DataArray(np.ones(12),dims=['time']).astype(float)
+default_wgt_mon = np.ones(12)
 
 #######################################################################################################
 
+@profiled(name='weighted_mean')
 def mon_wgt_avg(var: xr.DataArray,
                 months: list,
                 wgt_mon: xr.DataArray = default_wgt_mon) -> xr.DataArray:
@@ -43,6 +45,7 @@ def mon_wgt_avg(var: xr.DataArray,
   '''
 
   # Weight by each month and calculate seasonal average
+  wgt_mon = xr.DataArray(wgt_mon,dims=['time'])
   var_wgt = var[months,:,:].weighted(wgt_mon)
   var_avg = var_wgt.mean('time')
 
@@ -0,0 +1,379 @@
+#######################################################################################################
+#
+# Builds a 12 month climatology file from CAM/CLM history output, either one time series file or a
+# directory of monthly h0 files, in place of NCO scripts (ncks/ncra/ncrcat for every month). Each month
+# of each group of variables is averaged in a worker process that reads its time steps a few years at a
+# time, and the results are written to one compressed netCDF file with the attributes and encodings of
+# the input. Like the output of ncra + ncrcat, the file has a 'time' dimension of 12 records (January
+# first) holding the average of every time-dependent variable, so it can be passed as 'path' to the
+# seasonal cycle, seasonal average and water tagging functions.
+#
+# Run from the command line with "python -m ESMplot.climate_analysis.monthly_climatology --help"
+#
+#######################################################################################################
+
+import os
+import re
+import glob
+import datetime
+import numpy as np
+import xarray as xr
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from ESMplot.climate_analysis.case_executor import worker_context
+from ESMplot.climate_analysis.profiling import profiled, span, worker_profiling, init_worker_profiling
+
+# Default size of one time step of the variables averaged together by one worker
+default_group_mb = 32.
+
+# Encoding entries kept from the input files (the rest describe the input's storage)
+kept_encoding = ['dtype','_FillValue','missing_value','scale_factor','add_offset','char_dim_name']
+
+# Year and month in the name of a monthly history file, ex. case.cam.h0.2105-01.nc
+month_file_pattern = re.compile(r'(\d{4,})-(\d{2})\.nc$')
+
+#######################################################################################################
+# Time steps of each month
+#######################################################################################################
+
+def month_records(files: list,
+                  begi: str = 'beg',
+                  endi: str = 'end',
+                  time_dim: str = 'time') -> list:
+
+  '''Returns, for each of the 12 months, a list of (file, indices) pairs giving the time steps of that
+  month in 'files'. The files are taken as one time series in the order given. Single time step files
+  named like monthly h0 files (ex. case.cam.h0.2105-01.nc) are assigned the month in their name;
+  otherwise the series is assumed to start in January at 'begi' and step through the months in order,
+  as in the climatology functions. 'begi' and 'endi' are time indices of the whole series (defaults
+  'beg' and 'end' use all of it).'''
+
+  lengths = []
+  for path in files:
+   with xr.open_dataset(path,decode_times=False,decode_timedelta=False) as data:
+    lengths.append(data.sizes[time_dim] if time_dim in data.dims else 0)
+
+  total = int(np.sum(lengths))
+  begi = 0 if begi == 'beg' else int(begi)
+  endi = total if endi == 'end' else int(endi)
+  named = all(length == 1 and month_file_pattern.search(os.path.basename(path)) != None
+              for path, length in zip(files,lengths))
+  if not named and (endi - begi) % 12 != 0:
+   raise ValueError('(endi-begi) must be a multiple of 12, got '+str(endi-begi))
+
+  records = [dict() for _ in range(12)]
+  position = 0
+  for path, length in zip(files,lengths):
+   for index in range(length):
+    if begi <= position < endi:
+     if named:
+      month = int(month_file_pattern.search(os.path.basename(path)).group(2)) - 1
+     else:
+      month = (position - begi) % 12
+     records[month].setdefault(path,[]).append(index)
+    position += 1
+
+  return [list(month.items()) for month in records]
+
+def _as_index(indices: list):
+
+  # Evenly spaced time indices as a slice, so the file is read with one strided read
+  if len(indices) == 1:
+   return slice(indices[0],indices[0]+1)
+  step = indices[1] - indices[0]
+  if step > 0 and all(b - a == step for a, b in zip(indices[:-1],indices[1:])):
+   return slice(indices[0],indices[-1]+1,step)
+
+  return indices
+
+#######################################################################################################
+# Average of one month of a group of variables (run in worker processes)
+#######################################################################################################
+
+def _month_mean(records: list,
+                names: list,
+                month: int,
+                block_years: int,
+                time_dim: str) -> dict:
+
+  with span('climatology_month',month=month+1,variables=len(names)):
+
+   sums, counts, first, dtypes = {}, {}, {}, {}
+
+   for path, indices in records:
+    with xr.open_dataset(path,decode_times=False,decode_timedelta=False) as data:
+     for start in range(0,len(indices),block_years):
+      index = _as_index(indices[start:start+block_years])
+      for name in names:
+       var = data[name]
+       values = var.transpose(time_dim,...).isel({time_dim:index}).values
+       dtypes[name] = values.dtype
+
+       # Numbers are summed in float64 (skipping missing values); text keeps its first time step
+       if values.dtype.kind == 'f':
+        valid = ~np.isnan(values)
+        total = np.where(valid,values,0.).sum(axis=0,dtype=np.float64)
+        count = valid.sum(axis=0)
+       elif values.dtype.kind in 'iub':
+        total = values.sum(axis=0,dtype=np.float64)
+        count = values.shape[0]
+       else:
+        first.setdefault(name,values[0])
+        continue
+
+       if name in sums:
+        sums[name] += total
+        counts[name] = counts[name] + count
+       else:
+        sums[name], counts[name] = total, count
+
+   means = dict(first)
+   for name in sums:
+    dtype = dtypes[name]
+    with np.errstate(invalid='ignore',divide='ignore'):
+     mean = sums[name] / counts[name]
+    means[name] = mean.astype(dtype) if dtype.kind == 'f' else np.rint(mean).astype(dtype)
+
+  return means
+
+#######################################################################################################
+# Build the climatology file
+#######################################################################################################
+
+@profiled
+def monthly_climatology(source: str,
+                        output: str = None,
+                        variables: list = None,
+                        pattern: str = '*.h0.*.nc',
+                        begi: str = 'beg',
+                        endi: str = 'end',
+                        workers: int = None,
+                        block_years: int = 10,
+                        group_mb: float = default_group_mb,
+                        complevel: int = 4,
+                        overwrite: bool = False,
+                        time_dim: str = 'time') -> str:
+
+  '''Calculates the 12 month climatology of every time-dependent variable in a history file, or in a
+  directory of history files, and writes it to one compressed netCDF file. Gives the same file as
+  averaging each month with ncra and joining the months with ncrcat: a 'time' dimension of 12 records
+  (January first) holding the mean of each variable over the years, including time and time_bnds, with
+  missing values skipped, integers rounded and text variables (ex. date_written) taken from the first
+  year. Time-invariant variables (ex. hyam, hybm, lat, lon) and the global and variable attributes and
+  encodings (type, fill value, packing) are copied from the input; a line is added to 'history'.
+
+  Months and groups of variables are averaged in parallel in 'workers' processes, each reading its time
+  steps 'block_years' years at a time, so memory use does not grow with the length of the record. The
+  file is written variable group by variable group as the groups finish.
+
+  Required Parameters
+  --------------------------------------------------------------------------------------------------------
+  source
+   class: 'string', Path to a netCDF history file with a time series of whole years, or to a directory of
+                    history files (ex. monthly h0 files) which are taken as one time series in file name
+                    order. Monthly files named like case.cam.h0.2105-01.nc are averaged by the month in
+                    their name, so incomplete years may be included.
+
+  Optional Parameters
+  --------------------------------------------------------------------------------------------------------
+  output: class 'string', Path of the climatology file to write. Default = None writes next to 'source'
+                          with '_monthly_climatology.nc' replacing the extension (or appended to a
+                          directory name).
+  variables: class 'list', Names of the variables to average. Time-invariant variables and the time
+                           coordinate and its bounds are always kept. Default = None averages every
+                           time-dependent variable.
+  pattern: class 'string', File name pattern of the history files in a 'source' directory.
+                           Default = '*.h0.*.nc'
+  begi, endi: class 'string' or 'int', First and last time index of the series to include. Defaults
+                                       'beg' and 'end' use the whole series. (endi-begi) must be a
+                                       multiple of 12 unless months are taken from the file names.
+  workers: class 'int', Number of worker processes. Default = None uses one per core; 1 runs in this
+                        process. The workers import the calling script, so its work must be under
+                        "if __name__ == '__main__':" when more than one worker is used.
+  block_years: class 'int', Number of years of one month read at a time by a worker. Default = 10
+  group_mb: class 'float', Size in MB of one time step of the variables averaged together by one worker.
+                           Default = 32.
+  complevel: class 'int', zlib compression level of the output (1-9). Default = 4
+  overwrite: class 'bool', Replace an existing file at 'output'. Default = False raises an error.
+  time_dim: class 'string', Name of the time dimension. Default = 'time'
+  ________________________________________________________________________________________________________
+
+  Returns
+  ---------------------
+  output: :class:'string'
+          Path of the climatology file
+
+  Example
+  ---------------------
+  monthly_climatology('/path/to/case.cam.h0.210501-212412.nc')
+   -> /path/to/case.cam.h0.210501-212412_monthly_climatology.nc
+  monthly_climatology('/path/to/case/atm/hist/',output='/path/to/case.cam.h0.2105-2124_monthly_climatology_cat.nc',
+                      pattern='*.cam.h0.*.nc')
+
+  '''
+
+  source = str(source).rstrip(os.sep) if os.path.isdir(str(source)) else str(source)
+  block_years = int(block_years)
+  if block_years < 1:
+   raise ValueError('block_years must be at least 1')
+
+  #-----------------------------
+  # Choose the output file
+  #-----------------------------
+
+  if output == None:
+   output = (source if os.path.isdir(source) else os.path.splitext(source)[0])+'_monthly_climatology.nc'
+  output = str(output)
+  if os.path.exists(output) and not overwrite:
+   raise ValueError('Climatology file '+output+' already exists; use overwrite=True to replace it')
+
+  #-----------------------------------------------
+  # Find the history files and the time steps of each month
+  #-----------------------------------------------
+
+  if os.path.isdir(source):
+   files = sorted(glob.glob(os.path.join(source,pattern)))
+   if len(files) == 0:
+    raise ValueError('No files matching '+pattern+' in '+source)
+  else:
+   files = [source]
+
+  records = month_records(files,begi=begi,endi=endi,time_dim=time_dim)
+  for month in range(12):
+   if len(records[month]) == 0:
+    raise ValueError('No time steps for month '+str(month+1)+' in '+source)
+  nsteps = sum(len(indices) for month in records for _, indices in month)
+
+  #-----------------------------------------------
+  # Variables to average, in groups for the workers
+  #-----------------------------------------------
+
+  template = xr.open_dataset(files[0],decode_times=False,decode_timedelta=False)
+
+  bounds = template[time_dim].attrs.get('bounds') if time_dim in template.variables else None
+  averaged = [name for name in template.variables if time_dim in template[name].dims]
+  if variables != None:
+   keep = [str(var) for var in variables] + [time_dim,bounds]
+   missing = [var for var in keep[:-2] if var not in averaged]
+   if len(missing) > 0:
+    raise ValueError('Time-dependent variables not found in '+files[0]+': '+', '.join(missing))
+   averaged = [name for name in averaged if name in keep]
+  averaged = sorted(averaged,key=lambda name: name != time_dim)   # time first, then file order
+  static = [name for name in template.variables if time_dim not in template[name].dims]
+
+  groups, size = [[]], 0.
+  for name in averaged:
+   nbytes = template[name].dtype.itemsize*float(np.prod(template[name].shape))/max(template.sizes[time_dim],1)
+   if len(groups[-1]) > 0 and size + nbytes > float(group_mb)*1e6:
+    groups.append([])
+    size = 0.
+   groups[-1].append(name)
+   size += nbytes
+
+  #-----------------------------------------------
+  # Average each (group, month) and write each group when its 12 months are done
+  #-----------------------------------------------
+
+  workers = min(os.cpu_count() or 1,12*len(groups)) if workers == None else max(int(workers),1)
+  tasks = [(g,month) for g in range(len(groups)) for month in range(12)]
+  partial = output+'.part'
+
+  def encoding(name):
+   enc = {key: value for key, value in template[name].encoding.items() if key in kept_encoding}
+   if template[name].ndim > 0 and template[name].dtype.kind in 'iufb':
+    enc.update(zlib=True,complevel=int(complevel),shuffle=True)
+   return enc
+
+  def write_group(g,results):
+   data = xr.Dataset()
+   for name in groups[g]:
+    var = template[name]
+    dims = [time_dim]+[dim for dim in var.dims if dim != time_dim]
+    values = np.stack([results[(g,month)][name] for month in range(12)])
+    data[name] = xr.DataArray(values,dims=dims,attrs=var.attrs).transpose(*var.dims)
+    data[name].encoding = encoding(name)
+
+   # The first group is written with the time-invariant variables and global attributes
+   if g == 0:
+    for name in static:
+     data[name] = template[name].variable.copy()
+     data[name].encoding = encoding(name)
+    history = datetime.datetime.now().ctime()+': ESMplot monthly_climatology of '+str(nsteps)+ \
+              ' time steps from '+source
+    data.attrs = dict(template.attrs)
+    data.attrs['history'] = history+('\n'+template.attrs['history'] if 'history' in template.attrs else '')
+    data.to_netcdf(partial,mode='w',unlimited_dims=[time_dim])
+   else:
+    data.to_netcdf(partial,mode='a')
+
+  try:
+   results = {}
+   written = 0
+
+   if workers == 1:
+    for g, month in tasks:
+     results[(g,month)] = _month_mean(records[month],groups[g],month,block_years,time_dim)
+     while written < len(groups) and all((written,m) in results for m in range(12)):
+      write_group(written,results)
+      for m in range(12):
+       del results[(written,m)]
+      written += 1
+
+   else:
+    queue = list(reversed(tasks))
+    pending = {}
+    with ProcessPoolExecutor(max_workers=workers,mp_context=worker_context(),initializer=init_worker_profiling,
+                             initargs=(worker_profiling(),)) as pool:
+     while len(queue) > 0 or len(pending) > 0:
+
+      # Tasks are submitted in order, a few ahead of the workers, so only the groups being
+      # averaged are held in memory
+      while len(queue) > 0 and len(pending) < 2*workers:
+       g, month = queue.pop()
+       pending[pool.submit(_month_mean,records[month],groups[g],month,block_years,time_dim)] = (g,month)
+
+      done, _ = wait(pending,return_when=FIRST_COMPLETED)
+      for future in done:
+       results[pending.pop(future)] = future.result()
+
+      while written < len(groups) and all((written,m) in results for m in range(12)):
+       write_group(written,results)
+       for m in range(12):
+        del results[(written,m)]
+       written += 1
+
+   os.replace(partial,output)
+
+  finally:
+   template.close()
+   if os.path.exists(partial):
+    os.remove(partial)
+
+  return output
+
+#######################################################################################################
+# Command line
+#######################################################################################################
+
+if __name__ == '__main__':
+
+  import argparse
+
+  parser = argparse.ArgumentParser(description='Write the 12 month climatology of a history file or of a '
+                                               'directory of monthly history files to one netCDF file.')
+  parser.add_argument('source',help='history file, or directory of history files')
+  parser.add_argument('-o','--output',default=None,help='climatology file (default: next to source)')
+  parser.add_argument('-v','--variables',nargs='+',default=None,help='variables to average (default: all)')
+  parser.add_argument('--pattern',default='*.h0.*.nc',help="file pattern in a directory (default: '*.h0.*.nc')")
+  parser.add_argument('--begi',default='beg',help='first time index (default: beginning)')
+  parser.add_argument('--endi',default='end',help='last time index (default: end)')
+  parser.add_argument('-j','--workers',type=int,default=None,help='worker processes (default: one per core)')
+  parser.add_argument('--block-years',type=int,default=10,help='years read at a time (default: 10)')
+  parser.add_argument('--complevel',type=int,default=4,help='zlib compression level (default: 4)')
+  parser.add_argument('--overwrite',action='store_true',help='replace an existing output file')
+  args = parser.parse_args()
+
+  index = lambda value: value if value in ['beg','end'] else int(value)
+  path = monthly_climatology(args.source,output=args.output,variables=args.variables,pattern=args.pattern,
+                             begi=index(args.begi),endi=index(args.endi),workers=args.workers,
+                             block_years=args.block_years,complevel=args.complevel,overwrite=args.overwrite)
+  print('Wrote '+path)
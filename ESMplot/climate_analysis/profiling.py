@@ -0,0 +1,389 @@
+#######################################################################################################
+#
+# Opt-in timing of the stages of an analysis (opening files, summing precipitation, vertical
+# interpolation, climatologies, weighted means, map rendering) and of the seasonal cycle, seasonal
+# average, water tagging and plotting functions. Each stage is recorded as a named span with its wall
+# time, CPU time, bytes read and peak memory. When profiling is on, a Chrome trace (open it in
+# chrome://tracing or https://ui.perfetto.dev) is written and a summary table is printed when Python
+# exits. Profiling is off by default and costs one check per span when off.
+#
+# Turn it on in a script with enable_profiling('trace.json'), or without changing the script by setting
+# the environment variable ESMPLOT_PROFILE to the trace file path, ex. ESMPLOT_PROFILE=trace.json
+#
+#######################################################################################################
+
+import os
+import sys
+import json
+import time
+import glob
+import atexit
+import threading
+import functools
+
+# Environment variable that turns profiling on when ESMplot is imported, and the variable that marks
+# the process that writes the trace (so processes it starts hand their spans to it)
+environment_variable = 'ESMPLOT_PROFILE'
+owner_variable = 'ESMPLOT_PROFILE_OWNER'
+
+# Default trace file name
+default_trace_file = 'ESMplot_trace.json'
+
+# Profiling settings: trace file = None turns profiling off
+_trace_file = None
+_print_summary = True
+
+# Finished spans of this process, open spans of each thread, and whether this is a worker process
+_events = []
+_local = threading.local()
+_lock = threading.Lock()
+_worker = False
+_exit_registered = False
+
+# Clock origin of the trace, shared with worker processes (see init_worker_profiling)
+_origin = time.perf_counter()
+
+#######################################################################################################
+# Turn profiling on and off
+#######################################################################################################
+
+def enable_profiling(trace_file: str = default_trace_file,
+                     summary: bool = True):
+
+  '''Turns on profiling. Spans are collected from this process and from the worker processes it starts
+  (see run_cases and render_pages_parallel), and when Python exits the Chrome trace is written to
+  'trace_file' and, if 'summary' is True, a table of the time spent in each span is printed.'''
+
+  global _trace_file, _print_summary, _exit_registered
+
+  _trace_file = os.path.abspath(str(trace_file))
+  _print_summary = bool(summary)
+
+  if not _exit_registered:
+   atexit.register(_write_at_exit)
+   _exit_registered = True
+
+def disable_profiling():
+
+  '''Turns off profiling. Spans already recorded are kept until write_trace or clear_profile.'''
+
+  global _trace_file
+  _trace_file = None
+
+def profiling_enabled() -> bool:
+
+  '''Returns True if profiling is on.'''
+
+  return _trace_file != None
+
+def clear_profile():
+
+  '''Discards every span recorded so far.'''
+
+  with _lock:
+   del _events[:]
+
+#######################################################################################################
+# Resource counters
+#######################################################################################################
+
+def _bytes_read() -> int:
+
+  # Bytes read by this process through read system calls, from disk or the page cache (None if unknown)
+  try:
+   with open('/proc/self/io') as io:
+    for line in io:
+     if line.startswith('rchar:'):
+      return int(line.split()[1])
+  except (OSError,ValueError):
+   pass
+
+  return None
+
+def _peak_rss() -> int:
+
+  # Peak resident memory of this process so far in bytes (None if unknown)
+  try:
+   with open('/proc/self/status') as status:
+    for line in status:
+     if line.startswith('VmHWM:'):
+      return int(line.split()[1])*1024
+  except (OSError,ValueError):
+   pass
+
+  try:
+   import resource
+   maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+   return int(maxrss) if sys.platform == 'darwin' else int(maxrss)*1024
+  except (ImportError,OSError):
+   return None
+
+def _difference(end,start):
+
+  return None if end == None or start == None else end - start
+
+#######################################################################################################
+# Spans
+#######################################################################################################
+
+class _Span:
+
+   ''' One timed stage, recorded when it is closed. Use 'span' or 'profiled' rather than this class.'''
+
+   def __init__(self,name,args):
+
+      self.name = name
+      self.args = args
+
+   def __enter__(self):
+
+      stack = getattr(_local,'stack',None)
+      if stack == None:
+       stack = _local.stack = []
+      stack.append(self)
+
+      self.rss0 = _peak_rss()
+      self.read0 = _bytes_read()
+      self.cpu0 = time.process_time()
+      self.wall0 = time.perf_counter()
+
+      return self
+
+   def __exit__(self,*exc):
+
+      wall1 = time.perf_counter()
+      cpu1 = time.process_time()
+      read1 = _bytes_read()
+      rss1 = _peak_rss()
+
+      stack = _local.stack
+      stack.pop()
+
+      rss_increase = _difference(rss1,self.rss0)
+      args = dict(cpu_s=round(cpu1-self.cpu0,6),
+                  bytes_read=_difference(read1,self.read0),
+                  peak_rss_mb=None if rss1 == None else round(rss1/1e6,1),
+                  peak_rss_increase_mb=None if rss_increase == None else round(rss_increase/1e6,1))
+      for key, value in self.args.items():
+       args[key] = value if isinstance(value,(int,float,bool,type(None))) else str(value)
+      if exc[0] != None:
+       args['error'] = exc[0].__name__
+
+      event = dict(name=self.name,cat='ESMplot',ph='X',pid=os.getpid(),tid=threading.get_ident(),
+                   ts=round((self.wall0-_origin)*1e6,1),dur=round((wall1-self.wall0)*1e6,1),args=args)
+
+      with _lock:
+       _events.append(event)
+
+      # Worker processes exit without running atexit, so hand their spans to the parent process
+      # through a file as soon as each outermost span closes
+      if _worker and len(stack) == 0:
+       _flush_worker()
+
+      return False
+
+class _NoSpan:
+
+   ''' Span used when profiling is off.'''
+
+   def __enter__(self):
+
+      return self
+
+   def __exit__(self,*exc):
+
+      return False
+
+_no_span = _NoSpan()
+
+def span(name: str,
+         **args):
+
+  '''Returns a context manager that records the block inside it as a span called 'name' when profiling
+  is on, and does nothing otherwise. Keyword arguments are stored with the span in the trace.
+
+  Example
+  ---------------------
+  with span('open_dataset',path=path):
+   data = xr.open_dataset(path)
+  '''
+
+  if _trace_file == None:
+   return _no_span
+
+  return _Span(str(name),args)
+
+def profiled(func=None,
+             name: str = None):
+
+  '''Decorator that records every call of a function as a span, named after the function unless 'name'
+  is given. Used as @profiled or @profiled(name='...'). Calls are not timed when profiling is off.'''
+
+  if func == None:
+   return lambda func: profiled(func,name=name)
+
+  span_name = func.__name__ if name == None else str(name)
+
+  @functools.wraps(func)
+  def wrapper(*args,**kwargs):
+   if _trace_file == None:
+    return func(*args,**kwargs)
+   with _Span(span_name,{}):
+    return func(*args,**kwargs)
+
+  return wrapper
+
+#######################################################################################################
+# Worker processes
+#######################################################################################################
+
+def _after_fork():
+
+  # Spans of the parent process stay with the parent
+  global _worker, _lock
+  _worker = True
+  _lock = threading.Lock()
+  del _events[:]
+  _local.stack = []
+
+if hasattr(os,'register_at_fork'):
+  os.register_at_fork(after_in_child=_after_fork)
+
+def worker_profiling() -> tuple:
+
+  '''Returns the profiling settings of this process, to be passed to init_worker_profiling in the worker
+  processes it starts.'''
+
+  return (_trace_file,_print_summary,_origin)
+
+def init_worker_profiling(settings: tuple):
+
+  '''Applies the profiling settings returned by worker_profiling in the process that started this worker.
+  Spans of the worker are then handed to that process, on the same clock, instead of being written to a
+  trace of its own.'''
+
+  global _trace_file, _print_summary, _origin, _worker
+  _trace_file, _print_summary, _origin = settings
+  _worker = True
+
+def _worker_file() -> str:
+
+  return _trace_file+'.'+str(os.getpid())+'.part'
+
+def _flush_worker():
+
+  if _trace_file == None or len(_events) == 0:
+   return
+
+  with _lock:
+   events = list(_events)
+   del _events[:]
+
+  try:
+   with open(_worker_file(),'a') as part:
+    for event in events:
+     part.write(json.dumps(event)+'\n')
+  except OSError:
+   pass
+
+def _collect_workers():
+
+  # Spans written by worker processes
+  if _trace_file == None:
+   return
+
+  for path in glob.glob(glob.escape(_trace_file)+'.*.part'):
+   try:
+    with open(path) as part:
+     events = [json.loads(line) for line in part if line.strip()]
+    os.remove(path)
+   except (OSError,ValueError):
+    continue
+   with _lock:
+    _events.extend(events)
+
+#######################################################################################################
+# Trace file and summary table
+#######################################################################################################
+
+def write_trace(trace_file: str = None) -> str:
+
+  '''Writes every span recorded so far, including those of worker processes, to a Chrome trace JSON
+  file (default = None uses the file given to enable_profiling). Returns the file path.'''
+
+  _collect_workers()
+  trace_file = _trace_file if trace_file == None else os.path.abspath(str(trace_file))
+
+  with _lock:
+   events = sorted(_events,key=lambda event: event['ts'])
+
+  names = [dict(name='process_name',ph='M',pid=pid,tid=0,
+                args=dict(name='ESMplot' if pid == os.getpid() else 'ESMplot worker '+str(pid)))
+           for pid in sorted(set(event['pid'] for event in events))]
+
+  with open(trace_file,'w') as trace:
+   json.dump(dict(traceEvents=names+events,displayTimeUnit='ms'),trace)
+
+  return trace_file
+
+def profiling_summary() -> dict:
+
+  '''Returns a dictionary with one entry per span name: the number of calls, total wall and CPU time in
+  seconds, total bytes read and the largest peak resident memory in MB. Times of a span include the
+  spans nested inside it.'''
+
+  _collect_workers()
+
+  with _lock:
+   events = list(_events)
+
+  summary = {}
+  for event in events:
+   args = event['args']
+   entry = summary.setdefault(event['name'],dict(calls=0,wall_s=0.,cpu_s=0.,bytes_read=0,peak_rss_mb=0.))
+   entry['calls'] += 1
+   entry['wall_s'] += event['dur']/1e6
+   entry['cpu_s'] += args['cpu_s']
+   entry['bytes_read'] += args['bytes_read'] or 0
+   entry['peak_rss_mb'] = max(entry['peak_rss_mb'],args['peak_rss_mb'] or 0.)
+
+  return summary
+
+def print_profiling_summary():
+
+  '''Prints the table returned by profiling_summary, slowest spans first.'''
+
+  summary = profiling_summary()
+  if len(summary) == 0:
+   return
+
+  print('')
+  print('ESMplot profile (times include nested spans)')
+  print(f"{'span':<36}{'calls':>7}{'wall (s)':>11}{'cpu (s)':>11}{'read (MB)':>12}{'peak RSS (MB)':>15}")
+  for name, entry in sorted(summary.items(),key=lambda item: -item[1]['wall_s']):
+   print(f"{name[:35]:<36}{entry['calls']:>7}{entry['wall_s']:>11.3f}{entry['cpu_s']:>11.3f}"
+         f"{entry['bytes_read']/1e6:>12.1f}{entry['peak_rss_mb']:>15.1f}")
+
+def _write_at_exit():
+
+  if _trace_file == None or _worker:
+   return
+
+  try:
+   trace_file = write_trace()
+  except OSError as error:
+   print('ESMplot profile: could not write '+str(_trace_file)+': '+str(error))
+   return
+
+  if _print_summary:
+   print_profiling_summary()
+   print('Trace written to '+trace_file)
+
+# Turn profiling on from the environment. Processes started by the owning process (ex. dask's
+# 'processes' scheduler) inherit the environment and hand their spans to it like other workers.
+if os.environ.get(environment_variable,'') != '':
+  if os.environ.get(owner_variable,str(os.getpid())) != str(os.getpid()):
+   _worker = True
+  else:
+   os.environ[owner_variable] = str(os.getpid())
+  enable_profiling(os.environ[environment_variable])
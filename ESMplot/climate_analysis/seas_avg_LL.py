@@ -7,15 +7,16 @@
 
 import numpy as np
 import xarray as xr
-from geocat.comp.interpolation import interp_hybrid_to_pressure
 from ESMplot.climate_analysis.climatology import clmMonTSLL
 from ESMplot.climate_analysis.mon_wgt_avg import mon_wgt_avg
+from ESMplot.climate_analysis.derived_cache import cached_derived
 from ESMplot.climate_analysis import seas_cycle_TLL as seascyc
 from ESMplot.climate_analysis import seas_cycle_TSLL as seassoil
+from ESMplot.climate_analysis.profiling import profiled, span
 
 # Default arrays
 default_levels  = np.arange(0,1050,50) # 0 hPa to 1000 hPa by 50 
-default_wgt_mon = xr.DataArray(np.ones(12),dims=['time']).astype(float)
+default_wgt_mon = np.ones(12)
 
 #======================================================================================================
 # File contains the following functions:
@@ -33,6 +34,8 @@ default_wgt_mon = xr.DataArray(np.ones(12),dims=['time']).astype(float)
 # Generic variable at surface or pressure level of the atmosphere 
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seasavg_var_LL(var1: str,
                    months: list,
                    path: str,
@@ -43,7 +46,10 @@ def seasavg_var_LL(var1: str,
                    level: int = None,
                    plev: np.ndarray = default_levels,
                    mult: float = 1.,
-                   wgt_mon: xr.DataArray = default_wgt_mon) -> xr.DataArray:
+                   wgt_mon: xr.DataArray = default_wgt_mon,
+                   block_years: int = None,
+                   chunks: dict = None,
+                   scheduler: str = None) -> xr.DataArray:
 
   '''Reads in up to two variables from a netCDF file (that includes a dimension for time) and creates
   a seasonally averaged global map (lat x lon) output variable.
@@ -95,6 +101,11 @@ def seasavg_var_LL(var1: str,
                                      paleoclimate analysis when the relative weight of each month differed 
                                      from the values of today. Must be same size as 'months'. Default = all 
                                      months have the same weight. Will revert to default if not specified. 
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   _______________________________________________________________________________________________________
 
   Returns
@@ -126,7 +137,8 @@ def seasavg_var_LL(var1: str,
   #-----------------------------
 
   var_clim = seascyc.seascyc_var_TLL(var1=var1,path=path,begi=begi,endi=endi,level=level,plev=plev,
-                                     mult=mult,var2=var2,math=math)
+                                     mult=mult,var2=var2,math=math,block_years=block_years,
+                                     chunks=chunks,scheduler=scheduler)
 
   #--------------------------------------------
   # Weight by fractional length of each month
@@ -140,12 +152,17 @@ def seasavg_var_LL(var1: str,
 # Precipitation variable 
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seasavg_prect_LL(months: list,
                      path: str,
                      begi: str = 'beg',
                      endi: str = 'end',
                      mult: float = 86400000.,
-                     wgt_mon: xr.DataArray = default_wgt_mon) -> xr.DataArray:
+                     wgt_mon: xr.DataArray = default_wgt_mon,
+                     block_years: int = None,
+                     chunks: dict = None,
+                     scheduler: str = None) -> xr.DataArray:
 
   '''Reads in precipitation variables from a netCDF file (that includes a dimension for time) and 
   creates a seasonally averaged global map (lat x lon) output variable.
@@ -173,6 +190,11 @@ def seasavg_prect_LL(months: list,
                                      paleoclimate analysis when the relative weight of each month differed 
                                      from the values of today. Must be same size as 'months'. Default = all 
                                      months have the same weight. Will revert to default if not specified. 
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   ________________________________________________________________________________________________________
 
   Returns
@@ -195,7 +217,8 @@ def seasavg_prect_LL(months: list,
   # Calculate seasonal cycle
   #-----------------------------
 
-  var_clim = seascyc.seascyc_prect_TLL(path=path,begi=begi,endi=endi,mult=mult)
+  var_clim = seascyc.seascyc_prect_TLL(path=path,begi=begi,endi=endi,mult=mult,block_years=block_years,
+                                       chunks=chunks,scheduler=scheduler)
 
   #--------------------------------------------
   # Weight by fractional length of each month
@@ -209,13 +232,18 @@ def seasavg_prect_LL(months: list,
 # Precipitation-Evaporation variable (Effective moisture)
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seasavg_PminE_LL(months: list,
                      path: str,
                      begi: str = 'beg',
                      endi: str = 'end',
                      Pmult: float = 86400000.,
                      Emult: float = 86400.,
-                     wgt_mon: xr.DataArray = default_wgt_mon) -> xr.DataArray:
+                     wgt_mon: xr.DataArray = default_wgt_mon,
+                     block_years: int = None,
+                     chunks: dict = None,
+                     scheduler: str = None) -> xr.DataArray:
 
   '''Reads in precipitation and evaporation variables from a netCDF file (that includes a dimension 
   for time) and creates a seasonally averaged global map (lat x lon) output variable of
@@ -246,6 +274,11 @@ def seasavg_PminE_LL(months: list,
                                      paleoclimate analysis when the relative weight of each month differed 
                                      from the values of today. Must be same size as 'months'. Default = all 
                                      months have the same weight. Will revert to default if not specified. 
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   ________________________________________________________________________________________________________
 
   Returns
@@ -269,7 +302,8 @@ def seasavg_PminE_LL(months: list,
   # Calculate seasonal cycle
   #-----------------------------
 
-  var_clim = seascyc.seascyc_PminE_TLL(path=path,begi=begi,endi=endi,Pmult=Pmult,Emult=Emult)
+  var_clim = seascyc.seascyc_PminE_TLL(path=path,begi=begi,endi=endi,Pmult=Pmult,Emult=Emult,
+                                       block_years=block_years,chunks=chunks,scheduler=scheduler)
 
   #--------------------------------------------
   # Weight by fractional length of each month
@@ -283,6 +317,8 @@ def seasavg_PminE_LL(months: list,
 # Land variable with soil levels 
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seasavg_soilvar_LL(var1: str,
                        months: list,
                        path: str,
@@ -293,7 +329,10 @@ def seasavg_soilvar_LL(var1: str,
                        soillev: list = [0],
                        soildimname: str = 'levgrnd',
                        mult: float = 1.,
-                       wgt_mon: xr.DataArray = default_wgt_mon) -> xr.DataArray:
+                       wgt_mon: xr.DataArray = default_wgt_mon,
+                       block_years: int = None,
+                       chunks: dict = None,
+                       scheduler: str = None) -> xr.DataArray:
 
   '''Reads in up to two land variables from a netCDF file (that includes a dimension for time and soil
   level) and creates a seasonally averaged global map (lat x lon) output variable.
@@ -338,6 +377,11 @@ def seasavg_soilvar_LL(var1: str,
                                      paleoclimate analysis when the relative weight of each month differed 
                                      from the values of today. Must be same size as 'months'. Default = all 
                                      months have the same weight. Will revert to default if not specified. 
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   ________________________________________________________________________________________________________
 
   Returns
@@ -368,7 +412,8 @@ def seasavg_soilvar_LL(var1: str,
   #-----------------------------
 
   var_clim = seascyc.seascyc_soilvar_TLL(var1=var1,path=path,begi=begi,endi=endi,soillev=soillev,
-                                          mult=mult,var2=var2,math=math)
+                                          mult=mult,var2=var2,math=math,block_years=block_years,
+                                          chunks=chunks,scheduler=scheduler)
 
   #--------------------------------------------
   # Weight by fractional length of each month
@@ -382,13 +427,18 @@ def seasavg_soilvar_LL(var1: str,
 # Precipitation isotopes: d18Op, dDp, or dexcess of precip 
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seasavg_rainiso_LL(iso_type:str,
                        months: list,
                        path: str,
                        begi: str = 'beg',
                        endi: str = 'end',
                        ptiny: float = 1.E-18,
-                       wgt_mon: xr.DataArray = default_wgt_mon) -> xr.DataArray:
+                       wgt_mon: xr.DataArray = default_wgt_mon,
+                       block_years: int = None,
+                       chunks: dict = None,
+                       scheduler: str = None) -> xr.DataArray:
 
   '''Reads in precipitation isotopes from a netCDF file (that includes a dimension for time) and creates
   a seasonally averaged global map (lat x lon) output variable. Weighting by precipitation amount and 
@@ -421,6 +471,11 @@ def seasavg_rainiso_LL(iso_type:str,
                                      paleoclimate analysis when the relative weight of each month differed 
                                      from the values of today. Must be same size as 'months'. Default = all 
                                      months have the same weight. Will revert to default if not specified. 
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   ________________________________________________________________________________________________________
 
   Returns
@@ -445,7 +500,8 @@ def seasavg_rainiso_LL(iso_type:str,
   #----------------------------------------------------------------------------------
 
   # Seasonal cycle of precipitation (months x lat x lon)
-  wtvar_init = seascyc.seascyc_prect_TLL(path=path,begi=begi,endi=endi) # no need to specify 'mult' here
+  wtvar_init = seascyc.seascyc_prect_TLL(path=path,begi=begi,endi=endi,block_years=block_years,
+                                         chunks=chunks,scheduler=scheduler) # no need to specify 'mult' here
 
   # Remove any negative or fill values from wtvar and set to NaN
   wtvar_proc = xr.where((wtvar_init <= 0.) | (wtvar_init > 1E29),float('NaN'),wtvar_init)
@@ -458,7 +514,8 @@ def seasavg_rainiso_LL(iso_type:str,
   #----------------------------------------------------------------------------------
 
   # Calculation
-  iso_init = seascyc.seascyc_rainiso_TLL(iso_type=iso_type,path=path,begi=begi,endi=endi,ptiny=ptiny)
+  iso_init = seascyc.seascyc_rainiso_TLL(iso_type=iso_type,path=path,begi=begi,endi=endi,ptiny=ptiny,
+                                         block_years=block_years,chunks=chunks,scheduler=scheduler)
 
   # Set as standardized xr.DataArray
   iso = xr.DataArray(iso_init,dims=['time','lat','lon'])
@@ -489,6 +546,8 @@ def seasavg_rainiso_LL(iso_type:str,
 # Soil water isotopes: d18Op, dDp, or dexcess of soil water 
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seasavg_soiliso_LL(iso_type:str,
                        months: list,
                        path: str,
@@ -497,7 +556,10 @@ def seasavg_soiliso_LL(iso_type:str,
                        ptiny: float = 1.E-18,
                        soillev: list = [0],
                        soildimname: str = 'levgrnd',
-                       wgt_mon: xr.DataArray = default_wgt_mon) -> xr.DataArray:
+                       wgt_mon: xr.DataArray = default_wgt_mon,
+                       block_years: int = None,
+                       chunks: dict = None,
+                       scheduler: str = None) -> xr.DataArray:
 
   '''Reads in soil water isotopes from a netCDF file (that includes a dimension for time) and creates
   a seasonally averaged global map (lat x lon) output variable. Weighting by soil water amount and 
@@ -537,6 +599,11 @@ def seasavg_soiliso_LL(iso_type:str,
                                      paleoclimate analysis when the relative weight of each month differed 
                                      from the values of today. Must be same size as 'months'. Default = all 
                                      months have the same weight. Will revert to default if not specified. 
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   ________________________________________________________________________________________________________
 
   Returns
@@ -564,7 +631,8 @@ def seasavg_soiliso_LL(iso_type:str,
 
   # Seasonal cycle of soil water (months x lat x lon)
   wtvar_init = seascyc.seascyc_soilvar_TLL(var1='H2OSOI',path=path,begi=begi,endi=endi,
-                                           soillev=soillev)
+                                           soillev=soillev,block_years=block_years,chunks=chunks,
+                                           scheduler=scheduler)
 
   # Remove any negative or fill values from wtvar and set to NaN
   wtvar_proc = xr.where((wtvar_init <= 0.) | (wtvar_init > 1E29),float('NaN'),wtvar_init)
@@ -578,7 +646,8 @@ def seasavg_soiliso_LL(iso_type:str,
 
   # Calculation
   iso_init = seascyc.seascyc_soiliso_TLL(iso_type=iso_type,path=path,begi=begi,endi=endi,ptiny=ptiny,
-                                         soillev=soillev)
+                                         soillev=soillev,block_years=block_years,chunks=chunks,
+                                         scheduler=scheduler)
 
   # Set as standardized xr.DataArray
   iso = xr.DataArray(iso_init,dims=['time','lat','lon'])
@@ -609,6 +678,8 @@ def seasavg_soiliso_LL(iso_type:str,
 # Vapor isotopes at specified pressure level: d18Op, dDp, or dexcess of water vapor
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seasavg_vaporiso_LL(iso_type: str,
                         months: list,
                         path: str,
@@ -618,7 +689,10 @@ def seasavg_vaporiso_LL(iso_type: str,
                         plev: np.ndarray = default_levels,
                         wtvar_name: str = 'Q',
                         ptiny: float = 1.E-18,
-                        wgt_mon: xr.DataArray = default_wgt_mon) -> xr.DataArray:
+                        wgt_mon: xr.DataArray = default_wgt_mon,
+                        block_years: int = None,
+                        chunks: dict = None,
+                        scheduler: str = None) -> xr.DataArray:
 
   '''Reads in water vapor isotopes from a netCDF file (that includes a dimension for time) and creates
   a seasonally averaged global map (lat x lon) output variable. Weighting by specific humidity and 
@@ -668,6 +742,11 @@ def seasavg_vaporiso_LL(iso_type: str,
                                      paleoclimate analysis when the relative weight of each month differed 
                                      from the values of today. Must be same size as 'months'. Default = all 
                                      months have the same weight. Will revert to default if not specified. 
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   _______________________________________________________________________________________________________
   Returns
   ---------------------
@@ -696,7 +775,8 @@ def seasavg_vaporiso_LL(iso_type: str,
 
   # Seasonal cycle of wtvar (months x lat x lon)
   wtvar_init = seascyc.seascyc_var_TLL(var1=wtvar_name,path=path,begi=begi,endi=endi,
-                                                     level=level,plev=plev)
+                                                     level=level,plev=plev,block_years=block_years,
+                                                     chunks=chunks,scheduler=scheduler)
 
   # Remove any negative or fill values from wtvar and set to NaN
   wtvar_proc = xr.where((wtvar_init <= 0.) | (wtvar_init > 1E29),float('NaN'),wtvar_init)
@@ -710,7 +790,8 @@ def seasavg_vaporiso_LL(iso_type: str,
 
   # Calculation
   iso_init = seascyc.seascyc_vaporiso_TLL(iso_type=iso_type,path=path,begi=begi,endi=endi,ptiny=ptiny,
-                                            level=level,plev=plev)
+                                            level=level,plev=plev,block_years=block_years,
+                                            chunks=chunks,scheduler=scheduler)
 
   # Set as standardized xr.DataArray
   iso = xr.DataArray(iso_init,dims=['time','lat','lon'])
@@ -741,6 +822,8 @@ def seasavg_vaporiso_LL(iso_type: str,
 # Soil water isotopes weighted by root depth fraction: d18Op, dDp, or dexcess of soil water 
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seasavg_isoroot_LL(iso_type:str,
                        months: list,
                        path: str,
@@ -749,7 +832,10 @@ def seasavg_isoroot_LL(iso_type:str,
                        ptiny: float = 1.E-18,
                        rootwgt: str = 'ROOTR_COLUMN',
                        soildimname: str = 'levgrnd',
-                       wgt_mon: xr.DataArray = default_wgt_mon) -> xr.DataArray:
+                       wgt_mon: xr.DataArray = default_wgt_mon,
+                       block_years: int = None,
+                       chunks: dict = None,
+                       scheduler: str = None) -> xr.DataArray:
 
   '''Reads in soil water isotopes from a netCDF file (that includes a dimension for time) and creates
   a seasonally averaged global map (lat x lon) output variable weighted by root depth fraction. 
@@ -789,6 +875,11 @@ def seasavg_isoroot_LL(iso_type:str,
                                      paleoclimate analysis when the relative weight of each month differed 
                                      from the values of today. Must be same size as 'months'. Default = all 
                                      months have the same weight. Will revert to default if not specified. 
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   _______________________________________________________________________________________________________
 
   Returns
@@ -819,7 +910,8 @@ def seasavg_isoroot_LL(iso_type:str,
   #----------------------------------------------------------------------------------
 
   # Seasonal cycle of soil water (months x lat x lon)
-  wtvar_init = seassoil.seascyc_soilvar_TSLL(var1='H2OSOI',path=path,begi=begi,endi=endi)
+  wtvar_init = seassoil.seascyc_soilvar_TSLL(var1='H2OSOI',path=path,begi=begi,endi=endi,
+                                             block_years=block_years,chunks=chunks,scheduler=scheduler)
 
   # Remove any negative or fill values from wtvar and set to NaN
   wtvar_proc = xr.where((wtvar_init <= 0.) | (wtvar_init > 1E29),float('NaN'),wtvar_init)
@@ -832,7 +924,8 @@ def seasavg_isoroot_LL(iso_type:str,
   #----------------------------------------------------------------------------------
 
   # Calculation
-  iso_init = seassoil.seascyc_soiliso_TSLL(iso_type=iso_type,path=path,begi=begi,endi=endi,ptiny=ptiny)
+  iso_init = seassoil.seascyc_soiliso_TSLL(iso_type=iso_type,path=path,begi=begi,endi=endi,ptiny=ptiny,
+                                           block_years=block_years,chunks=chunks,scheduler=scheduler)
 
   # Set as standardized xr.DataArray
   iso = xr.DataArray(iso_init,dims=['time',soildimname,'lat','lon'])
@@ -862,11 +955,13 @@ def seasavg_isoroot_LL(iso_type:str,
   #---------------------------------------------------------
 
   # Read in climatology of rooting depth variable
-  root_clim = seassoil.seascyc_soilvar_TSLL(var1=rootwgt,path=path,begi=begi,endi=endi)
+  root_clim = seassoil.seascyc_soilvar_TSLL(var1=rootwgt,path=path,begi=begi,endi=endi,
+                                            block_years=block_years,chunks=chunks,scheduler=scheduler)
 
   # Weight root_clim by month
-  root_prewgt = root_clim[months,:,:,:].weighted(wgt_mon)
-  root_mon_wgt = root_prewgt.mean(dim='time')
+  with span('weighted_mean'):
+   root_prewgt = root_clim[months,:,:,:].weighted(wgt_mon)
+   root_mon_wgt = root_prewgt.mean(dim='time')
 
   # Remove values < 0 in average root depth fraction variable
   root_mon_wgt_proc = xr.where(root_mon_wgt < 0, float('NaN'), root_mon_wgt) # remove values < 0 and set them to NaN
@@ -881,13 +976,18 @@ def seasavg_isoroot_LL(iso_type:str,
 # Wind U and V vectors
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seasavg_wind_vec_LL(months: list,
                         path: str,
                         begi: str = 'beg',
                         endi: str = 'end',
                         level: int = None,
                         plev: np.ndarray = default_levels,
-                        wgt_mon: xr.DataArray = default_wgt_mon) -> xr.DataArray:
+                        wgt_mon: xr.DataArray = default_wgt_mon,
+                        block_years: int = None,
+                        chunks: dict = None,
+                        scheduler: str = None) -> xr.DataArray:
 
   '''Reads in wind (U,V) variables from a netCDF file (that includes a dimension for time) and creates
   a seasonally averaged global map (lat x lon) of vectors output variable.
@@ -926,6 +1026,11 @@ def seasavg_wind_vec_LL(months: list,
                                      paleoclimate analysis when the relative weight of each month differed 
                                      from the values of today. Must be same size as 'months'. Default = all 
                                      months have the same weight. Will revert to default if not specified. 
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   _______________________________________________________________________________________________________
 
   Returns
@@ -949,7 +1054,8 @@ def seasavg_wind_vec_LL(months: list,
   # Calculate seasonal cycle
   #-----------------------------
 
-  u_clim, v_clim = seascyc.seascyc_wind_vec_TLL(path=path,begi=begi,endi=endi,level=level,plev=plev)
+  u_clim, v_clim = seascyc.seascyc_wind_vec_TLL(path=path,begi=begi,endi=endi,level=level,plev=plev,
+                                                block_years=block_years,chunks=chunks,scheduler=scheduler)
 
   #--------------------------------------------
   # Weight by fractional length of each month
@@ -964,6 +1070,8 @@ def seasavg_wind_vec_LL(months: list,
 # Integrated vapor transport (IVT) vectors
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seasavg_IVT_vec_LL(months: list,
                        path: str,
                        begi: str = 'beg',
@@ -971,7 +1079,11 @@ def seasavg_IVT_vec_LL(months: list,
                        ptop: float = 0.,
                        pbot: float = 1000., 
                        plev: np.ndarray = default_levels,
-                       wgt_mon: xr.DataArray = default_wgt_mon) -> xr.DataArray:
+                       wgt_mon: xr.DataArray = default_wgt_mon,
+                       chunks: dict = None,
+                       scheduler: str = None,
+                       engine: str = 'plev',
+                       block_years: int = None) -> xr.DataArray:
 
   '''Reads in U, V, and Q variables from a netCDF file (that includes a dimension for time) and creates
   a seasonally averaged global map (lat x lon) of integrated vapor transport vectors. 
@@ -1011,6 +1123,14 @@ def seasavg_IVT_vec_LL(months: list,
                                      paleoclimate analysis when the relative weight of each month differed 
                                      from the values of today. Must be same size as 'months'. Default = all 
                                      months have the same weight. Will revert to default if not specified. 
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
+  engine: class 'string', How the column is integrated: 'plev' (interpolate to 'plev' first) or 'hybrid' 
+                          (integrate u*q and v*q on the model's hybrid levels at every time step). See 
+                          seascyc_IVT_vec_TLL. Default = 'plev'
+  block_years: class 'int', With engine='hybrid', the time series is read 'block_years' years at a time. 
+                            Default = None reads the whole time series at once.
   _______________________________________________________________________________________________________
 
   Returns
@@ -1039,7 +1159,9 @@ def seasavg_IVT_vec_LL(months: list,
   # Calculate seasonal cycle
   #-----------------------------
 
-  u_clim, v_clim = seascyc.seascyc_IVT_vec_TLL(path=path,begi=begi,endi=endi,ptop=ptop,pbot=pbot,plev=plev)
+  u_clim, v_clim = seascyc.seascyc_IVT_vec_TLL(path=path,begi=begi,endi=endi,ptop=ptop,pbot=pbot,plev=plev,
+                                               chunks=chunks,scheduler=scheduler,engine=engine,
+                                               block_years=block_years)
 
   #--------------------------------------------
   # Weight by fractional length of each month
@@ -5,13 +5,16 @@
 #
 #######################################################################################################
 
+import time
+import inspect
 import numpy as np
 import xarray as xr
-from geocat.comp.interpolation import interp_hybrid_to_pressure 
-from ESMplot.climate_analysis.climatology import clmMonTLL,clmMonTLLL,clmMonTSLL
-from geocat.f2py.dpres_plevel_wrapper import dpres_plevel
-from warnings import simplefilter
-from icecream import ic
+from ESMplot.climate_analysis.climatology import clmMonTLL,clmMonTLLL,clmMonTSLL,clmMonBlocks
+from ESMplot.climate_analysis.dataset_cache import open_cached_dataset
+from ESMplot.climate_analysis.execution import compute
+from ESMplot.climate_analysis.vertical_interp import cached_interp_plan, clear_interp_plan_cache
+from ESMplot.climate_analysis.derived_cache import cached_derived
+from ESMplot.climate_analysis.profiling import profiled, span
 
 # Default arrays
 default_levels  = np.arange(0.,1050.,50.) # 0 hPa to 1000 hPa by 50   
@@ -26,12 +29,17 @@ default_levels  = np.arange(0.,1050.,50.) # 0 hPa to 1000 hPa by 50
 # Vectors (output: 12 months x lat x lon)
 # seascyc_wind_vec_TLL, seascyc_IVT_vec_TLL
 #
+# Error of the climatology-first mode (output: dictionary of metrics)
+# clim_first_error
+#
 #======================================================================================================
 
 #######################################################################################################
 # Generic variable at surface or pressure level of the atmosphere 
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seascyc_var_TLL(var1: str,
                     path: str,
                     begi: str = 'beg',
@@ -40,7 +48,11 @@ def seascyc_var_TLL(var1: str,
                     math: str = None, 
                     level: int = None, 
                     plev: np.ndarray = default_levels,
-                    mult: float = 1.) -> xr.DataArray: 
+                    mult: float = 1.,
+                    block_years: int = None,
+                    chunks: dict = None,
+                    scheduler: str = None,
+                    clim_first: bool = False) -> xr.DataArray: 
 
   '''Reads in up to two variables from a netCDF file (that includes a dimension for time) and creates
   a seasonal cycle global map (12 months x lat x lon) output variable.
@@ -74,16 +86,27 @@ def seascyc_var_TLL(var1: str,
                       pressure levels. Ex. 850 -> calculating variable's values at 850 hPa 
   plev: class 'numpy.ndarray', The new range of pressure levels with units hPa/mb, of which 'level' must 
                                be an available value. Default = np.arange(0,1050,50) 
-                               This script will interpolate climate model output from hybrid to pressure 
-                               levels using geocat.comp's interp_hybrid_to_pressure function. NOTE: If 
-                               NaN's present in variable while interpolating from hybrid to pressure, may 
-                               see this error, which comes from metpy and can be ignored: 'UserWarning: 
-                               Interpolation point out of data bounds encountered 
-                               warnings.warn('Interpolation point out of data bounds encountered')'
+                               This script will interpolate climate model output from hybrid levels to 
+                               'level' only, using the two hybrid levels that bracket it in each column 
+                               (a HybridInterpPlan from vertical_interp.py, which matches geocat.comp's 
+                               interp_hybrid_to_pressure). Values where 'level' is outside the column 
+                               (ex. below the surface) are NaN. 
                                Ex. np.arange(0,1050,50) -> pressure levels between 0 hPa and 1000 hPa with 
                                stride of 50 hPa. Default = np.arange(0,1050,50) 
   mult: class 'float', A float value that becomes a scalar to the variable's values. Default = 1.0. Will 
                        revert to default if not specified. 
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
+  clim_first: class 'bool', If True, the 12 month climatologies of the variable(s) and PS are built on 
+                            hybrid levels first and only those 12 monthly fields are interpolated to 
+                            pressure, instead of every time step. Much faster for quick looks at long 
+                            time series, but an approximation: averaging and interpolation do not commute 
+                            where PS varies in time (ex. near the surface). Only used with 'level'. Use 
+                            clim_first_error to measure the difference from the default for a case. 
+                            Default = False 
   _______________________________________________________________________________________________________
 
   Returns
@@ -107,69 +130,94 @@ def seascyc_var_TLL(var1: str,
   if math != None:
    math = str(math)
 
-  # Assign index for level in plev
-  if level != None:
-   lev_ind = int(np.where(np.array(plev) == level)[0])
+  # Check that level is one of plev
+  if level != None and level not in plev:
+   raise ValueError('level '+str(level)+' hPa is not one of plev')
+
+  # Climatology-first mode only applies to variables interpolated to 'level'
+  clim_first = bool(clim_first) and level != None
 
   #-----------------------------------
   # Read in variables and scale them 
   #-----------------------------------
  
   # Read in dataset 
-  data = xr.open_dataset(path)
+  data = open_cached_dataset(path,chunks=chunks)
 
   # Assign values for begi and endi
   begi = 0 if begi == 'beg' else begi
   endi = len(data.time) if endi == 'end' else endi
 
-  # Read in variable(s)
-  var1_data = data[var1][begi:endi,:,:]*mult
-  if var2 != None:
-   var2_data = data[var2][begi:endi,:,:]*mult
+  # Climatology-first mode: monthly means of the variable(s) on hybrid levels, which are then
+  # interpolated to 'level' by read_block(begi,endi) below
+  if clim_first:
+   def read_hybrid(t0,t1):
+    return tuple(data[var][t0:t1,:,:]*mult for var in [var1,var2] if var != None)
+   if block_years == None:
+    hybrid_clims = tuple(clmMonTLLL(var,lev_dim='lev') for var in read_hybrid(begi,endi))
+   else:
+    hybrid_clims = clmMonBlocks(read_hybrid,begi,endi,block_years)
+
+  # Read in variable(s) for time indices t0 to t1
+  def read_block(t0,t1):
+   if clim_first:
+    var1_data = hybrid_clims[0]
+    if var2 != None:
+     var2_data = hybrid_clims[1]
+   else:
+    var1_data = data[var1][t0:t1,:,:]*mult
+    if var2 != None:
+     var2_data = data[var2][t0:t1,:,:]*mult
  
-  # Convert sigma coordinates to pressure coordinates
-  if level != None:
-   simplefilter(action='ignore', category=UserWarning) # ignore unnecessary error from metpy
-   hyam = data.hyam 
-   hybm = data.hybm
-   psrf = data.PS
-   p0Pa  = 100000.
-   var1_lev = interp_hybrid_to_pressure(data=var1_data,ps=psrf,hyam=hyam,hybm=hybm,p0=p0Pa,new_levels=plev*100.) # converts plev to units=Pa
-   var1_time = xr.DataArray(var1_lev[:,lev_ind,:,:], dims=['time','lat','lon'],coords=dict(time=var1_data.time,lat=var1_data.lat,lon=var1_data.lon),
-                                                     attrs=dict(description=str(var1)+' at '+str(level)+' hPa'))
-   if var2 != None:
-    var2_lev = interp_hybrid_to_pressure(data=var2_data,ps=psrf,hyam=hyam,hybm=hybm,p0=p0Pa,new_levels=plev*100.) # converts plev to units=Pa
-    var2_time = xr.DataArray(var2_lev[:,lev_ind,:,:], dims=['time','lat','lon'],coords=dict(time=var1_data.time,lat=var1_data.lat,lon=var1_data.lon),
-                                                      attrs=dict(description=str(var2)+' at '+str(level)+' hPa'))
-  else:
-   var1_time = xr.DataArray(var1_data)
-   if var2 != None:
-    var2_time = xr.DataArray(var2_data)
-
-  #--------------------------------------
-  # Perform math operator if necessary
-  #--------------------------------------
+   # Convert sigma coordinates to pressure coordinates
+   # (each column is interpolated from its two hybrid levels bracketing 'level'; whole columns are read)
+   if level != None:
+    plan = cached_interp_plan(path,t0,t1,level*100.,p0=100000.,chunks=chunks,clim=clim_first) # converts level to units=Pa
+    var1_lev = plan.apply(var1_data)
+    var1_time = xr.DataArray(var1_lev, dims=['time','lat','lon'],coords=dict(time=var1_data.time,lat=var1_data.lat,lon=var1_data.lon),
+                                       attrs=dict(description=str(var1)+' at '+str(level)+' hPa'))
+    if var2 != None:
+     var2_lev = plan.apply(var2_data)
+     var2_time = xr.DataArray(var2_lev, dims=['time','lat','lon'],coords=dict(time=var1_data.time,lat=var1_data.lat,lon=var1_data.lon),
+                                        attrs=dict(description=str(var2)+' at '+str(level)+' hPa'))
+   else:
+    var1_time = xr.DataArray(var1_data)
+    if var2 != None:
+     var2_time = xr.DataArray(var2_data)
+
+   #--------------------------------------
+   # Perform math operator if necessary
+   #--------------------------------------
 
-  if var2 != None:
-   if math == 'add':
-    var_time = var1_time + var2_time
-   elif math == 'sub':
-    var_time = var1_time - var2_time
-   elif math == 'mul':
-    var_time = var1_time * var2_time
-   elif math == 'div':
-    var_time = var1_time / var2_time
-   elif math == 'exp':
-    var_time = var1_time ** var2_time
-  else:
-   var_time = var1_time
+   if var2 != None:
+    if math == 'add':
+     var_time = var1_time + var2_time
+    elif math == 'sub':
+     var_time = var1_time - var2_time
+    elif math == 'mul':
+     var_time = var1_time * var2_time
+    elif math == 'div':
+     var_time = var1_time / var2_time
+    elif math == 'exp':
+     var_time = var1_time ** var2_time
+   else:
+    var_time = var1_time
+   return var_time
 
   #-------------------------------
   # Perform seasonal averaging
   #-------------------------------
 
-  # Calculate averages for each month
-  var_clim = clmMonTLL(var_time)
+  # Calculate averages for each month (already done on hybrid levels in climatology-first mode)
+  if clim_first:
+   var_clim = read_block(begi,endi)
+  elif block_years == None:
+   var_clim = clmMonTLL(read_block(begi,endi))
+  else:
+   var_clim = clmMonBlocks(read_block,begi,endi,block_years)
+
+  # Compute once at the end if dask was used
+  var_clim = compute(var_clim,scheduler=scheduler)
 
   return var_clim
 
@@ -177,10 +225,15 @@ def seascyc_var_TLL(var1: str,
 # Precipitation variable 
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seascyc_prect_TLL(path: str,
                       begi: str = 'beg',
                       endi: str = 'end',
-                      mult: float = 86400000.) -> xr.DataArray:
+                      mult: float = 86400000.,
+                      block_years: int = None,
+                      chunks: dict = None,
+                      scheduler: str = None) -> xr.DataArray:
 
   '''Reads in precipitation variables from a netCDF file (that includes a dimension for time) 
   and creates a seasonal cycle global map (12 months x lat x lon) output variable.
@@ -200,6 +253,11 @@ def seascyc_prect_TLL(path: str,
                                        to endi as int. If integers, (endi-begi)/12 must be multiple of 12. 
   mult: class 'float', A float value that becomes a scalar to the variable's values. Assumes original 
                        variable is in m/s. Default = 86400000., which converts m/s to mm/day
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   _______________________________________________________________________________________________________
 
   Returns
@@ -222,21 +280,30 @@ def seascyc_prect_TLL(path: str,
   #-----------------------------------
 
   # Read in dataset 
-  data = xr.open_dataset(path)
+  data = open_cached_dataset(path,chunks=chunks)
 
   # Assign values for begi and endi
   begi = 0 if begi == 'beg' else begi
   endi = len(data.time) if endi == 'end' else endi
 
-  # Read in variable(s)
-  var_time = (data['PRECC'][begi:endi,:,:] + data['PRECL'][begi:endi,:,:])*mult
+  # Read in variable(s) for time indices t0 to t1
+  def read_block(t0,t1):
+   with span('precip_sum'):
+    var_time = (data['PRECC'][t0:t1,:,:] + data['PRECL'][t0:t1,:,:])*mult
+   return var_time
 
   #-------------------------------
   # Perform seasonal averaging
   #-------------------------------
 
   # Calculate averages for each month
-  var_clim = clmMonTLL(var_time)
+  if block_years == None:
+   var_clim = clmMonTLL(read_block(begi,endi))
+  else:
+   var_clim = clmMonBlocks(read_block,begi,endi,block_years)
+
+  # Compute once at the end if dask was used
+  var_clim = compute(var_clim,scheduler=scheduler)
 
   return var_clim
 
@@ -244,11 +311,16 @@ def seascyc_prect_TLL(path: str,
 # Precipitation-Evaporation variable (Effective moisture)
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seascyc_PminE_TLL(path: str,
                       begi: str = 'beg',
                       endi: str = 'end',
                       Pmult: float = 86400000.,
-                      Emult: float = 86400.) -> xr.DataArray:
+                      Emult: float = 86400.,
+                      block_years: int = None,
+                      chunks: dict = None,
+                      scheduler: str = None) -> xr.DataArray:
 
   '''Reads in precipitation and evaporation variables from a netCDF file (that includes a dimension 
   for time) and creates a seasonal cycle global map (12 months x lat x lon) output variable of 
@@ -271,6 +343,11 @@ def seascyc_PminE_TLL(path: str,
                         variable is in m/s. Default = 86400000., which converts m/s to mm/day. 
   Emult: class 'float', A float value that becomes a scalar to evaporation values. Assumes original 
                         variable is in m/s. Default = 86400, which converts m/s to mm/day.
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   _______________________________________________________________________________________________________
 
   Returns
@@ -294,25 +371,34 @@ def seascyc_PminE_TLL(path: str,
   #-----------------------------------
 
   # Read in dataset 
-  data = xr.open_dataset(path)
+  data = open_cached_dataset(path,chunks=chunks)
 
   # Assign values for begi and endi
   begi = 0 if begi == 'beg' else begi
   endi = len(data.time) if endi == 'end' else endi
 
-  # Read in variables
-  p_time = (data['PRECC'][begi:endi,:,:] + data['PRECL'][begi:endi,:,:])*Pmult
-  e_time = (data['QFLX'][begi:endi,:,:])*Emult
+  # Read in variables for time indices t0 to t1
+  def read_block(t0,t1):
+   with span('precip_sum'):
+    p_time = (data['PRECC'][t0:t1,:,:] + data['PRECL'][t0:t1,:,:])*Pmult
+   e_time = (data['QFLX'][t0:t1,:,:])*Emult
 
-  # Calculate P-E
-  PminE_time = p_time - e_time
+   # Calculate P-E
+   PminE_time = p_time - e_time
+   return PminE_time
 
   #-------------------------------
   # Perform seasonal averaging
   #-------------------------------
 
   # Calculate averages for each month
-  var_clim = clmMonTLL(PminE_time)
+  if block_years == None:
+   var_clim = clmMonTLL(read_block(begi,endi))
+  else:
+   var_clim = clmMonBlocks(read_block,begi,endi,block_years)
+
+  # Compute once at the end if dask was used
+  var_clim = compute(var_clim,scheduler=scheduler)
 
   return var_clim
 
@@ -320,6 +406,8 @@ def seascyc_PminE_TLL(path: str,
 # Land variable with soil levels 
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seascyc_soilvar_TLL(var1: str,
                         path: str,
                         begi: str = 'beg',
@@ -328,7 +416,10 @@ def seascyc_soilvar_TLL(var1: str,
                         math: str = None,
                         soillev: list = [0],
                         soildimname: str = 'levgrnd',
-                        mult: float = 1.) -> xr.DataArray:
+                        mult: float = 1.,
+                        block_years: int = None,
+                        chunks: dict = None,
+                        scheduler: str = None) -> xr.DataArray:
 
   '''Reads in up to two land variables from a netCDF file (that includes a dimension for time and soil 
   level) and creates a seasonal cycle global map (12 months x lat x lon) output variable.
@@ -373,6 +464,11 @@ def seascyc_soilvar_TLL(var1: str,
                                      paleoclimate analysis when the relative weight of each month differed 
                                      from the values of today. Must be same size as 'months'. Default = all 
                                      months have the same weight. Will revert to default if not specified. 
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   _______________________________________________________________________________________________________
 
   Returns
@@ -402,41 +498,49 @@ def seascyc_soilvar_TLL(var1: str,
   #-----------------------------------
 
   # Read in dataset 
-  data = xr.open_dataset(path)
+  data = open_cached_dataset(path,chunks=chunks)
 
   # Assign values for begi and endi
   begi = 0 if begi == 'beg' else begi
   endi = len(data.time) if endi == 'end' else endi
 
-  # Read in variable(s)
-  var1_time = data[var1][begi:endi,soillev,:,:].mean(dim=soildimname)*mult
-  if var2 != None:
-   var2_time = data[var2][begi:endi,soillev,:,:].mean(dim=soildimname)*mult
+  # Read in variable(s) for time indices t0 to t1
+  def read_block(t0,t1):
+   var1_time = data[var1][t0:t1,soillev,:,:].mean(dim=soildimname)*mult
+   if var2 != None:
+    var2_time = data[var2][t0:t1,soillev,:,:].mean(dim=soildimname)*mult
 
-  #--------------------------------------
-  # Perform math operator if necessary
-  #--------------------------------------
+   #--------------------------------------
+   # Perform math operator if necessary
+   #--------------------------------------
 
-  if var2 != None:
-   if math == 'add':
-    var_time = var1_time + var2_time
-   elif math == 'sub':
-    var_time = var1_time - var2_time
-   elif math == 'mul':
-    var_time = var1_time * var2_time
-   elif math == 'div':
-    var_time = var1_time / var2_time
-   elif math == 'exp':
-    var_time = var1_time ** var2_time
-  else:
-   var_time = var1_time
+   if var2 != None:
+    if math == 'add':
+     var_time = var1_time + var2_time
+    elif math == 'sub':
+     var_time = var1_time - var2_time
+    elif math == 'mul':
+     var_time = var1_time * var2_time
+    elif math == 'div':
+     var_time = var1_time / var2_time
+    elif math == 'exp':
+     var_time = var1_time ** var2_time
+   else:
+    var_time = var1_time
+   return var_time
 
   #-------------------------------
   # Perform seasonal averaging
   #-------------------------------
 
   # Calculate averages for each month
-  var_clim = clmMonTLL(var_time)
+  if block_years == None:
+   var_clim = clmMonTLL(read_block(begi,endi))
+  else:
+   var_clim = clmMonBlocks(read_block,begi,endi,block_years)
+
+  # Compute once at the end if dask was used
+  var_clim = compute(var_clim,scheduler=scheduler)
 
   return var_clim
 
@@ -444,11 +548,16 @@ def seascyc_soilvar_TLL(var1: str,
 # Precipitation isotopes: d18Op, dDp, or dexcess of precip 
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seascyc_rainiso_TLL(iso_type:str,
                         path: str,
                         begi: str = 'beg',
                         endi: str = 'end',
-                        ptiny: float = 1.E-18) -> xr.DataArray:
+                        ptiny: float = 1.E-18,
+                        block_years: int = None,
+                        chunks: dict = None,
+                        scheduler: str = None) -> xr.DataArray:
 
   '''Reads in precipitation isotopes from a netCDF file (that includes a dimension for time) and creates
   a seasonal cycle global map (12 months x lat x lon) output variable.
@@ -472,6 +581,11 @@ def seascyc_rainiso_TLL(iso_type:str,
   ptiny: class 'float', Minimum value for light isotopic variable. This is required in the calculation of 
                         isotopes so as not to have artificially high delta values due to extremely low 
                         light isotopic values. Default = 1.E-18
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   _______________________________________________________________________________________________________
 
   Returns
@@ -494,7 +608,7 @@ def seascyc_rainiso_TLL(iso_type:str,
   #-----------------------------------
 
   # Read in dataset 
-  data = xr.open_dataset(path)
+  data = open_cached_dataset(path,chunks=chunks)
 
   # Assign values for begi and endi
   begi = 0 if begi == 'beg' else begi
@@ -504,43 +618,54 @@ def seascyc_rainiso_TLL(iso_type:str,
   # Precipitation isotopic variable   
   #------------------------------------
 
-  # Read in light isotopic values
-  liso_d18O_init = xr.DataArray(data.PRECRC_H216Or[begi:endi,:,:] + data.PRECSC_H216Os[begi:endi,:,:] + \
-                                data.PRECRL_H216OR[begi:endi,:,:] + data.PRECSL_H216OS[begi:endi,:,:])
-  liso_dHDO_init = xr.DataArray(data.PRECRC_H2Or[begi:endi,:,:] + data.PRECSC_H2Os[begi:endi,:,:] + \
-                                data.PRECRL_H2OR[begi:endi,:,:] + data.PRECSL_H2OS[begi:endi,:,:])
-
-  # Remove extremely small values from light isotopic variable
-  liso_d18O = xr.where(liso_d18O_init < ptiny,ptiny,liso_d18O_init)
-  liso_dHDO = xr.where(liso_dHDO_init < ptiny,ptiny,liso_dHDO_init)
-
-  # Read in heavy isotopic values
-  hiso_d18O = xr.DataArray(data.PRECRC_H218Or[begi:endi,:,:] + data.PRECSC_H218Os[begi:endi,:,:] + \
-                           data.PRECRL_H218OR[begi:endi,:,:] + data.PRECSL_H218OS[begi:endi,:,:])
-  hiso_dHDO = xr.DataArray(data.PRECRC_HDOr[begi:endi,:,:] + data.PRECSC_HDOs[begi:endi,:,:] + \
-                           data.PRECRL_HDOR[begi:endi,:,:] + data.PRECSL_HDOS[begi:endi,:,:])
-
-  # Calculate delta values
-  d18O = ( (hiso_d18O / liso_d18O) - 1. ) * 1000.
-  dHDO = ( (hiso_dHDO / liso_dHDO) - 1. ) * 1000.
-
-  #---------------------
-  # Apply isotope type
-  #---------------------
-
-  if iso_type == 'd18O':
-   var_time = xr.DataArray(d18O,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
-  if iso_type == 'dHDO':
-   var_time = xr.DataArray(dHDO,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
-  if iso_type == 'dexcess':
-   var_time = xr.DataArray(dHDO - 8 * d18O,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+  # Read in isotopic variables for time indices t0 to t1
+  def read_block(t0,t1):
+   # Read in light isotopic values
+   with span('precip_sum'):
+    liso_d18O_init = xr.DataArray(data.PRECRC_H216Or[t0:t1,:,:] + data.PRECSC_H216Os[t0:t1,:,:] + \
+                                  data.PRECRL_H216OR[t0:t1,:,:] + data.PRECSL_H216OS[t0:t1,:,:])
+    liso_dHDO_init = xr.DataArray(data.PRECRC_H2Or[t0:t1,:,:] + data.PRECSC_H2Os[t0:t1,:,:] + \
+                                  data.PRECRL_H2OR[t0:t1,:,:] + data.PRECSL_H2OS[t0:t1,:,:])
+
+   # Remove extremely small values from light isotopic variable
+   liso_d18O = xr.where(liso_d18O_init < ptiny,ptiny,liso_d18O_init)
+   liso_dHDO = xr.where(liso_dHDO_init < ptiny,ptiny,liso_dHDO_init)
+
+   # Read in heavy isotopic values
+   with span('precip_sum'):
+    hiso_d18O = xr.DataArray(data.PRECRC_H218Or[t0:t1,:,:] + data.PRECSC_H218Os[t0:t1,:,:] + \
+                             data.PRECRL_H218OR[t0:t1,:,:] + data.PRECSL_H218OS[t0:t1,:,:])
+    hiso_dHDO = xr.DataArray(data.PRECRC_HDOr[t0:t1,:,:] + data.PRECSC_HDOs[t0:t1,:,:] + \
+                             data.PRECRL_HDOR[t0:t1,:,:] + data.PRECSL_HDOS[t0:t1,:,:])
+
+   # Calculate delta values
+   d18O = ( (hiso_d18O / liso_d18O) - 1. ) * 1000.
+   dHDO = ( (hiso_dHDO / liso_dHDO) - 1. ) * 1000.
+
+   #---------------------
+   # Apply isotope type
+   #---------------------
+
+   if iso_type == 'd18O':
+    var_time = xr.DataArray(d18O,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+   if iso_type == 'dHDO':
+    var_time = xr.DataArray(dHDO,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+   if iso_type == 'dexcess':
+    var_time = xr.DataArray(dHDO - 8 * d18O,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+   return var_time
 
   #-------------------------------
   # Perform seasonal averaging
   #-------------------------------
 
   # Calculate averages for each month
-  var_clim = clmMonTLL(var_time)
+  if block_years == None:
+   var_clim = clmMonTLL(read_block(begi,endi))
+  else:
+   var_clim = clmMonBlocks(read_block,begi,endi,block_years)
+
+  # Compute once at the end if dask was used
+  var_clim = compute(var_clim,scheduler=scheduler)
 
   return var_clim
 
@@ -548,13 +673,18 @@ def seascyc_rainiso_TLL(iso_type:str,
 # Soil water isotopes: d18Op, dDp, or dexcess of soil water 
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seascyc_soiliso_TLL(iso_type:str,
                         path: str,
                         begi: str = 'beg',
                         endi: str = 'end',
                         ptiny: float = 1.E-18,
                         soillev: list = [0],
-                        soildimname: str = 'levgrnd') -> xr.DataArray:
+                        soildimname: str = 'levgrnd',
+                        block_years: int = None,
+                        chunks: dict = None,
+                        scheduler: str = None) -> xr.DataArray:
 
   '''Reads in soil water isotopes from a netCDF file (that includes a dimension for time) and creates
   a seasonal cycle global map (12 months x lat x lon) output variable.
@@ -585,6 +715,11 @@ def seascyc_soiliso_TLL(iso_type:str,
   soildimname: class 'str', Name of soil level dimension. Default is 'levgrnd', which is standard for CESM 
                             variables. This must correspond to the correct dimension name in var for 
                             proper averaging to occur.
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   ________________________________________________________________________________________________________
 
   Returns
@@ -609,7 +744,7 @@ def seascyc_soiliso_TLL(iso_type:str,
   #-----------------------------------
 
   # Read in dataset
-  data = xr.open_dataset(path)
+  data = open_cached_dataset(path,chunks=chunks)
 
   # Assign values for begi and endi
   begi = 0 if begi == 'beg' else begi
@@ -619,39 +754,48 @@ def seascyc_soiliso_TLL(iso_type:str,
   # Soil water isotopic variable   
   #------------------------------------
 
-  # Read in light isotopic values
-  liso_d18O_init = xr.DataArray(data.H2OSOI_H2OTR[begi:endi,soillev,:,:]).mean(dim=soildimname) 
-  liso_dHDO_init = xr.DataArray(data.H2OSOI_H2OTR[begi:endi,soillev,:,:]).mean(dim=soildimname)
+  # Read in isotopic variables for time indices t0 to t1
+  def read_block(t0,t1):
+   # Read in light isotopic values
+   liso_d18O_init = xr.DataArray(data.H2OSOI_H2OTR[t0:t1,soillev,:,:]).mean(dim=soildimname) 
+   liso_dHDO_init = xr.DataArray(data.H2OSOI_H2OTR[t0:t1,soillev,:,:]).mean(dim=soildimname)
 
-  # Remove extremely small values from light isotopic variable
-  liso_d18O = xr.where(liso_d18O_init < ptiny,ptiny,liso_d18O_init)
-  liso_dHDO = xr.where(liso_dHDO_init < ptiny,ptiny,liso_dHDO_init)
+   # Remove extremely small values from light isotopic variable
+   liso_d18O = xr.where(liso_d18O_init < ptiny,ptiny,liso_d18O_init)
+   liso_dHDO = xr.where(liso_dHDO_init < ptiny,ptiny,liso_dHDO_init)
 
-  # Read in heavy isotopic values
-  hiso_d18O = xr.DataArray(data.H2OSOI_H218O[begi:endi,soillev,:,:]).mean(dim=soildimname)
-  hiso_dHDO = xr.DataArray(data.H2OSOI_HDO[begi:endi,soillev,:,:]).mean(dim=soildimname)
+   # Read in heavy isotopic values
+   hiso_d18O = xr.DataArray(data.H2OSOI_H218O[t0:t1,soillev,:,:]).mean(dim=soildimname)
+   hiso_dHDO = xr.DataArray(data.H2OSOI_HDO[t0:t1,soillev,:,:]).mean(dim=soildimname)
 
-  # Calculate delta values
-  d18O = ( (hiso_d18O / liso_d18O) - 1. ) * 1000.
-  dHDO = ( (hiso_dHDO / liso_dHDO) - 1. ) * 1000.
+   # Calculate delta values
+   d18O = ( (hiso_d18O / liso_d18O) - 1. ) * 1000.
+   dHDO = ( (hiso_dHDO / liso_dHDO) - 1. ) * 1000.
 
-  #---------------------
-  # Apply isotope type
-  #---------------------
+   #---------------------
+   # Apply isotope type
+   #---------------------
 
-  if iso_type == 'd18O':
-   var_time = xr.DataArray(d18O,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
-  if iso_type == 'dHDO':
-   var_time = xr.DataArray(dHDO,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
-  if iso_type == 'dexcess':
-   var_time = xr.DataArray(dHDO - 8 * d18O,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+   if iso_type == 'd18O':
+    var_time = xr.DataArray(d18O,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+   if iso_type == 'dHDO':
+    var_time = xr.DataArray(dHDO,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+   if iso_type == 'dexcess':
+    var_time = xr.DataArray(dHDO - 8 * d18O,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+   return var_time
 
   #-------------------------------
   # Perform seasonal averaging
   #-------------------------------
 
   # Calculate averages for each month
-  var_clim = clmMonTLL(var_time)
+  if block_years == None:
+   var_clim = clmMonTLL(read_block(begi,endi))
+  else:
+   var_clim = clmMonBlocks(read_block,begi,endi,block_years)
+
+  # Compute once at the end if dask was used
+  var_clim = compute(var_clim,scheduler=scheduler)
 
   return var_clim
 
@@ -659,13 +803,19 @@ def seascyc_soiliso_TLL(iso_type:str,
 # Vapor isotopes at specified pressure level: d18Op, dDp, or dexcess of water vapor
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seascyc_vaporiso_TLL(iso_type: str,
                          path: str,
                          level: int,
                          begi: str = 'beg',
                          endi: str = 'end',
                          plev: np.ndarray = default_levels,
-                         ptiny: float = 1.E-18) -> xr.DataArray:
+                         ptiny: float = 1.E-18,
+                         block_years: int = None,
+                         chunks: dict = None,
+                         scheduler: str = None,
+                         clim_first: bool = False) -> xr.DataArray:
 
   '''Reads in water vapor isotopes from a netCDF file (that includes a dimension for time) and creates
   a seasonal cycle global map (12 months x lat x lon) output variable.
@@ -692,17 +842,28 @@ def seascyc_vaporiso_TLL(iso_type: str,
                                        to endi as int. If integers, (endi-begi)/12 must be multiple of 12. 
   plev: class 'numpy.ndarray', The new range of pressure levels with units hPa/mb, of which 'level' must 
                                be an available value. Default = np.arange(0,1050,50) 
-                               This script will interpolate climate model output from hybrid to pressure 
-                               levels using geocat.comp's interp_hybrid_to_pressure function. NOTE: If 
-                               NaN's present in variable while interpolating from hybrid to pressure, may 
-                               see this error, which comes from metpy and can be ignored: 'UserWarning: 
-                               Interpolation point out of data bounds encountered 
-                               warnings.warn('Interpolation point out of data bounds encountered')'
+                               This script will interpolate climate model output from hybrid levels to 
+                               'level' only, using the two hybrid levels that bracket it in each column 
+                               (a HybridInterpPlan from vertical_interp.py, which matches geocat.comp's 
+                               interp_hybrid_to_pressure). Values where 'level' is outside the column 
+                               (ex. below the surface) are NaN. 
                                Ex. np.arange(0,1050,50) -> pressure levels between 0 hPa and 1000 hPa with 
                                stride of 50 hPa. Default = np.arange(0,1050,50) 
   ptiny: class 'float', Minimum value for light isotopic variable. This is required in the calculation of 
                         isotopes so as not to have artificially high delta values due to extremely low 
                         light isotopic values. Default = 1.E-18
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
+  clim_first: class 'bool', If True, the 12 month climatologies of the variable(s) and PS are built on 
+                            hybrid levels first and only those 12 monthly fields are interpolated to 
+                            pressure, instead of every time step. Much faster for quick looks at long 
+                            time series, but an approximation: averaging and interpolation do not commute 
+                            where PS varies in time (ex. near the surface), and the delta values are 
+                            calculated from the monthly means of the isotopes. Use clim_first_error to 
+                            measure the difference from the default for a case. Default = False 
   _______________________________________________________________________________________________________
 
   Returns
@@ -721,86 +882,97 @@ def seascyc_vaporiso_TLL(iso_type: str,
   path = str(path)
   level = int(level)
 
-  # Assign index for level in plev
-  lev_ind = int(np.where(np.array(plev) == level)[0])
+  # Check that level is one of plev
+  if level not in plev:
+   raise ValueError('level '+str(level)+' hPa is not one of plev')
 
   #-----------------------------------
   # Read in dataset 
   #-----------------------------------
 
   # Read in dataset 
-  data = xr.open_dataset(path)
+  data = open_cached_dataset(path,chunks=chunks)
 
   # Assign values for begi and endi
   begi = 0 if begi == 'beg' else begi
   endi = len(data.time) if endi == 'end' else endi
 
-  # Read in variables for converting sigma to pressure coordinates
-  hyam = data.hyam
-  hybm = data.hybm
-  psrf = data.PS[begi:endi,:,:]
-  p0Pa  = 100000.
+  # Climatology-first mode: monthly means of the isotopic variables on hybrid levels, which are then
+  # interpolated to 'level' by read_block(begi,endi) below instead of every time step
+  if clim_first:
+   def read_hybrid(t0,t1):
+    return tuple(data[var][t0:t1,:,:,:] for var in ['H216OV','H2OV','H218OV','HDOV'])
+   if block_years == None:
+    hybrid_clims = tuple(clmMonTLLL(var,lev_dim='lev') for var in read_hybrid(begi,endi))
+   else:
+    hybrid_clims = clmMonBlocks(read_hybrid,begi,endi,block_years)
 
   #------------------------------------
   # Water vapor isotopic variable   
   #------------------------------------
 
-  # Read in light isotopic values
-  liso_d18O_init = data.H216OV[begi:endi,:,:,:]
-  liso_dHDO_init = data.H2OV[begi:endi,:,:,:]
-
-  # Ignore unnecessary error from metpy
-  simplefilter(action='ignore', category=UserWarning) 
-
-  # Convert light isotopic values from sigma to pressure coordinates
-  liso_d18O_lev = interp_hybrid_to_pressure(data=liso_d18O_init,ps=psrf,hyam=hyam,hybm=hybm,p0=p0Pa,
-                                            new_levels=plev*100.)
-  liso_dHDO_lev = interp_hybrid_to_pressure(data=liso_dHDO_init,ps=psrf,hyam=hyam,hybm=hybm,p0=p0Pa,
-                                            new_levels=plev*100.)
-  liso_d18O_time = xr.DataArray(liso_d18O_lev[:,lev_ind,:,:],dims=['time','lat','lon'],
-                            coords=dict(time=liso_d18O_lev.time,lat=liso_d18O_lev.lat,lon=liso_d18O_lev.lon))
-  liso_dHDO_time = xr.DataArray(liso_dHDO_lev[:,lev_ind,:,:],dims=['time','lat','lon'],
-                            coords=dict(time=liso_dHDO_lev.time,lat=liso_dHDO_lev.lat,lon=liso_dHDO_lev.lon))
-
-  # Remove extremely small values from light isotopic variable
-  liso_d18O = xr.where(liso_d18O_time < ptiny,ptiny,liso_d18O_time)
-  liso_dHDO = xr.where(liso_dHDO_time < ptiny,ptiny,liso_dHDO_time)
-
-  # Read in heavy isotopic values
-  hiso_d18O_init = data.H218OV[begi:endi,:,:,:]
-  hiso_dHDO_init = data.HDOV[begi:endi,:,:,:]
-
-  # Convert light isotopic values from sigma to pressure coordinates
-  hiso_d18O_lev = interp_hybrid_to_pressure(data=hiso_d18O_init,ps=psrf,hyam=hyam,hybm=hybm,p0=p0Pa,
-                                            new_levels=plev*100.)
-  hiso_dHDO_lev = interp_hybrid_to_pressure(data=hiso_dHDO_init,ps=psrf,hyam=hyam,hybm=hybm,p0=p0Pa,
-                                            new_levels=plev*100.)
-  hiso_d18O = xr.DataArray(hiso_d18O_lev[:,lev_ind,:,:],dims=['time','lat','lon'],
-                            coords=dict(time=hiso_d18O_lev.time,lat=hiso_d18O_lev.lat,lon=hiso_d18O_lev.lon))
-  hiso_dHDO = xr.DataArray(hiso_dHDO_lev[:,lev_ind,:,:],dims=['time','lat','lon'],
-                            coords=dict(time=hiso_dHDO_lev.time,lat=hiso_dHDO_lev.lat,lon=hiso_dHDO_lev.lon))
-
-  # Calculate delta values
-  d18O = ( (hiso_d18O / liso_d18O) - 1. ) * 1000.
-  dHDO = ( (hiso_dHDO / liso_dHDO) - 1. ) * 1000.
-
-  #---------------------
-  # Apply isotope type
-  #---------------------
-
-  if iso_type == 'd18O':
-   var_time = xr.DataArray(d18O,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
-  if iso_type == 'dHDO':
-   var_time = xr.DataArray(dHDO,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
-  if iso_type == 'dexcess':
-   var_time = xr.DataArray(dHDO - 8 * d18O,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+  # Read in isotopic variables for time indices t0 to t1
+  def read_block(t0,t1):
+   # Plan for converting sigma to pressure coordinates, shared by all four isotopic variables
+   plan = cached_interp_plan(path,t0,t1,level*100.,p0=100000.,chunks=chunks,clim=clim_first) # converts level to units=Pa
+
+   # Read in light and heavy isotopic values
+   if clim_first:
+    liso_d18O_init, liso_dHDO_init, hiso_d18O_init, hiso_dHDO_init = hybrid_clims
+   else:
+    liso_d18O_init = data.H216OV[t0:t1,:,:,:]
+    liso_dHDO_init = data.H2OV[t0:t1,:,:,:]
+    hiso_d18O_init = data.H218OV[t0:t1,:,:,:]
+    hiso_dHDO_init = data.HDOV[t0:t1,:,:,:]
+
+   # Convert light isotopic values from sigma to pressure coordinates (at 'level' only)
+   liso_d18O_lev = plan.apply(liso_d18O_init)
+   liso_dHDO_lev = plan.apply(liso_dHDO_init)
+   liso_d18O_time = xr.DataArray(liso_d18O_lev,dims=['time','lat','lon'],
+                             coords=dict(time=liso_d18O_lev.time,lat=liso_d18O_lev.lat,lon=liso_d18O_lev.lon))
+   liso_dHDO_time = xr.DataArray(liso_dHDO_lev,dims=['time','lat','lon'],
+                             coords=dict(time=liso_dHDO_lev.time,lat=liso_dHDO_lev.lat,lon=liso_dHDO_lev.lon))
+
+   # Remove extremely small values from light isotopic variable
+   liso_d18O = xr.where(liso_d18O_time < ptiny,ptiny,liso_d18O_time)
+   liso_dHDO = xr.where(liso_dHDO_time < ptiny,ptiny,liso_dHDO_time)
+
+   # Convert heavy isotopic values from sigma to pressure coordinates (at 'level' only)
+   hiso_d18O_lev = plan.apply(hiso_d18O_init)
+   hiso_dHDO_lev = plan.apply(hiso_dHDO_init)
+   hiso_d18O = xr.DataArray(hiso_d18O_lev,dims=['time','lat','lon'],
+                             coords=dict(time=hiso_d18O_lev.time,lat=hiso_d18O_lev.lat,lon=hiso_d18O_lev.lon))
+   hiso_dHDO = xr.DataArray(hiso_dHDO_lev,dims=['time','lat','lon'],
+                             coords=dict(time=hiso_dHDO_lev.time,lat=hiso_dHDO_lev.lat,lon=hiso_dHDO_lev.lon))
+
+   # Calculate delta values
+   d18O = ( (hiso_d18O / liso_d18O) - 1. ) * 1000.
+   dHDO = ( (hiso_dHDO / liso_dHDO) - 1. ) * 1000.
+
+   #---------------------
+   # Apply isotope type
+   #---------------------
+
+   if iso_type == 'd18O':
+    var_time = xr.DataArray(d18O,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+   if iso_type == 'dHDO':
+    var_time = xr.DataArray(dHDO,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+   if iso_type == 'dexcess':
+    var_time = xr.DataArray(dHDO - 8 * d18O,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+   return var_time
 
   #-------------------------------
   # Perform seasonal averaging
   #-------------------------------
 
-  # Calculate averages for each month
-  var_clim = clmMonTLL(var_time)
+  # Calculate averages for each month (the climatology-first result already holds 12 months)
+  if block_years == None or clim_first:
+   var_clim = clmMonTLL(read_block(begi,endi))
+  else:
+   var_clim = clmMonBlocks(read_block,begi,endi,block_years)
+
+  # Compute once at the end if dask was used
+  var_clim = compute(var_clim,scheduler=scheduler)
 
   return var_clim
 
@@ -808,13 +980,18 @@ def seascyc_vaporiso_TLL(iso_type: str,
 # Soil water isotopes weighted by root depth fraction: d18Op, dDp, or dexcess of soil water 
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seascyc_isoroot_TLL(iso_type:str,
                         path: str,
                         begi: str = 'beg',
                         endi: str = 'end',
                         ptiny: float = 1.E-18,
                         rootwgt: str = 'ROOTR_COLUMN',
-                        soildimname: str = 'levgrnd') -> xr.DataArray:
+                        soildimname: str = 'levgrnd',
+                        block_years: int = None,
+                        chunks: dict = None,
+                        scheduler: str = None) -> xr.DataArray:
 
   '''Reads in soil water isotopes from a netCDF file (that includes a dimension for time) and creates
   a seasonal cycle global map (12 months x lat x lon) output variable weighted by root depth fraction. 
@@ -845,6 +1022,11 @@ def seascyc_isoroot_TLL(iso_type:str,
   soildimname: class 'str', Name of soil level dimension. Default is 'levgrnd', which is standard for CESM 
                             variables. This must correspond to the correct dimension name in var for 
                             proper averaging to occur.
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   _______________________________________________________________________________________________________
 
   Returns
@@ -870,7 +1052,7 @@ def seascyc_isoroot_TLL(iso_type:str,
   #-----------------------------------
 
   # Read in dataset
-  data = xr.open_dataset(path)
+  data = open_cached_dataset(path,chunks=chunks)
 
   # Assign values for begi and endi
   begi = 0 if begi == 'beg' else begi
@@ -880,60 +1062,68 @@ def seascyc_isoroot_TLL(iso_type:str,
   # Soil water isotopic variable   
   #------------------------------------
 
-  # Read in light isotopic values
-  liso_d18O_init = data.H2OSOI_H2OTR[begi:endi,:,:,:]
-  liso_dHDO_init = data.H2OSOI_H2OTR[begi:endi,:,:,:]
+  # Read in root weighted isotopic variables for time indices t0 to t1
+  def read_block(t0,t1):
+   # Read in light isotopic values
+   liso_d18O_init = data.H2OSOI_H2OTR[t0:t1,:,:,:]
+   liso_dHDO_init = data.H2OSOI_H2OTR[t0:t1,:,:,:]
+
+   # Remove extremely small values from light isotopic variable
+   liso_d18O = xr.where(liso_d18O_init < ptiny,ptiny,liso_d18O_init)
+   liso_dHDO = xr.where(liso_dHDO_init < ptiny,ptiny,liso_dHDO_init)
 
-  # Remove extremely small values from light isotopic variable
-  liso_d18O = xr.where(liso_d18O_init < ptiny,ptiny,liso_d18O_init)
-  liso_dHDO = xr.where(liso_dHDO_init < ptiny,ptiny,liso_dHDO_init)
+   # Read in heavy isotopic values
+   hiso_d18O = data.H2OSOI_H218O[t0:t1,:,:,:]
+   hiso_dHDO = data.H2OSOI_HDO[t0:t1,:,:,:]
 
-  # Read in heavy isotopic values
-  hiso_d18O = data.H2OSOI_H218O[begi:endi,:,:,:]
-  hiso_dHDO = data.H2OSOI_HDO[begi:endi,:,:,:]
+   # Calculate delta values
+   d18Os = ( (hiso_d18O / liso_d18O) - 1. ) * 1000.
+   dHDOs = ( (hiso_dHDO / liso_dHDO) - 1. ) * 1000.
 
-  # Calculate delta values
-  d18Os = ( (hiso_d18O / liso_d18O) - 1. ) * 1000.
-  dHDOs = ( (hiso_dHDO / liso_dHDO) - 1. ) * 1000.
+   #-----------------------
+   # Apply isotope type
+   #-----------------------
 
-  #-----------------------
-  # Apply isotope type
-  #-----------------------
+   # Variable now has shape (levgrnd x lat x lon)
 
-  # Variable now has shape (levgrnd x lat x lon)
+   if iso_type == 'd18O':
+    isoslev = d18Os
+   if iso_type == 'dHDO':
+    isoslev = dHDOs
+   if iso_type == 'dexcess':
+    isoslev = xr.DataArray(dHDOs - 8 * d18Os,dims=['time',soildimname,'lat','lon'],
+                           coords={'time':data.time[t0:t1],soildimname:data[soildimname],
+                                   'lat':data.lat,'lon':data.lon})
 
-  if iso_type == 'd18O':
-   isoslev = d18Os
-  if iso_type == 'dHDO':
-   isoslev = dHDOs
-  if iso_type == 'dexcess':
-   isoslev = xr.DataArray(dHDOs - 8 * d18Os,dims=['time',soildimname,'lat','lon'],
-                          coords={'time':data.time,soildimname:data[soildimname],
-                                  'lat':data.lat,'lon':data.lon})
+   #---------------------------------------------------------
+   # Weight soil water isotopes by fractional rooting depth
+   #---------------------------------------------------------
 
-  #---------------------------------------------------------
-  # Weight soil water isotopes by fractional rooting depth
-  #---------------------------------------------------------
+   # Read in rooting depth
+   root_init = data[rootwgt][t0:t1,:,:,:]
 
-  # Read in rooting depth and average years together
-  root_init = data[rootwgt][begi:endi,:,:,:]
+   # Remove values < 0 in average root depth fraction variable
+   root_proc = xr.where(root_init < 0, float('NaN'), root_init) # remove values < 0 and set them to NaN
 
-  # Remove values < 0 in average root depth fraction variable
-  root_proc = xr.where(root_init < 0, float('NaN'), root_init) # remove values < 0 and set them to NaN
+   # Weight the isotopes by the fractional rooting depth
+   iso_time = xr.DataArray( xr.DataArray(isoslev*root_proc).sum(dim=soildimname) /                      \
+                            xr.DataArray(root_proc,dims=['time',soildimname,'lat','lon']).sum(dim=soildimname) )
 
-  # Weight the isotopes by the fractional rooting depth
-  iso_time = xr.DataArray( xr.DataArray(isoslev*root_proc).sum(dim=soildimname) /                      \
-                           xr.DataArray(root_proc,dims=['time',soildimname,'lat','lon']).sum(dim=soildimname) )
+   # Set root_seas as xarray DataArray
+   return xr.DataArray(iso_time,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
 
   #-------------------------------
   # Perform seasonal averaging
   #-------------------------------
 
-  # Set root_seas as xarray DataArray
-  var_time = xr.DataArray(iso_time,dims=['time','lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
-
   # Calculate averages for each month
-  var_clim = clmMonTLL(var_time)
+  if block_years == None:
+   var_clim = clmMonTLL(read_block(begi,endi))
+  else:
+   var_clim = clmMonBlocks(read_block,begi,endi,block_years)
+
+  # Compute once at the end if dask was used
+  var_clim = compute(var_clim,scheduler=scheduler)
 
   return var_clim
 
@@ -941,11 +1131,17 @@ def seascyc_isoroot_TLL(iso_type:str,
 # Wind U and V vectors
 #######################################################################################################
 
+@profiled
+@cached_derived
 def seascyc_wind_vec_TLL(path: str,
                          begi: str = 'beg',
                          endi: str = 'end',
                          level: int = None,
-                         plev: np.ndarray = default_levels) -> xr.DataArray:
+                         plev: np.ndarray = default_levels,
+                         block_years: int = None,
+                         chunks: dict = None,
+                         scheduler: str = None,
+                         clim_first: bool = False) -> xr.DataArray:
 
   '''Reads in wind (U,V) variables from a netCDF file (that includes a dimension for time) and creates
   a seasonal cycle global map (12 months x lat x lon) output variable.
@@ -970,14 +1166,24 @@ def seascyc_wind_vec_TLL(path: str,
                                        to endi as int. If integers, (endi-begi)/12 must be multiple of 12. 
   plev: class 'numpy.ndarray', The new range of pressure levels with units hPa/mb, of which 'level' must 
                                be an available value. Default = np.arange(0,1050,50) 
-                               This script will interpolate climate model output from hybrid to pressure 
-                               levels using geocat.comp's interp_hybrid_to_pressure function. NOTE: If 
-                               NaN's present in variable while interpolating from hybrid to pressure, may 
-                               see this error, which comes from metpy and can be ignored: 'UserWarning: 
-                               Interpolation point out of data bounds encountered 
-                               warnings.warn('Interpolation point out of data bounds encountered')'
+                               This script will interpolate climate model output from hybrid levels to 
+                               'level' only, using the two hybrid levels that bracket it in each column 
+                               (a HybridInterpPlan from vertical_interp.py, which matches geocat.comp's 
+                               interp_hybrid_to_pressure). Values where 'level' is outside the column 
+                               (ex. below the surface) are NaN. 
                                Ex. np.arange(0,1050,50) -> pressure levels between 0 hPa and 1000 hPa with 
                                stride of 50 hPa. Default = np.arange(0,1050,50) 
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
+  clim_first: class 'bool', If True, the 12 month climatologies of the variable(s) and PS are built on 
+                            hybrid levels first and only those 12 monthly fields are interpolated to 
+                            pressure, instead of every time step. Much faster for quick looks at long 
+                            time series, but an approximation: averaging and interpolation do not commute 
+                            where PS varies in time (ex. near the surface). Use clim_first_error to 
+                            measure the difference from the default for a case. Default = False 
   _______________________________________________________________________________________________________
 
   Returns
@@ -995,66 +1201,112 @@ def seascyc_wind_vec_TLL(path: str,
   level = int(level)
   plev = np.array(plev)
 
-  # Assign index for level in plev
-  lev_ind = int(np.where(np.array(plev) == level)[0])
+  # Check that level is one of plev
+  if level not in plev:
+   raise ValueError('level '+str(level)+' hPa is not one of plev')
 
   #-----------------------------------
   # Read in variables and scale them 
   #-----------------------------------
 
   # Read in dataset 
-  data = xr.open_dataset(path)
+  data = open_cached_dataset(path,chunks=chunks)
 
   # Assign values for begi and endi
   begi = 0 if begi == 'beg' else begi
   endi = len(data.time) if endi == 'end' else endi
 
-  # Read in variable(s)
-  u_data = data['U'][begi:endi,:,:,:]
-  v_data = data['V'][begi:endi,:,:,:]
-
-  # Convert sigma coordinates to pressure coordinates
-  simplefilter(action='ignore', category=UserWarning) # ignore unnecessary error from metpy
-  hyam = data.hyam
-  hybm = data.hybm
-  psrf = data.PS
-  p0Pa  = 100000.
-  u_lev = interp_hybrid_to_pressure(data=u_data,ps=psrf,hyam=hyam,hybm=hybm,p0=p0Pa,new_levels=plev*100.) # converts plev to units=Pa
-  v_lev = interp_hybrid_to_pressure(data=v_data,ps=psrf,hyam=hyam,hybm=hybm,p0=p0Pa,new_levels=plev*100.) # converts plev to units=Pa
-  u_time = xr.DataArray(u_lev[:,lev_ind,:,:], dims=['time','lat','lon'],coords=dict(time=u_data.time,lat=u_data.lat,lon=u_data.lon),
-                                                     attrs=dict(description='U winds at '+str(level)+' hPa'))
-  v_time = xr.DataArray(v_lev[:,lev_ind,:,:], dims=['time','lat','lon'],coords=dict(time=v_data.time,lat=v_data.lat,lon=v_data.lon),
-                                                     attrs=dict(description='V winds at '+str(level)+' hPa'))
+  # Climatology-first mode: monthly means of U and V on hybrid levels, which are then interpolated to
+  # 'level' by read_block(begi,endi) below instead of every time step
+  if clim_first:
+   def read_hybrid(t0,t1):
+    return data['U'][t0:t1,:,:,:], data['V'][t0:t1,:,:,:]
+   if block_years == None:
+    hybrid_clims = tuple(clmMonTLLL(var,lev_dim='lev') for var in read_hybrid(begi,endi))
+   else:
+    hybrid_clims = clmMonBlocks(read_hybrid,begi,endi,block_years)
+
+  # Read in U and V at 'level' for time indices t0 to t1
+  def read_block(t0,t1):
+   if clim_first:
+    u_data, v_data = hybrid_clims
+   else:
+    u_data = data['U'][t0:t1,:,:,:]
+    v_data = data['V'][t0:t1,:,:,:]
+
+   # Convert sigma coordinates to pressure coordinates (at 'level' only)
+   plan = cached_interp_plan(path,t0,t1,level*100.,p0=100000.,chunks=chunks,clim=clim_first) # converts level to units=Pa
+   u_lev = plan.apply(u_data)
+   v_lev = plan.apply(v_data)
+   u_time = xr.DataArray(u_lev, dims=['time','lat','lon'],coords=dict(time=u_data.time,lat=u_data.lat,lon=u_data.lon),
+                                attrs=dict(description='U winds at '+str(level)+' hPa'))
+   v_time = xr.DataArray(v_lev, dims=['time','lat','lon'],coords=dict(time=v_data.time,lat=v_data.lat,lon=v_data.lon),
+                                attrs=dict(description='V winds at '+str(level)+' hPa'))
+   return u_time, v_time
 
   #-------------------------------
   # Perform seasonal averaging
   #-------------------------------
 
-  # Calculate averages for each month
-  u_clim = clmMonTLL(u_time)
-  v_clim = clmMonTLL(v_time)
+  # Calculate averages for each month (the climatology-first result already holds 12 months)
+  if block_years == None or clim_first:
+   u_time, v_time = read_block(begi,endi)
+   u_clim = clmMonTLL(u_time)
+   v_clim = clmMonTLL(v_time)
+  else:
+   u_clim, v_clim = clmMonBlocks(read_block,begi,endi,block_years)
 
   # Set NaN values
   u_clim = u_clim.where(u_clim < 1E10)
   v_clim = v_clim.where(v_clim < 1E10)
 
+  # Compute once at the end if dask was used
+  u_clim, v_clim = compute(u_clim,v_clim,scheduler=scheduler)
+
   return u_clim, v_clim
 
 #######################################################################################################
 # Integrated vapor transport (IVT) vectors 
 #######################################################################################################
 
+def _ivt_hybrid(u: np.ndarray,
+                v: np.ndarray,
+                q: np.ndarray,
+                ps: np.ndarray,
+                hyai: np.ndarray,
+                hybi: np.ndarray,
+                p0: float,
+                ptop: float,
+                pbot: float) -> tuple:
+
+  # Vertically integrated u*q and v*q (kg/(m*s)) on hybrid levels (last dimension), using the thickness 
+  # of each layer between its interfaces, limited to ptop and pbot (Pa)
+  g = 9.8 # m/s^2
+  pint = np.clip(hyai*p0 + hybi*ps[...,np.newaxis],ptop,pbot)
+  dp_g = np.abs(np.diff(pint,axis=-1)) / g
+
+  return np.einsum('...k,...k,...k->...',u,q,dp_g), np.einsum('...k,...k,...k->...',v,q,dp_g)
+
+
+@profiled
+@cached_derived
 def seascyc_IVT_vec_TLL(path: str,
                         begi: str = 'beg',
                         endi: str = 'end',
                         ptop: float = 0.,
                         pbot: float = 1000.,
-                        plev: np.ndarray = default_levels) -> xr.DataArray:
+                        plev: np.ndarray = default_levels,
+                        chunks: dict = None,
+                        scheduler: str = None,
+                        clim_first: bool = False,
+                        engine: str = 'plev',
+                        block_years: int = None) -> xr.DataArray:
 
   '''Reads in U,V, and Q variables from a netCDF file (that includes a dimension for time) and creates
   a seasonal cycle global map (12 months x lat x lon) output variable of integrated vapor transport vectors.
 
-  NOTE: To use this function, geocat.f2py must be version 2022.4.0. Later versions do not work currently.
+  NOTE: To use this function with engine='plev', geocat.f2py must be version 2022.4.0. Later versions do 
+  not work currently.
 
   Required Parameters                       
   --------------------------------------------------------------------------------------------------------
@@ -1076,13 +1328,32 @@ def seascyc_IVT_vec_TLL(path: str,
   plev: class 'numpy.ndarray', The new range of pressure levels with units hPa/mb, of which 'level' must 
                                be an available value. Default = np.arange(0,1050,50) 
                                This script will interpolate climate model output from hybrid to pressure 
-                               levels using geocat.comp's interp_hybrid_to_pressure function. NOTE: If 
-                               NaN's present in variable while interpolating from hybrid to pressure, may 
-                               see this error, which comes from metpy and can be ignored: 'UserWarning: 
-                               Interpolation point out of data bounds encountered 
-                               warnings.warn('Interpolation point out of data bounds encountered')'
+                               levels with one HybridInterpPlan (vertical_interp.py) shared by U, V and Q, 
+                               which matches geocat.comp's interp_hybrid_to_pressure. Values where a level 
+                               is outside the column (ex. below the surface) are NaN. 
                                Ex. np.arange(0,1050,50) -> pressure levels between 0 hPa and 1000 hPa with 
                                stride of 50 hPa. Default = np.arange(0,1050,50) 
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
+  clim_first: class 'bool', If True, the 12 month climatologies of the variable(s) and PS are built on 
+                            hybrid levels first and only those 12 monthly fields are interpolated to 
+                            pressure, instead of every time step. Much faster for quick looks at long 
+                            time series, but an approximation: averaging and interpolation do not commute 
+                            where PS varies in time (ex. near the surface). Use clim_first_error to 
+                            measure the difference from the default for a case. Only used with 
+                            engine='plev'. Default = False 
+  engine: class 'string', How the column is integrated. Options are: 'plev' (interpolate the monthly 
+                          climatologies of U, V and Q to 'plev' and integrate UQ and VQ from their 
+                          product, as above) and 'hybrid' (integrate u*q and v*q on the model's own 
+                          levels at every time step, with layer thickness from hyai, hybi and PS, then 
+                          average; gives the time mean of the flux rather than the product of the 
+                          means, does not need geocat and ignores 'plev' and 'clim_first'). With 
+                          'hybrid' the column runs from ptop down to the lower of pbot and the surface. 
+                          Default = 'plev'
+  block_years: class 'int', With engine='hybrid', the time series is read and integrated 'block_years' 
+                            years at a time, so memory use does not grow with the length of the record. 
+                            Default = None reads the whole time series at once.
   _______________________________________________________________________________________________________
 
   Returns
@@ -1101,44 +1372,86 @@ def seascyc_IVT_vec_TLL(path: str,
   ptop = float(ptop)
   pbot = float(pbot)
   plev = np.array(plev)
+  engine = str(engine)
+
+  # Check that engine is available
+  if engine not in ['plev','hybrid']:
+   raise ValueError("engine must be 'plev' or 'hybrid', got '"+engine+"'")
 
   #-----------------------------------
   # Read in variables and scale them 
   #-----------------------------------
 
   # Read in dataset 
-  data = xr.open_dataset(path)
+  data = open_cached_dataset(path,chunks=chunks)
 
   # Assign values for begi and endi
   begi = 0 if begi == 'beg' else begi
   endi = len(data.time) if endi == 'end' else endi
 
+  #----------------------------------------------
+  # Integrate on native hybrid levels if chosen
+  #----------------------------------------------
+
+  if engine == 'hybrid':
+
+   # IVT at each time step for time indices t0 to t1, with one contraction over 'lev' per component
+   def read_block(t0,t1):
+    return xr.apply_ufunc(_ivt_hybrid,data.U[t0:t1,:,:,:],data.V[t0:t1,:,:,:],data.Q[t0:t1,:,:,:],
+                          data.PS[t0:t1,:,:],data.hyai,data.hybi,
+                          kwargs=dict(p0=100000.,ptop=ptop*100.,pbot=pbot*100.),
+                          input_core_dims=[['lev'],['lev'],['lev'],[],['ilev'],['ilev']],
+                          output_core_dims=[[],[]],
+                          dask='parallelized',
+                          dask_gufunc_kwargs=dict(allow_rechunk=True),
+                          output_dtypes=[np.float64,np.float64])
+
+   # Calculate averages for each month
+   if block_years == None:
+    UQ_time, VQ_time = read_block(begi,endi)
+    u_clim = clmMonTLL(UQ_time)
+    v_clim = clmMonTLL(VQ_time)
+   else:
+    u_clim, v_clim = clmMonBlocks(read_block,begi,endi,block_years)
+
+   # Set NaN values
+   u_clim = u_clim.where(u_clim < 1E10)
+   v_clim = v_clim.where(v_clim < 1E10)
+
+   # Compute once at the end if dask was used
+   u_clim, v_clim = compute(u_clim,v_clim,scheduler=scheduler)
+
+   return u_clim, v_clim
+
   # Read in variables
   u_data = data.U[begi:endi,:,:,:]
   v_data = data.V[begi:endi,:,:,:]
   q_data = data.Q[begi:endi,:,:,:]
 
-  # Convert sigma coordinates to pressure coordinates
-  simplefilter(action='ignore', category=UserWarning) # ignore unnecessary error from metpy
-  hyam = data.hyam
-  hybm = data.hybm
-  psrf = data.PS
-  p0Pa  = 100000.
-  u_lev = xr.DataArray(interp_hybrid_to_pressure(data=u_data,ps=psrf,hyam=hyam,hybm=hybm,p0=p0Pa,new_levels=plev*100.),
-                       dims=['time','plev','lat','lon'],coords=dict(time=data.time,plev=plev,lat=data.lat,lon=data.lon))
-  v_lev = xr.DataArray(interp_hybrid_to_pressure(data=v_data,ps=psrf,hyam=hyam,hybm=hybm,p0=p0Pa,new_levels=plev*100.),
-                       dims=['time','plev','lat','lon'],coords=dict(time=data.time,plev=plev,lat=data.lat,lon=data.lon))
-  q_lev = xr.DataArray(interp_hybrid_to_pressure(data=q_data,ps=psrf,hyam=hyam,hybm=hybm,p0=p0Pa,new_levels=plev*100.),
-                       dims=['time','plev','lat','lon'],coords=dict(time=data.time,plev=plev,lat=data.lat,lon=data.lon))
+  # Climatology-first mode interpolates the monthly means on hybrid levels instead of every time step
+  if clim_first:
+   u_data = clmMonTLLL(u_data,lev_dim='lev')
+   v_data = clmMonTLLL(v_data,lev_dim='lev')
+   q_data = clmMonTLLL(q_data,lev_dim='lev')
+
+  # Convert sigma coordinates to pressure coordinates with one interpolation plan shared by U, V and Q
+  plan = cached_interp_plan(path,begi,endi,plev*100.,p0=100000.,chunks=chunks,clim=clim_first) # converts plev to units=Pa
+  u_lev = xr.DataArray(plan.apply(u_data),
+                       dims=['time','plev','lat','lon'],coords=dict(time=u_data.time,plev=plev,lat=data.lat,lon=data.lon))
+  v_lev = xr.DataArray(plan.apply(v_data),
+                       dims=['time','plev','lat','lon'],coords=dict(time=v_data.time,plev=plev,lat=data.lat,lon=data.lon))
+  q_lev = xr.DataArray(plan.apply(q_data),
+                       dims=['time','plev','lat','lon'],coords=dict(time=q_data.time,plev=plev,lat=data.lat,lon=data.lon))
 
   # Calculate climatologies
   u_time = clmMonTLLL(u_lev)
   v_time = clmMonTLLL(v_lev)
   q_time = clmMonTLLL(q_lev)
 
-  # Calculate UQ and VQ
+  # Calculate UQ and VQ (computed here if dask was used, as they are weighted level by level below)
   uq = u_time * q_time
   vq = v_time * q_time
+  uq, vq = compute(uq,vq,scheduler=scheduler)
 
   #------------------------------
   # Perform calculation for IVT 
@@ -1148,6 +1461,7 @@ def seascyc_IVT_vec_TLL(path: str,
   # 1) Finding index of plev that corresponds to ptop, this avoids error where ptop is not <= min(plev)
   ptop_ind = np.where(plev == ptop)[0][0] 
   # 2) Converting pressure to Pa and then converting it right back to hPa, this is a workaround for dpres_plevel to work
+  from geocat.f2py.dpres_plevel_wrapper import dpres_plevel
   dp = (dpres_plevel(pressure_levels=plev[ptop_ind:]*100.,pressure_surface=pbot*100.,pressure_top=ptop*100.)/100.) 
 
   # Weight each atmospheric layer by dp/g
@@ -1176,4 +1490,88 @@ def seascyc_IVT_vec_TLL(path: str,
   u_clim = u_clim.where(u_clim < 1E10)
   v_clim = v_clim.where(v_clim < 1E10)
 
+  # Compute once at the end if dask was used
+  u_clim, v_clim = compute(u_clim,v_clim,scheduler=scheduler)
+
   return u_clim, v_clim
+
+#######################################################################################################
+# Error of the climatology-first mode 
+#######################################################################################################
+
+@profiled
+def clim_first_error(func,
+                     *args,
+                     **kwargs) -> dict:
+
+  '''Runs one of the pressure level seasonal cycle functions twice, exactly and with clim_first=True, and 
+  reports how far the climatology-first approximation is from the exact result and how much time it saves.
+  Useful for checking, once per case and level, whether the fast mode is good enough for quick looks.
+
+  Required Parameters                       
+  --------------------------------------------------------------------------------------------------------
+  func
+   class: 'function', seascyc_var_TLL, seascyc_vaporiso_TLL, seascyc_wind_vec_TLL or seascyc_IVT_vec_TLL
+
+  Optional Parameters                       
+  --------------------------------------------------------------------------------------------------------
+  args, kwargs: Parameters passed on to 'func', ex. ('T','/path/to/file.nc') and level=500. 'clim_first' 
+                is set by this function.
+  _______________________________________________________________________________________________________
+
+  Returns
+  ---------------------
+  output: :class:'dict'
+          rmse: area weighted (cos(lat)) root mean square of (fast - exact) over months and grid cells 
+                where both are defined. For vectors, U and V are pooled.
+          bias: area weighted mean of (fast - exact)
+          max_abs: largest absolute difference
+          rel_rmse: rmse divided by the area weighted standard deviation of the exact result
+          nan_mismatch: number of values that are NaN in only one of the two results (ex. where 'level' is 
+                        below the surface in some months but not in the monthly mean PS)
+          exact_seconds, fast_seconds: run times of the two calls, neither read from the derived product
+                                       cache nor reusing an interpolation plan (the fast call runs second
+                                       and reuses the open dataset)
+
+  '''
+
+  kwargs = dict(kwargs)
+  kwargs.pop('clim_first',None)
+
+  # Time the calculations themselves rather than reads from the derived product cache: unwrap every
+  # decorator (profiling and caching), not just the outermost one
+  func = inspect.unwrap(func)
+
+  # Run the exact and climatology-first calculations, each building its interpolation plan from scratch
+  clear_interp_plan_cache()
+  start = time.perf_counter()
+  exact = func(*args,clim_first=False,**kwargs)
+  exact_seconds = time.perf_counter() - start
+
+  clear_interp_plan_cache()
+  start = time.perf_counter()
+  fast = func(*args,clim_first=True,**kwargs)
+  fast_seconds = time.perf_counter() - start
+
+  # Pool the components of vector output
+  exact = xr.concat(list(exact) if isinstance(exact,tuple) else [exact],dim='component')
+  fast = xr.concat(list(fast) if isinstance(fast,tuple) else [fast],dim='component')
+
+  #-------------------------------
+  # Area weighted error metrics
+  #-------------------------------
+
+  wgt = np.cos(np.deg2rad(exact.lat))
+  diff = fast - exact
+  ref = exact.where(diff.notnull())
+
+  rmse = float(np.sqrt((diff**2).weighted(wgt).mean()))
+  std = float(np.sqrt(((ref - ref.weighted(wgt).mean())**2).weighted(wgt).mean()))
+
+  return dict(rmse=rmse,
+              bias=float(diff.weighted(wgt).mean()),
+              max_abs=float(abs(diff).max()),
+              rel_rmse=rmse/std if std > 0. else np.nan,
+              nan_mismatch=int((exact.isnull() != fast.isnull()).sum()),
+              exact_seconds=exact_seconds,
+              fast_seconds=fast_seconds)
@@ -7,8 +7,10 @@
 
 import numpy as np
 import xarray as xr
-from geocat.comp.interpolation import interp_hybrid_to_pressure 
-from ESMplot.climate_analysis.climatology import clmMonTLL,clmMonTLLL,clmMonTSLL
+from ESMplot.climate_analysis.climatology import clmMonTLL,clmMonTLLL,clmMonTSLL,clmMonBlocks
+from ESMplot.climate_analysis.dataset_cache import open_cached_dataset
+from ESMplot.climate_analysis.execution import compute
+from ESMplot.climate_analysis.profiling import profiled
 
 # Default arrays
 default_levels  = np.arange(0,1050,50) # 0 hPa to 1000 hPa by 50   
@@ -25,6 +27,7 @@ default_levels  = np.arange(0,1050,50) # 0 hPa to 1000 hPa by 50
 # Land variable with soil levels 
 #######################################################################################################
 
+@profiled
 def seascyc_soilvar_TSLL(var1: str,
                          path: str,
                          begi: str = 'beg',
@@ -32,7 +35,10 @@ def seascyc_soilvar_TSLL(var1: str,
                          var2: str = None,
                          math: str = None,
                          soildimname: str = 'levgrnd',
-                         mult: float = 1.) -> xr.DataArray:
+                         mult: float = 1.,
+                         block_years: int = None,
+                         chunks: dict = None,
+                         scheduler: str = None) -> xr.DataArray:
 
   '''Reads in up to two land variables from a netCDF file (that includes a dimension for time and soil 
   level) and creates a seasonal cycle global map (12 months x soil level x lat x lon) output variable.
@@ -66,6 +72,11 @@ def seascyc_soilvar_TSLL(var1: str,
                             averaging to occur.
   mult: class 'float', A float value that becomes a scalar to the variable's values. Default = 1.0. Will 
                        revert to default if not specified. 
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   _______________________________________________________________________________________________________
 
   Returns
@@ -94,41 +105,49 @@ def seascyc_soilvar_TSLL(var1: str,
   #-----------------------------------
 
   # Read in dataset 
-  data = xr.open_dataset(path)
+  data = open_cached_dataset(path,chunks=chunks)
 
   # Assign values for begi and endi
   begi = 0 if begi == 'beg' else begi
   endi = len(data.time) if endi == 'end' else endi
 
-  # Read in variable(s)
-  var1_time = data[var1][begi:endi,:,:,:]*mult
-  if var2 != None:
-   var2_time = data[var2][begi:endi,:,:,:]*mult
-
-  #--------------------------------------
-  # Perform math operator if necessary
-  #--------------------------------------
-
-  if var2 != None:
-   if math == 'add':
-    var_time = var1_time + var2_time
-   elif math == 'sub':
-    var_time = var1_time - var2_time
-   elif math == 'mul':
-    var_time = var1_time * var2_time
-   elif math == 'div':
-    var_time = var1_time / var2_time
-   elif math == 'exp':
-    var_time = var1_time ** var2_time
-  else:
-   var_time = var1_time
+  # Read in variable(s) for time indices t0 to t1
+  def read_block(t0,t1):
+   var1_time = data[var1][t0:t1,:,:,:]*mult
+   if var2 != None:
+    var2_time = data[var2][t0:t1,:,:,:]*mult
+
+   #--------------------------------------
+   # Perform math operator if necessary
+   #--------------------------------------
+
+   if var2 != None:
+    if math == 'add':
+     var_time = var1_time + var2_time
+    elif math == 'sub':
+     var_time = var1_time - var2_time
+    elif math == 'mul':
+     var_time = var1_time * var2_time
+    elif math == 'div':
+     var_time = var1_time / var2_time
+    elif math == 'exp':
+     var_time = var1_time ** var2_time
+   else:
+    var_time = var1_time
+   return var_time
 
   #-------------------------------
   # Perform seasonal averaging
   #-------------------------------
 
   # Calculate averages for each month
-  var_clim = clmMonTSLL(var_time,soil_dim=soildimname)
+  if block_years == None:
+   var_clim = clmMonTSLL(read_block(begi,endi),soil_dim=soildimname)
+  else:
+   var_clim = clmMonBlocks(read_block,begi,endi,block_years)
+
+  # Compute once at the end if dask was used
+  var_clim = compute(var_clim,scheduler=scheduler)
 
   return var_clim
 
@@ -136,12 +155,16 @@ def seascyc_soilvar_TSLL(var1: str,
 # Soil water isotopes: d18Op, dDp, or dexcess of soil water 
 #######################################################################################################
 
+@profiled
 def seascyc_soiliso_TSLL(iso_type:str,
                          path: str,
                          begi: str = 'beg',
                          endi: str = 'end',
                          ptiny: float = 1.E-18,
-                         soildimname: str = 'levgrnd') -> xr.DataArray:
+                         soildimname: str = 'levgrnd',
+                         block_years: int = None,
+                         chunks: dict = None,
+                         scheduler: str = None) -> xr.DataArray:
 
   '''Reads in soil water isotopes from a netCDF file (that includes a dimension for time) and creates
   a seasonal cycle global map (12 months x soil level x lat x lon) output variable.
@@ -169,6 +192,11 @@ def seascyc_soiliso_TSLL(iso_type:str,
   soildimname: class 'str', Name of soil level dimension. Default is 'levgrnd', which is standard for CESM 
                             variables. This must correspond to the correct dimension name in var for proper 
                             averaging to occur.
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   _______________________________________________________________________________________________________
 
   Returns
@@ -192,7 +220,7 @@ def seascyc_soiliso_TSLL(iso_type:str,
   #-----------------------------------
 
   # Read in dataset
-  data = xr.open_dataset(path)
+  data = open_cached_dataset(path,chunks=chunks)
 
   # Assign values for begi and endi
   begi = 0 if begi == 'beg' else begi
@@ -202,40 +230,50 @@ def seascyc_soiliso_TSLL(iso_type:str,
   # Soil water isotopic variable   
   #------------------------------------
 
-  # Read in light isotopic values
-  liso_d18O_init = xr.DataArray(data.H2OSOI_H2OTR[begi:endi,:,:,:])
-  liso_dHDO_init = xr.DataArray(data.H2OSOI_H2OTR[begi:endi,:,:,:])
+  # Read in isotopic variables for time indices t0 to t1
+  def read_block(t0,t1):
+   # Read in light isotopic values
+   liso_d18O_init = xr.DataArray(data.H2OSOI_H2OTR[t0:t1,:,:,:])
+   liso_dHDO_init = xr.DataArray(data.H2OSOI_H2OTR[t0:t1,:,:,:])
 
-  # Remove extremely small values from light isotopic variable
-  liso_d18O = xr.where(liso_d18O_init < ptiny,ptiny,liso_d18O_init)
-  liso_dHDO = xr.where(liso_dHDO_init < ptiny,ptiny,liso_dHDO_init)
+   # Remove extremely small values from light isotopic variable
+   liso_d18O = xr.where(liso_d18O_init < ptiny,ptiny,liso_d18O_init)
+   liso_dHDO = xr.where(liso_dHDO_init < ptiny,ptiny,liso_dHDO_init)
 
-  # Read in heavy isotopic values
-  hiso_d18O = xr.DataArray(data.H2OSOI_H218O[begi:endi,:,:,:])
-  hiso_dHDO = xr.DataArray(data.H2OSOI_HDO[begi:endi,:,:,:])
+   # Read in heavy isotopic values
+   hiso_d18O = xr.DataArray(data.H2OSOI_H218O[t0:t1,:,:,:])
+   hiso_dHDO = xr.DataArray(data.H2OSOI_HDO[t0:t1,:,:,:])
 
-  # Calculate delta values
-  d18O = ( (hiso_d18O / liso_d18O) - 1. ) * 1000.
-  dHDO = ( (hiso_dHDO / liso_dHDO) - 1. ) * 1000.
+   # Calculate delta values
+   d18O = ( (hiso_d18O / liso_d18O) - 1. ) * 1000.
+   dHDO = ( (hiso_dHDO / liso_dHDO) - 1. ) * 1000.
 
-  #---------------------
-  # Apply isotope type
-  #---------------------
+   #---------------------
+   # Apply isotope type
+   #---------------------
 
-  if iso_type == 'd18O':
-   var_time = xr.DataArray(d18O,dims=['time',soildimname,'lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
-  if iso_type == 'dHDO':
-   var_time = xr.DataArray(dHDO,dims=['time',soildimname,'lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
-  if iso_type == 'dexcess':
-   var_time = xr.DataArray(dHDO - 8 * d18O,dims=['time',soildimname,'lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+   if iso_type == 'd18O':
+    var_time = xr.DataArray(d18O,dims=['time',soildimname,'lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+   if iso_type == 'dHDO':
+    var_time = xr.DataArray(dHDO,dims=['time',soildimname,'lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+   if iso_type == 'dexcess':
+    var_time = xr.DataArray(dHDO - 8 * d18O,dims=['time',soildimname,'lat','lon'],coords=dict(lat=data.lat,lon=data.lon))
+   return var_time
 
   #-------------------------------
   # Perform seasonal averaging
   #-------------------------------
 
   # Calculate averages for each month
-  var_clim = xr.DataArray(clmMonTSLL(var_time,soil_dim=soildimname),dims=['time',soildimname,'lat','lon'],
+  if block_years == None:
+   var_clim = clmMonTSLL(read_block(begi,endi),soil_dim=soildimname)
+  else:
+   var_clim = clmMonBlocks(read_block,begi,endi,block_years)
+  var_clim = xr.DataArray(var_clim,dims=['time',soildimname,'lat','lon'],
                           coords={'time':np.arange(12),soildimname:data[soildimname],'lat':data.lat,'lon':data.lon})
 
+  # Compute once at the end if dask was used
+  var_clim = compute(var_clim,scheduler=scheduler)
+
   return var_clim
 
@@ -0,0 +1,281 @@
+#######################################################################################################
+#
+# Interpolation of hybrid sigma-pressure model output to pressure levels. A HybridInterpPlan finds, once
+# per (case, time slice, target levels), the two hybrid levels that bracket each target pressure in each
+# column, and can then be applied to any number of variables on the same grid. Plans for a case are
+# cached so vapor isotopes, winds and IVT read from the same file share one.
+#
+#######################################################################################################
+
+import numpy as np
+import xarray as xr
+from collections import OrderedDict
+from ESMplot.climate_analysis.climatology import clmMonTLL
+from ESMplot.climate_analysis.dataset_cache import open_cached_dataset, file_fingerprint
+from ESMplot.climate_analysis.profiling import span
+
+# Number of interpolation plans kept in the cache
+default_plan_cache_size = 4
+
+# Cached plans, most recently used last
+_plan_cache = OrderedDict()
+_plan_cache_size = default_plan_cache_size
+
+#######################################################################################################
+# NumPy kernels (hybrid level dimension last)
+#######################################################################################################
+
+def _build_plan(ps: np.ndarray,
+                hyam: np.ndarray,
+                hybm: np.ndarray,
+                p0: float,
+                new_levels: np.ndarray) -> tuple:
+
+  # Returns, for each target level (last dimension), the index of the hybrid level below it, the pressure
+  # offset from that level (NaN where the target is outside the column) and the layer thickness
+  nlev = len(hyam)
+  ps = ps[...,np.newaxis]
+
+  # Number of hybrid levels with pressure below each target (equivalent to searchsorted, side='left')
+  count = np.zeros(ps.shape[:-1]+(len(new_levels),),dtype=np.intp)
+  for k in range(nlev):
+   count += (hyam[k]*p0 + hybm[k]*ps) < new_levels
+
+  # Bracketing levels, as in metpy.interpolate.interpolate_1d
+  above = np.clip(count,1,nlev-1)
+  below = above - 1
+  p_above = hyam[above]*p0 + hybm[above]*ps
+  p_below = hyam[below]*p0 + hybm[below]*ps
+
+  dx = new_levels - p_below
+  dx = np.where((count == nlev) | (new_levels < p_below),np.nan,dx)
+
+  return below, dx, p_above - p_below
+
+def _apply_plan(data: np.ndarray,
+                below: np.ndarray,
+                dx: np.ndarray,
+                dp: np.ndarray) -> np.ndarray:
+
+  # Linear interpolation in pressure, in the same order of operations as metpy
+  d_below = np.take_along_axis(data,below,axis=-1)
+  d_above = np.take_along_axis(data,below+1,axis=-1)
+
+  return d_below + dx * ((d_above - d_below) / dp)
+
+#######################################################################################################
+# Interpolation plan
+#######################################################################################################
+
+class HybridInterpPlan:
+
+  '''Bracketing indices and offsets for interpolating hybrid sigma-pressure variables to pressure levels.
+  Building the plan does the work that only depends on PS, hyam and hybm (the 3-D pressure field and the
+  search for bracketing levels); 'apply' then interpolates any variable on the same levels and times
+  with two gathers and one multiply-add. The bracketing levels differ between columns, so 'apply' still
+  reads every hybrid level of the variable; what is saved is the per-level pressure and search work.
+  Values match geocat.comp's interp_hybrid_to_pressure (linear in pressure, NaN where a level is outside
+  the column). Works lazily on dask arrays; a lazy plan is persisted so it is computed only once.
+
+  Required Parameters
+  --------------------------------------------------------------------------------------------------------
+  ps
+   class: 'xarray.DataArray', Surface pressure in Pa, ex. with dimensions (time,lat,lon).
+
+  hyam, hybm
+   class: 'xarray.DataArray', Hybrid A and B coefficients at level midpoints (dimension 'lev_dim').
+
+  new_levels
+   class: 'float' or 'numpy.ndarray', Target pressure level(s) in Pa. Ex. plev*100. A single float
+                                      gives output without a pressure level dimension.
+
+  Optional Parameters
+  --------------------------------------------------------------------------------------------------------
+  p0: class 'float', Reference pressure in Pa. Default = 100000.
+  lev_dim: class 'string', Name of the hybrid level dimension. Default = 'lev'
+  plev_dim: class 'string', Name of the output pressure level dimension. Default = 'plev'
+  ________________________________________________________________________________________________________
+
+  Example
+  ---------------------
+  plan = HybridInterpPlan(ps=data.PS,hyam=data.hyam,hybm=data.hybm,new_levels=plev*100.)
+  u_lev = plan.apply(data.U)
+  v_lev = plan.apply(data.V)
+
+  '''
+
+  def __init__(self,
+               ps: xr.DataArray,
+               hyam: xr.DataArray,
+               hybm: xr.DataArray,
+               new_levels: np.ndarray,
+               p0: float = 100000.,
+               lev_dim: str = 'lev',
+               plev_dim: str = 'plev'):
+
+    self.single = np.ndim(new_levels) == 0
+    self.new_levels = np.atleast_1d(np.asarray(new_levels,dtype=np.float64))
+    self.p0 = float(p0)
+    self.lev_dim = lev_dim
+    self.plev_dim = plev_dim
+
+    hyam = xr.DataArray(hyam).astype(np.float64)
+    hybm = xr.DataArray(hybm).astype(np.float64)
+
+    # Order levels so pressure increases with index (top of model first)
+    self.reverse = bool(hyam[0]*self.p0 + hybm[0]*self.p0 > hyam[-1]*self.p0 + hybm[-1]*self.p0)
+    if self.reverse:
+     hyam = hyam[::-1]
+     hybm = hybm[::-1]
+
+    with span('interp_plan'):
+     below, dx, dp = xr.apply_ufunc(_build_plan,ps,hyam,hybm,
+                                    kwargs=dict(p0=self.p0,new_levels=self.new_levels),
+                                    input_core_dims=[[],[lev_dim],[lev_dim]],
+                                    output_core_dims=[[plev_dim],[plev_dim],[plev_dim]],
+                                    dask='parallelized',
+                                    dask_gufunc_kwargs=dict(output_sizes={plev_dim:len(self.new_levels)},
+                                                            allow_rechunk=True),
+                                    output_dtypes=[np.intp,np.float64,np.float64])
+
+     # Build a lazy plan once rather than each time it is applied
+     if below.chunks is not None:
+      below, dx, dp = below.persist(), dx.persist(), dp.persist()
+
+    self.below, self.dx, self.dp = below, dx, dp
+
+  def apply(self,
+            data: xr.DataArray) -> xr.DataArray:
+
+    '''Interpolates 'data' (with dimension 'lev_dim' and the dimensions of PS) to the plan's pressure
+    levels. Returns the dimensions of 'data' with 'lev_dim' replaced by 'plev_dim' (coordinates in Pa),
+    or removed if the plan was built for a single level.'''
+
+    if self.reverse:
+     data = data.isel({self.lev_dim:slice(None,None,-1)})
+
+    with span('interp_hybrid_to_pressure'):
+     var_lev = xr.apply_ufunc(_apply_plan,data,self.below,self.dx,self.dp,
+                              input_core_dims=[[self.lev_dim],[self.plev_dim],[self.plev_dim],[self.plev_dim]],
+                              output_core_dims=[[self.plev_dim]],
+                              join='inner',
+                              dask='parallelized',
+                              dask_gufunc_kwargs=dict(allow_rechunk=True),
+                              output_dtypes=[np.result_type(data.dtype,np.float64)])
+
+    # Keep the dimension order of the input
+    dims = [self.plev_dim if d == self.lev_dim else d for d in data.dims]
+    var_lev = var_lev.transpose(*dims).assign_coords({self.plev_dim:self.new_levels})
+
+    if self.single:
+     return var_lev.isel({self.plev_dim:0},drop=True)
+
+    return var_lev
+
+#######################################################################################################
+# Interpolate one pressure level
+#######################################################################################################
+
+def interp_hybrid_to_pressure_level(data: xr.DataArray,
+                                    ps: xr.DataArray,
+                                    hyam: xr.DataArray,
+                                    hybm: xr.DataArray,
+                                    new_level: float,
+                                    p0: float = 100000.,
+                                    lev_dim: str = 'lev') -> xr.DataArray:
+
+  '''Interpolates a variable on hybrid sigma-pressure levels to a single pressure level. Gives the same
+  values as geocat.comp's interp_hybrid_to_pressure (linear in pressure, NaN outside the range of the
+  column) for one of its 'new_levels', without making the 3-D pressure field, interpolating only
+  between the two hybrid levels that bracket 'new_level' in each column. Every hybrid level of 'data' is
+  still read, since the bracketing levels differ between columns. Works lazily on dask arrays. To
+  interpolate several variables on the same grid, build a HybridInterpPlan once and apply it to each.
+
+  Required Parameters
+  --------------------------------------------------------------------------------------------------------
+  data
+   class: 'xarray.DataArray', Variable with a hybrid level dimension, ex. U with dimensions
+                              (time,lev,lat,lon).
+
+  ps
+   class: 'xarray.DataArray', Surface pressure in Pa with the dimensions of 'data' except 'lev_dim'.
+
+  hyam, hybm
+   class: 'xarray.DataArray', Hybrid A and B coefficients at level midpoints (dimension 'lev_dim').
+
+  new_level
+   class: 'float', Target pressure level in Pa. Ex. 85000. -> 850 hPa
+
+  Optional Parameters
+  --------------------------------------------------------------------------------------------------------
+  p0: class 'float', Reference pressure in Pa. Default = 100000.
+  lev_dim: class 'string', Name of the hybrid level dimension. Default = 'lev'
+  ________________________________________________________________________________________________________
+
+  Returns
+  ---------------------
+  output: :class:'xarray.DataArray'
+          Variable at 'new_level' with the dimensions of 'data' except 'lev_dim', ex. [time,lat,lon]
+
+  '''
+
+  plan = HybridInterpPlan(ps=ps,hyam=hyam,hybm=hybm,new_levels=float(new_level),p0=p0,lev_dim=lev_dim)
+
+  return plan.apply(data)
+
+#######################################################################################################
+# Plans shared across functions
+#######################################################################################################
+
+def cached_interp_plan(path: str,
+                       begi: int,
+                       endi: int,
+                       new_levels: np.ndarray,
+                       p0: float = 100000.,
+                       chunks: dict = None,
+                       clim: bool = False) -> HybridInterpPlan:
+
+  '''Returns the HybridInterpPlan for the file at 'path' (using its PS, hyam and hybm) over time indices
+  begi to endi and pressure level(s) 'new_levels' in Pa, building it only if no matching plan is cached.
+  If 'clim' is True the plan is built from the 12 month climatology of PS instead, for interpolating
+  climatologies made on hybrid levels (see 'clim_first' in seas_cycle_TLL.py). Plans are keyed by the
+  file's contents (see file_fingerprint), so a rewritten file gets a new plan. The cache holds the most
+  recently used plans (default = 4); see set_interp_plan_cache_size.'''
+
+  key = (file_fingerprint(path),int(begi),int(endi),np.ndim(new_levels),
+         tuple(np.atleast_1d(new_levels).astype(float).tolist()),float(p0),
+         tuple(sorted(chunks.items())) if isinstance(chunks,dict) else chunks,bool(clim))
+
+  if key in _plan_cache:
+   _plan_cache.move_to_end(key)
+   return _plan_cache[key]
+
+  data = open_cached_dataset(path,chunks=chunks)
+  psrf = data.PS[begi:endi,:,:]
+  if clim:
+   psrf = clmMonTLL(psrf)
+  plan = HybridInterpPlan(ps=psrf,hyam=data.hyam,hybm=data.hybm,new_levels=new_levels,p0=p0)
+
+  if _plan_cache_size > 0:
+   _plan_cache[key] = plan
+   while len(_plan_cache) > _plan_cache_size:
+    _plan_cache.popitem(last=False)
+
+  return plan
+
+def clear_interp_plan_cache():
+
+  '''Empties the cache of interpolation plans.'''
+
+  _plan_cache.clear()
+
+def set_interp_plan_cache_size(size: int):
+
+  '''Sets the maximum number of interpolation plans kept (default = 4). Each plan holds three arrays of
+  size (time x levels x lat x lon). A size of 0 disables caching.'''
+
+  global _plan_cache_size
+  _plan_cache_size = max(int(size),0)
+
+  while len(_plan_cache) > _plan_cache_size:
+   _plan_cache.popitem(last=False)
@@ -0,0 +1,199 @@
+#######################################################################################################
+#
+# Conversion of CAM/CLM history output (one netCDF file or a directory of monthly h0 files) to a Zarr
+# store chunked for analysis: each variable is stored with long time chunks, so time series reductions
+# such as climatologies read a few large compressed chunks per variable instead of walking the
+# model's write-oriented netCDF layout. Stores are read by open_cached_dataset in place of the .nc path.
+#
+#######################################################################################################
+
+import os
+import glob
+import shutil
+import numpy as np
+import xarray as xr
+
+# Default target size of one uncompressed chunk
+default_chunk_mb = 64.
+
+# Dimensions split to reach the target chunk size, in order; all other dimensions (time, lev, ilev, ...)
+# are kept whole where possible so vertical interpolation and time reductions read whole columns
+horizontal_dims = ['lat','lon','ncol','lndgrid']
+
+# Encoding entries kept from the netCDF files (the rest describe netCDF storage)
+kept_encoding = ['dtype','_FillValue','missing_value','scale_factor','add_offset','units','calendar']
+
+#######################################################################################################
+# Chunk sizes for time series analysis
+#######################################################################################################
+
+def analysis_chunks(var: xr.DataArray,
+                    time_dim: str = 'time',
+                    chunk_mb: float = default_chunk_mb) -> dict:
+
+  '''Returns chunk sizes {dim: size} for storing 'var' so that reading its whole time series is cheap.
+  The full time dimension and any vertical dimension are kept in one chunk, and the horizontal dimensions
+  (lat first, then lon) are halved until a chunk is at most 'chunk_mb' megabytes uncompressed. If a
+  single grid column over all times is still larger than that, time is split into whole years (multiples
+  of 12 months).'''
+
+  chunks = dict(zip(var.dims,var.shape))
+  limit = float(chunk_mb)*1e6
+  itemsize = np.dtype(var.dtype).itemsize
+
+  def nbytes():
+   return float(np.prod(list(chunks.values())))*itemsize
+
+  for dim in horizontal_dims:
+   while dim in chunks and chunks[dim] > 1 and nbytes() > limit:
+    chunks[dim] = int(np.ceil(chunks[dim]/2))
+
+  while time_dim in chunks and chunks[time_dim] > 12 and nbytes() > limit:
+   chunks[time_dim] = max(12,int(np.ceil(chunks[time_dim]/24))*12)
+
+  return chunks
+
+#######################################################################################################
+# Convert history files to a Zarr store
+#######################################################################################################
+
+def history_to_zarr(source: str,
+                    store: str = None,
+                    variables: list = None,
+                    pattern: str = '*.h0.*.nc',
+                    chunk_mb: float = default_chunk_mb,
+                    clevel: int = 3,
+                    overwrite: bool = False,
+                    scheduler: str = None) -> str:
+
+  '''Rewrites a history file, or a directory of monthly history files, as a Zarr store with chunking
+  chosen for time series analysis (see analysis_chunks), zstd compression and consolidated metadata.
+  A store written next to a netCDF file (the default, ex. case.zarr for case.nc) is opened by every
+  reader in the package in place of the netCDF file, so scripts can keep using the .nc path. With
+  'chunks' (ex. chunks={}), variables are then read as parallel chunk reads with dask. Requires zarr 2
+  (the version in conda_envs/environment_ESMplot_py310.yml), numcodecs and dask. The store is written under a temporary name (store+'.part') and moved into place when
+  complete, so an interrupted conversion never leaves a partial store that readers would pick up.
+
+  Required Parameters
+  --------------------------------------------------------------------------------------------------------
+  source
+   class: 'string', Path to a netCDF history file, or to a directory of history files (ex. monthly h0
+                    files) which are concatenated along time in file name order.
+
+  Optional Parameters
+  --------------------------------------------------------------------------------------------------------
+  store: class 'string', Path of the Zarr store to write. Default = None writes next to 'source', with
+                         the extension replaced by .zarr (or .zarr appended to a directory name).
+  variables: class 'list', Names of the variables to convert. Coordinates and time-invariant variables
+                           needed by the readers (ex. hyam, hybm, hyai, hybi, P0) are always kept.
+                           Default = None converts every variable.
+  pattern: class 'string', File name pattern of the history files in a 'source' directory.
+                           Default = '*.h0.*.nc'
+  chunk_mb: class 'float', Target size of one uncompressed chunk in MB. Default = 64.
+  clevel: class 'int', zstd compression level (1-9). Default = 3
+  overwrite: class 'bool', Replace an existing store at 'store'. Default = False raises an error.
+  scheduler: class 'string', Dask scheduler used for writing: 'threads', 'processes' or 'synchronous'.
+                             Default = None uses dask's default (threads).
+  ________________________________________________________________________________________________________
+
+  Returns
+  ---------------------
+  output: :class:'string'
+          Path of the Zarr store
+
+  Example
+  ---------------------
+  history_to_zarr('/path/to/case.cam.h0.0001-0100.nc')     -> /path/to/case.cam.h0.0001-0100.zarr
+  history_to_zarr('/path/to/case/atm/hist/',store='/path/to/case.cam.h0.zarr')
+
+  '''
+
+  import dask
+
+  # Fails early if the installed zarr cannot write the store
+  compression = zarr_compression(clevel)
+
+  source = str(source).rstrip(os.sep) if os.path.isdir(str(source)) else str(source)
+
+  #-----------------------------
+  # Choose the output store
+  #-----------------------------
+
+  if store == None:
+   store = source+'.zarr' if os.path.isdir(source) else os.path.splitext(source)[0]+'.zarr'
+  store = str(store)
+  if os.path.exists(store) and not overwrite:
+   raise ValueError('Zarr store '+store+' already exists; use overwrite=True to replace it')
+
+  #-----------------------------
+  # Open the history file(s)
+  #-----------------------------
+
+  # Times stay encoded as in the files, so the store decodes them the same way the netCDF files do
+  if os.path.isdir(source):
+   files = sorted(glob.glob(os.path.join(source,pattern)))
+   if len(files) == 0:
+    raise ValueError('No files matching '+pattern+' in '+source)
+   data = xr.open_mfdataset(files,combine='nested',concat_dim='time',data_vars='minimal',
+                            coords='minimal',compat='override',decode_times=False)
+  else:
+   data = xr.open_dataset(source,chunks={},decode_times=False)
+
+  if variables != None:
+   keep = [str(var) for var in variables] + [var for var in data.data_vars if 'time' not in data[var].dims]
+   data = data[[var for var in data.data_vars if var in keep]]
+
+  #--------------------------------------------
+  # Rechunk and compress each variable
+  #--------------------------------------------
+
+  encoding = {}
+  for name, var in data.variables.items():
+   var.encoding = {key: value for key, value in var.encoding.items() if key in kept_encoding}
+   encoding[name] = dict(compression)
+  for name in data.data_vars:
+   if data[name].ndim > 0:
+    data[name] = data[name].chunk(analysis_chunks(data[name],chunk_mb=chunk_mb))
+
+  #-----------------------------
+  # Write the store
+  #-----------------------------
+
+  # Written to a temporary store first: readers only see the store once every chunk is written
+  partial = store+'.part'
+  if os.path.exists(partial):
+   shutil.rmtree(partial)
+  kwargs = {} if scheduler == None else dict(scheduler=scheduler)
+  try:
+   with dask.config.set(**kwargs):
+    data.to_zarr(partial,mode='w',consolidated=True,encoding=encoding)
+  except BaseException:
+   shutil.rmtree(partial,ignore_errors=True)
+   raise
+  finally:
+   data.close()
+
+  if os.path.isdir(store):
+   shutil.rmtree(store)
+  os.replace(partial,store)
+
+  return store
+
+#######################################################################################################
+# Compression settings
+#######################################################################################################
+
+def zarr_compression(clevel: int = 3) -> dict:
+
+  '''Returns the encoding entry that compresses a variable with zstd (Blosc, bit shuffle) at level
+  'clevel'. Stores are written in Zarr format 2 with zarr 2, which takes a single numcodecs 'compressor';
+  zarr >= 3 is not supported (it needs newer xarray and Python than the package's environment).'''
+
+  import zarr
+  from numcodecs import Blosc
+
+  if int(zarr.__version__.split('.')[0]) >= 3:
+   raise ImportError('history_to_zarr needs zarr 2 (found zarr '+zarr.__version__+'); install the version in '
+                     'conda_envs/environment_ESMplot_py310.yml')
+
+  return dict(compressor=Blosc(cname='zstd',clevel=int(clevel),shuffle=Blosc.BITSHUFFLE))
@@ -0,0 +1,137 @@
+#######################################################################################################
+#
+# Cache of base map features (coastlines, lakes, country borders, US states) that are already clipped
+# to the map extent and projected to the map projection. Adding a feature with cartopy's add_feature
+# makes every axis select, clip and reproject the Natural Earth geometries again when it is drawn; a
+# 12 month seasonal cycle page does this for 12+ axes with identical results. Features added with
+# add_basemap_feature are prepared once per (projection, extent, feature, scale) and shared by every
+# axis after that.
+#
+#######################################################################################################
+
+import numpy as np
+from collections import OrderedDict
+import matplotlib.collections as mcollections
+from matplotlib.path import Path
+import cartopy.feature as cfeature
+from ESMplot.climate_analysis.profiling import span
+
+try:
+ from cartopy.mpl.path import shapely_to_path  # cartopy >= 0.23
+except ImportError:
+ from cartopy.mpl.patch import geos_to_path
+
+ def shapely_to_path(geom):
+  return Path.make_compound_path(*geos_to_path(geom))
+
+# Default number of prepared (projection, extent, feature, scale) combinations kept in memory
+default_basemap_cache_size = 32
+
+# Prepared feature paths, least recently used first
+_basemap_cache = OrderedDict()
+
+#######################################################################################################
+# Feature paths in map coordinates
+#######################################################################################################
+
+def basemap_paths(projection,
+                  extent: list,
+                  feature: cfeature.NaturalEarthFeature) -> list:
+
+  '''Returns the geometries of a Natural Earth 'feature' that intersect 'extent' ([lon0, lon1, lat0, lat1]
+  in the feature's coordinates) as a list holding one compound matplotlib path in the coordinates of
+  'projection' (empty if no geometry intersects). The scale of the feature is chosen from the extent as
+  cartopy does (ex. '110m' for a global map with cfeature.COASTLINE). Results are kept for the last
+  'default_basemap_cache_size' combinations of projection, extent, feature and scale.'''
+
+  extent = tuple(np.round(np.asarray(extent,dtype=float),6))
+  scale = feature.scaler.scale_from_extent(extent)
+  key = (type(projection).__name__,projection.proj4_init,extent,feature.category,feature.name,scale)
+
+  if key in _basemap_cache:
+   _basemap_cache.move_to_end(key)
+   return _basemap_cache[key]
+
+  paths = []
+  for geom in feature.with_scale(scale).intersecting_geometries(extent):
+   projected = projection.project_geometry(geom,feature.crs)
+   if not projected.is_empty:
+    paths.append(shapely_to_path(projected))
+
+  # All geometries share one style, so they are drawn as a single compound path: renderers (the PDF
+  # backend in particular) pay a fixed cost per path that otherwise dominates the drawing time
+  paths = [Path.make_compound_path(*paths)] if len(paths) > 0 else []
+
+  _basemap_cache[key] = paths
+  while len(_basemap_cache) > default_basemap_cache_size:
+   _basemap_cache.popitem(last=False)
+
+  return paths
+
+def clear_basemap_cache():
+
+  '''Removes every prepared feature from the cache.'''
+
+  _basemap_cache.clear()
+
+#######################################################################################################
+# Add a cached feature to a map
+#######################################################################################################
+
+class BasemapArtist(mcollections.PathCollection):
+
+  '''Collection drawing a Natural Earth feature from the basemap cache. Like cartopy's FeatureArtist,
+  the map extent is read when the axis is drawn, so the feature follows any later change of extent.'''
+
+  def __init__(self,
+               feature: cfeature.NaturalEarthFeature,
+               **kwargs):
+
+    super().__init__([],**kwargs)
+    self.feature = feature
+
+  def draw(self,
+           renderer):
+
+    if not self.get_visible():
+     return
+
+    with span('basemap_draw',feature=self.feature.name):
+     ax = self.axes
+     self.set_paths(basemap_paths(ax.projection,ax.get_extent(self.feature.crs),self.feature))
+     self.set_clip_path(ax.patch)
+     super().draw(renderer)
+
+def add_basemap_feature(ax,
+                        feature: cfeature.NaturalEarthFeature,
+                        **kwargs):
+
+  '''Adds a Natural Earth feature (ex. cfeature.COASTLINE, cfeature.LAKES, cfeature.BORDERS,
+  cfeature.STATES) to the map 'ax' using the basemap cache. A drop-in replacement for
+  ax.add_feature(feature,**kwargs): style keywords (ex. linewidths, edgecolor, facecolor, zorder) are
+  applied on top of the feature's defaults in the same way. Features that are not Natural Earth features
+  are passed to ax.add_feature.
+
+  Example
+  ---------------------
+  add_basemap_feature(ax,cfeature.COASTLINE,linewidths=0.5)
+  add_basemap_feature(ax,cfeature.LAKES,linewidths=0.3,facecolor='none',edgecolor='k')
+
+  '''
+
+  if not isinstance(feature,cfeature.NaturalEarthFeature):
+   return ax.add_feature(feature,**kwargs)
+
+  style = dict(feature.kwargs)
+  if 'color' in kwargs:
+   kwargs = dict(kwargs)
+   kwargs['facecolor'] = kwargs['edgecolor'] = kwargs.pop('color')
+  style.update(kwargs)
+  if isinstance(style.get('facecolor'),str) and style['facecolor'] == 'never':
+   style['facecolor'] = 'none'
+  style.setdefault('zorder',1.5)
+
+  artist = BasemapArtist(feature,**style)
+  ax.add_collection(artist,autolim=False)
+
+  return artist
@@ -4,42 +4,260 @@
 #
 #######################################################################################################
 
+import os
+import shutil
+import tempfile
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
-from matplotlib.ticker import MultipleLocator
-from matplotlib.backends.backend_pdf import PdfPages
-import geocat.viz.util as gv
-import cartopy.crs as ccrs
+from ESMplot.climate_analysis.lazy_import import lazy_import
+from ESMplot.climate_analysis.profiling import profiled, span, worker_profiling, init_worker_profiling
+
+# Plotting libraries, imported when a plot is first drawn
+plt = lazy_import('matplotlib.pyplot')
+mpatches = lazy_import('matplotlib.patches')
+mticker = lazy_import('matplotlib.ticker')
+backend_pdf = lazy_import('matplotlib.backends.backend_pdf')
+gv = lazy_import('geocat.viz.util')
+ccrs = lazy_import('cartopy.crs')
 
 #######################################################################################################
 # Function to save multiple images within the same PDF file as separate pages 
 #######################################################################################################
 
 def save_multi_image(filename):
-   pp = PdfPages(filename)
+   pp = backend_pdf.PdfPages(filename)
    fig_nums = plt.get_fignums()
    figs = [plt.figure(n) for n in fig_nums]
    for fig in figs:
-       fig.savefig(pp, format='pdf',bbox_inches='tight')
+       with span('render_page'):
+           fig.savefig(pp, format='pdf',bbox_inches='tight')
    pp.close()
 
    ''' Function to save multiple images within the same PDF file as separate pages. Appends as many
    pages as are open in the file. This function was taken from the following source:
    https://www.tutorialspoint.com/saving-multiple-figures-to-one-pdf-file-in-matplotlib'''
 
+#######################################################################################################
+# Multipage PDF file written one page at a time
+#######################################################################################################
+
+class PdfSink:
+
+   ''' Multipage PDF file that figures are appended to as soon as they are drawn. Each figure is saved
+   as the next page and closed, so only the figure being drawn is held in memory (save_multi_image keeps
+   every page open until the end). Usable as a context manager, which closes the file on exit, and can
+   be passed as 'pdf' to the plotting functions to collect their pages in one file.
+
+   Example
+   ---------------------
+   with PdfSink('pdfs/report.pdf') as pdf:
+    plot_contour_map_avg(var=var_avg_by_case,cases=cases,pdf=pdf)
+    fig = plt.figure()
+    ...
+    pdf.add(fig)
+   '''
+
+   def __init__(self,filename,bbox_inches='tight',**savefig_kwargs):
+
+      self.filename = str(filename)
+      self.savefig_kwargs = dict(format='pdf',bbox_inches=bbox_inches,**savefig_kwargs)
+      self.pages = 0
+      self._pdf = backend_pdf.PdfPages(self.filename)
+
+   def add(self,fig=None,close=True):
+
+      ''' Saves 'fig' (default = None uses the current figure) as the next page and closes it, unless
+      close = False.'''
+
+      fig = plt.gcf() if fig == None else fig
+      with span('render_page'):
+       fig.savefig(self._pdf,**self.savefig_kwargs)
+      self.pages += 1
+      if close == True:
+       plt.close(fig)
+
+   def close(self):
+
+      ''' Finishes writing the PDF file. Called automatically at the end of a 'with' block.'''
+
+      if self._pdf != None:
+       self._pdf.close()
+       self._pdf = None
+
+   def __enter__(self):
+
+      return self
+
+   def __exit__(self,*exc):
+
+      self.close()
+
+#######################################################################################################
+# Render pages in parallel worker processes and merge them into one PDF file
+#######################################################################################################
+
+# Function drawing one page in a worker process (see _init_page_worker)
+_page_renderer = None
+
+def _init_page_worker(render,rc,profile):
+
+   # Worker processes draw with the page function, matplotlib settings and profiling of the calling
+   # process. Pages are only saved to files, so workers draw with the Agg backend.
+   global _page_renderer
+   _page_renderer = render
+   plt.rcParams.update(dict(rc,backend='agg'))
+   init_worker_profiling(profile)
+
+def _render_page(page,filename):
+
+   # Draw one page in a worker process and save it to its own file
+   with span('draw_page'):
+    fig = _page_renderer(page)
+    with span('render_page'):
+     fig.savefig(filename,format='pdf',bbox_inches='tight')
+    plt.close(fig)
+
+   return filename
+
+def merge_pdf_pages(pages,filename):
+
+   ''' Merges the single page PDF files in 'pages' (in that order) into one multipage PDF file
+   'filename'. Requires pypdf.'''
+
+   from pypdf import PdfWriter
+
+   writer = PdfWriter()
+   for page in pages:
+    writer.append(page)
+   with open(filename,'wb') as output:
+    writer.write(output)
+   writer.close()
+
+def render_pages_parallel(render,pages,filename,workers=None):
+
+   ''' Renders each page of a multipage PDF file in a separate worker process and merges them into
+   'filename', giving the same file as drawing every page into a PdfSink. 'render' is a
+   function that draws one page and returns its figure, called as render(page) for each item in
+   'pages'. Each page is saved to its own file in a temporary folder next to 'filename', which is
+   removed after the pages are merged (see merge_pdf_pages, requires pypdf). At most 'workers'
+   pages are rendered at once (default = None uses every core). Worker processes are started like
+   those of run_cases (see worker_context in case_executor.py), so they open any files they read
+   themselves, and 'render' is sent to them by pickling: it must be a function defined at the top
+   level of a module or a functools.partial of one, with picklable arguments. Where 'render' cannot
+   be pickled or pypdf is not available, or only one worker is used, pages are drawn one at a time
+   into a PdfSink in this process instead. As with run_cases, a script using more than one worker
+   keeps its work under "if __name__ == '__main__':".'''
+
+   import pickle
+   from concurrent.futures import ProcessPoolExecutor
+   from ESMplot.climate_analysis.case_executor import worker_context
+
+   pages = list(pages)
+   workers = min(len(pages),os.cpu_count() or 1) if workers == None else int(workers)
+
+   # Checked before any page is drawn, so a missing pypdf does not fail after rendering every page
+   try:
+    import pypdf
+   except ImportError:
+    pypdf = None
+
+   if workers > 1 and pypdf != None:
+    try:
+     pickle.dumps(render)
+    except (pickle.PicklingError,AttributeError,TypeError):
+     workers = 1
+
+   if workers <= 1 or pypdf == None:
+    with PdfSink(filename) as pdf:
+     for page in pages:
+      with span('draw_page'):
+       pdf.add(render(page))
+    return
+
+   folder = tempfile.mkdtemp(prefix='.pages_',dir=os.path.dirname(os.path.abspath(filename)))
+   files = [os.path.join(folder,'page_'+str(n).zfill(4)+'.pdf') for n in range(len(pages))]
+
+   try:
+    with ProcessPoolExecutor(max_workers=workers,mp_context=worker_context(),
+                             initializer=_init_page_worker,
+                             initargs=(render,dict(plt.rcParams.copy()),worker_profiling())) as pool:
+     list(pool.map(_render_page,pages,files))
+    merge_pdf_pages(files,filename)
+   finally:
+    shutil.rmtree(folder,ignore_errors=True)
+
+#######################################################################################################
+# Fill a map with a 2D field, as filled contours, grid cells or an image
+#######################################################################################################
+
+# Options for 'cntr_type' in the map plotting functions
+fill_types = ['AreaFill','RasterAreaFill','RasterFill','ImageFill']
+
+@profiled
+def fill_map(var,ax,cntr_type='AreaFill',**kwargs):
+
+   ''' Draws the 2D field 'var' (lat x lon) on the map 'ax' and returns the mappable for a color bar.
+   All map plotting functions draw their fields with this function, so 'cntr_type' chooses how:
+
+     'AreaFill'       - filled contours (plot.contourf), written to PDF files as vector shapes
+     'RasterAreaFill' - filled contours, written to PDF files as an image
+     'RasterFill'     - one box per grid cell (plot.pcolormesh), written to PDF files as an image
+     'ImageFill'      - grid cells drawn as an image (plot.imshow), the fastest option; assumes evenly
+                        spaced latitudes and longitudes
+
+   The raster options keep labels, coastlines and vectors as vector graphics, with the field embedded
+   as an image at the resolution (dpi) the figure is saved with. Their PDF pages are much smaller and
+   faster to write and display than contours of a high-resolution field. Other keyword arguments
+   (ex. transform, cmap, levels, extend, add_colorbar, cbar_kwargs, add_labels) are passed to the
+   xarray plotting function, so every option uses the same colors for the same 'levels'.'''
+
+   if cntr_type == 'AreaFill':
+    return var.plot.contourf(ax=ax,**kwargs)
+
+   elif cntr_type == 'RasterAreaFill':
+    cntr = var.plot.contourf(ax=ax,**kwargs)
+    if hasattr(cntr,'set_rasterized'):       # matplotlib >= 3.8, contour sets are a single artist
+     cntr.set_rasterized(True)
+    else:
+     for collection in cntr.collections:
+      collection.set_rasterized(True)
+    return cntr
+
+   elif cntr_type == 'RasterFill':
+    return var.plot.pcolormesh(ax=ax,rasterized=True,**kwargs)
+
+   elif cntr_type == 'ImageFill':
+    # Image cells are centered on the coordinates, so the rows at the poles (ex. lat = -90, 90) reach
+    # past the edge of the map and cartopy would reproject (warp) the whole image. A field that is
+    # already in the map's own coordinates is drawn directly instead, clipped at the map edges like the
+    # grid cells of 'RasterFill'.
+    projection = getattr(ax,'projection',None)
+    if kwargs.get('transform') != None and kwargs['transform'] == projection:
+     x = var[var.dims[-1]].values
+     y = var[var.dims[-2]].values
+     x0, x1 = projection.x_limits
+     y0, y1 = projection.y_limits
+     if x.min() >= x0 and x.max() <= x1 and y.min() >= y0 and y.max() <= y1:
+      kwargs = dict(kwargs,transform=ax.transData)
+    return var.plot.imshow(ax=ax,**kwargs)
+
+   raise ValueError("cntr_type must be one of "+', '.join("'"+fill+"'" for fill in fill_types)+
+                    ", not '"+str(cntr_type)+"'")
+
 #######################################################################################################
 # Function to plot map ticks and coordinate labels 
 #######################################################################################################
 
 def map_ticks_and_labels(ax,LatMin,LatMax,LonMin,LonMax,lattksp,lontksp,xmin_mj,ymin_mj,tkmajlg,tkminlg,
                          glalpha,glcolor,lonlblsp,latlblsp,xpads,ypads,tklblsz,
-                         proj=ccrs.PlateCarree(),top=False,bot=True,left=True,right=True):
+                         proj=None,top=False,bot=True,left=True,right=True):
 
    ''' Function to plot map ticks and labels for lat/lon coordinates. Uses geocat.viz and ax.gridlines
    functionality to allow for labels on any side of map plot. See plotting functions for more details
    regarding parameters. Parameters specific to this function are 'top', 'bot', 'left', and 'right',
-   which are boolean determinators for whether labels will appear on that side of the map plot.''' 
+   which are boolean determinators for whether labels will appear on that side of the map plot.
+   Default 'proj' = None uses ccrs.PlateCarree().''' 
+
+   proj = ccrs.PlateCarree() if proj is None else proj
 
    # Sets lat/lon limits for ticks, does not draw tick labels
    gv.set_axes_limits_and_ticks(ax,xlim=(LonMin,LonMax),ylim=(LatMin,LatMax),
@@ -57,8 +275,8 @@ def map_ticks_and_labels(ax,LatMin,LatMax,LonMin,LonMax,lattksp,lontksp,xmin_mj,
    # Draws lat/lon tick labels and specifies locations to draw, allows for gridlines to be drawn too
    gl = ax.gridlines(crs=proj,draw_labels=True,alpha=glalpha,color=glcolor,
                      xlim=(LonMin,LonMax),ylim=(LatMin,LatMax))
-   gl.xlocator = MultipleLocator(lonlblsp)
-   gl.ylocator = MultipleLocator(latlblsp)
+   gl.xlocator = mticker.MultipleLocator(lonlblsp)
+   gl.ylocator = mticker.MultipleLocator(latlblsp)
    gl.top_labels = top
    gl.bottom_labels = bot  
    gl.left_labels = left
@@ -93,7 +311,7 @@ def draw_region_box(ax,slat,nlat,wlon,elon,linestyle,facecolor,edgecolor,linewid
     width = abs(wlon-elon)       # Eastern Hemisphere
 
    # Draw rectangle
-   ax.add_patch(Rectangle((wlon,slat),width,height,linestyle=linestyle,facecolor=facecolor,
+   ax.add_patch(mpatches.Rectangle((wlon,slat),width,height,linestyle=linestyle,facecolor=facecolor,
                           edgecolor=edgecolor,linewidth=linewidth,zorder=zorder))
 
 
@@ -5,18 +5,23 @@
 #
 #######################################################################################################
 
+from __future__ import annotations
 import numpy as np
 import xarray as xr
 import math
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MultipleLocator
-from matplotlib import colors
-from matplotlib.backends.backend_pdf import PdfPages
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
-import geocat.viz.util as gv
-import cmaps
-from ESMplot.plotting.plot_functions import save_multi_image,map_ticks_and_labels,draw_region_box
+from ESMplot.plotting.plot_functions import PdfSink,fill_map,map_ticks_and_labels,draw_region_box
+from ESMplot.climate_analysis.lazy_import import lazy_import
+from ESMplot.climate_analysis.profiling import profiled
+
+# Plotting libraries and the base map module, imported when a plot is first drawn
+plt = lazy_import('matplotlib.pyplot')
+mticker = lazy_import('matplotlib.ticker')
+colors = lazy_import('matplotlib.colors')
+ccrs = lazy_import('cartopy.crs')
+cfeature = lazy_import('cartopy.feature')
+gv = lazy_import('geocat.viz.util')
+cmaps = lazy_import('cmaps')
+basemap = lazy_import('ESMplot.plotting.basemap')
 
 # Default variables
 fig_let = ['a)','b)','c)','d)','e)','f)','g)','h)','i)','j)','k)','l)','m)','n)','o)','p)','q)','r)','s)',
@@ -26,6 +31,7 @@ fig_let = ['a)','b)','c)','d)','e)','f)','g)','h)','i)','j)','k)','l)','m)','n)'
 # Plot contours in panel and individual map plots 
 #######################################################################################################
 
+@profiled
 def plot_contour_map_avg(
                          ### Required Parameters
                          var: xr.DataArray, 
@@ -36,7 +42,7 @@ def plot_contour_map_avg(
                          hspace: float = None, wspace: float = None, fig_let: list = fig_let,
                          ttlloc: str = 'left', ttlfts: float = 12., ttlpad: float = 10.,
                          LatMin: float = -90., LatMax: float = 90., LonMin: float = -180.,
-                         LonMax: float = 180., proj: ccrs.Projection = ccrs.PlateCarree(), 
+                         LonMax: float = 180., proj: ccrs.Projection = None, 
                          coast: bool = True, coastlw: float = 0.75, lake: bool = False,
                          lakelw: float = 0.5, border: bool = True, borderlw: float = 0.75, 
                          usstate: bool = False, usstatelw: float = 0.5, add_axes: bool = True, 
@@ -45,7 +51,7 @@ def plot_contour_map_avg(
                          tkmajlg: float = 4., tkminlg: float = 2., xmin_mj: int = 2, ymin_mj: int = 2,
                          xpads: float = 15., ypads: float = 15., 
                          glalpha: float = 0.0, glcolor: str = 'gray',
-                         cntr_type: str = 'AreaFill', colort: colors.ListedColormap = cmaps.MPL_viridis, 
+                         cntr_type: str = 'AreaFill', colort: colors.ListedColormap = None, 
                          loval: float = None, hival: float = None, spval: float = None, 
                          tkstd: float = None, extnd: str = 'both', 
                          cbar_orient: str = 'horizontal', cbar_pad: float = 0.08, 
@@ -60,7 +66,8 @@ def plot_contour_map_avg(
                          point: bool = False, ptlat: float = None, ptlon: float = None,
                          shape_lats: list = [], shape_lons: list = [], shape_type: list = [], 
                          shape_size: list = [], shape_col: list = [], Ind_plots: bool = True,
-                         extra_name: str = '', folderpath: str = '', filesuf: str = '.pdf'
+                         extra_name: str = '', folderpath: str = '', filesuf: str = '.pdf',
+                         pdf: PdfSink = None
                          ):
 
   '''Reads in an xr.DataArray of 2+ cases of a global variable and produces a panel plot and optional
@@ -135,8 +142,9 @@ def plot_contour_map_avg(
                           gridlines. Modify 1.0 >= alpha > 0.0 for visible gridlines.
                           Default = 0.0 (no gridlines)
   glcolor: class 'str', Color of gridlines if glalpha > 0.0. Default = 'gray'
-  cntr_type: class 'str', Type of contour for plotting. Options: 'AreaFill' - interpolated, 
-                          'RasterFill' - raster. Default = 'AreaFill'
+  cntr_type: class 'str', Type of contour for plotting. Options: 'AreaFill' - interpolated, 'RasterAreaFill' -
+                          interpolated, rasterized in the PDF, 'RasterFill' - raster, 'ImageFill' - raster
+                          drawn as an image (fastest). See plot_functions.fill_map. Default = 'AreaFill'
   colort: class 'colors.ListedColormap', Color table used for plotting contours. Specify names from cmaps 
                                          (https://github.com/hhuangwx/cmaps) or Matplotlib 
                                          (https://matplotlib.org/stable/tutorials/colors/colormaps.html)
@@ -220,6 +228,8 @@ def plot_contour_map_avg(
                            parameters. Do not include first and last forward slashes, for example: 'pdfs' or 
                            'home/pdfs/untitledfolder'. Default = ''
   filesuf: class 'str', Type of output file specified as a string. Default = '.pdf' 
+  pdf: class 'PdfSink', Open multipage PDF file to append the pages to instead of writing a new file, ex. 
+                        to collect the output of several plotting functions in one file. Default = None
   _______________________________________________________________________________________________________
 
   Returns
@@ -229,6 +239,13 @@ def plot_contour_map_avg(
 
   '''
 
+  #-------------------------------------------------------------------------
+  # Default projection and color tables (made here rather than at import)
+  #-------------------------------------------------------------------------
+
+  proj   = ccrs.PlateCarree() if proj is None else proj
+  colort = cmaps.MPL_viridis if colort is None else colort
+
   #-------------------------------------------------------------------------
   # Make variables to plot cyclic
   #-------------------------------------------------------------------------
@@ -268,304 +285,301 @@ def plot_contour_map_avg(
   else: 
    vec_name = ''.join(('_',vec_name))
 
-  # Setting vector grid cell skipping parameters
-  skip1D = (slice(None, None, vec_skip)) 
-  skip2D = (slice(None, None, vec_skip), slice(None, None, vec_skip))
+  # Output file: each page is written to it and closed as soon as it is drawn
+  output = PdfSink('./'+str(folderpath)+'/'+str(seas)+'_'+str(var_name)+str(vec_name)+'_'+str(extra_name)+str(filesuf)) \
+           if pdf == None else pdf
+
+  try:
+   # Setting vector grid cell skipping parameters
+   skip1D = (slice(None, None, vec_skip)) 
+   skip2D = (slice(None, None, vec_skip), slice(None, None, vec_skip))
 
-  #----------------
-  # Define figures
-  #----------------
+   #----------------
+   # Define figures
+   #----------------
 
-  print('Working on panel plot...')
+   print('Working on panel plot...')
  
-  # Define fig and axes
-  if numcases == 'even': # symmetrical plot
-   fig, axes = plt.subplots(nrows=rowceil,ncols=2,figsize=(figw,figh),dpi=fdpi,subplot_kw={'projection':proj})
-   fig.subplots_adjust(hspace=hspace,wspace=wspace)
-
-  if numcases == 'odd': # use gridspec to place last axis in the middle
-   fig = plt.figure(figsize=(figw,figh),dpi=fdpi)
-   gs = fig.add_gridspec(nrows=100,ncols=100,hspace=hspace,wspace=wspace)  
-   axes = []                   
-   for r in range(rowceil_min1):
-    for c in range(2):
-     if c == 0:
-      ax = fig.add_subplot(gs[r*int(100/rowceil):r*int(100/rowceil)+int(100/rowceil),0:48],projection=proj)
-      axes.append(ax)
-     if c == 1:
-      ax = fig.add_subplot(gs[r*int(100/rowceil):r*int(100/rowceil)+int(100/rowceil),51:99],projection=proj)
-      axes.append(ax)
-   lastax = fig.add_subplot(gs[rowceil_min1*int(100/rowceil):-1,25:75],projection=proj)
-   axes.append(lastax)
+   # Define fig and axes
+   if numcases == 'even': # symmetrical plot
+    fig, axes = plt.subplots(nrows=rowceil,ncols=2,figsize=(figw,figh),dpi=fdpi,subplot_kw={'projection':proj})
+    fig.subplots_adjust(hspace=hspace,wspace=wspace)
+
+   if numcases == 'odd': # use gridspec to place last axis in the middle
+    fig = plt.figure(figsize=(figw,figh),dpi=fdpi)
+    gs = fig.add_gridspec(nrows=100,ncols=100,hspace=hspace,wspace=wspace)  
+    axes = []                   
+    for r in range(rowceil_min1):
+     for c in range(2):
+      if c == 0:
+       ax = fig.add_subplot(gs[r*int(100/rowceil):r*int(100/rowceil)+int(100/rowceil),0:48],projection=proj)
+       axes.append(ax)
+      if c == 1:
+       ax = fig.add_subplot(gs[r*int(100/rowceil):r*int(100/rowceil)+int(100/rowceil),51:99],projection=proj)
+       axes.append(ax)
+    lastax = fig.add_subplot(gs[rowceil_min1*int(100/rowceil):-1,25:75],projection=proj)
+    axes.append(lastax)
  
-  # Reshape axes for plotting
-  if numcases == 'even':  
-   axes = axes.reshape(rowceil,2)
-
-  #----------------------------------
-  # Subplot map components
-  #----------------------------------
-
-  if numcases == 'even':
-   for r in range(rowceil):
-    for c in range(2):
-     axes[r,c].set_title(fig_let[2*r+c]+' '+str(seas)+' '+str(var_name)+str(vec_name)+' '+cases[2*r+c],loc=ttlloc,
-                                                                                        fontsize=ttlfts,pad=ttlpad) 
-     axes[r,c].set_extent([LonMin,LonMax,LatMin,LatMax],proj)                                    
+   # Reshape axes for plotting
+   if numcases == 'even':  
+    axes = axes.reshape(rowceil,2)
+
+   #----------------------------------
+   # Subplot map components
+   #----------------------------------
+
+   if numcases == 'even':
+    for r in range(rowceil):
+     for c in range(2):
+      axes[r,c].set_title(fig_let[2*r+c]+' '+str(seas)+' '+str(var_name)+str(vec_name)+' '+cases[2*r+c],loc=ttlloc,
+                                                                                         fontsize=ttlfts,pad=ttlpad) 
+      axes[r,c].set_extent([LonMin,LonMax,LatMin,LatMax],proj)                                    
+      if coast == True:
+       basemap.add_basemap_feature(axes[r,c],cfeature.COASTLINE,linewidths=coastlw)
+      if lake == True:
+       basemap.add_basemap_feature(axes[r,c],cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
+      if border == True:
+       basemap.add_basemap_feature(axes[r,c],cfeature.BORDERS,linewidths=borderlw)
+      if usstate == True:
+       basemap.add_basemap_feature(axes[r,c],cfeature.STATES,linewidths=usstatelw)
+ 
+   if numcases == 'odd':
+    for i in range(len(cases)):
+     axes[i].set_title(fig_let[i]+' '+str(seas)+' '+str(var_name)+str(vec_name)+' '+cases[i],loc=ttlloc,fontsize=ttlfts,
+                                                                                                             pad=ttlpad) 
+     axes[i].set_extent([LonMin,LonMax,LatMin,LatMax],proj)                            
+     # Figure map
      if coast == True:
-      axes[r,c].add_feature(cfeature.COASTLINE,linewidths=coastlw)
+      basemap.add_basemap_feature(axes[i],cfeature.COASTLINE,linewidths=coastlw)
      if lake == True:
-      axes[r,c].add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
+      basemap.add_basemap_feature(axes[i],cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
      if border == True:
-      axes[r,c].add_feature(cfeature.BORDERS,linewidths=borderlw)
+      basemap.add_basemap_feature(axes[i],cfeature.BORDERS,linewidths=borderlw)
      if usstate == True:
-      axes[r,c].add_feature(cfeature.STATES,linewidths=usstatelw)
- 
-  if numcases == 'odd':
-   for i in range(len(cases)):
-    axes[i].set_title(fig_let[i]+' '+str(seas)+' '+str(var_name)+str(vec_name)+' '+cases[i],loc=ttlloc,fontsize=ttlfts,
-                                                                                                            pad=ttlpad) 
-    axes[i].set_extent([LonMin,LonMax,LatMin,LatMax],proj)                            
-    # Figure map
-    if coast == True:
-     axes[i].add_feature(cfeature.COASTLINE,linewidths=coastlw)
-    if lake == True:
-     axes[i].add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
-    if border == True:
-     axes[i].add_feature(cfeature.BORDERS,linewidths=borderlw)
-    if usstate == True:
-     axes[i].add_feature(cfeature.STATES,linewidths=usstatelw) 
-
-  #----------------------------------
-  # Add map axes and ticks  
-  #----------------------------------
-
-  if add_axes == True:
-
-   ### rows 1 to N-1
-   if numcases == 'even':
-    for r in range(rowceil_min1):
-     for c in range(2):
-      if c == 0:
-       map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+      basemap.add_basemap_feature(axes[i],cfeature.STATES,linewidths=usstatelw) 
+
+   #----------------------------------
+   # Add map axes and ticks  
+   #----------------------------------
+
+   if add_axes == True:
+
+    ### rows 1 to N-1
+    if numcases == 'even':
+     for r in range(rowceil_min1):
+      for c in range(2):
+       if c == 0:
+        map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                             xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                             glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                             top=False,bot=False,left=True,right=False)
+       if c == 1:
+        map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                             xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                             glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                             top=False,bot=False,left=False,right=True)
+
+    if numcases == 'odd':
+     for i in range(len(cases)-1):
+      if (i % 2) == 0: # all even indices are in left column
+       map_ticks_and_labels(ax=axes[i],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
                             xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
                             glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
                             top=False,bot=False,left=True,right=False)
-      if c == 1:
-       map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+      if (i % 2) == 1: # all odd indices are in left column
+       map_ticks_and_labels(ax=axes[i],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
                             xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
                             glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
                             top=False,bot=False,left=False,right=True)
 
-   if numcases == 'odd':
-    for i in range(len(cases)-1):
-     if (i % 2) == 0: # all even indices are in left column
-      map_ticks_and_labels(ax=axes[i],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                           xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                           glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                           top=False,bot=False,left=True,right=False)
-     if (i % 2) == 1: # all odd indices are in left column
-      map_ticks_and_labels(ax=axes[i],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                           xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                           glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                           top=False,bot=False,left=False,right=True)
-
-   ### row N
+    ### row N
+    if numcases == 'even':
+     for r in range(rowceil_min1,rowceil):
+      for c in range(2):
+       if c == 0:  # Left column
+        map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                             xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                             glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                             top=False,bot=True,left=True,right=False)
+       if c == 1:  # Right column
+        map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                             xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                             glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                             top=False,bot=True,left=False,right=True)
+
+    if numcases == 'odd':
+     i = len(cases)-1
+     map_ticks_and_labels(ax=axes[i],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                          xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                          glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                          top=False,bot=True,left=True,right=True)    
+
+   #----------------------------------
+   # Plot the variables 
+   #----------------------------------
+
    if numcases == 'even':
-    for r in range(rowceil_min1,rowceil):
+    for r in range(rowceil):
      for c in range(2):
-      if c == 0:  # Left column
-       map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                            xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                            glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                            top=False,bot=True,left=True,right=False)
-      if c == 1:  # Right column
-       map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                            xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                            glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                            top=False,bot=True,left=False,right=True)
+       cntr = fill_map(varc[2*r+c,:,:],axes[r,c],cntr_type=cntr_type,transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
+                       add_colorbar=False,add_labels=False,extend=extnd)
+       if overlay_vec == True:
+        vec = axes[r,c].quiver(uc.lon[skip1D],uc.lat[skip1D],uc[2*r+c,:,:][skip2D],vc[2*r+c,:,:][skip2D],scale_units='height',pivot='mid',
+                                scale=vec_scale,width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
+        qkey = axes[r,c].quiverkey(vec,0.8,0.2,vec_ref,str(vec_ref)+str(vec_units),labelpos='N',coordinates='figure',color='k')
 
    if numcases == 'odd':
-    i = len(cases)-1
-    map_ticks_and_labels(ax=axes[i],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                         xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                         glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                         top=False,bot=True,left=True,right=True)    
-
-  #----------------------------------
-  # Plot the variables 
-  #----------------------------------
-
-  if numcases == 'even':
-   for r in range(rowceil):
-    for c in range(2):
-      if cntr_type == 'AreaFill':
-       cntr = varc[2*r+c,:,:].plot.contourf(ax=axes[r,c],transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                                            add_colorbar=False,add_labels=False,extend=extnd)
-      elif cntr_type == 'RasterFill':
-       cntr = varc[2*r+c,:,:].plot(ax=axes[r,c],transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                                   add_colorbar=False,add_labels=False,extend=extnd)
+    for i in range(len(cases)):
+      cntr = fill_map(varc[i,:,:],axes[i],cntr_type=cntr_type,transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
+                      add_colorbar=False,add_labels=False,extend=extnd)
       if overlay_vec == True:
-       vec = axes[r,c].quiver(uc.lon[skip1D],uc.lat[skip1D],uc[2*r+c,:,:][skip2D],vc[2*r+c,:,:][skip2D],scale_units='height',pivot='mid',
+       vec = axes[i].quiver(uc.lon[skip1D],uc.lat[skip1D],uc[i,:,:][skip2D],vc[i,:,:][skip2D],scale_units='height',pivot='mid',
                                scale=vec_scale,width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
-       qkey = axes[r,c].quiverkey(vec,0.8,0.2,vec_ref,str(vec_ref)+str(vec_units),labelpos='N',coordinates='figure',color='k')
-
-  if numcases == 'odd':
-   for i in range(len(cases)):
-     if cntr_type == 'AreaFill':
-      cntr = varc[i,:,:].plot.contourf(ax=axes[i],transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                                       add_colorbar=False,add_labels=False,extend=extnd)
-     elif cntr_type == 'RasterFill':
-      cntr = varc[i,:,:].plot(ax=axes[i],transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                              add_colorbar=False,add_labels=False,extend=extnd)
-     if overlay_vec == True:
-      vec = axes[i].quiver(uc.lon[skip1D],uc.lat[skip1D],uc[i,:,:][skip2D],vc[i,:,:][skip2D],scale_units='height',pivot='mid',
-                              scale=vec_scale,width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
-      qkey = axes[i].quiverkey(vec,0.8,0.2,vec_ref,str(int(vec_ref))+str(vec_units),labelpos='N',coordinates='figure',color='k')
+       qkey = axes[i].quiverkey(vec,0.8,0.2,vec_ref,str(int(vec_ref))+str(vec_units),labelpos='N',coordinates='figure',color='k')
 
-  #-------------------------------
-  # Color bar for plots 
-  #-------------------------------
+   #-------------------------------
+   # Color bar for plots 
+   #-------------------------------
   
-  cbar = fig.colorbar(cntr,ax=axes,orientation=cbar_orient,ticks=MultipleLocator(tkstd),shrink=cbar_shrk,pad=cbar_pad,label=units,
-                                   spacing=cbar_sp)
-  cbar.ax.tick_params(labelsize=cbar_lblsz)
+   cbar = fig.colorbar(cntr,ax=axes,orientation=cbar_orient,ticks=mticker.MultipleLocator(tkstd),shrink=cbar_shrk,pad=cbar_pad,label=units,
+                                    spacing=cbar_sp)
+   cbar.ax.tick_params(labelsize=cbar_lblsz)
 
-  #------------------------------
-  # Add region and point to map
-  #------------------------------
+   #------------------------------
+   # Add region and point to map
+   #------------------------------
  
-  if regbox == True or point == True:
+   if regbox == True or point == True:
  
-   # Adjusters to put box around entire grid cell
-   latadj = abs(float((var.lat[1] - var.lat[2]) / 2))
-   lonadj = abs(float((var.lon[1] - var.lon[2]) / 2))
-
-  if regbox == True: 
-
-   # Handle values if °W = 180-360
-   if regwlon < 0.:
-    regwlon = regwlon + 360
-   if regelon < 0.:
-    regelon = regelon + 360
-
-   # Pick best values for region
-   slat = float(var.lat.sel(lat=regslat, method='nearest'))
-   nlat = float(var.lat.sel(lat=regnlat, method='nearest'))
-   wlon = float(var.lon.sel(lon=regwlon, method='nearest'))
-   elon = float(var.lon.sel(lon=regelon, method='nearest'))
-
-   # Handle values if °W = 180-360
-   if wlon > 180.0:
-    wlon = wlon - 360
-   if elon > 180.0:
-    elon = elon - 360
+    # Adjusters to put box around entire grid cell
+    latadj = abs(float((var.lat[1] - var.lat[2]) / 2))
+    lonadj = abs(float((var.lon[1] - var.lon[2]) / 2))
+
+   if regbox == True: 
+
+    # Handle values if °W = 180-360
+    if regwlon < 0.:
+     regwlon = regwlon + 360
+    if regelon < 0.:
+     regelon = regelon + 360
+
+    # Pick best values for region
+    slat = float(var.lat.sel(lat=regslat, method='nearest'))
+    nlat = float(var.lat.sel(lat=regnlat, method='nearest'))
+    wlon = float(var.lon.sel(lon=regwlon, method='nearest'))
+    elon = float(var.lon.sel(lon=regelon, method='nearest'))
+
+    # Handle values if °W = 180-360
+    if wlon > 180.0:
+     wlon = wlon - 360
+    if elon > 180.0:
+     elon = elon - 360
    
-   if numcases == 'even': 
+    if numcases == 'even': 
+     for r in range(rowceil):
+      for c in range(2):
+       draw_region_box(ax=axes[r,c],slat=slat-latadj,nlat=nlat+latadj,wlon=wlon-lonadj,elon=elon+lonadj,
+                       linestyle=regline,facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=10)
+
+    if numcases == 'odd':
+     for i in range(len(cases)):
+       draw_region_box(ax=axes[i],slat=slat-latadj,nlat=nlat+latadj,wlon=wlon-lonadj,elon=elon+lonadj,
+                       linestyle=regline,facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=10)
+
+   if point == True:
+ 
+    # Pick best values for point
+    latpt = float(var.lat.sel(lat=ptlat, method='nearest'))
+    lonpt = float(var.lon.sel(lon=ptlon, method='nearest')) 
+
+    # Handle values if °W = 180-360
+    if lonpt > 180.0:
+     lonpt = lonpt - 360
+
+    if numcases == 'even':
+     for r in range(rowceil):
+      for c in range(2):
+       axes[r,c].plot(lonpt,latpt,'ro',markersize=5)
+    if numcases == 'odd':
+     for i in range(len(cases)):
+      axes[i].plot(lonpt,latpt,'ro',markersize=5)
+
+   #------------------------
+   # Add shapes to map  
+   #------------------------
+ 
+   if numcases == 'even':
     for r in range(rowceil):
      for c in range(2):
-      draw_region_box(ax=axes[r,c],slat=slat-latadj,nlat=nlat+latadj,wlon=wlon-lonadj,elon=elon+lonadj,
-                      linestyle=regline,facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=10)
+      for s in range(len(shape_type)):
+       axes[r,c].plot(shape_lons[s],shape_lats[s],marker=shape_type[s],markersize=shape_size[s],markerfacecolor='none',
+                       markeredgecolor=shape_col)
 
    if numcases == 'odd':
     for i in range(len(cases)):
-      draw_region_box(ax=axes[i],slat=slat-latadj,nlat=nlat+latadj,wlon=wlon-lonadj,elon=elon+lonadj,
-                      linestyle=regline,facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=10)
+     for s in range(len(shape_type)):
+      axes[i].plot(shape_lons[s],shape_lats[s],marker=shape_type[s],markersize=shape_size[s],markerfacecolor='none',
+                   markeredgecolor=shape_col[s])
 
-  if point == True:
- 
-   # Pick best values for point
-   latpt = float(var.lat.sel(lat=ptlat, method='nearest'))
-   lonpt = float(var.lon.sel(lon=ptlon, method='nearest')) 
+   # Panel plot is the first page
+   output.add(fig)
 
-   # Handle values if °W = 180-360
-   if lonpt > 180.0:
-    lonpt = lonpt - 360
+   #-----------------------------------------------------------
+   # Plot individual maps and append to pdf file if necessary
+   #-----------------------------------------------------------
+
+   if Ind_plots == True:
+
+    print('Working on individual plots...')
 
-   if numcases == 'even':
-    for r in range(rowceil):
-     for c in range(2):
-      axes[r,c].plot(lonpt,latpt,'ro',markersize=5)
-   if numcases == 'odd':
     for i in range(len(cases)):
-     axes[i].plot(lonpt,latpt,'ro',markersize=5)
 
-  #------------------------
-  # Add shapes to map  
-  #------------------------
- 
-  if numcases == 'even':
-   for r in range(rowceil):
-    for c in range(2):
+     figi = plt.figure(figsize=(figw,figh),dpi=fdpi)
+     axi  = figi.add_subplot(111, projection=proj) 
+     axi.set_title(fig_let[i]+' '+str(seas)+' '+str(var_name)+str(vec_name)+' '+cases[i],loc=ttlloc,fontsize=ttlfts,
+                                                                                                    pad=ttlpad)  # title
+     axi.set_extent([LonMin,LonMax,LatMin,LatMax],proj)                                                          # map extent
+     if coast == True:
+      basemap.add_basemap_feature(axi,cfeature.COASTLINE,linewidths=coastlw)
+     if lake == True:
+      basemap.add_basemap_feature(axi,cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
+     if border == True:
+      basemap.add_basemap_feature(axi,cfeature.BORDERS,linewidths=borderlw)
+     if usstate == True:
+      basemap.add_basemap_feature(axi,cfeature.STATES,linewidths=usstatelw)
+     map_ticks_and_labels(ax=axi,LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                          xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                          glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                          top=False,bot=True,left=True,right=True)
+     cntr = fill_map(varc[i,:,:],axi,cntr_type=cntr_type,transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
+                     add_colorbar=True,cbar_kwargs={'orientation':cbar_orient,'ticks':mticker.MultipleLocator(tkstd),
+                     'shrink':cbar_shrk,'pad':cbar_pad,'label':units,'spacing':cbar_sp},add_labels=False,extend=extnd)
+     if overlay_vec == True:
+      vec = axi.quiver(uc.lon[skip1D],uc.lat[skip1D],uc[i,:,:][skip2D],vc[i,:,:][skip2D],scale_units='height',pivot='mid',scale=vec_scale,
+                                       width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
+      qkey = axi.quiverkey(vec,0.8,0.2,vec_ref,str(int(vec_ref))+str(vec_units),labelpos='N',coordinates='figure',color='k')
+     if regbox == True:
+      draw_region_box(ax=axi,slat=slat-latadj,nlat=nlat+latadj,wlon=wlon-lonadj,elon=elon+lonadj,
+                       linestyle=regline,facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=10)
+     if point == True:
+      axi.plot(lonpt,latpt,'ro',markersize=5)
      for s in range(len(shape_type)):
-      axes[r,c].plot(shape_lons[s],shape_lats[s],marker=shape_type[s],markersize=shape_size[s],markerfacecolor='none',
-                      markeredgecolor=shape_col)
-
-  if numcases == 'odd':
-   for i in range(len(cases)):
-    for s in range(len(shape_type)):
-     axes[i].plot(shape_lons[s],shape_lats[s],marker=shape_type[s],markersize=shape_size[s],markerfacecolor='none',
-                  markeredgecolor=shape_col[s])
-
-  #-----------------------------------------------------------
-  # Plot individual maps and append to pdf file if necessary
-  #-----------------------------------------------------------
-
-  if Ind_plots == True:
-
-   print('Working on individual plots...')
-
-   for i in range(len(cases)):
-
-    figi = plt.figure(figsize=(figw,figh),dpi=fdpi)
-    axi  = figi.add_subplot(111, projection=proj) 
-    axi.set_title(fig_let[i]+' '+str(seas)+' '+str(var_name)+str(vec_name)+' '+cases[i],loc=ttlloc,fontsize=ttlfts,
-                                                                                                   pad=ttlpad)  # title
-    axi.set_extent([LonMin,LonMax,LatMin,LatMax],proj)                                                          # map extent
-    if coast == True:
-     axi.add_feature(cfeature.COASTLINE,linewidths=coastlw)
-    if lake == True:
-     axi.add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
-    if border == True:
-     axi.add_feature(cfeature.BORDERS,linewidths=borderlw)
-    if usstate == True:
-     axi.add_feature(cfeature.STATES,linewidths=usstatelw)
-    map_ticks_and_labels(ax=axi,LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                         xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                         glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                         top=False,bot=True,left=True,right=True)
-    if cntr_type == 'AreaFill':
-     cntr = varc[i,:,:].plot.contourf(ax=axi,transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                                            add_colorbar=True,cbar_kwargs={'orientation':cbar_orient,'ticks':MultipleLocator(tkstd),
-                                            'shrink':cbar_shrk,'pad':cbar_pad,'label':units,'spacing':cbar_sp},add_labels=False,extend=extnd)                       
-    elif cntr_type == 'RasterFill':
-     cntr = varc[i,:,:].plot(ax=axi,transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                                    add_colorbar=True,cbar_kwargs={'orientation':cbar_orient,'ticks':MultipleLocator(tkstd),
-                                    'shrink':cbar_shrk,'pad':cbar_pad,'label':units},add_labels=False,extend=extnd) 
-    if overlay_vec == True:
-     vec = axi.quiver(uc.lon[skip1D],uc.lat[skip1D],uc[i,:,:][skip2D],vc[i,:,:][skip2D],scale_units='height',pivot='mid',scale=vec_scale,
-                                      width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
-     qkey = axi.quiverkey(vec,0.8,0.2,vec_ref,str(int(vec_ref))+str(vec_units),labelpos='N',coordinates='figure',color='k')
-    if regbox == True:
-     draw_region_box(ax=axi,slat=slat-latadj,nlat=nlat+latadj,wlon=wlon-lonadj,elon=elon+lonadj,
-                      linestyle=regline,facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=10)
-    if point == True:
-     axi.plot(lonpt,latpt,'ro',markersize=5)
-    for s in range(len(shape_type)):
-     axi.plot(shape_lons[s],shape_lats[s],marker=shape_type[s],markersize=shape_size[s],markerfacecolor='none',
-                      markeredgecolor=shape_col[s])
-
-  #--------------------------
-  # Save output PDF file
-  #--------------------------
-
-  save_multi_image('./'+str(folderpath)+'/'+str(seas)+'_'+str(var_name)+str(vec_name)+'_'+str(extra_name)+str(filesuf))
-  plt.close('all')
+      axi.plot(shape_lons[s],shape_lats[s],marker=shape_type[s],markersize=shape_size[s],markerfacecolor='none',
+                       markeredgecolor=shape_col[s])
+
+     # Append page to output file and close it
+     output.add(figi)
+
+  finally:
+   # Only a file opened here is closed; a 'pdf' passed in stays open for more pages
+   if pdf == None:
+    output.close()
 
 #######################################################################################################
 # Plot difference contours in panel and individual map plots 
 #######################################################################################################
 
+@profiled
 def plot_diff_contour_map_avg(
                               ### Required Parameters
                               var: xr.DataArray,
@@ -576,7 +590,7 @@ def plot_diff_contour_map_avg(
                               hspace: float = None, wspace: float = None, fig_let: list = fig_let,
                               ttlloc: str = 'left', ttlfts: float = 12., ttlpad: float = 10.,
                               LatMin: float = -90., LatMax: float = 90., LonMin: float = -180.,
-                              LonMax: float = 180., proj: ccrs.Projection = ccrs.PlateCarree(),
+                              LonMax: float = 180., proj: ccrs.Projection = None,
                               coast: bool = True, coastlw: float = 0.75, lake: bool = False,
                               lakelw: float = 0.5, border: bool = True, borderlw: float = 0.75,
                               usstate: bool = False, usstatelw: float = 0.5, add_axes: bool = True,
@@ -585,7 +599,7 @@ def plot_diff_contour_map_avg(
                               tkmajlg: float = 4., tkminlg: float = 2., xmin_mj: int = 2, ymin_mj: int = 2,
                               xpads: float = 15., ypads: float = 15.,
                               glalpha: float = 0.0, glcolor: str = 'gray',
-                              cntr_type: str = 'AreaFill', colort: colors.ListedColormap = cmaps.ncl_default,
+                              cntr_type: str = 'AreaFill', colort: colors.ListedColormap = None,
                               loval: float = None, hival: float = None, spval: float = None,
                               tkstd: float = None, extnd: str = 'neither',
                               cbar_orient: str = 'horizontal', cbar_pad: float = 0.08,
@@ -600,7 +614,8 @@ def plot_diff_contour_map_avg(
                               point: bool = False, ptlat: float = None, ptlon: float = None,
                               shape_lats: list = [], shape_lons: list = [], shape_type: list = [],
                               shape_size: list = [], shape_col: list = [], Ind_plots: bool = True,
-                              extra_name: str = '', folderpath: str = '', filesuf: str = '.pdf'
+                              extra_name: str = '', folderpath: str = '', filesuf: str = '.pdf',
+                              pdf: PdfSink = None
                               ):
 
   '''Reads in an xr.DataArray of 3+ cases of a global variable and produces a panel difference plot and 
@@ -677,8 +692,9 @@ def plot_diff_contour_map_avg(
                           gridlines. Modify 1.0 >= alpha > 0.0 for visible gridlines.
                           Default = 0.0 (no gridlines)
   glcolor: class 'str', Color of gridlines if glalpha > 0.0. Default = 'gray'
-  cntr_type: class 'str', Type of contour for plotting. Options: 'AreaFill' - interpolated, 
-                          'RasterFill' - raster. Default = 'AreaFill'
+  cntr_type: class 'str', Type of contour for plotting. Options: 'AreaFill' - interpolated, 'RasterAreaFill' -
+                          interpolated, rasterized in the PDF, 'RasterFill' - raster, 'ImageFill' - raster
+                          drawn as an image (fastest). See plot_functions.fill_map. Default = 'AreaFill'
   colort: class 'colors.ListedColormap', Color table used for plotting contours. Specify names from cmaps 
                                          (https://github.com/hhuangwx/cmaps) or Matplotlib 
                                          (https://matplotlib.org/stable/tutorials/colors/colormaps.html)
@@ -762,6 +778,8 @@ def plot_diff_contour_map_avg(
                            parameters. Do not include first and last forward slashes, for example: 'pdfs' or 
                            'home/pdfs/untitledfolder'. Default = ''
   filesuf: class 'str', Type of output file specified as a string. Default = '.pdf' 
+  pdf: class 'PdfSink', Open multipage PDF file to append the pages to instead of writing a new file, ex. 
+                        to collect the output of several plotting functions in one file. Default = None
   _______________________________________________________________________________________________________
 
   Returns
@@ -771,6 +789,13 @@ def plot_diff_contour_map_avg(
 
   '''
 
+  #-------------------------------------------------------------------------
+  # Default projection and color tables (made here rather than at import)
+  #-------------------------------------------------------------------------
+
+  proj   = ccrs.PlateCarree() if proj is None else proj
+  colort = cmaps.ncl_default if colort is None else colort
+
   #-------------------------------------------------------------------------
   # Make variables to plot cyclic
   #-------------------------------------------------------------------------
@@ -829,296 +854,292 @@ def plot_diff_contour_map_avg(
   else:
    vec_name = ''.join(('_',vec_name))
 
-  # Setting vector grid cell skipping parameters
-  skip1D = (slice(None, None, vec_skip))
-  skip2D = (slice(None, None, vec_skip), slice(None, None, vec_skip))
-
-  #----------------
-  # Define figures
-  #----------------
-
-  print('Working on panel difference plot...')
-
-  # Define fig and axes
-  if numcases == 'even': # symmetrical plot
-   fig, axes = plt.subplots(nrows=rowceil,ncols=2,figsize=(figw,figh),dpi=fdpi,subplot_kw={'projection':proj})
-   fig.subplots_adjust(hspace=hspace,wspace=wspace)
-
-  if numcases == 'odd': # use gridspec to place last axis in the middle
-   fig = plt.figure(figsize=(figw,figh),dpi=fdpi)
-   gs = fig.add_gridspec(nrows=100,ncols=100,hspace=hspace,wspace=wspace)
-   axes = []
-   for r in range(rowceil_min1):
-    for c in range(2):
-     if c == 0:
-      ax = fig.add_subplot(gs[r*int(100/rowceil):r*int(100/rowceil)+int(100/rowceil),0:48],projection=proj)
-      axes.append(ax)
-     if c == 1:
-      ax = fig.add_subplot(gs[r*int(100/rowceil):r*int(100/rowceil)+int(100/rowceil),51:99],projection=proj)
-      axes.append(ax)
-   lastax = fig.add_subplot(gs[rowceil_min1*int(100/rowceil):-1,25:75],projection=proj)
-   axes.append(lastax)
-
-  # Reshape axes for plotting
-  if numcases == 'even':
-   axes = axes.reshape(rowceil,2)
-
-  #----------------------------------
-  # Subplot map components
-  #----------------------------------
-
-  if numcases == 'even':
-   for r in range(rowceil):
-    for c in range(2):
-     axes[r,c].set_title(fig_let[2*r+c]+' '+str(seas)+' '+str(var_name)+str(vec_name)+' '+cases_diff[2*r+c],loc=ttlloc,
-                                                                                            fontsize=ttlfts,pad=ttlpad)
-     axes[r,c].set_extent([LonMin,LonMax,LatMin,LatMax],proj)
-     if coast == True:
-      axes[r,c].add_feature(cfeature.COASTLINE,linewidths=coastlw)
-     if lake == True:
-      axes[r,c].add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
-     if border == True:
-      axes[r,c].add_feature(cfeature.BORDERS,linewidths=borderlw)
-     if usstate == True:
-      axes[r,c].add_feature(cfeature.STATES,linewidths=usstatelw)
-
-  if numcases == 'odd':
-   for i in range(len(cases)-1):
-    axes[i].set_title(fig_let[i]+' '+str(seas)+' '+str(var_name)+str(vec_name)+' '+cases_diff[i],loc=ttlloc,
-                                                                                 fontsize=ttlfts,pad=ttlpad)
-    axes[i].set_extent([LonMin,LonMax,LatMin,LatMax],proj)
-    # Figure map
-    if coast == True:
-     axes[i].add_feature(cfeature.COASTLINE,linewidths=coastlw)
-    if lake == True:
-     axes[i].add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
-    if border == True:
-     axes[i].add_feature(cfeature.BORDERS,linewidths=borderlw)
-    if usstate == True:
-     axes[i].add_feature(cfeature.STATES,linewidths=usstatelw)
-
-  #----------------------------------
-  # Add map axes and ticks  
-  #----------------------------------
-
-  if add_axes == True:
-
-   ### rows 1 to N-1
-   if numcases == 'even':
+  # Output file: each page is written to it and closed as soon as it is drawn
+  output = PdfSink('./'+str(folderpath)+'/'+str(seas)+'_diff_'+str(var_name)+str(vec_name)+'_'+str(extra_name)+str(filesuf)) \
+           if pdf == None else pdf
+
+  try:
+   # Setting vector grid cell skipping parameters
+   skip1D = (slice(None, None, vec_skip))
+   skip2D = (slice(None, None, vec_skip), slice(None, None, vec_skip))
+
+   #----------------
+   # Define figures
+   #----------------
+
+   print('Working on panel difference plot...')
+
+   # Define fig and axes
+   if numcases == 'even': # symmetrical plot
+    fig, axes = plt.subplots(nrows=rowceil,ncols=2,figsize=(figw,figh),dpi=fdpi,subplot_kw={'projection':proj})
+    fig.subplots_adjust(hspace=hspace,wspace=wspace)
+
+   if numcases == 'odd': # use gridspec to place last axis in the middle
+    fig = plt.figure(figsize=(figw,figh),dpi=fdpi)
+    gs = fig.add_gridspec(nrows=100,ncols=100,hspace=hspace,wspace=wspace)
+    axes = []
     for r in range(rowceil_min1):
      for c in range(2):
-      if c == 0:  # Left column
-       map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                            xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                            glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                            top=False,bot=False,left=True,right=False)
-      if c == 1:  # Right column
-       map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                            xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                            glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                            top=False,bot=False,left=False,right=True)
+      if c == 0:
+       ax = fig.add_subplot(gs[r*int(100/rowceil):r*int(100/rowceil)+int(100/rowceil),0:48],projection=proj)
+       axes.append(ax)
+      if c == 1:
+       ax = fig.add_subplot(gs[r*int(100/rowceil):r*int(100/rowceil)+int(100/rowceil),51:99],projection=proj)
+       axes.append(ax)
+    lastax = fig.add_subplot(gs[rowceil_min1*int(100/rowceil):-1,25:75],projection=proj)
+    axes.append(lastax)
+
+   # Reshape axes for plotting
+   if numcases == 'even':
+    axes = axes.reshape(rowceil,2)
+
+   #----------------------------------
+   # Subplot map components
+   #----------------------------------
+
+   if numcases == 'even':
+    for r in range(rowceil):
+     for c in range(2):
+      axes[r,c].set_title(fig_let[2*r+c]+' '+str(seas)+' '+str(var_name)+str(vec_name)+' '+cases_diff[2*r+c],loc=ttlloc,
+                                                                                             fontsize=ttlfts,pad=ttlpad)
+      axes[r,c].set_extent([LonMin,LonMax,LatMin,LatMax],proj)
+      if coast == True:
+       basemap.add_basemap_feature(axes[r,c],cfeature.COASTLINE,linewidths=coastlw)
+      if lake == True:
+       basemap.add_basemap_feature(axes[r,c],cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
+      if border == True:
+       basemap.add_basemap_feature(axes[r,c],cfeature.BORDERS,linewidths=borderlw)
+      if usstate == True:
+       basemap.add_basemap_feature(axes[r,c],cfeature.STATES,linewidths=usstatelw)
 
    if numcases == 'odd':
     for i in range(len(cases)-1):
-      if (i % 2) == 0: # all even indices are in left column
-       map_ticks_and_labels(ax=axes[i],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                            xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                            glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                            top=False,bot=False,left=True,right=False)
-      if (i % 2) == 1: # all odd indices are in right column
-       map_ticks_and_labels(ax=axes[i],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                            xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                            glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                            top=False,bot=False,left=False,right=True)
+     axes[i].set_title(fig_let[i]+' '+str(seas)+' '+str(var_name)+str(vec_name)+' '+cases_diff[i],loc=ttlloc,
+                                                                                  fontsize=ttlfts,pad=ttlpad)
+     axes[i].set_extent([LonMin,LonMax,LatMin,LatMax],proj)
+     # Figure map
+     if coast == True:
+      basemap.add_basemap_feature(axes[i],cfeature.COASTLINE,linewidths=coastlw)
+     if lake == True:
+      basemap.add_basemap_feature(axes[i],cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
+     if border == True:
+      basemap.add_basemap_feature(axes[i],cfeature.BORDERS,linewidths=borderlw)
+     if usstate == True:
+      basemap.add_basemap_feature(axes[i],cfeature.STATES,linewidths=usstatelw)
+
+   #----------------------------------
+   # Add map axes and ticks  
+   #----------------------------------
+
+   if add_axes == True:
+
+    ### rows 1 to N-1
+    if numcases == 'even':
+     for r in range(rowceil_min1):
+      for c in range(2):
+       if c == 0:  # Left column
+        map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                             xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                             glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                             top=False,bot=False,left=True,right=False)
+       if c == 1:  # Right column
+        map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                             xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                             glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                             top=False,bot=False,left=False,right=True)
+
+    if numcases == 'odd':
+     for i in range(len(cases)-1):
+       if (i % 2) == 0: # all even indices are in left column
+        map_ticks_and_labels(ax=axes[i],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                             xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                             glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                             top=False,bot=False,left=True,right=False)
+       if (i % 2) == 1: # all odd indices are in right column
+        map_ticks_and_labels(ax=axes[i],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                             xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                             glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                             top=False,bot=False,left=False,right=True)
+
+    ### row N
+    if numcases == 'even':
+     for r in range(rowceil_min1,rowceil):
+      for c in range(2):
+       if c == 0:  # Left column
+        map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                             xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                             glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                             top=False,bot=True,left=True,right=False)
+       if c == 1:  # Right column
+        map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                             xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                             glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                             top=False,bot=True,left=False,right=True)
+
+    if numcases == 'odd':
+     i = (len(cases)-1)-1
+     map_ticks_and_labels(ax=axes[i],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                          xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                          glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                          top=False,bot=True,left=True,right=True)
+
+   #----------------------------------
+   # Plot the variables 
+   #----------------------------------
 
-   ### row N
    if numcases == 'even':
-    for r in range(rowceil_min1,rowceil):
+    for r in range(rowceil):
      for c in range(2):
-      if c == 0:  # Left column
-       map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                            xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                            glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                            top=False,bot=True,left=True,right=False)
-      if c == 1:  # Right column
-       map_ticks_and_labels(ax=axes[r,c],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                            xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                            glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                            top=False,bot=True,left=False,right=True)
+       cntr = fill_map(diff[2*r+c,:,:],axes[r,c],cntr_type=cntr_type,transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
+                       add_colorbar=False,add_labels=False,extend=extnd)
+       if overlay_vec == True:
+        vec = axes[r,c].quiver(uc.lon[skip1D],uc.lat[skip1D],udiff[2*r+c,:,:][skip2D],vdiff[2*r+c,:,:][skip2D],scale_units='height',pivot='mid',
+                                scale=vec_scale,width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
+        qkey = axes[r,c].quiverkey(vec,0.8,0.2,vec_ref,str(int(vec_ref))+str(vec_units),labelpos='N',coordinates='figure',color='k')
 
    if numcases == 'odd':
-    i = (len(cases)-1)-1
-    map_ticks_and_labels(ax=axes[i],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                         xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                         glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                         top=False,bot=True,left=True,right=True)
-
-  #----------------------------------
-  # Plot the variables 
-  #----------------------------------
-
-  if numcases == 'even':
-   for r in range(rowceil):
-    for c in range(2):
-      if cntr_type == 'AreaFill':
-       cntr = diff[2*r+c,:,:].plot.contourf(ax=axes[r,c],transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                                            add_colorbar=False,add_labels=False,extend=extnd)
-      elif cntr_type == 'RasterFill':
-       cntr = diff[2*r+c,:,:].plot(ax=axes[r,c],transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                                   add_colorbar=False,add_labels=False,extend=extnd)
+    for i in range(len(cases)-1):
+      cntr = fill_map(diff[i,:,:],axes[i],cntr_type=cntr_type,transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
+                      add_colorbar=False,add_labels=False,extend=extnd)
       if overlay_vec == True:
-       vec = axes[r,c].quiver(uc.lon[skip1D],uc.lat[skip1D],udiff[2*r+c,:,:][skip2D],vdiff[2*r+c,:,:][skip2D],scale_units='height',pivot='mid',
+       vec = axes[i].quiver(uc.lon[skip1D],uc.lat[skip1D],udiff[i,:,:][skip2D],vdiff[i,:,:][skip2D],scale_units='height',pivot='mid',
                                scale=vec_scale,width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
-       qkey = axes[r,c].quiverkey(vec,0.8,0.2,vec_ref,str(int(vec_ref))+str(vec_units),labelpos='N',coordinates='figure',color='k')
-
-  if numcases == 'odd':
-   for i in range(len(cases)-1):
-     if cntr_type == 'AreaFill':
-      cntr = diff[i,:,:].plot.contourf(ax=axes[i],transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                                       add_colorbar=False,add_labels=False,extend=extnd)
-     elif cntr_type == 'RasterFill':
-      cntr = diff[i,:,:].plot(ax=axes[i],transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                              add_colorbar=False,add_labels=False,extend=extnd)
-     if overlay_vec == True:
-      vec = axes[i].quiver(uc.lon[skip1D],uc.lat[skip1D],udiff[i,:,:][skip2D],vdiff[i,:,:][skip2D],scale_units='height',pivot='mid',
-                              scale=vec_scale,width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
-      qkey = axes[i].quiverkey(vec,0.8,0.2,vec_ref,str(int(vec_ref))+str(vec_units),labelpos='N',coordinates='figure',color='k')
-
-  #-------------------------------
-  # Color bar for plots 
-  #-------------------------------
-
-  cbar = fig.colorbar(cntr,ax=axes,orientation=cbar_orient,ticks=MultipleLocator(tkstd),shrink=cbar_shrk,pad=cbar_pad,label=units,
-                                   spacing=cbar_sp)
-  cbar.ax.tick_params(labelsize=cbar_lblsz)
-
-  #------------------------------
-  # Add region and point to map
-  #------------------------------
-
-  if regbox == True or point == True:
+       qkey = axes[i].quiverkey(vec,0.8,0.2,vec_ref,str(int(vec_ref))+str(vec_units),labelpos='N',coordinates='figure',color='k')
+
+   #-------------------------------
+   # Color bar for plots 
+   #-------------------------------
+
+   cbar = fig.colorbar(cntr,ax=axes,orientation=cbar_orient,ticks=mticker.MultipleLocator(tkstd),shrink=cbar_shrk,pad=cbar_pad,label=units,
+                                    spacing=cbar_sp)
+   cbar.ax.tick_params(labelsize=cbar_lblsz)
+
+   #------------------------------
+   # Add region and point to map
+   #------------------------------
+
+   if regbox == True or point == True:
+
+    # Adjusters to put box around entire grid cell
+    latadj = abs(float((var.lat[1] - var.lat[2]) / 2))
+    lonadj = abs(float((var.lon[1] - var.lon[2]) / 2))
+
+   if regbox == True:
+
+    # Handle values if °W = 180-360
+    if regwlon < 0.:
+     regwlon = regwlon + 360
+    if regelon < 0.:
+     regelon = regelon + 360
+
+    # Pick best values for region
+    slat = float(var.lat.sel(lat=regslat, method='nearest'))
+    nlat = float(var.lat.sel(lat=regnlat, method='nearest'))
+    wlon = float(var.lon.sel(lon=regwlon, method='nearest'))
+    elon = float(var.lon.sel(lon=regelon, method='nearest'))
+
+    # Handle values if °W = 180-360
+    if wlon > 180.0:
+     wlon = wlon - 360
+    if elon > 180.0:
+     elon = elon - 360
+
+    if numcases == 'even':
+     for r in range(rowceil):
+      for c in range(2):
+       draw_region_box(ax=axes[r,c],slat=slat-latadj,nlat=nlat+latadj,wlon=wlon-lonadj,elon=elon+lonadj,
+                       linestyle=regline,facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=10)
+      
+    if numcases == 'odd':
+     for i in range(len(cases)-1):
+       draw_region_box(ax=axes[i],slat=slat-latadj,nlat=nlat+latadj,wlon=wlon-lonadj,elon=elon+lonadj,
+                       linestyle=regline,facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=10)
 
-   # Adjusters to put box around entire grid cell
-   latadj = abs(float((var.lat[1] - var.lat[2]) / 2))
-   lonadj = abs(float((var.lon[1] - var.lon[2]) / 2))
+   if point == True:
 
-  if regbox == True:
+    # Pick best values for point
+    latpt = float(var.lat.sel(lat=ptlat, method='nearest'))
+    lonpt = float(var.lon.sel(lon=ptlon, method='nearest'))
 
-   # Handle values if °W = 180-360
-   if regwlon < 0.:
-    regwlon = regwlon + 360
-   if regelon < 0.:
-    regelon = regelon + 360
+    # Handle values if °W = 180-360
+    if lonpt > 180.0:
+     lonpt = lonpt - 360
 
-   # Pick best values for region
-   slat = float(var.lat.sel(lat=regslat, method='nearest'))
-   nlat = float(var.lat.sel(lat=regnlat, method='nearest'))
-   wlon = float(var.lon.sel(lon=regwlon, method='nearest'))
-   elon = float(var.lon.sel(lon=regelon, method='nearest'))
+    if numcases == 'even':
+     for r in range(rowceil):
+      for c in range(2):
+       axes[r,c].plot(lonpt,latpt,'ro',markersize=5)
+    if numcases == 'odd':
+     for i in range(len(cases)-1):
+      axes[i].plot(lonpt,latpt,'ro',markersize=5)
 
-   # Handle values if °W = 180-360
-   if wlon > 180.0:
-    wlon = wlon - 360
-   if elon > 180.0:
-    elon = elon - 360
+   #------------------------
+   # Add shapes to map  
+   #------------------------
 
    if numcases == 'even':
     for r in range(rowceil):
      for c in range(2):
-      draw_region_box(ax=axes[r,c],slat=slat-latadj,nlat=nlat+latadj,wlon=wlon-lonadj,elon=elon+lonadj,
-                      linestyle=regline,facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=10)
-      
+      for s in range(len(shape_type)):
+       axes[r,c].plot(shape_lons[s],shape_lats[s],marker=shape_type[s],markersize=shape_size[s],markerfacecolor='none',
+                       markeredgecolor=shape_col)
+
    if numcases == 'odd':
     for i in range(len(cases)-1):
-      draw_region_box(ax=axes[i],slat=slat-latadj,nlat=nlat+latadj,wlon=wlon-lonadj,elon=elon+lonadj,
-                      linestyle=regline,facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=10)
+     for s in range(len(shape_type)):
+      axes[i].plot(shape_lons[s],shape_lats[s],marker=shape_type[s],markersize=shape_size[s],markerfacecolor='none',
+                   markeredgecolor=shape_col[s])
 
-  if point == True:
+   # Panel plot is the first page
+   output.add(fig)
 
-   # Pick best values for point
-   latpt = float(var.lat.sel(lat=ptlat, method='nearest'))
-   lonpt = float(var.lon.sel(lon=ptlon, method='nearest'))
+   #-----------------------------------------------------------
+   # Plot individual maps and append to pdf file if necessary
+   #-----------------------------------------------------------
 
-   # Handle values if °W = 180-360
-   if lonpt > 180.0:
-    lonpt = lonpt - 360
+   if Ind_plots == True:
 
-   if numcases == 'even':
-    for r in range(rowceil):
-     for c in range(2):
-      axes[r,c].plot(lonpt,latpt,'ro',markersize=5)
-   if numcases == 'odd':
-    for i in range(len(cases)-1):
-     axes[i].plot(lonpt,latpt,'ro',markersize=5)
+    print('Working on individual difference plots...')
 
-  #------------------------
-  # Add shapes to map  
-  #------------------------
+    for i in range(len(cases)-1):
 
-  if numcases == 'even':
-   for r in range(rowceil):
-    for c in range(2):
+     figi = plt.figure(figsize=(figw,figh),dpi=fdpi)
+     axi  = figi.add_subplot(111, projection=proj)
+     axi.set_title(fig_let[i]+' '+str(seas)+' '+str(var_name)+str(vec_name)+' '+cases_diff[i],loc=ttlloc,fontsize=ttlfts,pad=ttlpad) 
+     axi.set_extent([LonMin,LonMax,LatMin,LatMax],proj)                                   
+     if coast == True:
+      basemap.add_basemap_feature(axi,cfeature.COASTLINE,linewidths=coastlw)
+     if lake == True:
+      basemap.add_basemap_feature(axi,cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
+     if border == True:
+      basemap.add_basemap_feature(axi,cfeature.BORDERS,linewidths=borderlw)
+     if usstate == True:
+      basemap.add_basemap_feature(axi,cfeature.STATES,linewidths=usstatelw)
+     map_ticks_and_labels(ax=axi,LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                          xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                          glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                          top=False,bot=True,left=True,right=True)
+     cntr = fill_map(diff[i,:,:],axi,cntr_type=cntr_type,transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
+                     add_colorbar=True,cbar_kwargs={'orientation':cbar_orient,'ticks':mticker.MultipleLocator(tkstd),
+                     'shrink':cbar_shrk,'pad':cbar_pad,'label':units,'spacing':cbar_sp},add_labels=False,extend=extnd)
+     if overlay_vec == True:
+      vec = axi.quiver(uc.lon[skip1D],uc.lat[skip1D],udiff[i,:,:][skip2D],vdiff[i,:,:][skip2D],scale_units='height',pivot='mid',scale=vec_scale,
+                                       width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
+      qkey = axi.quiverkey(vec,0.8,0.2,vec_ref,str(vec_ref)+str(vec_units),labelpos='N',coordinates='figure',color='k')
+     if regbox == True:
+      draw_region_box(ax=axi,slat=slat-latadj,nlat=nlat+latadj,wlon=wlon-lonadj,elon=elon+lonadj,
+                       linestyle=regline,facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=10)
+     if point == True:
+      axi.plot(lonpt,latpt,'ro',markersize=5)
      for s in range(len(shape_type)):
-      axes[r,c].plot(shape_lons[s],shape_lats[s],marker=shape_type[s],markersize=shape_size[s],markerfacecolor='none',
-                      markeredgecolor=shape_col)
-
-  if numcases == 'odd':
-   for i in range(len(cases)-1):
-    for s in range(len(shape_type)):
-     axes[i].plot(shape_lons[s],shape_lats[s],marker=shape_type[s],markersize=shape_size[s],markerfacecolor='none',
-                  markeredgecolor=shape_col[s])
-
-  #-----------------------------------------------------------
-  # Plot individual maps and append to pdf file if necessary
-  #-----------------------------------------------------------
-
-  if Ind_plots == True:
-
-   print('Working on individual difference plots...')
-
-   for i in range(len(cases)-1):
-
-    figi = plt.figure(figsize=(figw,figh),dpi=fdpi)
-    axi  = figi.add_subplot(111, projection=proj)
-    axi.set_title(fig_let[i]+' '+str(seas)+' '+str(var_name)+str(vec_name)+' '+cases_diff[i],loc=ttlloc,fontsize=ttlfts,pad=ttlpad) 
-    axi.set_extent([LonMin,LonMax,LatMin,LatMax],proj)                                   
-    if coast == True:
-     axi.add_feature(cfeature.COASTLINE,linewidths=coastlw)
-    if lake == True:
-     axi.add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
-    if border == True:
-     axi.add_feature(cfeature.BORDERS,linewidths=borderlw)
-    if usstate == True:
-     axi.add_feature(cfeature.STATES,linewidths=usstatelw)
-    map_ticks_and_labels(ax=axi,LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                         xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                         glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                         top=False,bot=True,left=True,right=True)
-    if cntr_type == 'AreaFill':
-     cntr = diff[i,:,:].plot.contourf(ax=axi,transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                                            add_colorbar=True,cbar_kwargs={'orientation':cbar_orient,'ticks':MultipleLocator(tkstd),
-                                            'shrink':cbar_shrk,'pad':cbar_pad,'label':units,'spacing':cbar_sp},add_labels=False,extend=extnd)                     
-    elif cntr_type == 'RasterFill':
-     cntr = diff[i,:,:].plot(ax=axi,transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                                    add_colorbar=True,cbar_kwargs={'orientation':cbar_orient,'ticks':MultipleLocator(tkstd),
-                                    'shrink':cbar_shrk,'pad':cbar_pad,'label':units},add_labels=False,extend=extnd)
-    if overlay_vec == True:
-     vec = axi.quiver(uc.lon[skip1D],uc.lat[skip1D],udiff[i,:,:][skip2D],vdiff[i,:,:][skip2D],scale_units='height',pivot='mid',scale=vec_scale,
-                                      width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
-     qkey = axi.quiverkey(vec,0.8,0.2,vec_ref,str(vec_ref)+str(vec_units),labelpos='N',coordinates='figure',color='k')
-    if regbox == True:
-     draw_region_box(ax=axi,slat=slat-latadj,nlat=nlat+latadj,wlon=wlon-lonadj,elon=elon+lonadj,
-                      linestyle=regline,facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=10)
-    if point == True:
-     axi.plot(lonpt,latpt,'ro',markersize=5)
-    for s in range(len(shape_type)):
-     axi.plot(shape_lons[s],shape_lats[s],marker=shape_type[s],markersize=shape_size[s],markerfacecolor='none',
-                      markeredgecolor=shape_col[s])
-
-  #--------------------------
-  # Save output PDF file
-  #--------------------------
-
-  save_multi_image('./'+str(folderpath)+'/'+str(seas)+'_diff_'+str(var_name)+str(vec_name)+'_'+str(extra_name)+str(filesuf))
-  plt.close('all')
+      axi.plot(shape_lons[s],shape_lats[s],marker=shape_type[s],markersize=shape_size[s],markerfacecolor='none',
+                       markeredgecolor=shape_col[s])
+
+     # Append page to output file and close it
+     output.add(figi)
+
+  finally:
+   # Only a file opened here is closed; a 'pdf' passed in stays open for more pages
+   if pdf == None:
+    output.close()
 
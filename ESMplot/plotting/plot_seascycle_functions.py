@@ -5,21 +5,25 @@
 #
 #######################################################################################################
 
+from __future__ import annotations
 import numpy as np
 import xarray as xr
 import math
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MultipleLocator
-from matplotlib import colors
-from matplotlib.backends.backend_pdf import PdfPages
-import matplotlib.animation as animation
-import cartopy
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
-import geocat.viz.util as gv
-import cmaps
-from ESMplot.plotting.plot_functions import save_multi_image,map_ticks_and_labels,draw_region_box
-from ESMplot.climate_analysis.coordinate_functions import lat_lon_index_array
+from ESMplot.plotting.plot_functions import PdfSink,fill_map,map_ticks_and_labels,draw_region_box
+from ESMplot.climate_analysis.coordinate_functions import region_index
+from ESMplot.climate_analysis.lazy_import import lazy_import
+from ESMplot.climate_analysis.profiling import profiled, span
+
+# Plotting libraries and the base map module, imported when a plot is first drawn
+plt = lazy_import('matplotlib.pyplot')
+mticker = lazy_import('matplotlib.ticker')
+colors = lazy_import('matplotlib.colors')
+animation = lazy_import('matplotlib.animation')
+ccrs = lazy_import('cartopy.crs')
+cfeature = lazy_import('cartopy.feature')
+gv = lazy_import('geocat.viz.util')
+cmaps = lazy_import('cmaps')
+basemap = lazy_import('ESMplot.plotting.basemap')
 
 # Default variables
 fig_let = ['a)','b)','c)','d)','e)','f)','g)','h)','i)','j)','k)','l)','m)','n)','o)','p)','q)','r)','s)',
@@ -29,6 +33,7 @@ fig_let = ['a)','b)','c)','d)','e)','f)','g)','h)','i)','j)','k)','l)','m)','n)'
 # Seasonal cycle plot, includes line and map plots 
 #######################################################################################################
 
+@profiled
 def plot_seasonal_cycle(
                         ### Required Parameters
                         var: xr.DataArray,
@@ -45,7 +50,7 @@ def plot_seasonal_cycle(
                         leg_fontsz: float = 12., leg_title: str = '', leg_ttlfs: float = 12.,
                         leg_bdrpad: float = 1., xy_lbl_sz: float = 15., xy_ypad: float = 10.,
                         xy_tk_sz: float = 14., gridw: float = 0.1, mapplot: bool = True, 
-                        mapdiff: bool = False, proj: cartopy.crs.Projection = ccrs.PlateCarree(),
+                        mapdiff: bool = False, proj: ccrs.Projection = None,
                         hspace: float = 0.14, wspace: float = 0.15, fig_let: list = fig_let,
                         ttlfts: float = 12., ttlhgt: float = 0.92, spttlloc: str = 'left',
                         spttlfts: float = 10., spttlpad: float = 10., LatMin: float = -90.,
@@ -58,7 +63,7 @@ def plot_seasonal_cycle(
                         tkmajlg: float = 4., tkminlg: float = 2., xmin_mj: int = 2, ymin_mj: int = 2,
                         xpads: float = 10., ypads: float = 10., 
                         glalpha: float = 0.0, glcolor: str = 'gray', cntr_type: str = 'AreaFill',
-                        colort: colors.ListedColormap = cmaps.MPL_viridis,
+                        colort: colors.ListedColormap = None,
                         loval: float = None, hival: float = None, spval: float = None,
                         tkstd: float = None, extnd: str = 'both', cbar_orient: str = 'horizontal',
                         cbar_pad: float = 0.06, cbar_shrk: float = 0.6, cbar_sp: str = 'proportional',
@@ -74,7 +79,7 @@ def plot_seasonal_cycle(
                         shape_lats: list = [], shape_lons: list = [], shape_type: list = [],
                         shape_size: list = [], shape_col: list = [], 
                         extra_name: str = '', folderpath: str = '', filesuf: str = '.pdf',
-                        makegif: bool = False, gif_itvl: int = 500
+                        makegif: bool = False, gif_itvl: int = 500, pdf: PdfSink = None
                         ):
 
   '''Reads in an xr.DataArray of 2+ cases of a seasonal cycle global variable and produces a line plot 
@@ -178,8 +183,9 @@ def plot_seasonal_cycle(
                           gridlines. Modify 1.0 >= alpha > 0.0 for visible gridlines.
                           Default = 0.0 (no gridlines)
   glcolor: class 'str', Color of gridlines if glalpha > 0.0. Default = 'gray'
-  cntr_type: class 'str', Type of contour for plotting. Options: 'AreaFill' - interpolated, 
-                          'RasterFill' - raster. Default = 'AreaFill'
+  cntr_type: class 'str', Type of contour for plotting. Options: 'AreaFill' - interpolated, 'RasterAreaFill' -
+                          interpolated, rasterized in the PDF, 'RasterFill' - raster, 'ImageFill' - raster
+                          drawn as an image (fastest). See plot_functions.fill_map. Default = 'AreaFill'
   colort: class 'colors.ListedColormap', Color table used for plotting contours. Specify names from cmaps 
                                          (https://github.com/hhuangwx/cmaps) or Matplotlib 
                                          (https://matplotlib.org/stable/tutorials/colors/colormaps.html)
@@ -264,6 +270,8 @@ def plot_seasonal_cycle(
   makegif: class 'bool', If True, includes gif of map plot of each month as a separate output file.
                          Default = False
   gif_itvl: class 'int', Delay between frames in GIF in milliseconds. Default = 500
+  pdf: class 'PdfSink', Open multipage PDF file to append the pages to instead of writing a new file, ex. 
+                        to collect the output of several plotting functions in one file. Default = None
   _______________________________________________________________________________________________________
 
   Returns
@@ -273,6 +281,13 @@ def plot_seasonal_cycle(
 
   '''
 
+  #-------------------------------------------------------------------------
+  # Default projection and color tables (made here rather than at import)
+  #-------------------------------------------------------------------------
+
+  proj   = ccrs.PlateCarree() if proj is None else proj
+  colort = cmaps.MPL_viridis if colort is None else colort
+
   #*********************************
   # Set variables before plotting 
   #*********************************
@@ -323,340 +338,320 @@ def plot_seasonal_cycle(
   else:
    vec_name = ''.join(('_',vec_name))
 
-  # Setting vector grid cell skipping parameters
-  skip1D = (slice(None, None, vec_skip))
-  skip2D = (slice(None, None, vec_skip), slice(None, None, vec_skip))
+  # Output file: each page is written to it and closed as soon as it is drawn
+  difftxt = '_diff' if mapdiff == True else ''
+  output = PdfSink('./'+str(folderpath)+'/seascycle'+difftxt+'_'+str(var_name)+str(vec_name)+'_'+str(extra_name)+str(filesuf)) \
+           if pdf == None else pdf
 
-  #*********************************
-  # 1. PLOT XY OF MONTHLY VALUES
-  #*********************************
+  try:
+   # Setting vector grid cell skipping parameters
+   skip1D = (slice(None, None, vec_skip))
+   skip2D = (slice(None, None, vec_skip), slice(None, None, vec_skip))
+
+   #*********************************
+   # 1. PLOT XY OF MONTHLY VALUES
+   #*********************************
  
-  if lineplot == True:
+   if lineplot == True:
 
-   print('Working on line plot...')
+    print('Working on line plot...')
 
-   #--------------------------------------------------
-   # Make variable of line plot values from variable
-   #--------------------------------------------------
+    #--------------------------------------------------
+    # Make variable of line plot values from variable
+    #--------------------------------------------------
 
-   # Use function to calculate index arrays for lat and lon
-   latarray, lonarray = lat_lon_index_array(lat=var.lat,lon=var.lon,slat=slat,nlat=nlat,wlon=wlon,elon=elon)
+    # Use the grid's cached region index to calculate index arrays for lat and lon
+    index = region_index(var.lat,var.lon)
+    latarray, lonarray = index.index_arrays(slat=slat,nlat=nlat,wlon=wlon,elon=elon)
 
-   # Spatially weight variable given region boundaries and print result (with metadata) to command line
-   lat_wgts = np.cos(np.deg2rad(var.lat))
+    # Spatially weight variable given region boundaries and print result (with metadata) to command line
+    lat_wgts = np.cos(np.deg2rad(var.lat))
 
-   # Initialize variable
-   var_xy = xr.DataArray(None,dims=['case','months'],coords=dict(case=cases,months=np.arange(1,13,1)))
+    # Initialize variable
+    var_xy = xr.DataArray(None,dims=['case','months'],coords=dict(case=cases,months=np.arange(1,13,1)))
 
-   # Load values for each case
-   for i in range(len(cases)):
-    rwgt = var[i,:,latarray,lonarray].weighted(lat_wgts[latarray])
-    var_xy[i,:] = rwgt.mean(('lon','lat'))
+    # Load values for each case
+    with span('weighted_mean'):
+     for i in range(len(cases)):
+      rwgt = var[i,:,latarray,lonarray].weighted(lat_wgts[latarray])
+      var_xy[i,:] = rwgt.mean(('lon','lat'))
 
-   #-----------------------
-   # Make values for title
-   #-----------------------
+    #-----------------------
+    # Make values for title
+    #-----------------------
  
-   # Create spacing to show lat/lon values as edge of grid cells rather than midpoint
-   latadj = abs(float((var.lat[1] - var.lat[2]) / 2))
-   lonadj = abs(float((var.lon[1] - var.lon[2]) / 2))
-
-   # Discover direction of latitude array
-   if var.lat[0] > 0:
-    lat_direction = 'N->S'
-   elif var.lat[0] < 0:
-    lat_direction = 'S->N'
-
-   # Discover treatment of longitude array
-   if any(i > 180. for i in var.lon):
-    lon_treatment = 'degW = 180-360'
-   elif any(i < 0. for i in var.lon):
-    lon_treatment = 'degW = -180-0'
-
-   # If longitude array treats degW as 180-360, modify lonw,lone
-   if lon_treatment == 'degW = 180-360':
-    if wlon < 0.:
-     wlon = wlon + 360
-    if elon < 0.:
-     elon = elon + 360
-
-   # Select coordinate indices
-   lats = list(var.lat.values).index(var.lat.sel(lat=slat, method='nearest').lat)
-   latn = list(var.lat.values).index(var.lat.sel(lat=nlat, method='nearest').lat)
-   lonw = list(var.lon.values).index(var.lon.sel(lon=wlon, method='nearest').lon)
-   lone = list(var.lon.values).index(var.lon.sel(lon=elon, method='nearest').lon)
-
-   # Define values for each coordinate to print
-   lats_val = np.array(var.lat[lats])
-   latn_val = np.array(var.lat[latn])
-   lonw_val = np.array(var.lon[lonw])
-   lone_val = np.array(var.lon[lone])
-
-   # Switch lons back to - = °W before printing, if necessary
-   if lon_treatment == 'degW = 180-360':
-    if lonw_val > 180.:
-     lonw_val = lonw_val - 360
-    if lone_val > 180.:
-     lone_val = lone_val - 360
-
-   #----------------
-   # Define figure
-   #----------------
+    # Create spacing to show lat/lon values as edge of grid cells rather than midpoint
+    latadj = abs(float((var.lat[1] - var.lat[2]) / 2))
+    lonadj = abs(float((var.lon[1] - var.lon[2]) / 2))
+
+    # Select coordinate indices
+    lats, latn, lonw, lone = index.bounds(slat=slat,nlat=nlat,wlon=wlon,elon=elon)
+
+    # Define values for each coordinate to print
+    lats_val = np.array(var.lat[lats])
+    latn_val = np.array(var.lat[latn])
+    lonw_val = np.array(var.lon[lonw])
+    lone_val = np.array(var.lon[lone])
+
+    # Switch lons back to - = °W before printing, if necessary
+    if index.lon_360:
+     if lonw_val > 180.:
+      lonw_val = lonw_val - 360
+     if lone_val > 180.:
+      lone_val = lone_val - 360
+
+    #----------------
+    # Define figure
+    #----------------
    
-   figxy = plt.figure(figsize=(figw,figh),dpi=fdpi)
-   axy = figxy.add_subplot(111)
+    figxy = plt.figure(figsize=(figw,figh),dpi=fdpi)
+    axy = figxy.add_subplot(111)
    
-   #---------------------
-   # Make xy plot
-   #---------------------
+    #---------------------
+    # Make xy plot
+    #---------------------
  
-   # Plot data
-   for i in range(len(cases)):
-    axy.plot(np.arange(1,13,1),var_xy[i,:],linestyle=linestyle[i],linewidth=linewidth[i],color=linecolor[i])
-
-   # Set title
-   #if xytitle == True: 
-   # axy.set_title(str(var_name)+' ('+str((lats_val-latadj).round(2))+' to '+str((latn_val+latadj).round(2))+'°N, '+str(
-   #                                      (lonw_val-lonadj).round(2))+' to '+str((lone_val+lonadj).round(2))+'°E)',
-   #                                      loc=xyttlloc,fontsize=xyttlfts,pad=xyttlpad)  
+    # Plot data
+    for i in range(len(cases)):
+     axy.plot(np.arange(1,13,1),var_xy[i,:],linestyle=linestyle[i],linewidth=linewidth[i],color=linecolor[i])
+
+    # Set title
+    #if xytitle == True: 
+    # axy.set_title(str(var_name)+' ('+str((lats_val-latadj).round(2))+' to '+str((latn_val+latadj).round(2))+'°N, '+str(
+    #                                      (lonw_val-lonadj).round(2))+' to '+str((lone_val+lonadj).round(2))+'°E)',
+    #                                      loc=xyttlloc,fontsize=xyttlfts,pad=xyttlpad)  
  
-   # Set legend
-   axy.legend(cases,frameon=leg_frame,framealpha=leg_framea,edgecolor=leg_edgecol,ncol=leg_ncol,loc=leg_loc,
-                    fontsize=leg_fontsz,title=leg_title,title_fontsize=leg_ttlfs,borderpad=leg_bdrpad)
+    # Set legend
+    axy.legend(cases,frameon=leg_frame,framealpha=leg_framea,edgecolor=leg_edgecol,ncol=leg_ncol,loc=leg_loc,
+                     fontsize=leg_fontsz,title=leg_title,title_fontsize=leg_ttlfs,borderpad=leg_bdrpad)
    
-   # Set X ticks and labels 
-   axy.set_xlim([0.9,12.1])
-   axy.set_xticks(np.arange(1,13,1))
-   axy.set_xticklabels(month_txt,fontsize=xy_tk_sz)
+    # Set X ticks and labels 
+    axy.set_xlim([0.9,12.1])
+    axy.set_xticks(np.arange(1,13,1))
+    axy.set_xticklabels(month_txt,fontsize=xy_tk_sz)
    
-   # Set Y ticks and labels
-   axy.tick_params(axis='y',which='major',labelsize=xy_tk_sz)
-   axy.set_ylabel(units,labelpad=xy_ypad,fontsize=xy_lbl_sz)
-   if ybot != None and ytop != None:
-    axy.set_ylim([ybot,ytop])
+    # Set Y ticks and labels
+    axy.tick_params(axis='y',which='major',labelsize=xy_tk_sz)
+    axy.set_ylabel(units,labelpad=xy_ypad,fontsize=xy_lbl_sz)
+    if ybot != None and ytop != None:
+     axy.set_ylim([ybot,ytop])
    
-   # Grid  
-   axy.grid(linewidth=gridw)
+    # Grid  
+    axy.grid(linewidth=gridw)
 
-  #*********************************
-  # 2. PLOT MAPS FOR EACH MONTH 
-  #*********************************
+    # Line plot is the first page
+    output.add(figxy)
 
-  if mapplot == True:
+   #*********************************
+   # 2. PLOT MAPS FOR EACH MONTH 
+   #*********************************
 
-   print('Working on map plots...')
-
-   #------------------------------------
-   # Determine how many plots to make
-   #------------------------------------
+   if mapplot == True:
 
-   if mapdiff == False: 
-    numpages = len(cases)
-    varplot  = varc
-    names    = cases 
-    if overlay_vec == True:
-     uplot = u
-     vplot = v
-   elif mapdiff == True:
-    numpages = len(cases)-1
-    varplot  = diff
-    names    = cases_diff
-    if overlay_vec == True:
-     uplot = udiff
-     vplot = vdiff
+    print('Working on map plots...')
 
-   #--------------------------------------------------------
-   # Loop through each PDF page and make monthly map plots 
-   #--------------------------------------------------------
+    #------------------------------------
+    # Determine how many plots to make
+    #------------------------------------
 
-   for i in range(numpages):  
+    if mapdiff == False: 
+     numpages = len(cases)
+     varplot  = varc
+     names    = cases 
+     if overlay_vec == True:
+      uplot = u
+      vplot = v
+    elif mapdiff == True:
+     numpages = len(cases)-1
+     varplot  = diff
+     names    = cases_diff
+     if overlay_vec == True:
+      uplot = udiff
+      vplot = vdiff
 
-    print(names[i]+'...')
+    #--------------------------------------------------------
+    # Loop through each PDF page and make monthly map plots 
+    #--------------------------------------------------------
 
-    #------------------
-    # Define figures
-    #------------------
+    for i in range(numpages):  
 
-    fig, axes = plt.subplots(nrows=4,ncols=3,figsize=(figw,figh),dpi=fdpi,subplot_kw={'projection':proj})
-    fig.subplots_adjust(hspace=hspace,wspace=wspace)
+     print(names[i]+'...')
 
-    #--------------
-    # Set titles 
-    #--------------
+     #------------------
+     # Define figures
+     #------------------
 
-    # Main title
-    fig.suptitle(str(var_name)+str(vec_name)+' '+names[i],fontsize=ttlfts,y=ttlhgt)
+     fig, axes = plt.subplots(nrows=4,ncols=3,figsize=(figw,figh),dpi=fdpi,subplot_kw={'projection':proj})
+     fig.subplots_adjust(hspace=hspace,wspace=wspace)
 
-    # Subplot titles
-    for r in range(4):
-     for c in range(3):
-      axes[r,c].set_title(month_txt[3*r+c],loc=spttlloc,fontsize=spttlfts,pad=spttlpad)
+     #--------------
+     # Set titles 
+     #--------------
 
-    #-------------------
-    # Set map extents  
-    #-------------------
-   
-    for r in range(4):
-     for c in range(3):
-      axes[r,c].set_extent([LonMin,LonMax,LatMin,LatMax],proj)
+     # Main title
+     fig.suptitle(str(var_name)+str(vec_name)+' '+names[i],fontsize=ttlfts,y=ttlhgt)
 
-    #---------------------
-    # Define figure map
-    #---------------------
+     # Subplot titles
+     for r in range(4):
+      for c in range(3):
+       axes[r,c].set_title(month_txt[3*r+c],loc=spttlloc,fontsize=spttlfts,pad=spttlpad)
 
-    for r in range(4):
-     for c in range(3):
-      if coast == True:
-       axes[r,c].add_feature(cfeature.COASTLINE,linewidths=coastlw)
-      if lake == True:
-       axes[r,c].add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
-      if border == True:
-       axes[r,c].add_feature(cfeature.BORDERS,linewidths=borderlw)
-      if usstate == True:
-       axes[r,c].add_feature(cfeature.STATES,linewidths=usstatelw)
-
-    #----------------------
-    # Set axes for maps
-    #----------------------
-
-    if add_axes == True:
-
-     # First three rows, first column (lat on left, no lon); [0,0] [1,0] [2,0]
-     for r in range(3):
-      map_ticks_and_labels(ax=axes[r,0],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                            xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                            glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                            top=False,bot=False,left=True,right=False)
-
-     # First three rows, middle column (no lat or lon); [0,1] [1,1] [2,1]
-     for r in range(3):
-      map_ticks_and_labels(ax=axes[r,1],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                            xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                            glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                            top=False,bot=False,left=False,right=False)
-
-     # First three rows, last column (lat on right, no lon); [0,2] [1,2] [2,2]
-     for r in range(3):
-      map_ticks_and_labels(ax=axes[r,2],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                            xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                            glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                            top=False,bot=False,left=False,right=True)
-
-     # Last row, first column (lat on left, lon on bottom); [3,0] 
-     map_ticks_and_labels(ax=axes[3,0],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                          xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                          glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                          top=False,bot=True,left=True,right=False)
-
-     # Last row, middle column (no lat, lon on bottom); [3,1] 
-     map_ticks_and_labels(ax=axes[3,1],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                          xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                          glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                          top=False,bot=True,left=False,right=False)
+     #-------------------
+     # Set map extents  
+     #-------------------
    
-     # Last row, last column (lat on right, lon on bottom); [3,2] 
-     map_ticks_and_labels(ax=axes[3,2],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
-                          xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
-                          glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
-                          top=False,bot=True,left=False,right=True)
-
-    #----------------------
-    # Plot variables 
-    #----------------------
-
-    for r in range(4):
-     for c in range(3):
-      if cntr_type == 'AreaFill':
-       cntr = varplot[i,3*r+c,:,:].plot.contourf(ax=axes[r,c],transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                                                 add_colorbar=False,add_labels=False,extend=extnd)
-      elif cntr_type == 'RasterFill':
-       cntr = varplot[i,3*r+c,:,:].plot(ax=axes[r,c],transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                                        add_colorbar=False,add_labels=False,extend=extnd)
-    
-      if overlay_vec == True:
-       vec = axes[r,c].quiver(uplot.lon[skip1D],uplot.lat[skip1D],uplot[i,3*r+c,:,:][skip2D],vplot[i,3*r+c,:,:][skip2D],scale_units='height',
-                              pivot='mid',scale=vec_scale,width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
-       qkey = axes[r,c].quiverkey(vec,0.8,0.2,vec_ref,str(int(vec_ref))+str(vec_units),labelpos='N',coordinates='figure',color='k')
-
-    #-------------------------------
-    # Color bar for plots 
-    #-------------------------------
-
-    cbar = fig.colorbar(cntr,ax=axes,orientation=cbar_orient,ticks=MultipleLocator(tkstd),shrink=cbar_shrk,pad=cbar_pad,label=units,
-                         spacing=cbar_sp)
-    cbar.ax.tick_params(labelsize=cbar_lblsz)
-
-    #------------------------------
-    # Add region and point to map
-    #------------------------------
+     for r in range(4):
+      for c in range(3):
+       axes[r,c].set_extent([LonMin,LonMax,LatMin,LatMax],proj)
 
-    if regbox == True or point == True:
+     #---------------------
+     # Define figure map
+     #---------------------
 
-     # Adjusters to put box around entire grid cell
-     latadj = abs(float((var.lat[1] - var.lat[2]) / 2))
-     lonadj = abs(float((var.lon[1] - var.lon[2]) / 2))
+     for r in range(4):
+      for c in range(3):
+       if coast == True:
+        basemap.add_basemap_feature(axes[r,c],cfeature.COASTLINE,linewidths=coastlw)
+       if lake == True:
+        basemap.add_basemap_feature(axes[r,c],cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
+       if border == True:
+        basemap.add_basemap_feature(axes[r,c],cfeature.BORDERS,linewidths=borderlw)
+       if usstate == True:
+        basemap.add_basemap_feature(axes[r,c],cfeature.STATES,linewidths=usstatelw)
+
+     #----------------------
+     # Set axes for maps
+     #----------------------
 
-    if regbox == True:
+     if add_axes == True:
 
-     # Handle values if °W = 180-360
-     if regwlon < 0.:
-      regwlon = regwlon + 360
-     if regelon < 0.:
-      regelon = regelon + 360
+      # First three rows, first column (lat on left, no lon); [0,0] [1,0] [2,0]
+      for r in range(3):
+       map_ticks_and_labels(ax=axes[r,0],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                             xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                             glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                             top=False,bot=False,left=True,right=False)
+
+      # First three rows, middle column (no lat or lon); [0,1] [1,1] [2,1]
+      for r in range(3):
+       map_ticks_and_labels(ax=axes[r,1],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                             xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                             glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                             top=False,bot=False,left=False,right=False)
+
+      # First three rows, last column (lat on right, no lon); [0,2] [1,2] [2,2]
+      for r in range(3):
+       map_ticks_and_labels(ax=axes[r,2],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                             xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                             glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                             top=False,bot=False,left=False,right=True)
+
+      # Last row, first column (lat on left, lon on bottom); [3,0] 
+      map_ticks_and_labels(ax=axes[3,0],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                           xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                           glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                           top=False,bot=True,left=True,right=False)
 
-     # Pick best values for region
-     slat = float(var.lat.sel(lat=regslat, method='nearest'))
-     nlat = float(var.lat.sel(lat=regnlat, method='nearest'))
-     wlon = float(var.lon.sel(lon=regwlon, method='nearest'))
-     elon = float(var.lon.sel(lon=regelon, method='nearest'))
+      # Last row, middle column (no lat, lon on bottom); [3,1] 
+      map_ticks_and_labels(ax=axes[3,1],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                           xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                           glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                           top=False,bot=True,left=False,right=False)
+   
+      # Last row, last column (lat on right, lon on bottom); [3,2] 
+      map_ticks_and_labels(ax=axes[3,2],LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
+                           xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
+                           glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
+                           top=False,bot=True,left=False,right=True)
 
-     # Handle values if °W = 180-360
-     if wlon > 180.0:
-      wlon = wlon - 360
-     if elon > 180.0:
-      elon = elon - 360
+     #----------------------
+     # Plot variables 
+     #----------------------
 
      for r in range(4):
       for c in range(3):
-       draw_region_box(ax=axes[r,c],slat=slat-latadj,nlat=nlat+latadj,wlon=wlon-lonadj,elon=elon+lonadj,
-                      linestyle=regline,facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=10)
-
-    if point == True:
-
-     # Pick best values for point
-     latpt = float(var.lat.sel(lat=ptlat, method='nearest'))
-     lonpt = float(var.lon.sel(lon=ptlon, method='nearest'))
-
-     # Handle values if °W = 180-360
-     if lonpt > 180.0:
-      lonpt = lonpt - 360
-
+       cntr = fill_map(varplot[i,3*r+c,:,:],axes[r,c],cntr_type=cntr_type,transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
+                       add_colorbar=False,add_labels=False,extend=extnd)
+    
+       if overlay_vec == True:
+        vec = axes[r,c].quiver(uplot.lon[skip1D],uplot.lat[skip1D],uplot[i,3*r+c,:,:][skip2D],vplot[i,3*r+c,:,:][skip2D],scale_units='height',
+                               pivot='mid',scale=vec_scale,width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
+        qkey = axes[r,c].quiverkey(vec,0.8,0.2,vec_ref,str(int(vec_ref))+str(vec_units),labelpos='N',coordinates='figure',color='k')
+
+     #-------------------------------
+     # Color bar for plots 
+     #-------------------------------
+
+     cbar = fig.colorbar(cntr,ax=axes,orientation=cbar_orient,ticks=mticker.MultipleLocator(tkstd),shrink=cbar_shrk,pad=cbar_pad,label=units,
+                          spacing=cbar_sp)
+     cbar.ax.tick_params(labelsize=cbar_lblsz)
+
+     #------------------------------
+     # Add region and point to map
+     #------------------------------
+
+     if regbox == True or point == True:
+
+      # Adjusters to put box around entire grid cell
+      latadj = abs(float((var.lat[1] - var.lat[2]) / 2))
+      lonadj = abs(float((var.lon[1] - var.lon[2]) / 2))
+
+     if regbox == True:
+
+      # Handle values if °W = 180-360
+      if regwlon < 0.:
+       regwlon = regwlon + 360
+      if regelon < 0.:
+       regelon = regelon + 360
+
+      # Pick best values for region
+      slat = float(var.lat.sel(lat=regslat, method='nearest'))
+      nlat = float(var.lat.sel(lat=regnlat, method='nearest'))
+      wlon = float(var.lon.sel(lon=regwlon, method='nearest'))
+      elon = float(var.lon.sel(lon=regelon, method='nearest'))
+
+      # Handle values if °W = 180-360
+      if wlon > 180.0:
+       wlon = wlon - 360
+      if elon > 180.0:
+       elon = elon - 360
+
+      for r in range(4):
+       for c in range(3):
+        draw_region_box(ax=axes[r,c],slat=slat-latadj,nlat=nlat+latadj,wlon=wlon-lonadj,elon=elon+lonadj,
+                       linestyle=regline,facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=10)
+
+     if point == True:
+
+      # Pick best values for point
+      latpt = float(var.lat.sel(lat=ptlat, method='nearest'))
+      lonpt = float(var.lon.sel(lon=ptlon, method='nearest'))
+
+      # Handle values if °W = 180-360
+      if lonpt > 180.0:
+       lonpt = lonpt - 360
+
+      for r in range(4):
+       for c in range(3):
+        axes[r,c].plot(lonpt,latpt,'ro',markersize=5)
+
+     #------------------------
+     # Add shapes to map  
+     #------------------------
+ 
      for r in range(4):
       for c in range(3):
-       axes[r,c].plot(lonpt,latpt,'ro',markersize=5)
+       for s in range(len(shape_type)):
+        axes[r,c].plot(shape_lons[s],shape_lats[s],marker=shape_type[s],markersize=shape_size[s],markerfacecolor='none',
+                        markeredgecolor=shape_col)
 
-    #------------------------
-    # Add shapes to map  
-    #------------------------
- 
-    for r in range(4):
-     for c in range(3):
-      for s in range(len(shape_type)):
-       axes[r,c].plot(shape_lons[s],shape_lats[s],marker=shape_type[s],markersize=shape_size[s],markerfacecolor='none',
-                       markeredgecolor=shape_col)
+     # Append page to output file and close it
+     output.add(fig)
  
-  #***********************
-  # Save output to file
-  #***********************
-
-  if mapdiff == False:
-   difftxt = ''
-  elif mapdiff == True:
-   difftxt = '_diff'
- 
-  save_multi_image('./'+str(folderpath)+'/seascycle'+difftxt+'_'+str(var_name)+str(vec_name)+'_'+str(extra_name)+str(filesuf))
-
-  plt.close('all')
+  finally:
+   # Only a file opened here is closed; a 'pdf' passed in stays open for more pages
+   if pdf == None:
+    output.close()
 
   ############################################################################################################
   # GIF animation
@@ -699,25 +694,21 @@ def plot_seasonal_cycle(
      axg.set_title(str(var_name)+str(vec_name)+' '+names[i]+' '+month_txt[x],loc=spttlloc,fontsize=spttlfts,pad=spttlpad)
      axg.set_extent([LonMin,LonMax,LatMin,LatMax],proj)
      if coast == True:
-      axg.add_feature(cfeature.COASTLINE,linewidths=coastlw)
+      basemap.add_basemap_feature(axg,cfeature.COASTLINE,linewidths=coastlw)
      if lake == True:
-      axg.add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
+      basemap.add_basemap_feature(axg,cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
      if border == True:
-      axg.add_feature(cfeature.BORDERS,linewidths=borderlw)
+      basemap.add_basemap_feature(axg,cfeature.BORDERS,linewidths=borderlw)
      if usstate == True:
-      axg.add_feature(cfeature.STATES,linewidths=usstatelw)
+      basemap.add_basemap_feature(axg,cfeature.STATES,linewidths=usstatelw)
      if add_axes == True:
       map_ticks_and_labels(ax=axg,LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,lattksp=lattksp,lontksp=lontksp,
                            xmin_mj=xmin_mj,ymin_mj=ymin_mj,tkmajlg=tkmajlg,tkminlg=tkminlg,proj=proj,glalpha=glalpha,
                            glcolor=glcolor,lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,tklblsz=tklblsz,
                            top=False,bot=True,left=True,right=True)
 
-     if cntr_type == 'AreaFill':
-       cntr = varplot[i,x,:,:].plot.contourf(ax=axg,transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                                                 add_colorbar=False,add_labels=False,extend=extnd)
-     elif cntr_type == 'RasterFill':
-       cntr = varplot[i,x,:,:].plot(ax=axg,transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
-                                        add_colorbar=False,add_labels=False,extend=extnd)
+     cntr = fill_map(varplot[i,x,:,:],axg,cntr_type=cntr_type,transform=proj,cmap=colort,levels=np.arange(loval,hival+spval,spval),
+                     add_colorbar=False,add_labels=False,extend=extnd)
      if overlay_vec == True:
       vec = axg.quiver(uplot.lon[skip1D],uplot.lat[skip1D],uplot[i,x,:,:][skip2D],vplot[i,x,:,:][skip2D],scale_units='height',
                        pivot='mid',scale=vec_scale,width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
@@ -726,7 +717,7 @@ def plot_seasonal_cycle(
     # Create animation with self-defined function above
     anim = animation.FuncAnimation(figg,animate_seas,frames=12,interval=gif_itvl)
     # Color bar
-    cbar = figg.colorbar(cntr,ax=axg,orientation=cbar_orient,ticks=MultipleLocator(tkstd),shrink=cbar_shrk,pad=cbar_pad,label=units,
+    cbar = figg.colorbar(cntr,ax=axg,orientation=cbar_orient,ticks=mticker.MultipleLocator(tkstd),shrink=cbar_shrk,pad=cbar_pad,label=units,
                         spacing=cbar_sp)
     cbar.ax.tick_params(labelsize=cbar_lblsz)
     # Region/point drawn on map
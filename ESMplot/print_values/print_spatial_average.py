@@ -7,7 +7,8 @@
 
 import numpy as np
 import xarray as xr
-from ESMplot.climate_analysis.coordinate_functions import lat_lon_index_array
+from ESMplot.climate_analysis.coordinate_functions import region_index
+from ESMplot.climate_analysis.profiling import profiled
 
 # Previously defined variables
 time_dim_names = ['time','month','months','year','years']
@@ -20,6 +21,7 @@ time_dim_names = ['time','month','months','year','years']
 # Print global average
 #---------------------
 
+@profiled
 def print_global_average(case: str,
                          variable: xr.DataArray,
                          units: str):
@@ -48,6 +50,7 @@ def print_global_average(case: str,
 # Print region average
 #---------------------
 
+@profiled
 def print_region_average(case: str,
                          variable: xr.DataArray,
                          units: str,
@@ -85,9 +88,9 @@ def print_region_average(case: str,
     else:
      time_dim = False
 
-    # Use function to calculate index arrays for lat and lon
-    latarray, lonarray = lat_lon_index_array(lat=variable.lat,lon=variable.lon,
-                                             slat=slat,nlat=nlat,wlon=wlon,elon=elon)
+    # Use the grid's cached region index to calculate index arrays for lat and lon
+    index = region_index(variable.lat,variable.lon)
+    latarray, lonarray = index.index_arrays(slat=slat,nlat=nlat,wlon=wlon,elon=elon)
 
     # Spatially weight variable given region boundaries and print result (with metadata) to command line
     lat_wgts = np.cos(np.deg2rad(variable.lat))
@@ -102,30 +105,8 @@ def print_region_average(case: str,
     latadj = abs(float((variable.lat[1] - variable.lat[2]) / 2))
     lonadj = abs(float((variable.lon[1] - variable.lon[2]) / 2))
 
-    # Discover direction of latitude array
-    if variable.lat[0] > 0:
-     lat_direction = 'N->S'
-    elif variable.lat[0] < 0:
-     lat_direction = 'S->N'
-
-    # Discover treatment of longitude array
-    if any(i > 180. for i in variable.lon):
-     lon_treatment = 'degW = 180-360' 
-    elif any(i < 0. for i in variable.lon):
-     lon_treatment = 'degW = -180-0' 
-
-    # If longitude array treats degW as 180-360, modify lonw,lone
-    if lon_treatment == 'degW = 180-360':
-     if wlon < 0.:    
-      wlon = wlon + 360
-     if elon < 0.:
-      elon = elon + 360
-
     # Select coordinate indices
-    lats = list(variable.lat.values).index(variable.lat.sel(lat=slat, method='nearest').lat)
-    latn = list(variable.lat.values).index(variable.lat.sel(lat=nlat, method='nearest').lat)
-    lonw = list(variable.lon.values).index(variable.lon.sel(lon=wlon, method='nearest').lon)
-    lone = list(variable.lon.values).index(variable.lon.sel(lon=elon, method='nearest').lon)
+    lats, latn, lonw, lone = index.bounds(slat=slat,nlat=nlat,wlon=wlon,elon=elon)
 
     # Define values for each coordinate to print
     lats_val = np.array(variable.lat[lats])
@@ -134,7 +115,7 @@ def print_region_average(case: str,
     lone_val = np.array(variable.lon[lone])
 
     # Switch lons back to - = °W before printing, if necessary
-    if lon_treatment == 'degW = 180-360':
+    if index.lon_360:
      if lonw_val > 180.:
       lonw_val = lonw_val - 360 
      if lone_val > 180.:
@@ -148,6 +129,7 @@ def print_region_average(case: str,
 # Print point average
 #---------------------
 
+@profiled
 def print_point_average(case: str,
                         variable: xr.DataArray,
                         units: str,
@@ -185,27 +167,16 @@ def print_point_average(case: str,
     latadj = abs(float((variable.lat[1] - variable.lat[2]) / 2))
     lonadj = abs(float((variable.lon[1] - variable.lon[2]) / 2))
 
-    # Discover treatment of longitude array
-    if any(i > 180. for i in variable.lon):
-     lon_treatment = 'degW = 180-360'
-    elif any(i < 0. for i in variable.lon):
-     lon_treatment = 'degW = -180-0'
-
-    # If longitude array treats degW as 180-360, modify lonw,lone
-    if lon_treatment == 'degW = 180-360':
-     if lonpt < 0.:
-      lonpt = lonpt + 360
-   
     # Select coordinate indices
-    lat_ind = list(variable.lat.values).index(variable.lat.sel(lat=latpt, method='nearest').lat)
-    lon_ind = list(variable.lon.values).index(variable.lon.sel(lon=lonpt, method='nearest').lon)
+    index = region_index(variable.lat,variable.lon)
+    lat_ind, lon_ind = index.nearest(latpt=latpt,lonpt=lonpt)
 
     # Define values for each coordinate to print 
     lat_val = np.array(variable.lat[lat_ind])
     lon_val = np.array(variable.lon[lon_ind])
 
     # Switch lon back to - = °W before printing, if necessary
-    if lon_treatment == 'degW = 180-360':
+    if index.lon_360:
      if lon_val > 180.:
       lon_val = lon_val - 360
 
@@ -0,0 +1,436 @@
+#######################################################################################################
+#
+# Single-pass reader for water tagged CESM output. A CaseReader is given every product needed from one
+# case (precipitation, precipitation isotopes and any number of tag regions), works out which raw
+# variables those products require, reads each of them exactly once and builds all of the 12 month
+# climatologies together. Seasonal averages are then taken from the stored climatologies without going
+# back to the file.
+#
+#######################################################################################################
+
+import numpy as np
+import xarray as xr
+from ESMplot.climate_analysis.climatology import clmMonTLL,clmMonTLLL,clmMonBlocks
+from ESMplot.climate_analysis.mon_wgt_avg import mon_wgt_avg
+from ESMplot.climate_analysis.dataset_cache import open_cached_dataset
+from ESMplot.climate_analysis.execution import compute
+from ESMplot.watertagging.seas_avg_LL_watertags import watertag_weighting
+from ESMplot.watertagging.virtual_tags import expand_tags, weighted_sum
+from ESMplot.climate_analysis.profiling import profiled, span
+
+# Default arrays
+default_wgt_mon = np.ones(12)
+
+# Precipitation isotope products and the water species they are built from (light, heavy)
+rainiso_species = {'d18O': ('H216O','H218O'),
+                   'dHDO': ('H2O','HDO')}
+rainiso_types = ['d18O','dHDO','dexcess']
+
+#######################################################################################################
+# Raw variable names
+#######################################################################################################
+
+def precip_family(species: str,
+                  tagcode: str = None) -> list:
+
+  '''Returns the four CESM precipitation variables (convective rain, convective snow, large-scale rain,
+  large-scale snow) whose sum is the total precipitation of a water species. For untagged precipitation
+  'species' is the species name (ex. 'H218O'). For tagged precipitation 'tagcode' is the tag region code
+  and 'species' is '' for the light (16O) tag variables or '18O' for the heavy tag variables.'''
+
+  if tagcode == None:
+   return ['PRECRC_'+species+'r','PRECSC_'+species+'s','PRECRL_'+species+'R','PRECSL_'+species+'S']
+  else:
+   return ['PRECRC_'+tagcode+species+'r','PRECSC_'+tagcode+species+'s',
+           'PRECRL_'+tagcode+species+'R','PRECSL_'+tagcode+species+'S']
+
+#######################################################################################################
+# Reader for all products of a single case
+#######################################################################################################
+
+class CaseReader:
+
+  '''Reads every requested product of one water tagged case in a single pass through its netCDF file.
+
+  Required Parameters
+  --------------------------------------------------------------------------------------------------------
+  path
+   class: 'string', The file path to the netCDF file containing the output variables to be read in.
+
+  Optional Parameters
+  --------------------------------------------------------------------------------------------------------
+  products: class 'list', Untagged products to calculate. Options are 'prect' (PRECC + PRECL) and the
+                          precipitation isotope types 'd18O', 'dHDO' and 'dexcess'. Isotope products
+                          always include 'prect', which they are weighted by. Default = ['prect']
+  tagcodes: class 'list', Code names of the tagged regions to calculate. Each tag provides the tagged
+                          precipitation and its d18O, as in 'seasavg_watertagging_vars'. Combined tags
+                          registered with register_combined_tag are summed from their source tags when
+                          the file does not have them. Default = []
+  begi, endi: class 'string' or 'int', Determines the first and last time element to be included in
+                                       analysis. Defaults 'beg' and 'end' read in the entire length of
+                                       the file. Specifying an integer will read in time from begi as int
+                                       to endi as int. If integers, (endi-begi)/12 must be multiple of 12.
+  ptiny: class 'float', Minimum value for light isotopic variable. This is required in the calculation of
+                        isotopes so as not to have artificially high delta values due to extremely low
+                        light isotopic values. Default = 1.E-18
+  mult: class 'float', A float value that becomes a scalar to precipitation values. Assumes original
+                       variable is in m/s. Default = 86400000., which converts m/s to mm/day
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for opening the file lazily, ex. {'time': 120}. All products are
+                        then built as one dask graph and computed together by 'load' on all cores.
+                        Requires dask. Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
+  _______________________________________________________________________________________________________
+
+  Example
+  ---------------------
+  reader = CaseReader(path,products=['prect','d18O'],tagcodes=tagcodes,begi=begi,endi=endi)
+  prect = reader.seasavg('prect',months=MON,wgt_mon=wgt_mon)
+  d18Op = reader.seasavg('d18O',months=MON,wgt_mon=wgt_mon)
+  Pi, d18Opsink = reader.seasavg_tag(tagcodes[0],months=MON,wgt_mon=wgt_mon)
+  Pi_by_tag, d18Opsink_by_tag = reader.seasavg_tags(months=MON,wgt_mon=wgt_mon) # every tag, [tag x lat x lon]
+
+  Climatologies are calculated on first use (or by calling 'load') and kept for the life of the reader.
+
+  '''
+
+  def __init__(self,
+               path: str,
+               products: list = ['prect'],
+               tagcodes: list = [],
+               begi: str = 'beg',
+               endi: str = 'end',
+               ptiny: float = 1.E-18,
+               mult: float = 86400000.,
+               block_years: int = None,
+               chunks: dict = None,
+               scheduler: str = None):
+
+   #-----------------------------
+   # Ensure type of parameters
+   #-----------------------------
+
+   self.path = str(path)
+   self.products = [str(p) for p in products]
+   self.tagcodes = [str(t) for t in tagcodes]
+   self.ptiny = float(ptiny)
+   self.mult = float(mult)
+   self.block_years = block_years
+   self.chunks = chunks
+   self.scheduler = scheduler
+
+   for product in self.products:
+    if product != 'prect' and product not in rainiso_types:
+     raise ValueError("Unknown product '"+product+"'. Options are 'prect', "+", ".join(rainiso_types))
+
+   # Isotopes are weighted by precipitation, so it is always needed with them
+   if 'prect' not in self.products:
+    self.products.insert(0,'prect')
+
+   #-----------------------------------
+   # Read in dataset
+   #-----------------------------------
+
+   self.data = open_cached_dataset(self.path,chunks=self.chunks)
+
+   # Assign values for begi and endi
+   self.begi = 0 if begi == 'beg' else begi
+   self.endi = len(self.data.time) if endi == 'end' else endi
+
+   self.lat = self.data.lat
+   self.lon = self.data.lon
+
+   # Climatologies [12 months x lat x lon] and tag stacks [12 months x tag x lat x lon], filled by 'load'
+   self.clim = {}
+   self.tag_clim = ()
+
+   # Number of reads of each raw variable (one per block of years when streaming)
+   self.reads = {}
+
+  #----------------------------------------------------------------------------------
+  # Plan which raw variables are needed
+  #----------------------------------------------------------------------------------
+
+  def plan(self) -> list:
+
+   '''Returns the unique raw variable names that will be read from the file, in the order they are read.'''
+
+   names = ['PRECC','PRECL']
+
+   for iso_type in rainiso_species:
+    if iso_type in self.products or 'dexcess' in self.products:
+     light, heavy = rainiso_species[iso_type]
+     names += precip_family(light) + precip_family(heavy)
+
+   for species in ['','18O']:
+    for tagcode in self._tag_sources(species)[0]:
+     names += precip_family(species,tagcode)
+
+   return list(dict.fromkeys(names))
+
+  def _tag_sources(self,
+                   species: str) -> tuple:
+
+   # Tags stored in the file, and how each requested (possibly combined) tag is made from them
+   return expand_tags(self.tagcodes,lambda tagcode: precip_family(species,tagcode)[0] in self.data)
+
+  #----------------------------------------------------------------------------------
+  # Read in and sum a family of raw variables
+  #----------------------------------------------------------------------------------
+
+  def _read_sum(self,
+                names: list,
+                t0: int,
+                t1: int) -> xr.DataArray:
+
+   total = None
+   with span('precip_sum'):
+    for name in names:
+     values = self.data[name][t0:t1,:,:].data
+     if self.chunks == None:
+      values = np.asarray(values)
+     self.reads[name] = self.reads.get(name,0) + 1
+     total = values if total is None else total + values
+
+   return xr.DataArray(total,dims=['time','lat','lon'],coords=dict(lat=self.lat,lon=self.lon))
+
+  def _read_tags(self,
+                 species: str,
+                 t0: int,
+                 t1: int) -> xr.DataArray:
+
+   # Tagged precipitation of every tag, stacked [time x tag x lat x lon]. Each stored tag is read once,
+   # also when it is a source of one or more combined tags
+   sources, terms = self._tag_sources(species)
+   totals = {tagcode: self._read_sum(precip_family(species,tagcode),t0,t1) for tagcode in sources}
+   stack = [weighted_sum(terms[tagcode],totals) for tagcode in self.tagcodes]
+
+   return xr.concat(stack,dim=xr.DataArray(self.tagcodes,dims=['tag'],name='tag')).transpose('time','tag','lat','lon')
+
+  def _delta(self,
+             light: xr.DataArray,
+             heavy: xr.DataArray) -> xr.DataArray:
+
+   # Remove extremely small values from light isotopic variable and calculate delta values
+   light = xr.where(light < self.ptiny,self.ptiny,light)
+
+   return ( (heavy / light) - 1. ) * 1000.
+
+  def _clims(self,
+             read_block,
+             clm = clmMonTLL) -> tuple:
+
+   # Seasonal cycles of every variable returned by 'read_block', in one pass through time
+   if self.block_years == None:
+    return tuple(clm(var_time) for var_time in read_block(self.begi,self.endi))
+
+   return clmMonBlocks(read_block,self.begi,self.endi,self.block_years)
+
+  #----------------------------------------------------------------------------------
+  # Build all climatologies in one pass
+  #----------------------------------------------------------------------------------
+
+  def load(self):
+
+   '''Reads every raw variable in 'plan' exactly once and builds the climatologies of all products.
+   Products are read in groups that share no variables (precipitation, precipitation isotopes, each
+   tag), and each group's raw time series are released as soon as its climatologies are built.'''
+
+   if self.clim:
+    return self
+
+   #----------------------------------------------------------------------------------
+   # Precipitation (stored unscaled, 'mult' is applied to returned values)
+   #----------------------------------------------------------------------------------
+
+   self.clim['prect'], = self._clims(lambda t0,t1: (self._read_sum(['PRECC','PRECL'],t0,t1),))
+
+   #----------------------------------------------------------------------------------
+   # Precipitation isotopes, sharing each species between the products that use it
+   #----------------------------------------------------------------------------------
+
+   iso_products = [p for p in self.products if p in rainiso_types]
+
+   def read_rainiso(t0,t1):
+    deltas = {}
+    for iso_type in rainiso_species:
+     if iso_type in self.products or 'dexcess' in self.products:
+      light, heavy = rainiso_species[iso_type]
+      deltas[iso_type] = self._delta(self._read_sum(precip_family(light),t0,t1),
+                                     self._read_sum(precip_family(heavy),t0,t1))
+    if 'dexcess' in self.products:
+     deltas['dexcess'] = deltas['dHDO'] - 8 * deltas['d18O']
+    return tuple(deltas[p] for p in iso_products)
+
+   if iso_products:
+    self.clim.update(zip(iso_products,self._clims(read_rainiso)))
+
+   #----------------------------------------------------------------------------------
+   # Tagged precipitation and d18O, every tag together as one stack
+   #----------------------------------------------------------------------------------
+
+   if self.tagcodes:
+
+    def read_tags(t0,t1):
+     liso = self._read_tags('',t0,t1)
+     hiso = self._read_tags('18O',t0,t1)
+     return liso, self._delta(liso,hiso)
+
+    self.tag_clim = self._clims(read_tags,clm=lambda var_time: clmMonTLLL(var_time,lev_dim='tag'))
+
+   #----------------------------------------------------------------------------------
+   # Compute every product together if dask was used
+   #----------------------------------------------------------------------------------
+
+   keys = list(self.clim)
+   clims = [self.clim[k] for k in keys] + list(self.tag_clim)
+   clims = compute(*clims,scheduler=self.scheduler)
+   clims = clims if isinstance(clims,tuple) else (clims,)
+   self.clim = dict(zip(keys,clims[:len(keys)]))
+   self.tag_clim = tuple(clims[len(keys):])
+
+   return self
+
+  #----------------------------------------------------------------------------------
+  # Access climatologies
+  #----------------------------------------------------------------------------------
+
+  def climatology(self,
+                  product: str) -> xr.DataArray:
+
+   '''Returns the seasonal cycle [12 months x lat x lon] of an untagged product. Precipitation is
+   scaled by 'mult', matching seascyc_prect_TLL; isotopes match seascyc_rainiso_TLL.'''
+
+   self.load()
+
+   if product == 'prect':
+    return self.clim['prect']*self.mult
+
+   return self.clim[product]
+
+  def tag_climatology(self,
+                      tagcode: str) -> tuple:
+
+   '''Returns the seasonal cycles [12 months x lat x lon] of tagged precipitation (scaled by 'mult')
+   and tagged d18O for the tag region 'tagcode'.'''
+
+   self.load()
+   Pi_clim, d18O_clim = (clim.sel(tag=str(tagcode),drop=True) for clim in self.tag_clim)
+
+   return Pi_clim*self.mult, d18O_clim
+
+  #----------------------------------------------------------------------------------
+  # Seasonal averages
+  #----------------------------------------------------------------------------------
+
+  def _prect_weighted(self,
+                      iso_clim: xr.DataArray,
+                      wtvar_clim: xr.DataArray,
+                      months: list,
+                      wgt_mon: xr.DataArray) -> xr.DataArray:
+
+   # Remove any negative or fill values from wtvar and set to NaN
+   wtvar_proc = xr.where((wtvar_clim <= 0.) | (wtvar_clim > 1E29),float('NaN'),wtvar_clim)
+   wtvar = xr.DataArray(wtvar_proc,dims=['time','lat','lon'])
+   iso = xr.DataArray(iso_clim,dims=['time','lat','lon'])
+
+   # Weight precipitation by fractional length of each month, then weight isotopes by precipitation
+   wtvar_mon_wgt = xr.DataArray(wgt_mon*wtvar[months,:,:],dims=['time','lat','lon'])
+
+   return xr.DataArray( xr.DataArray(wtvar_mon_wgt*iso[months,:,:]).sum(dim='time') / \
+                        xr.DataArray(wtvar_mon_wgt).sum(dim='time')                   )
+
+  def seasavg(self,
+              product: str,
+              months: list,
+              wgt_mon: xr.DataArray = default_wgt_mon) -> xr.DataArray:
+
+   '''Returns the seasonal average [lat x lon] of an untagged product. 'prect' is weighted by the
+   fractional length of each month (as in seasavg_prect_LL) and isotope products are additionally
+   weighted by precipitation amount (as in seasavg_rainiso_LL).'''
+
+   months = list(months)
+   wgt_mon = xr.DataArray(wgt_mon,dims=['time'])
+
+   if product == 'prect':
+    return mon_wgt_avg(var=self.climatology('prect'),months=months,wgt_mon=wgt_mon)
+
+   return self._prect_weighted(self.climatology(product),self.clim['prect'],months,wgt_mon)
+
+  def seasavg_tag(self,
+                  tagcode: str,
+                  months: list,
+                  wgt_mon: xr.DataArray = default_wgt_mon) -> tuple:
+
+   '''Returns the seasonally averaged tagged precipitation and d18O [lat x lon] for the tag region
+   'tagcode', identical to the output of seasavg_watertagging_vars: Pi, d18Opsink'''
+
+   Pi, d18Opsink = self.seasavg_tags(months=months,wgt_mon=wgt_mon,tagcodes=[tagcode])
+
+   return Pi.isel(tag=0,drop=True), d18Opsink.isel(tag=0,drop=True)
+
+  def seasavg_tags(self,
+                   months: list,
+                   wgt_mon: xr.DataArray = default_wgt_mon,
+                   tagcodes: list = None) -> tuple:
+
+   '''Returns the seasonally averaged tagged precipitation and d18O [tag x lat x lon] of every tag region
+   (or only those in 'tagcodes'), weighted for all tags in one operation. Identical to the output of
+   seasavg_watertagging_batch: Pi, d18Opsink'''
+
+   months = list(months)
+   wgt_mon = xr.DataArray(wgt_mon,dims=['time'])
+
+   if not self.tagcodes:
+    raise ValueError('No tagcodes were given to this CaseReader')
+
+   self.load()
+   prect_clim, d18O_clim = self.tag_clim
+   if tagcodes != None:
+    prect_clim = prect_clim.sel(tag=[str(t) for t in tagcodes])
+    d18O_clim = d18O_clim.sel(tag=[str(t) for t in tagcodes])
+
+   Pi_monwgt, d18Opwt_tag = watertag_weighting(prect_clim,d18O_clim,months,wgt_mon)
+
+   # PRECT
+   Pi = xr.DataArray(Pi_monwgt,dims=['tag','lat','lon'],
+                     coords=dict(tag=prect_clim.tag,lat=self.lat,lon=self.lon))*self.mult
+
+   # d18Op
+   d18Opsink = xr.DataArray(d18Opwt_tag,dims=['tag','lat','lon'],
+                            coords=dict(tag=prect_clim.tag,lat=self.lat,lon=self.lon))
+
+   return Pi, d18Opsink
+
+#######################################################################################################
+# Every water tagging product of one case, for running cases in parallel
+#######################################################################################################
+
+@profiled
+def watertag_case_products(path: str,
+                           tagcodes: list,
+                           months: list,
+                           wgt_mon: xr.DataArray = default_wgt_mon,
+                           begi: str = 'beg',
+                           endi: str = 'end',
+                           ptiny: float = 1.E-18,
+                           isotope: str = 'd18O') -> tuple:
+
+  '''Returns the seasonally averaged precipitation and precipitation isotopes [lat x lon] and the tagged
+  precipitation and d18O of every tag region [tag x lat x lon] of one case, read in a single pass with a
+  CaseReader: prect, d18Op, Pi_tags, d18Opsink_tags. Parameters are as in CaseReader and
+  CaseReader.seasavg; 'isotope' is the untagged isotope product ('d18O', 'dHDO' or 'dexcess'). Used with
+  run_cases to read the cases of a comparison in parallel, ex.
+
+  prect_global, d18Op_global, Pi_by_tag, d18Opsink_by_tag = run_cases(watertag_case_products,CASES,
+         cases=cases,kwargs=dict(tagcodes=tagcodes,months=MON,begi=begi,endi=endi),
+         case_kwargs=dict(wgt_mon=[wgt_mon[i,:] for i in range(len(CASES))]))'''
+
+  reader = CaseReader(path=path,products=['prect',isotope],tagcodes=tagcodes,begi=begi,endi=endi,ptiny=ptiny)
+
+  prect = reader.seasavg('prect',months=months,wgt_mon=wgt_mon)
+  d18Op = reader.seasavg(isotope,months=months,wgt_mon=wgt_mon)
+  Pi_tags, d18Opsink_tags = reader.seasavg_tags(months=months,wgt_mon=wgt_mon)
+
+  return prect, d18Op, Pi_tags, d18Opsink_tags
@@ -1,21 +1,97 @@
 #######################################################################################################
-# 
+#
 # -aaf
 # This function combines the variables associated with a given list of tagged regions
 #   to compare the input with other water tag experiments that use different tags.
 # For example, combine Europe and Asia tags to compare with an experiment that uses a Eurasia tag.
 # Note that the outer edges of the combined tags must be equal to the comparison target.
 #
+# combine_regions_to_new_tags makes several combined tags (ex. ERAS, NAMG, NATL, NPAC) in one pass
+#   and can stream the result to a netCDF file chunk by chunk.
+#
 #######################################################################################################
 
+import os
 import re
+from contextlib import contextmanager, nullcontext
 from collections import defaultdict
+import numpy as np
 import xarray as xr
+from ESMplot.climate_analysis.profiling import profiled
 
-def combine_regions_to_new_tag(
-    ds: xr.Dataset,
-    regions=("EURO", "NASA", "INDA", "SASA"),
-    new_region="ERAS",
+# Default size in MB of one dask chunk of a variable in the combined dataset
+default_chunk_mb = 64.
+
+# netCDF chunk cache (MB per variable) while streaming; netCDF's default of 64 MB per variable of both
+# the input and output files would hold most of a file in memory
+stream_chunk_cache_mb = 1.
+
+def _region_index(ds: xr.Dataset, new_regions: dict):
+    """
+    Group the data variables of `ds` by the combined tag they belong to, scanning them once.
+
+    Returns ({(new_region, prefix, sep, tail): {region: variable name}}, [names of region variables]).
+    A source region listed under several new regions is used by each of them.
+    """
+    owners = defaultdict(list)    # source region -> new regions that use it
+    for new_region, regions in new_regions.items():
+        if not regions:
+            raise ValueError(f"Provide at least one region prefix for new region '{new_region}'.")
+        for r in regions:
+            owners[r].append(new_region)
+
+    # longest codes first, so a code that starts with another code is matched whole
+    region_alt = "|".join(map(re.escape, sorted(owners, key=len, reverse=True)))
+    pat = re.compile(rf"^(?P<prefix>.*?)(?P<sep>_)?(?P<region>{region_alt})(?P<tail>.+)$")
+
+    groups = defaultdict(dict)
+    region_vars = []
+
+    for vname in ds.data_vars:
+        m = pat.match(vname)
+        if m:
+            for new_region in owners[m.group("region")]:
+                key = (new_region, m.group("prefix") or "", m.group("sep") or "", m.group("tail"))
+                groups[key][m.group("region")] = vname
+            region_vars.append(vname)
+
+    return groups, region_vars
+
+def _time_chunks(ds: xr.Dataset, time_dim: str, chunk_mb: float) -> dict:
+    """
+    Chunk sizes along `time_dim` so one chunk of the largest variable is about `chunk_mb` MB, in whole
+    netCDF chunks of the file so each netCDF chunk is read and written once.
+    """
+    if time_dim not in ds.dims:
+        return {}
+    tvars = [da for da in ds.data_vars.values() if time_dim in da.dims]
+    step_bytes = max([da.dtype.itemsize * float(np.prod(da.shape)) / ds.sizes[time_dim] for da in tvars] or [1.0])
+    file_chunk = max([da.encoding["chunksizes"][da.dims.index(time_dim)] for da in tvars
+                      if da.encoding.get("chunksizes") is not None] or [1])
+    steps = max(1, int(float(chunk_mb) * 1e6 // step_bytes) // file_chunk) * file_chunk
+    return {time_dim: int(min(ds.sizes[time_dim], steps))}
+
+@contextmanager
+def _chunk_cache(mb: float):
+    """
+    Use a netCDF chunk cache of `mb` MB per variable for files opened or created inside the block.
+    """
+    try:
+        import netCDF4
+    except ImportError:
+        yield
+        return
+    previous = netCDF4.get_chunk_cache()
+    netCDF4.set_chunk_cache(int(float(mb) * 2**20))
+    try:
+        yield
+    finally:
+        netCDF4.set_chunk_cache(*previous)
+
+@profiled
+def combine_regions_to_new_tags(
+    ds: xr.Dataset | str,
+    new_regions: dict = {"ERAS": ("EURO", "NASA", "INDA", "SASA")},
     *,
     # math/combination controls
     weights: dict | None = None,       # per-region multipliers before summing
@@ -31,60 +107,64 @@ def combine_regions_to_new_tag(
     annotate_sources: bool = True,           # add helper attrs like 'combined_from_regions'
     consensus_only_keys: set | None = None,  # if set, only require consensus for these keys
     prefer_keys_first_present: tuple = (),   # keys to always take from preferred source even if consensus mode
-    keep_nonregion_vars: bool = True
-) -> xr.Dataset:
-    """
-    Sum per-region variables into a new region (e.g., ERAS) while inheriting attrs/encoding.
-
-    Matches variables named like:
-      [<prefix>][<sep>]<REGION><tail>
-    where <prefix> is optional, <sep> is an optional underscore, <REGION>∈regions,
-    and <tail> is the suffix (e.g., '18OI', 'V', 'r', etc.).
+    keep_nonregion_vars: bool = True,
 
-    Output variable name:
-      f"{prefix}{sep}{new_region}{tail}"
+    # output controls
+    path: str | None = None,                 # write the result to this netCDF file, chunk by chunk
+    chunk_mb: float | None = default_chunk_mb,  # size of one dask chunk along time (None: no chunking)
+    time_dim: str = "time"
+):
+    """
+    Sum per-region variables into several new regions at once, e.g.
+      {"ERAS": ("EURO", "NASA", "INDA", "SASA"), "NAMG": ("WNAM", "ENAM"),
+       "NATL": ("WNAT", "ENAT"), "NPAC": ("WNPA", "ENPA")}
+    Gives the same variables as chaining combine_regions_to_new_tag once per new region, but the
+    data variables are matched to the new regions in one scan and every combined variable is a lazy
+    running sum of its (weighted) sources, so nothing is read until the result is used or written.
+    The options are those of combine_regions_to_new_tag; `weights` maps each source region to its
+    multiplier, and a '<new_region>_missing_regions_info' attribute is added for each new region
+    with incomplete groups when `require_all` is set.
 
-    Attribute inheritance:
-      - prefer_order: copy attrs from the first region in `regions` that appears in the group
-      - consensus: copy only keys whose values are identical across all present inputs
-      - You can also:
-          * specify `consensus_only_keys` to require consensus only for a subset (e.g., {'units'})
-          * specify `prefer_keys_first_present` to always take some keys from the preferred source
-      - We also optionally copy `.encoding`.
+    `ds` may be a dataset or the path of a netCDF file. Unless it is already chunked with dask (or
+    `chunk_mb` is None), it is split into chunks of about `chunk_mb` MB along `time_dim`, so the
+    returned xr.Dataset is lazy and writing it reads, sums and writes one chunk at a time. If `path`
+    is given, the result is written to that netCDF file, one chunk at a time in this thread, and the
+    path is returned instead; when `ds` is also a path, both files use a small netCDF chunk cache, so
+    memory use does not depend on the size of the file.
     """
-    if not regions:
-        raise ValueError("Provide at least one region prefix in `regions`.")
+    if inherit_attrs not in ("prefer_order", "consensus"):
+        raise ValueError("inherit_attrs must be 'prefer_order' or 'consensus'")
 
-    region_alt = "|".join(map(re.escape, regions))
-    pat = re.compile(rf"^(?P<prefix>.*?)(?P<sep>_)?(?P<region>{region_alt})(?P<tail>.+)$")
+    new_regions = {new_region: tuple(regions) for new_region, regions in new_regions.items()}
+    if not new_regions:
+        raise ValueError("Provide at least one new region in `new_regions`.")
 
-    groups = defaultdict(dict)    # (prefix, sep, tail) -> {region: DataArray}
-    region_vars = []
+    if isinstance(ds, (str, os.PathLike)):
+        with _chunk_cache(stream_chunk_cache_mb):
+            ds = xr.open_dataset(ds)
 
-    for vname, da in ds.data_vars.items():
-        m = pat.match(vname)
-        if m:
-            key = (m.group("prefix") or "", m.group("sep") or "", m.group("tail"))
-            groups[key][m.group("region")] = da
-            region_vars.append(vname)
+    if chunk_mb is not None and all(da.chunks is None for da in ds.data_vars.values()):
+        ds = ds.chunk(_time_chunks(ds, time_dim, chunk_mb))
 
-    def _preferred_region(present_regions):
+    groups, region_vars = _region_index(ds, new_regions)
+
+    def _preferred_region(regions, present_regions):
         # first region in declared order that is present
         for r in regions:
             if r in present_regions:
                 return r
         return present_regions[0]
 
-    def _merge_attrs(das_by_region: dict[str, xr.DataArray]):
+    def _merge_attrs(regions, das_by_region: dict[str, xr.DataArray]):
         present_regions = list(das_by_region.keys())
         # pick preferred source DA
-        pref_region = _preferred_region(present_regions)
+        pref_region = _preferred_region(regions, present_regions)
         pref_da = das_by_region[pref_region]
         merged = {}
 
         if inherit_attrs == "prefer_order":
             merged = dict(pref_da.attrs)
-        elif inherit_attrs == "consensus":
+        else:
             # union of keys across inputs
             keys = set().union(*(da.attrs.keys() for da in das_by_region.values()))
             for k in keys:
@@ -104,62 +184,58 @@ def combine_regions_to_new_tag(
                     else:
                         # skip conflicting key
                         continue
-        else:
-            raise ValueError("inherit_attrs must be 'prefer_order' or 'consensus'")
 
         if annotate_sources:
             merged["combined_from_regions"] = ",".join(sorted(present_regions))
-            merged["source_attr_region"] = _preferred_region(present_regions)
+            merged["source_attr_region"] = pref_region
             merged["combine_operation"] = "sum"
         return merged, pref_da.encoding if copy_encoding else None
 
     new_vars = {}
-    missing_summary = {}
+    missing_summary = defaultdict(dict)
 
-    for (prefix, sep, tail), reg_map in groups.items():
+    # new variables are made in the order of `new_regions`, as when chaining single combinations
+    order = list(new_regions)
+    for (new_region, prefix, sep, tail), reg_map in sorted(groups.items(), key=lambda g: order.index(g[0][0])):
+        regions = new_regions[new_region]
         present = [r for r in regions if r in reg_map]  # keep canonical order
         if require_all and len(present) != len(regions):
-            missing_summary[(prefix, sep, tail)] = sorted(set(regions) - set(present))
+            missing_summary[new_region][(prefix, sep, tail)] = sorted(set(regions) - set(present))
             continue
 
         if not present:
             continue
 
         # align inputs in the same order as `present`
-        das = [reg_map[r] for r in present]
-        das_aligned = xr.align(*das, join=join)
+        das_aligned = xr.align(*[ds[reg_map[r]] for r in present], join=join)
 
-        # apply weights (as multipliers) before summing
-        if weights is None:
-            arr = xr.concat(das_aligned, dim="__region__")
-        else:
-            arr = xr.concat(
-                [d * float(weights.get(r, 0.0)) for d, r in zip(das_aligned, present)],
-                dim="__region__",
-            )
-
-        if zero_fill and join != "exact":
-            arr = arr.fillna(0)
-
-        eras = arr.sum(dim="__region__", skipna=skipna).astype(dtype)
+        # running sum of the (weighted) inputs; each term is only read when the sum is computed
+        total = None
+        for d, r in zip(das_aligned, present):
+            if weights is not None:
+                d = d * float(weights.get(r, 0.0))
+            if skipna or (zero_fill and join != "exact"):
+                d = d.fillna(0)
+            total = d if total is None else total + d
+        combined = total.astype(dtype)
 
         # inherit attrs & encoding
-        das_by_region_aligned = {r: d for r, d in zip(present, das_aligned)}
-        merged_attrs, exemplar_encoding = _merge_attrs(das_by_region_aligned)
-        eras.attrs = merged_attrs
+        merged_attrs, exemplar_encoding = _merge_attrs(regions, dict(zip(present, das_aligned)))
+        combined.attrs = merged_attrs
         if copy_encoding and isinstance(exemplar_encoding, dict):
             # avoid copying incompatible keys; xarray will ignore unknowns on write
-            eras.encoding = dict(exemplar_encoding)
+            combined.encoding = dict(exemplar_encoding)
 
         # name & stash
         new_name = f"{prefix}{sep}{new_region}{tail}"
-        eras.name = new_name
-        new_vars[new_name] = eras
+        combined.name = new_name
+        new_vars[new_name] = combined
 
     # assemble output
     parts = []
     if keep_nonregion_vars:
-        keep = [v for v in ds.data_vars if v not in set(region_vars)]
+        region_set = set(region_vars)
+        keep = [v for v in ds.data_vars if v not in region_set]
         parts.append(ds[keep])
     else:
         parts.append(xr.Dataset(coords=ds.coords))
@@ -168,7 +244,83 @@ def combine_regions_to_new_tag(
     ds_out = xr.merge(parts)
     ds_out.attrs = dict(ds.attrs)
 
-    if missing_summary:
-        ds_out.attrs[f"{new_region}_missing_regions_info"] = str(missing_summary)
+    for new_region, missing in missing_summary.items():
+        ds_out.attrs[f"{new_region}_missing_regions_info"] = str(missing)
+
+    if path is None:
+        return ds_out
+
+    # netCDF reads and writes are serialized anyway, so the synchronous scheduler is as fast and starts
+    # no thread pool
+    if any(da.chunks is not None for da in ds_out.data_vars.values()):
+        import dask
+        scheduler = dask.config.set(scheduler="synchronous")
+    else:
+        scheduler = nullcontext()
+    with _chunk_cache(stream_chunk_cache_mb), scheduler:
+        ds_out.to_netcdf(path)
+    return path
+
+@profiled
+def combine_regions_to_new_tag(
+    ds: xr.Dataset,
+    regions=("EURO", "NASA", "INDA", "SASA"),
+    new_region="ERAS",
+    *,
+    # math/combination controls
+    weights: dict | None = None,       # per-region multipliers before summing
+    require_all: bool = False,         # only combine when *all* regions for a group are present
+    join: str = "exact",               # "exact" or "outer"
+    zero_fill: bool = False,           # if join!="exact": fill NaNs with 0 before summing
+    skipna: bool = True,               # ignore NaNs when summing
+    dtype: str = "float32",
+
+    # attribute/encoding inheritance controls
+    inherit_attrs: str = "prefer_order",     # "prefer_order" | "consensus"
+    copy_encoding: bool = True,              # try to copy .encoding (e.g., _FillValue, scale_factor)
+    annotate_sources: bool = True,           # add helper attrs like 'combined_from_regions'
+    consensus_only_keys: set | None = None,  # if set, only require consensus for these keys
+    prefer_keys_first_present: tuple = (),   # keys to always take from preferred source even if consensus mode
+    keep_nonregion_vars: bool = True
+) -> xr.Dataset:
+    """
+    Sum per-region variables into a new region (e.g., ERAS) while inheriting attrs/encoding.
+
+    Matches variables named like:
+      [<prefix>][<sep>]<REGION><tail>
+    where <prefix> is optional, <sep> is an optional underscore, <REGION>∈regions,
+    and <tail> is the suffix (e.g., '18OI', 'V', 'r', etc.).
+
+    Output variable name:
+      f"{prefix}{sep}{new_region}{tail}"
+
+    Attribute inheritance:
+      - prefer_order: copy attrs from the first region in `regions` that appears in the group
+      - consensus: copy only keys whose values are identical across all present inputs
+      - You can also:
+          * specify `consensus_only_keys` to require consensus only for a subset (e.g., {'units'})
+          * specify `prefer_keys_first_present` to always take some keys from the preferred source
+      - We also optionally copy `.encoding`.
+
+    To make several new regions, call combine_regions_to_new_tags once rather than chaining calls.
+    """
+    if not regions:
+        raise ValueError("Provide at least one region prefix in `regions`.")
 
-    return ds_out
+    return combine_regions_to_new_tags(
+        ds,
+        {new_region: tuple(regions)},
+        weights=weights,
+        require_all=require_all,
+        join=join,
+        zero_fill=zero_fill,
+        skipna=skipna,
+        dtype=dtype,
+        inherit_attrs=inherit_attrs,
+        copy_encoding=copy_encoding,
+        annotate_sources=annotate_sources,
+        consensus_only_keys=consensus_only_keys,
+        prefer_keys_first_present=prefer_keys_first_present,
+        keep_nonregion_vars=keep_nonregion_vars,
+        chunk_mb=None,
+    )
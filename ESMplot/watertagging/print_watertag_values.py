@@ -7,16 +7,18 @@
 import numpy as np
 import xarray as xr
 import pandas as pd
-from ESMplot.climate_analysis import seas_avg_LL as seasavg
-from ESMplot.watertagging.seas_avg_LL_watertags import seasavg_watertagging_vars
-from ESMplot.climate_analysis.coordinate_functions import lat_lon_index_array
+from ESMplot.watertagging.case_reader import CaseReader
+from ESMplot.climate_analysis.coordinate_functions import region_index, region_weights, region_mean
+from ESMplot.climate_analysis.dataset_cache import open_cached_dataset
 from warnings import simplefilter
+from ESMplot.climate_analysis.profiling import profiled
 
 # Default arrays
-default_wgt_mon = xr.DataArray(np.ones(12),dims=['time']).astype(float)
+default_wgt_mon = np.ones(12)
 
 #######################################################################################################
 
+@profiled
 def print_watertag_values(precip: xr.DataArray, d18Op: xr.DataArray,
                           precip_sum: float, d18Op_sum: float,
                           precip_reg_gbl: float, d18Op_reg_gbl: float,
@@ -70,44 +72,8 @@ def print_watertag_values(precip: xr.DataArray, d18Op: xr.DataArray,
   # Define region/point 
   #----------------------------
 
-  # Process coordinates
-  latadj = abs(np.float64((lat[2]-lat[1])/2))
-  lonadj = abs(np.float64((lon[2]-lon[1])/2))
-
-  # Discover direction of latitude array
-  if lat[0] > 0:
-   lat_direction = 'N->S'
-  elif lat[0] < 0:
-   lat_direction = 'S->N'
-
-  # Discover treatment of longitude array
-  if any(i > 180. for i in lon):
-   lon_treatment = 'degW = 180-360'
-  elif any(i < 0. for i in lon):
-   lon_treatment = 'degW = -180-0'
-
-  # If longitude array treats degW as 180-360, modify lonw,lone
-  if lon_treatment == 'degW = 180-360':
-   if wlon < 0.:
-    wlon = wlon + 360
-   if elon < 0.:
-    elon = elon + 360
-
-  # Select coordinate indices
-  lats = list(lat.values).index(lat.sel(lat=slat, method='nearest').lat)
-  latn = list(lat.values).index(lat.sel(lat=nlat, method='nearest').lat)
-  lonw = list(lon.values).index(lon.sel(lon=wlon, method='nearest').lon)
-  lone = list(lon.values).index(lon.sel(lon=elon, method='nearest').lon)
-
-  # Define perimeter
-  rlats = np.float64(lat[lats]-latadj)
-  rlatn = np.float64(lat[latn]+latadj)
-  rlonw = np.float64(lon[lonw]-lonadj)
-  rlone = np.float64(lon[lone]+lonadj)
-  if rlonw > 180:
-    rlonw = rlonw - 360
-  if rlone > 180:
-    rlone = rlone - 360
+  # Define perimeter (grid cell edges of the region)
+  rlats, rlatn, rlonw, rlone = region_index(lat,lon).perimeter(slat=slat,nlat=nlat,wlon=wlon,elon=elon)
 
   #-----------------------------------------------------------------------------------
   # Convert to pandas df and then print values in neat columns 
@@ -134,6 +100,7 @@ def print_watertag_values(precip: xr.DataArray, d18Op: xr.DataArray,
 
 #######################################################################################################################
 
+@profiled
 def monthly_watertag_values_to_excel(CASES: str, cases: str, tagnames: list,tagcodes: list, 
                                      begi: str = 'beg', endi: str = 'end',
                                      slat: float = None, nlat: float = None,   
@@ -141,6 +108,8 @@ def monthly_watertag_values_to_excel(CASES: str, cases: str, tagnames: list,tagc
                                      folderpath: str = '', reg_name: str = '', filesuf: str = '.xlsx'):
 
   '''Print monthly values for precipitation and d18Op for each tag region for all cases to an Excel file. 
+  The 12 month climatologies of each case are built once (with a CaseReader) and every month is taken 
+  from them, so the cost is about that of a single seasonal average per case.
 
   Required Parameters
   ---------------------------------------------------------------------------------------------------------------
@@ -184,7 +153,7 @@ def monthly_watertag_values_to_excel(CASES: str, cases: str, tagnames: list,tagc
   months_str = ['Jan','Feb','Mar','Apr','May','Jun','Jul','Aug','Sep','Oct','Nov','Dec']
 
   # Dataset for dimensions
-  ds = xr.open_dataset(CASES[0])
+  ds = open_cached_dataset(CASES[0])
 
   # Assign values for begi and endi
   begi = 0 if begi == 'beg' else begi
@@ -205,22 +174,6 @@ def monthly_watertag_values_to_excel(CASES: str, cases: str, tagnames: list,tagc
   d18Opsink_by_tag = xr.DataArray(None,dims=['case','tag','months','lat','lon'],
                                        coords=dict(case=cases,tag=tagcodes,months=months_str,
                                                    lat=ds.lat,lon=ds.lon)).astype(float)
-  d18Opwt_by_tag = xr.DataArray(None,dims=['case','tag','months','lat','lon'],
-                                       coords=dict(case=cases,tag=tagcodes,months=months_str,
-                                                   lat=ds.lat,lon=ds.lon)).astype(float)
-  # Average value for each tag [case,tag]
-  prect = xr.DataArray(None,dims=['case','tag','months'],coords=dict(case=cases,tag=tagcodes,
-                                                                     months=months_str))
-  d18Op = xr.DataArray(None,dims=['case','tag','months'],coords=dict(case=cases,tag=tagcodes,
-                                                                     months=months_str))
-
-  # Global variable's average of the selected region
-  prect_reg = xr.DataArray(None,dims=['case','months'],coords=dict(case=cases,months=months_str))
-  d18Op_reg = xr.DataArray(None,dims=['case','months'],coords=dict(case=cases,months=months_str))
-
-  # Sum of all tagged region values
-  prect_sum = xr.DataArray(None,dims=['case','months'],coords=dict(case=cases,months=months_str))
-  d18Op_sum = xr.DataArray(None,dims=['case','months'],coords=dict(case=cases,months=months_str))
 
   #-----------------------------------
   # Loop through each case and month
@@ -230,6 +183,11 @@ def monthly_watertag_values_to_excel(CASES: str, cases: str, tagnames: list,tagc
   
    print('Working on Excel for '+str(cases[i]))
 
+   # Read every product of this case in a single pass through its file, building the 12 month
+   # climatologies once; each month below is taken from them
+   reader = CaseReader(path=CASES[i],products=['prect','d18O'],tagcodes=tagcodes[:len(tagnames)],
+                                     begi=begi,endi=endi,ptiny=1.E-18).load()
+
    # Loop through each month
 
    for moni in range(12):
@@ -241,102 +199,51 @@ def monthly_watertag_values_to_excel(CASES: str, cases: str, tagnames: list,tagc
     #-----------------------------------------------------------------
 
     # PRECT
-    prect_global[i,moni,:,:] = seasavg.seasavg_prect_LL(path=CASES[i],begi=begi,endi=endi,months=mon,
-                                                   wgt_mon=[1.])
+    prect_global[i,moni,:,:] = reader.seasavg('prect',months=mon,wgt_mon=[1.])
 
     # d18Op
-    d18Op_global[i,moni,:,:] = seasavg.seasavg_rainiso_LL(iso_type='d18O',path=CASES[i],begi=begi,endi=endi,
-                                                         ptiny=1.E-18,months=mon,wgt_mon=[1.])
+    d18Op_global[i,moni,:,:] = reader.seasavg('d18O',months=mon,wgt_mon=[1.])
 
     #-----------------------------
-    # Loop through each tag
+    # Every tag at once
     #-----------------------------
 
-    for tag in range(len(tagnames)):
-
-     Pi_by_tag[i,tag,moni,:,:], d18Opsink_by_tag[i,tag,moni,:,:] = seasavg_watertagging_vars(
-
-          # Inputs for functions:
-          tagcode=tagcodes[tag],months=mon,path=CASES[i],begi=begi,endi=endi,wgt_mon=[1.])
-
-    #-----------------------------------
-    # Perform calculation on variables
-    #-----------------------------------
+    Pi_tags, d18Opsink_tags = reader.seasavg_tags(months=mon,wgt_mon=[1.])
+    Pi_by_tag[i,:len(tagnames),moni,:,:] = Pi_tags
+    d18Opsink_by_tag[i,:len(tagnames),moni,:,:] = d18Opsink_tags
 
-    # Initialize latitude weights
-    lat = ds.lat
-    lon = ds.lon
-    lat_wgts = np.cos(np.deg2rad(lat))
+  #-----------------------------------------------------------
+  # Perform calculation on variables for every case and month
+  #-----------------------------------------------------------
 
-    # Create list arrays of lat and lon values for regional averaging
-    latarray, lonarray = lat_lon_index_array(lat=ds.lat,lon=ds.lon,slat=slat,nlat=nlat,
-                                                                    wlon=wlon,elon=elon)
+  # Coordinates
+  lat = ds.lat
+  lon = ds.lon
 
-    # Loop through each tag to calculate prect and d18Op tag region values 
-    for tag in range(len(tagnames)):
+  # Area weights of the region, built once and applied to all cases, tags and months together
+  region = region_weights(lat=ds.lat,lon=ds.lon,slat=slat,nlat=nlat,wlon=wlon,elon=elon)
 
-     # Use water tagging equation: d18Opwt@gc = d18Op_tag@gc * ( total16Op_tag@gc / prect_global@gc )
-     d18Opwt_by_tag[i,tag,moni,:,:] = d18Opsink_by_tag[i,tag,moni,:,:] * ( 
-                                        Pi_by_tag[i,tag,moni,:,:] / prect_global[i,moni,:,:] )
+  # Use water tagging equation: d18Opwt@gc = d18Op_tag@gc * ( total16Op_tag@gc / prect_global@gc )
+  d18Opwt_by_tag = d18Opsink_by_tag * ( Pi_by_tag / prect_global )
 
-     # Area weight prect and d18Op for tagged region average
-     prect_wgt         = Pi_by_tag[i,tag,moni,latarray,lonarray].weighted(lat_wgts[latarray])
-     prect[i,tag,moni] = prect_wgt.mean(('lon','lat'))
-     d18Op_wgt         = d18Opwt_by_tag[i,tag,moni,latarray,lonarray].weighted(lat_wgts[latarray])
-     d18Op[i,tag,moni] = d18Op_wgt.mean(('lon','lat'))
+  # Area weight prect and d18Op for tagged region average [case,tag,months]
+  prect = region_mean(Pi_by_tag,region)
+  d18Op = region_mean(d18Opwt_by_tag,region)
 
-    # Calculate tagged region average with global variables to check against tagged variables
-    prect_global_wgt  = prect_global[i,moni,latarray,lonarray].weighted(lat_wgts[latarray])
-    prect_reg[i,moni] = prect_global_wgt.mean(('lon','lat'))
-    d18Op_global_wgt  = d18Op_global[i,moni,latarray,lonarray].weighted(lat_wgts[latarray])
-    d18Op_reg[i,moni] = d18Op_global_wgt.mean(('lon','lat'))
+  # Calculate tagged region average with global variables to check against tagged variables [case,months]
+  prect_reg = region_mean(prect_global,region)
+  d18Op_reg = region_mean(d18Op_global,region)
 
-    # Sum tag values together
-    prect_sum[i,moni] = np.sum(prect[i,:,moni])
-    d18Op_sum[i,moni] = np.sum(d18Op[i,:,moni])
+  # Sum tag values together [case,months]
+  prect_sum = prect[:,:len(tagnames),:].sum('tag')
+  d18Op_sum = d18Op[:,:len(tagnames),:].sum('tag')
 
   #--------------------------------------
   # Define region/point for output file 
   #--------------------------------------
 
-  # Process coordinates
-  latadj = abs(np.float64((lat[2]-lat[1])/2))
-  lonadj = abs(np.float64((lon[2]-lon[1])/2))
-
-  # Discover direction of latitude array
-  if lat[0] > 0:
-   lat_direction = 'N->S'
-  elif lat[0] < 0:
-   lat_direction = 'S->N'
-
-  # Discover treatment of longitude array
-  if any(i > 180. for i in lon):
-   lon_treatment = 'degW = 180-360'
-  elif any(i < 0. for i in lon):
-   lon_treatment = 'degW = -180-0'
-
-  # If longitude array treats degW as 180-360, modify lonw,lone
-  if lon_treatment == 'degW = 180-360':
-   if wlon < 0.:
-    wlon = wlon + 360
-   if elon < 0.:
-    elon = elon + 360
-
-  # Select coordinate indices
-  lats = list(lat.values).index(lat.sel(lat=slat, method='nearest').lat)
-  latn = list(lat.values).index(lat.sel(lat=nlat, method='nearest').lat)
-  lonw = list(lon.values).index(lon.sel(lon=wlon, method='nearest').lon)
-  lone = list(lon.values).index(lon.sel(lon=elon, method='nearest').lon)
-
-  # Define perimeter
-  rlats = np.float64(lat[lats]-latadj)
-  rlatn = np.float64(lat[latn]+latadj)
-  rlonw = np.float64(lon[lonw]-lonadj)
-  rlone = np.float64(lon[lone]+lonadj)
-  if rlonw > 180:
-    rlonw = rlonw - 360
-  if rlone > 180:
-    rlone = rlone - 360
+  # Define perimeter (grid cell edges of the region)
+  rlats, rlatn, rlonw, rlone = region_index(lat,lon).perimeter(slat=slat,nlat=nlat,wlon=wlon,elon=elon)
 
   #---------------------------------------
   # Construct Excel file from variables 
@@ -8,16 +8,21 @@
 
 import numpy as np
 import xarray as xr
-from ESMplot.climate_analysis.climatology import clmMonTLL
+from ESMplot.climate_analysis.climatology import clmMonTLLL,clmMonBlocks
 from ESMplot.climate_analysis.mon_wgt_avg import mon_wgt_avg
+from ESMplot.climate_analysis.dataset_cache import open_cached_dataset
+from ESMplot.climate_analysis.execution import compute
+from ESMplot.climate_analysis.profiling import profiled, span
+from ESMplot.watertagging.virtual_tags import expand_tags, weighted_sum
 
 # Default arrays
-default_wgt_mon = xr.DataArray(np.ones(12),dims=['time']).astype(float)
+default_wgt_mon = np.ones(12)
 
 #######################################################################################################
 # Precipitation isotopes: d18Op, dDp, or dexcess of precip 
 #######################################################################################################
 
+@profiled
 def seasavg_watertagging_vars(tagcode:str,
                               months: list,
                               path: str,
@@ -25,7 +30,10 @@ def seasavg_watertagging_vars(tagcode:str,
                               endi: str = 'end',
                               ptiny: float = 1.E-18,
                               mult: float = 86400000.,
-                              wgt_mon: xr.DataArray = default_wgt_mon) -> xr.DataArray:
+                              wgt_mon: xr.DataArray = default_wgt_mon,
+                              block_years: int = None,
+                              chunks: dict = None,
+                              scheduler: str = None) -> xr.DataArray:
 
   '''Reads in precipitation isotopes and precpitation (here defined as the sum of 16O variables) from a 
   netCDF file (that includes a dimension for time) and creates a seasonally averaged global map for a
@@ -35,7 +43,8 @@ def seasavg_watertagging_vars(tagcode:str,
   Required Parameters                       
   --------------------------------------------------------------------------------------------------------
   tagcode
-   class: 'string', Code name of tagged region. This parameter is used for reading in water tag variables.  
+   class: 'string', Code name of tagged region. This parameter is used for reading in water tag variables. 
+                    May be a combined tag registered with register_combined_tag (see virtual_tags.py).  
 
   months
    class: 'list', A list of indices that defines the months to be included in the seasonal average.
@@ -61,6 +70,11 @@ def seasavg_watertagging_vars(tagcode:str,
                                      paleoclimate analysis when the relative weight of each month differed 
                                      from the values of today. Must be same size as 'months'. Default = all 
                                      months have the same weight. Will revert to default if not specified. 
+  block_years: class 'int', Years read and averaged at a time (see clmMonBlocks in climatology.py).
+                            Default = None reads the whole time series at once.
+  chunks: class 'dict', Dask chunk sizes for reading lazily, ex. {'time': 120} (see execution.py).
+                        Default = None reads the variables into memory with NumPy.
+  scheduler: class 'string', Dask scheduler used with 'chunks' (see execution.py). Default = None
   _______________________________________________________________________________________________________
 
   Returns
@@ -70,11 +84,134 @@ def seasavg_watertagging_vars(tagcode:str,
 
   '''
 
+  # A batch of one tag (see seasavg_watertagging_batch below to calculate many tags together)
+  Pi, d18Opsink = seasavg_watertagging_batch(tagcodes=[str(tagcode)],months=months,path=path,begi=begi,
+                                             endi=endi,ptiny=ptiny,mult=mult,wgt_mon=wgt_mon,
+                                             block_years=block_years,chunks=chunks,scheduler=scheduler)
+
+  return Pi.isel(tag=0,drop=True), d18Opsink.isel(tag=0,drop=True)
+
+#######################################################################################################
+# Precipitation isotopes for many tag regions at once: stacks of (tag x lat x lon) 
+#######################################################################################################
+
+def watertag_stack(data: xr.Dataset,
+                   tagcodes: list,
+                   species: str,
+                   t0: int,
+                   t1: int) -> xr.DataArray:
+
+  '''Reads in the total tagged precipitation (convective + large-scale, rain + snow) of water species 
+  'species' ('' for the light 16O tag variables or '18O' for the heavy tag variables) for every tag region 
+  in 'tagcodes' and time indices t0 to t1, and stacks it into one variable [time x tag x lat x lon]. 
+  Combined tags registered with register_combined_tag that are not in the file are summed from their 
+  source tags, each of which is read once.'''
+
+  # Tags stored in the file, and how each requested tag is made from them
+  sources, terms = expand_tags(tagcodes,lambda tagcode: 'PRECRC_'+tagcode+species+'r' in data)
+
+  with span('precip_sum',tags=len(tagcodes)):
+   totals = {tagcode: data['PRECRC_'+tagcode+species+'r'][t0:t1,:,:] + \
+                      data['PRECSC_'+tagcode+species+'s'][t0:t1,:,:] + \
+                      data['PRECRL_'+tagcode+species+'R'][t0:t1,:,:] + \
+                      data['PRECSL_'+tagcode+species+'S'][t0:t1,:,:] for tagcode in sources}
+   stack = [weighted_sum(terms[tagcode],totals) for tagcode in tagcodes]
+
+   return xr.concat(stack,dim=xr.DataArray(list(tagcodes),dims=['tag'],name='tag')).transpose('time','tag','lat','lon')
+
+@profiled
+def watertag_weighting(prect_clim: xr.DataArray,
+                       d18O_clim: xr.DataArray,
+                       months: list,
+                       wgt_mon: xr.DataArray = default_wgt_mon) -> tuple:
+
+  '''Seasonally averages the climatologies [12 months x ...] of tagged precipitation and tagged d18O, 
+  for one tag [12 x lat x lon] or a stack of tags [12 x tag x lat x lon] in one operation. Precipitation 
+  is weighted by the fractional length of each month and d18O by seasonal rainfall as well. Returns the 
+  unscaled precipitation and the d18O of precipitation with the month dimension removed: Pi, d18Opsink'''
+
+  #----------------------------------------------------------------------------------
+  # Process variables before performing weighting
+  #----------------------------------------------------------------------------------
+
+  wgt_mon = xr.DataArray(wgt_mon,dims=['time'])
+
+  # Remove any negative or fill values from wtvar and set to NaN
+  wtvar = xr.where((prect_clim <= 0.) | (prect_clim > 1E29),float('NaN'),prect_clim)
+
+  #----------------------------------------------------------------------------------------------------
+  # Weight precipitation monthly values by multiplying them by fractional length of each month
+  # NOTE: 'wgt_mon' variable will already account for how many months are present in the calculation,
+  #       but 'wtvar' will not, so need to index 'months' for 'wtvar' here
+  #----------------------------------------------------------------------------------------------------
+
+  # result -> [months x ...], precip weighted by month
+  wtvar_mon_wgt = wgt_mon*wtvar[months]
+
+  #----------------------------------------------------------------------------------------------------
+  # Weight isotopic values by seasonal rainfall
+  # NOTE: 'wtvar_mon_wgt' variable already accounts for how many months are present, but 'iso' does not 
+  #----------------------------------------------------------------------------------------------------
+
+  d18Opsink = (wtvar_mon_wgt*d18O_clim[months]).sum(dim='time') / wtvar_mon_wgt.sum(dim='time')
+
+  # PRECT 
+  Pi = mon_wgt_avg(var=prect_clim,months=months,wgt_mon=wgt_mon)
+
+  return Pi, d18Opsink
+
+@profiled
+def seasavg_watertagging_batch(tagcodes: list,
+                               months: list,
+                               path: str,
+                               begi: str = 'beg',
+                               endi: str = 'end',
+                               ptiny: float = 1.E-18,
+                               mult: float = 86400000.,
+                               wgt_mon: xr.DataArray = default_wgt_mon,
+                               block_years: int = None,
+                               chunks: dict = None,
+                               scheduler: str = None) -> xr.DataArray:
+
+  '''Same as seasavg_watertagging_vars, but for a list of tag regions at once. The tagged variables of 
+  every tag are read into one (time x tag x lat x lon) stack, and the ptiny clamp, delta values, 
+  climatologies and monthly and rainfall weighting are each done once for the whole stack rather than 
+  once per tag.
+
+  Required Parameters                       
+  --------------------------------------------------------------------------------------------------------
+  tagcodes
+   class: 'list', Code names of the tagged regions. Ex. ['NPAC','SPAC']. May include combined tags 
+                  registered with register_combined_tag.
+
+  months
+   class: 'list', A list of indices that defines the months to be included in the seasonal average.
+                  Ex. Annual average = [0,1,2,3,4,5,6,7,8,9,10,11] or JJA average = [5,6,7]
+
+  path
+   class: 'string', The file path to the netCDF file containing the tagged output variables.
+
+  Optional Parameters                       
+  --------------------------------------------------------------------------------------------------------
+  begi, endi, ptiny, mult, wgt_mon, block_years, chunks, scheduler: As in seasavg_watertagging_vars. With 
+                                                                    'block_years', memory use grows with 
+                                                                    the number of tags times the block 
+                                                                    length. 
+  _______________________________________________________________________________________________________
+
+  Returns
+  ---------------------
+  output: :class:'xarray.DataArray'
+          Seasonally averaged variables for every tag: Pi [tag,lat,lon], d18Opsink [tag,lat,lon], with 
+          coordinate 'tag' = tagcodes
+
+  '''
+
   #-----------------------------
   # Ensure type of parameters
   #-----------------------------
 
-  tagcode = str(tagcode)
+  tagcodes = [str(tagcode) for tagcode in tagcodes]
   months = list(months)
   path = str(path)
   ptiny = float(ptiny)
@@ -85,87 +222,57 @@ def seasavg_watertagging_vars(tagcode:str,
   #-----------------------------------
 
   # Read in dataset 
-  data = xr.open_dataset(path)
+  data = open_cached_dataset(path,chunks=chunks)
 
   # Assign values for begi and endi
   begi = 0 if begi == 'beg' else begi
   endi = len(data.time) if endi == 'end' else endi
 
   #----------------------------------------------------------------------------------
-  # Calculate seasonal cycle of precipitation 
+  # Read in tagged precipitation and d18O of every tag for time indices t0 to t1
   #----------------------------------------------------------------------------------
 
-  # Read in light isotopic values
-  liso_d18O_init = xr.DataArray(data['PRECRC_'+tagcode+'r'][begi:endi,:,:] + \
-                                data['PRECSC_'+tagcode+'s'][begi:endi,:,:] + \
-                                data['PRECRL_'+tagcode+'R'][begi:endi,:,:] + \
-                                data['PRECSL_'+tagcode+'S'][begi:endi,:,:])
+  def read_block(t0,t1):
 
-  # Seasonal cycle of liso_d18O
-  prect_clim = clmMonTLL(liso_d18O_init) 
+   # Read in light isotopic values
+   liso_d18O_init = watertag_stack(data,tagcodes,'',t0,t1)
 
-  #----------------------------------------------------------------------------------
-  # Calculate seasonal cycle of d18Op
-  #----------------------------------------------------------------------------------
+   # Remove extremely small values from light isotopic variable
+   liso_d18O = xr.where(liso_d18O_init < ptiny,ptiny,liso_d18O_init)
 
-  # Remove extremely small values from light isotopic variable
-  liso_d18O = xr.where(liso_d18O_init < ptiny,ptiny,liso_d18O_init)
+   # Read in heavy isotopic values
+   hiso_d18O = watertag_stack(data,tagcodes,'18O',t0,t1)
 
-  # Read in heavy isotopic values
-  hiso_d18O = xr.DataArray(data['PRECRC_'+tagcode+'18Or'][begi:endi,:,:] + \
-                           data['PRECSC_'+tagcode+'18Os'][begi:endi,:,:] + \
-                           data['PRECRL_'+tagcode+'18OR'][begi:endi,:,:] + \
-                           data['PRECSL_'+tagcode+'18OS'][begi:endi,:,:])
+   # Calculate delta values
+   d18O = ( (hiso_d18O / liso_d18O) - 1. ) * 1000.
 
-  # Calculate delta values
-  d18O = ( (hiso_d18O / liso_d18O) - 1. ) * 1000.
-
-  # Perform seasonal averaging
-  d18O_clim = clmMonTLL(d18O)
+   return liso_d18O_init, d18O
 
   #----------------------------------------------------------------------------------
-  # Process variables before performing weighting
+  # Calculate seasonal cycles of precipitation and d18Op [12 months x tag x lat x lon]
   #----------------------------------------------------------------------------------
 
-  # Remove any negative or fill values from wtvar and set to NaN
-  wtvar_proc = xr.where((prect_clim <= 0.) | (prect_clim > 1E29),float('NaN'),prect_clim)
-
-  # Set weight variable (prect) as standardized xr.DataArray
-  wtvar = xr.DataArray(wtvar_proc,dims=['time','lat','lon'])
-
-  # Set iso variable (d18O) as standardized xr.DataArray
-  iso = xr.DataArray(d18O_clim,dims=['time','lat','lon'])
-
-  #----------------------------------------------------------------------------------------------------
-  # Weight precipitation monthly values by multiplying them by fractional length of each month
-  # NOTE: 'wgt_mon' variable will already account for how many months are present in the calculation,
-  #       but 'wtvar' will not, so need to index 'months' for 'wtvar' here
-  #----------------------------------------------------------------------------------------------------
+  if block_years == None:
+   liso_d18O_init, d18O = read_block(begi,endi)
+   prect_clim = clmMonTLLL(liso_d18O_init,lev_dim='tag') 
+   d18O_clim = clmMonTLLL(d18O,lev_dim='tag')
+  else:
+   prect_clim, d18O_clim = clmMonBlocks(read_block,begi,endi,block_years)
 
-  # result -> [months x lat x lon], precip weighted by month
-  wtvar_mon_wgt_calc = wgt_mon*wtvar[months,:,:]
-
-  # Set as standardized xr.DataArray
-  wtvar_mon_wgt = xr.DataArray(wtvar_mon_wgt_calc,dims=['time','lat','lon'])
-
-  #----------------------------------------------------------------------------------------------------
-  # Weight isotopic values by seasonal rainfall
-  # NOTE: 'wtvar_mon_wgt' variable already accounts for how many months are present, but 'iso' does not 
-  #----------------------------------------------------------------------------------------------------
-
-  d18Opwt_tag = xr.DataArray( xr.DataArray(wtvar_mon_wgt*iso[months,:,:]).sum(dim='time') / \
-                              xr.DataArray(wtvar_mon_wgt).sum(dim='time')                   )
+  # Compute both climatologies together if dask was used
+  prect_clim, d18O_clim = compute(prect_clim,d18O_clim,scheduler=scheduler)
 
   #----------------------------------------------------------------------------------
-  # Process final variables
+  # Weight by month and rainfall, and process final variables
   #----------------------------------------------------------------------------------
 
+  Pi_monwgt, d18Opwt_tag = watertag_weighting(prect_clim,d18O_clim,months,wgt_mon)
+
   # PRECT 
-  Pi_monwgt = mon_wgt_avg(var=prect_clim,months=months,wgt_mon=wgt_mon)   
-  Pi = xr.DataArray(Pi_monwgt,dims=['lat','lon'],coords=dict(lat=data.lat,lon=data.lon))*mult
+  Pi = xr.DataArray(Pi_monwgt,dims=['tag','lat','lon'],
+                    coords=dict(tag=tagcodes,lat=data.lat,lon=data.lon))*mult
 
   # d18Op
-  d18Opsink = xr.DataArray(d18Opwt_tag,dims=['lat','lon'],coords=dict(lat=data.lat,lon=data.lon)) 
+  d18Opsink = xr.DataArray(d18Opwt_tag,dims=['tag','lat','lon'],coords=dict(tag=tagcodes,lat=data.lat,lon=data.lon)) 
 
   return Pi, d18Opsink
-
@@ -0,0 +1,161 @@
+#######################################################################################################
+#
+# Combined tag regions that are resolved when the tagged variables are read, instead of being written
+# to a new copy of the history file by combine_regions_to_new_tags. A combined tag (ex. ERAS) is
+# registered once as a weighted list of source tags (ex. EURO, NASA, INDA, SASA), and the water tag
+# readers (seasavg_watertagging_vars, seasavg_watertagging_batch, CaseReader and watertag_case_products)
+# then read PRECRC_ERASr etc. as the sum of the source variables. A file that has the tag's own variables
+# (ex. an experiment run with an ERAS tag, or an older *_combReg.nc file) is read directly, so the same
+# tag list can be used for cases with different tagging.
+#
+#######################################################################################################
+
+# Registered combined tags: tag code -> list of (source tag code, weight)
+_combined_tags = {}
+
+#######################################################################################################
+# Register combined tags
+#######################################################################################################
+
+def register_combined_tag(tagcode: str,
+                          sources: list,
+                          weights = None):
+
+  '''Registers the combined tag 'tagcode' as the weighted sum of the tags in 'sources'. Replaces an earlier
+  registration of the same code.
+
+  Required Parameters
+  --------------------------------------------------------------------------------------------------------
+  tagcode
+   class: 'string', Code name of the combined tag region. Ex. 'ERAS'
+
+  sources
+   class: 'list', Code names of the tag regions summed into the combined tag. Ex. ['EURO','NASA','INDA',
+                  'SASA']. A source may itself be a registered combined tag.
+
+  Optional Parameters
+  --------------------------------------------------------------------------------------------------------
+  weights: class 'list' or 'dict', Multiplier of each source, in the order of 'sources' or as
+                                   {source: weight}. Default = None gives every source a weight of 1.
+
+  '''
+
+  tagcode = str(tagcode)
+  sources = [str(source) for source in sources]
+
+  if len(sources) == 0:
+   raise ValueError("Provide at least one source tag for combined tag '"+tagcode+"'")
+  if len(set(sources)) != len(sources):
+   raise ValueError("Source tags of combined tag '"+tagcode+"' must be unique, got "+", ".join(sources))
+
+  if weights is None:
+   weights = [1.]*len(sources)
+  elif isinstance(weights,dict):
+   weights = [weights.get(source,1.) for source in sources]
+  if len(weights) != len(sources):
+   raise ValueError("Give one weight per source tag of combined tag '"+tagcode+"'")
+
+  previous = _combined_tags.get(tagcode)
+  _combined_tags[tagcode] = [(source,float(weight)) for source, weight in zip(sources,weights)]
+
+  # A registration that makes a tag depend on itself is undone
+  try:
+   expand_tag(tagcode)
+  except ValueError:
+   if previous is None:
+    del _combined_tags[tagcode]
+   else:
+    _combined_tags[tagcode] = previous
+   raise
+
+def register_combined_tags(new_regions: dict,
+                           weights: dict = None):
+
+  '''Registers several combined tags at once from a mapping of tag code to source tags, ex.
+  {'ERAS': ['EURO','NASA','INDA','SASA'], 'NAMG': ['WNAM','ENAM']}, the same mapping that is given to
+  combine_regions_to_new_tags. 'weights' maps source tags to their multipliers (default 1).'''
+
+  for tagcode, sources in new_regions.items():
+   register_combined_tag(tagcode,sources,weights=None if weights is None else
+                         {source: weights[source] for source in sources if source in weights})
+
+def unregister_combined_tag(tagcode: str):
+
+  '''Removes the combined tag 'tagcode' from the registry.'''
+
+  _combined_tags.pop(str(tagcode),None)
+
+def clear_combined_tags():
+
+  '''Removes every registered combined tag.'''
+
+  _combined_tags.clear()
+
+def combined_tags() -> dict:
+
+  '''Returns the registered combined tags as {tag code: [(source tag code, weight), ...]}.'''
+
+  return {tagcode: list(terms) for tagcode, terms in _combined_tags.items()}
+
+def set_combined_tags(tags: dict):
+
+  '''Replaces the registry with 'tags', as returned by combined_tags (used to give worker processes the
+  combined tags of the calling process).'''
+
+  _combined_tags.clear()
+  _combined_tags.update({str(tagcode): [(str(source),float(weight)) for source, weight in terms]
+                         for tagcode, terms in tags.items()})
+
+#######################################################################################################
+# Resolve tags to the tags stored in a file
+#######################################################################################################
+
+def expand_tag(tagcode: str,
+               present = None) -> list:
+
+  '''Returns the tags stored in the file whose weighted sum is the tag 'tagcode', as a list of
+  (tag code, weight). 'present' is a function of a tag code that returns True if the file has that tag's
+  own variables; such tags, and tags that are not registered, are returned as [(tagcode, 1.)]. Combined
+  tags made of combined tags are expanded to the stored tags, multiplying the weights.'''
+
+  def expand(code,weight,seen):
+   if code not in _combined_tags or (present is not None and present(code)):
+    return [(code,weight)]
+   if code in seen:
+    raise ValueError("Combined tag '"+code+"' is defined in terms of itself")
+   terms = []
+   for source, source_weight in _combined_tags[code]:
+    terms += expand(source,weight*source_weight,seen+[code])
+   return terms
+
+  # Sum the weights of a stored tag reached through more than one combined tag
+  terms = {}
+  for code, weight in expand(str(tagcode),1.,[]):
+   terms[code] = terms.get(code,0.) + weight
+
+  return list(terms.items())
+
+def expand_tags(tagcodes: list,
+                present = None) -> tuple:
+
+  '''Expands every tag in 'tagcodes' as in expand_tag. Returns the stored tags to read, each listed once
+  in the order first needed, and {tag code: [(stored tag code, weight), ...]}, so a stored tag shared by
+  several requested tags is read only once.'''
+
+  terms = {str(tagcode): expand_tag(tagcode,present) for tagcode in tagcodes}
+  sources = list(dict.fromkeys(code for tag_terms in terms.values() for code, _ in tag_terms))
+
+  return sources, terms
+
+def weighted_sum(terms: list,
+                 values: dict):
+
+  '''Returns the sum of values[code]*weight over the (code, weight) pairs in 'terms' (as returned by
+  expand_tag). A single stored tag with weight 1 is returned as is.'''
+
+  total = None
+  for code, weight in terms:
+   value = values[code] if weight == 1. else values[code]*weight
+   total = value if total is None else total + value
+
+  return total
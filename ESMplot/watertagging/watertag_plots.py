@@ -4,31 +4,40 @@
 #
 #######################################################################################################
 
+from __future__ import annotations
+import inspect
+import functools
 import numpy as np
 import xarray as xr
-import cartopy.crs as ccrs
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MultipleLocator
-from matplotlib import colors
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
-import geocat.viz.util as gv
-import cmaps
-#from ESMplot.watertagging.tagged_regions_RCP85 import draw_land_tags, draw_ocean_tags
-from ESMplot.watertagging.tagged_regions_combined import draw_land_tags, draw_ocean_tags
-from ESMplot.plotting.plot_functions import save_multi_image,map_ticks_and_labels,draw_region_box
-from warnings import simplefilter
+from ESMplot.plotting.plot_functions import PdfSink,fill_map,map_ticks_and_labels,draw_region_box,render_pages_parallel
+from ESMplot.climate_analysis.dataset_cache import open_cached_dataset
+from ESMplot.climate_analysis.coordinate_functions import region_index
+from ESMplot.climate_analysis.lazy_import import lazy_import
+from ESMplot.climate_analysis.profiling import profiled, span
+
+# Plotting libraries and the base map module, imported when a plot is first drawn
+plt = lazy_import('matplotlib.pyplot')
+mticker = lazy_import('matplotlib.ticker')
+colors = lazy_import('matplotlib.colors')
+ccrs = lazy_import('cartopy.crs')
+cfeature = lazy_import('cartopy.feature')
+gv = lazy_import('geocat.viz.util')
+cmaps = lazy_import('cmaps')
+basemap = lazy_import('ESMplot.plotting.basemap')
 # Imports for lat/lon grid lines
-import matplotlib.ticker as mticker
-from cartopy.mpl.gridliner import LONGITUDE_FORMATTER, LATITUDE_FORMATTER
+gridliner = lazy_import('cartopy.mpl.gridliner')
+# Drawn tag regions
+#tagged_regions = lazy_import('ESMplot.watertagging.tagged_regions_RCP85')
+tagged_regions = lazy_import('ESMplot.watertagging.tagged_regions_combined')
 
 # Default arrays
-default_wgt_mon = xr.DataArray(np.ones(12),dims=['time']).astype(float)
+default_wgt_mon = np.ones(12)
 
 #######################################################################################################
 # Plot tag values for precipitation, precipitation percentage, and d18Op on a global map 
 #######################################################################################################
 
+@profiled
 def watertagging_values_on_map(
                                ### Required Parameters
                                precip: xr.DataArray, d18Op: xr.DataArray, case: str, tagnames: list, 
@@ -42,9 +51,9 @@ def watertagging_values_on_map(
                                wspace: float = -0.25, hspace: float = 0.05,
                                LatMin: float = -90., LatMax: float = 90.,
                                LonMin: float = -180., LonMax: float = 180.,
-                               proj: ccrs.Projection = ccrs.PlateCarree(), central_lon_180: bool = False, 
-                               landcol: colors.ListedColormap = cmaps.MPL_gist_earth_r(np.arange(0,10,1)), 
-                               oceancol: colors.ListedColormap = cmaps.WhiteBlue_r(np.arange(149,254,1)),
+                               proj: ccrs.Projection = None, central_lon_180: bool = False, 
+                               landcol: colors.ListedColormap = None, 
+                               oceancol: colors.ListedColormap = None,
                                p_units: str = 'mm/day', o_units: str = 'per mil',
                                ttlfs: float = 8., ttlloc: str = 'left',
                                coast: bool = True, coastlw: float = 0.3, 
@@ -65,7 +74,7 @@ def watertagging_values_on_map(
                                show_latlon: bool = True,
                                gl_xstep: float = 60., gl_ystep: float = 30.,
                                gl_fs: float = 6., gl_lw: float = 0.3, gl_alpha: float = 0.6,
-                               gl_ls: str = '--'):
+                               gl_ls: str = '--', pdf: PdfSink = None):
 
   '''Creates three map plots showing values of 1) precipitation, 2) precipitation percentage, and
   3) d18Op for land and ocean water tag regions.
@@ -166,8 +175,18 @@ def watertagging_values_on_map(
                             output file. Default = ''
   extra_name: class 'string', extra text to add at end of output file. Default = ''
   filesuf: class 'string', type of output file. Default = '.pdf'
+  pdf: class 'PdfSink', open multipage PDF file to append the map page to instead of writing a new
+                        file. Default = None
   --------------------------------------------------------------------------------------------------
   '''
+
+  #-------------------------------------------------------------------------
+  # Default projection and color tables (made here rather than at import)
+  #-------------------------------------------------------------------------
+
+  proj     = ccrs.PlateCarree() if proj is None else proj
+  landcol  = cmaps.MPL_gist_earth_r(np.arange(0,10,1)) if landcol is None else landcol
+  oceancol = cmaps.WhiteBlue_r(np.arange(149,254,1)) if oceancol is None else oceancol
   
   #--------------------------------------------
   # Handle variables if diff == True 
@@ -206,8 +225,8 @@ def watertagging_values_on_map(
           ylocs = np.arange(LatMin, LatMax + 1e-9, gl_ystep)
       gl.xlocator = mticker.FixedLocator(xlocs)
       gl.ylocator = mticker.FixedLocator(ylocs)
-      gl.xformatter = LONGITUDE_FORMATTER
-      gl.yformatter = LATITUDE_FORMATTER
+      gl.xformatter = gridliner.LONGITUDE_FORMATTER
+      gl.yformatter = gridliner.LATITUDE_FORMATTER
       gl.top_labels    = False
       gl.right_labels  = False
       gl.bottom_labels = bool(show_bottom)
@@ -217,7 +236,7 @@ def watertagging_values_on_map(
       return gl
 
   # Define land, set anything >[lo_cutoff] land as "land", else as "ocean"
-  data_landfrac = xr.open_dataset(path)
+  data_landfrac = open_cached_dataset(path)
   landfrac_all  = data_landfrac.LANDFRAC[0,:,:]
   landfrac_bin  = xr.where(landfrac_all > lo_cutoff, 1.0, 0.0)
 
@@ -242,17 +261,17 @@ def watertagging_values_on_map(
 
   # Map features
   if coast == True:
-   ax1.add_feature(cfeature.COASTLINE,linewidths=coastlw)
-   ax2.add_feature(cfeature.COASTLINE,linewidths=coastlw)
+   basemap.add_basemap_feature(ax1,cfeature.COASTLINE,linewidths=coastlw)
+   basemap.add_basemap_feature(ax2,cfeature.COASTLINE,linewidths=coastlw)
   if lake == True:
-   ax1.add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
-   ax2.add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
+   basemap.add_basemap_feature(ax1,cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
+   basemap.add_basemap_feature(ax2,cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
   if border == True:
-   ax1.add_feature(cfeature.BORDERS,linewidths=borderlw)
-   ax2.add_feature(cfeature.BORDERS,linewidths=borderlw)
+   basemap.add_basemap_feature(ax1,cfeature.BORDERS,linewidths=borderlw)
+   basemap.add_basemap_feature(ax2,cfeature.BORDERS,linewidths=borderlw)
   if usstate == True:
-   ax1.add_feature(cfeature.STATES,linewidths=usstatelw)
-   ax2.add_feature(cfeature.STATES,linewidths=usstatelw)
+   basemap.add_basemap_feature(ax1,cfeature.STATES,linewidths=usstatelw)
+   basemap.add_basemap_feature(ax2,cfeature.STATES,linewidths=usstatelw)
 
   # Plot land and ocean colors
   landfrac_bin.plot(ax=ax1,transform=ccrs.PlateCarree(),cmap=LandColorTable,add_colorbar=False,add_labels=False)
@@ -267,17 +286,17 @@ def watertagging_values_on_map(
 
   # Map features
   if coast == True:
-   ax3.add_feature(cfeature.COASTLINE,linewidths=coastlw)
-   ax4.add_feature(cfeature.COASTLINE,linewidths=coastlw)
+   basemap.add_basemap_feature(ax3,cfeature.COASTLINE,linewidths=coastlw)
+   basemap.add_basemap_feature(ax4,cfeature.COASTLINE,linewidths=coastlw)
   if lake == True:
-   ax3.add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
-   ax4.add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
+   basemap.add_basemap_feature(ax3,cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
+   basemap.add_basemap_feature(ax4,cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
   if border == True:
-   ax3.add_feature(cfeature.BORDERS,linewidths=borderlw)
-   ax4.add_feature(cfeature.BORDERS,linewidths=borderlw)
+   basemap.add_basemap_feature(ax3,cfeature.BORDERS,linewidths=borderlw)
+   basemap.add_basemap_feature(ax4,cfeature.BORDERS,linewidths=borderlw)
   if usstate == True:
-   ax3.add_feature(cfeature.STATES,linewidths=usstatelw)
-   ax4.add_feature(cfeature.STATES,linewidths=usstatelw)
+   basemap.add_basemap_feature(ax3,cfeature.STATES,linewidths=usstatelw)
+   basemap.add_basemap_feature(ax4,cfeature.STATES,linewidths=usstatelw)
 
   # Plot land and ocean colors
   landfrac_bin.plot(ax=ax3,transform=ccrs.PlateCarree(),cmap=LandColorTable,add_colorbar=False,add_labels=False)
@@ -292,17 +311,17 @@ def watertagging_values_on_map(
 
   # Map features
   if coast == True:
-   ax5.add_feature(cfeature.COASTLINE,linewidths=coastlw)
-   ax6.add_feature(cfeature.COASTLINE,linewidths=coastlw)
+   basemap.add_basemap_feature(ax5,cfeature.COASTLINE,linewidths=coastlw)
+   basemap.add_basemap_feature(ax6,cfeature.COASTLINE,linewidths=coastlw)
   if lake == True:
-   ax5.add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
-   ax6.add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
+   basemap.add_basemap_feature(ax5,cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
+   basemap.add_basemap_feature(ax6,cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
   if border == True:
-   ax5.add_feature(cfeature.BORDERS,linewidths=borderlw)
-   ax6.add_feature(cfeature.BORDERS,linewidths=borderlw)
+   basemap.add_basemap_feature(ax5,cfeature.BORDERS,linewidths=borderlw)
+   basemap.add_basemap_feature(ax6,cfeature.BORDERS,linewidths=borderlw)
   if usstate == True:
-   ax5.add_feature(cfeature.STATES,linewidths=usstatelw)
-   ax6.add_feature(cfeature.STATES,linewidths=usstatelw)
+   basemap.add_basemap_feature(ax5,cfeature.STATES,linewidths=usstatelw)
+   basemap.add_basemap_feature(ax6,cfeature.STATES,linewidths=usstatelw)
   
   # Plot land and ocean colors
   landfrac_bin.plot(ax=ax5,transform=ccrs.PlateCarree(),cmap=LandColorTable,add_colorbar=False,add_labels=False)
@@ -335,44 +354,8 @@ def watertagging_values_on_map(
   # Add region/point to plots 
   #----------------------------
 
-  # Discover direction of latitude array
-  if lat[0] > 0:
-   lat_direction = 'N->S'
-  elif lat[0] < 0:
-   lat_direction = 'S->N'
-
-  # Discover treatment of longitude array
-  if any(i > 180. for i in lon):
-   lon_treatment = 'degW = 180-360'
-  elif any(i < 0. for i in lon):
-   lon_treatment = 'degW = -180-0'
-
-  # If longitude array treats degW as 180-360, modify lonw,lone
-  if lon_treatment == 'degW = 180-360':
-   if wlon < 0.:
-    wlon = wlon + 360
-   if elon < 0.:
-    elon = elon + 360
-
-  # Select coordinate indices
-  lats = list(lat.values).index(lat.sel(lat=slat, method='nearest').lat)
-  latn = list(lat.values).index(lat.sel(lat=nlat, method='nearest').lat)
-  lonw = list(lon.values).index(lon.sel(lon=wlon, method='nearest').lon)
-  lone = list(lon.values).index(lon.sel(lon=elon, method='nearest').lon)
-
-  # Process coordinates
-  latadj = abs(np.float64((lat[2]-lat[1])/2))
-  lonadj = abs(np.float64((lon[2]-lon[1])/2))
-
-  # Define perimeter
-  rlats = np.float64(lat[lats]-latadj)
-  rlatn = np.float64(lat[latn]+latadj)
-  rlonw = np.float64(lon[lonw]-lonadj)
-  rlone = np.float64(lon[lone]+lonadj)
-  if rlonw > 180:
-    rlonw = rlonw - 360
-  if rlone > 180:
-    rlone = rlone - 360
+  # Define perimeter (grid cell edges of the region)
+  rlats, rlatn, rlonw, rlone = region_index(lat,lon).perimeter(slat=slat,nlat=nlat,wlon=wlon,elon=elon)
 
   if central_lon_180 == True:
     # Modification for central_longitude = 180.
@@ -448,13 +431,13 @@ def watertagging_values_on_map(
   #----------------------------
 
   for ltag in range(num_landtags):
-   draw_land_tags(numtag=ltag,ax=ax1,lw=tag_lw,major=tag_maj,minor=tag_min,color=tag_col,zorder=tag_zorder)
-   draw_land_tags(numtag=ltag,ax=ax3,lw=tag_lw,major=tag_maj,minor=tag_min,color=tag_col,zorder=tag_zorder)
-   draw_land_tags(numtag=ltag,ax=ax5,lw=tag_lw,major=tag_maj,minor=tag_min,color=tag_col,zorder=tag_zorder)
+   tagged_regions.draw_land_tags(numtag=ltag,ax=ax1,lw=tag_lw,major=tag_maj,minor=tag_min,color=tag_col,zorder=tag_zorder)
+   tagged_regions.draw_land_tags(numtag=ltag,ax=ax3,lw=tag_lw,major=tag_maj,minor=tag_min,color=tag_col,zorder=tag_zorder)
+   tagged_regions.draw_land_tags(numtag=ltag,ax=ax5,lw=tag_lw,major=tag_maj,minor=tag_min,color=tag_col,zorder=tag_zorder)
   for otag in range(num_landtags,len(tagnames),1):
-   draw_ocean_tags(numtag=otag,ax=ax2,lw=tag_lw,major=tag_maj,minor=tag_min,color=tag_col,zorder=tag_zorder)
-   draw_ocean_tags(numtag=otag,ax=ax4,lw=tag_lw,major=tag_maj,minor=tag_min,color=tag_col,zorder=tag_zorder)
-   draw_ocean_tags(numtag=otag,ax=ax6,lw=tag_lw,major=tag_maj,minor=tag_min,color=tag_col,zorder=tag_zorder)
+   tagged_regions.draw_ocean_tags(numtag=otag,ax=ax2,lw=tag_lw,major=tag_maj,minor=tag_min,color=tag_col,zorder=tag_zorder)
+   tagged_regions.draw_ocean_tags(numtag=otag,ax=ax4,lw=tag_lw,major=tag_maj,minor=tag_min,color=tag_col,zorder=tag_zorder)
+   tagged_regions.draw_ocean_tags(numtag=otag,ax=ax6,lw=tag_lw,major=tag_maj,minor=tag_min,color=tag_col,zorder=tag_zorder)
 
   #---------------------
   # Save as pdf
@@ -466,17 +449,113 @@ def watertagging_values_on_map(
   if extra_name != '':
    extra_name = ''.join(('_',extra_name))
 
-  # Name output file
-  plt.savefig('./'+str(folderpath)+'/'+str(case)+'_'+str(season)+'_watertag_values'+reg_name+extra_name+str(filesuf),
-              bbox_inches='tight')
+  # Append page to an open PDF file if given, otherwise name output file
+  if pdf != None:
+   pdf.add(fig)
+  else:
+   with span('render_page'):
+    plt.savefig('./'+str(folderpath)+'/'+str(case)+'_'+str(season)+'_watertag_values'+reg_name+extra_name+str(filesuf),
+                bbox_inches='tight')
+
+   # Close figure to retain memory
+   plt.close()
+
+#######################################################################################################
+# Draw the precipitation or d18Op map of one tag (one page of plot_tagged_precip_and_d18Op)
+#######################################################################################################
+
+def _draw_tag_page(page,*,case,tagnames,num_landtags,p_units,o_units,figw,figh,fdpi,LatMin,LatMax,LonMin,
+                   LonMax,proj,coast,coastlw,lake,lakelw,border,borderlw,usstate,usstatelw,topax,botax,leftax,
+                   rightax,latlblsp,lonlblsp,lattksp,lontksp,tklblsz,tkmajlg,tkminlg,xmin_mj,ymin_mj,xpads,
+                   ypads,glalpha,glcolor,cntr_type,colorp,coloro,p_mantick,p_extnd,o_loval,o_hival,o_spval,
+                   o_tkstd,o_extnd,cbar_orient,cbar_pad,cbar_shrk,ttlfs,ttlloc,ttlpad,regcol,regline,reglw,
+                   regzorder,taglw,tagmaj,tagmin,tagcol,tagzorder,overlay_vec,vec_scale,vec_wid,vec_hal,
+                   vec_hdl,vec_hdw,vec_ref,vec_units,prect_c,d18Op_c,uc,vc,p_levels,skip1D,skip2D,rlats,rlatn,
+                   rlonw,rlone):
+
+  # Defined at module level, rather than in plot_tagged_precip_and_d18Op, so it can be sent to the worker
+  # processes of render_pages_parallel. The keyword arguments are settings of that function.
+
+  # page = ('prect' or 'd18Op', tag index)
+  field, tag = page
+
+  # Define figure and axis
+  fig = plt.figure(figsize=(figw,figh),dpi=fdpi)
+  ax = fig.add_subplot(111, projection=proj)
+
+  # Default is global plot, will change if LonMin, etc. are modified
+  ax.set_extent([LonMin,LonMax,LatMin,LatMax],proj)
+
+  # Add features to map as indicated in parameters
+  if coast == True:
+   basemap.add_basemap_feature(ax,cfeature.COASTLINE,linewidths=coastlw) 
+  if lake == True:
+   basemap.add_basemap_feature(ax,cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k') 
+  if border == True:
+   basemap.add_basemap_feature(ax,cfeature.BORDERS,linewidths=borderlw) 
+  if usstate == True:
+   basemap.add_basemap_feature(ax,cfeature.STATES,linewidths=usstatelw) 
+
+  # Add ticks and labels to map as indicated in parameters
+  map_ticks_and_labels(ax=ax,LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,
+                       lattksp=lattksp,lontksp=lontksp,xmin_mj=xmin_mj,ymin_mj=ymin_mj,
+                       tkmajlg=tkmajlg,tkminlg=tkminlg,glalpha=glalpha,glcolor=glcolor,
+                       lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,
+                       tklblsz=tklblsz,proj=proj,top=topax,bot=botax,left=leftax,right=rightax)
+
+  # Draw rectangle over region for which water tagging results will be calculated
+  draw_region_box(ax=ax,slat=rlats,nlat=rlatn,wlon=rlonw,elon=rlone,linestyle=regline,
+                  facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=regzorder)
+
+  if field == 'prect':
+
+   # Title above precipitation plots
+   ax.set_title(str(case)+' Precip ('+p_units+') for '+str(tag+1)+'. '+tagnames[tag],
+                fontsize=ttlfs,loc=ttlloc,pad=ttlpad)
+
+   # Make contour plots 
+   var_c = prect_c
+   cntr_kwargs = dict(cmap=colorp,levels=p_levels,extend=p_extnd,
+                      cbar_kwargs={'orientation':cbar_orient,'shrink':cbar_shrk,'pad':cbar_pad,
+                      'label':p_units,'ticks':p_mantick,'format': '{}'.format})
+
+  elif field == 'd18Op':
+
+   # Title above d18Op plots
+   ax.set_title(str(case)+r' $\delta^{18} O_{P}$ ('+o_units+') for '+str(tag+1)+'. '+tagnames[tag],
+                fontsize=ttlfs,loc=ttlloc,pad=ttlpad)
+
+   # Make contour plots 
+   var_c = d18Op_c
+   cntr_kwargs = dict(cmap=coloro,levels=np.arange(o_loval,o_hival+o_spval,o_spval),extend=o_extnd,
+                      cbar_kwargs={'orientation':cbar_orient,'shrink':cbar_shrk,'pad':cbar_pad,
+                      'spacing':'proportional','ticks':mticker.MultipleLocator(o_tkstd),'label':o_units})
 
-  # Close figure to retain memory
-  plt.close()
+  fill_map(var_c[tag,:,:],ax,cntr_type=cntr_type,transform=ccrs.PlateCarree(),add_colorbar=True,add_labels=False,
+           **cntr_kwargs)
+
+  # Overlay wind vectors if turned on
+  if overlay_vec == True:
+   vec = ax.quiver(var_c.lon[skip1D],var_c.lat[skip1D],uc[skip2D],vc[skip2D],scale_units='height',pivot='mid',
+             scale=vec_scale,width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
+   qkey = ax.quiverkey(vec,0.8,0.2,vec_ref,str(int(vec_ref))+str(vec_units),labelpos='N',coordinates='figure',color='k')
+
+  # Draw corresponding land or ocean tag region on plot
+  if tag <= (num_landtags-1):
+   tagged_regions.draw_land_tags(numtag=tag,ax=ax,lw=taglw,major=tagmaj,minor=tagmin,color=tagcol,zorder=tagzorder)
+  elif tag > (num_landtags-1):
+   tagged_regions.draw_ocean_tags(numtag=tag,ax=ax,lw=taglw,major=tagmaj,minor=tagmin,color=tagcol,zorder=tagzorder)
+
+  return fig
+
+# Settings of plot_tagged_precip_and_d18Op used to draw a page
+_tag_page_settings = list(inspect.signature(_draw_tag_page).parameters)[1:]
 
 #######################################################################################################
 # Plot precip and d18Op maps for each tagged region 
 #######################################################################################################
 
+@profiled
 def plot_tagged_precip_and_d18Op(
                                  ### Required Parameters
                                  P: bool, O: bool, prect: xr.DataArray, d18Op: xr.DataArray, 
@@ -488,7 +567,7 @@ def plot_tagged_precip_and_d18Op(
                                  figw: float = 10., figh: float = 10., fdpi: float = 300.,
                                  LatMin: float = -90., LatMax: float = 90.,
                                  LonMin: float = -180., LonMax: float = 180.,
-                                 proj: ccrs.Projection = ccrs.PlateCarree(),
+                                 proj: ccrs.Projection = None,
                                  central_lon_180: bool = False, coast: bool = True, coastlw: float = 0.5,
                                  lake: bool = True, lakelw: float = 0.3,
                                  border: bool = False, borderlw: float = 0.5,
@@ -501,8 +580,8 @@ def plot_tagged_precip_and_d18Op(
                                  ymin_mj: int = 2, xpads: float = 15., ypads: float = 15., 
                                  glalpha: float = 0.0, glcolor: str = 'gray', 
                                  cntr_type: str = 'RasterFill', 
-                                 colorp: colors.ListedColormap = cmaps.MPL_viridis, 
-                                 coloro: colors.ListedColormap = cmaps.MPL_rainbow,
+                                 colorp: colors.ListedColormap = None, 
+                                 coloro: colors.ListedColormap = None,
                                  p_loval: float = 0., p_hival: float = 2., p_spval: float = 0.1,
                                  p_mantick: list = [0.001,0.2,0.5,1.0,1.5,2.0], p_extnd: str = 'max',
                                  o_loval: float = -5., o_hival: float = 0., o_spval: float = 0.2,
@@ -521,7 +600,8 @@ def plot_tagged_precip_and_d18Op(
                                  vec_hdl: float = 3., vec_hdw: float = 4., vec_skip: int = 4,
                                  vec_ref: float = 10., vec_units: str = '', vec_name: str = '',
                                  diff: bool = False, folderpath: str = '.', reg_name: str = '', 
-                                 extra_name: str = '',filesuf: str = '.pdf'
+                                 extra_name: str = '',filesuf: str = '.pdf', workers: int = None,
+                                 pdf: PdfSink = None
                                  ):
 
   '''Creates a multipage PDF file with a precipitation and d18Op map for each tagged region
@@ -606,8 +686,9 @@ def plot_tagged_precip_and_d18Op(
                           gridlines. Modify 1.0 >= alpha > 0.0 for visible gridlines.
                           Default = 0.0 (no gridlines)
   glcolor: class 'str', Color of gridlines if glalpha > 0.0. Default = 'gray'
-  cntr_type: class 'str', Type of contour for plotting. Options: 'AreaFill' - interpolated, 
-                          'RasterFill' - raster. Default = 'AreaFill'
+  cntr_type: class 'str', Type of contour for plotting. Options: 'AreaFill' - interpolated, 'RasterAreaFill' -
+                          interpolated, rasterized in the PDF, 'RasterFill' - raster, 'ImageFill' - raster
+                          drawn as an image (fastest). See plot_functions.fill_map. Default = 'RasterFill'
   colorp: class 'colors.ListedColormap', Color table for precipitation maps.
                                          Default = cmaps.MPL_viridis
   coloro: class 'colors.ListedColormap' Color table for d18Op maps. Default = cmaps.MPL_rainbow
@@ -671,9 +752,22 @@ def plot_tagged_precip_and_d18Op(
                     output file. Default = ''
   extra_name: class 'string', extra text to add at end of output file. Default = ''
   filesuf: class 'string', Type of output file. Default = '.pdf'
+  workers: class 'int', Number of processes the pages are drawn in. Each page is drawn and saved to its
+                        own file by a worker process and the pages are then merged into the output file
+                        (requires pypdf). Default = None draws every page in this process.
+  pdf: class 'PdfSink', Open multipage PDF file to append the pages to instead of writing a new file. Pages
+                        are then drawn in this process. Default = None
   --------------------------------------------------------------------------------------------------
   '''
 
+  #-------------------------------------------------------------------------
+  # Default projection and color tables (made here rather than at import)
+  #-------------------------------------------------------------------------
+
+  proj   = ccrs.PlateCarree() if proj is None else proj
+  colorp = cmaps.MPL_viridis if colorp is None else colorp
+  coloro = cmaps.MPL_rainbow if coloro is None else coloro
+
   #---------------------------------------------------
   # Determine contour level spacing based on 'diff'
   #---------------------------------------------------
@@ -700,44 +794,8 @@ def plot_tagged_precip_and_d18Op(
   # Add region/point to plots 
   #----------------------------
 
-  # Discover direction of latitude array
-  if lat[0] > 0:
-   lat_direction = 'N->S'
-  elif lat[0] < 0:
-   lat_direction = 'S->N'
-
-  # Discover treatment of longitude array
-  if any(i > 180. for i in lon):
-   lon_treatment = 'degW = 180-360'
-  elif any(i < 0. for i in lon):
-   lon_treatment = 'degW = -180-0'
-
-  # If longitude array treats degW as 180-360, modify lonw,lone
-  if lon_treatment == 'degW = 180-360':
-   if wlon < 0.:
-    wlon = wlon + 360
-   if elon < 0.:
-    elon = elon + 360
-
-  # Select coordinate indices
-  lats = list(lat.values).index(lat.sel(lat=slat, method='nearest').lat)
-  latn = list(lat.values).index(lat.sel(lat=nlat, method='nearest').lat)
-  lonw = list(lon.values).index(lon.sel(lon=wlon, method='nearest').lon)
-  lone = list(lon.values).index(lon.sel(lon=elon, method='nearest').lon)
-
-  # Process coordinates
-  latadj = abs(np.float64((lat[2]-lat[1])/2))
-  lonadj = abs(np.float64((lon[2]-lon[1])/2))
-
-  # Define perimeter
-  rlats = np.float64(lat[lats]-latadj)
-  rlatn = np.float64(lat[latn]+latadj)
-  rlonw = np.float64(lon[lonw]-lonadj)
-  rlone = np.float64(lon[lone]+lonadj)
-  if rlonw > 180:
-    rlonw = rlonw - 360
-  if rlone > 180:
-    rlone = rlone - 360
+  # Define perimeter (grid cell edges of the region)
+  rlats, rlatn, rlonw, rlone = region_index(lat,lon).perimeter(slat=slat,nlat=nlat,wlon=wlon,elon=elon)
  
   #------------------------------------------------
   # Manage precipitation cutoff value if specified
@@ -757,175 +815,64 @@ def plot_tagged_precip_and_d18Op(
    uc = gv.xr_add_cyclic_longitudes(u,'lon')
    vc = gv.xr_add_cyclic_longitudes(v,'lon')
 
+  if central_lon_180 == True:
+   # Modification for central_longitude = 180.
+   rlonw = rlonw if rlonw < 0 else rlonw - 180
+   rlone = rlone if rlone < 0 else rlone - 180
+
   #--------------------------------------------------------
-  # Make precipitation plots if specified
+  # Function drawing one page with the settings of this call
   #--------------------------------------------------------
 
-  if P == True:
-
-   for tag in range(len(tagnames)):
-
-    # Ignore unnecessary warning from matplotlib about having multiple figures open
-    simplefilter(action="ignore", category=RuntimeWarning)
-
-    # Define figure and axis
-    figp = plt.figure(figsize=(figw,figh),dpi=fdpi)
-    axp = figp.add_subplot(111, projection=proj)
-
-    # Default is global plot, will change if LonMin, etc. are modified
-    axp.set_extent([LonMin,LonMax,LatMin,LatMax],proj)
-
-    # Add features to map as indicated in parameters
-    if coast == True:
-     axp.add_feature(cfeature.COASTLINE,linewidths=coastlw) 
-    if lake == True:
-     axp.add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k') 
-    if border == True:
-     axp.add_feature(cfeature.BORDERS,linewidths=borderlw) 
-    if usstate == True:
-     axp.add_feature(cfeature.STATES,linewidths=usstatelw) 
-
-    # Add ticks and labels to map as indicated in parameters
-    map_ticks_and_labels(ax=axp,LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,
-                         lattksp=lattksp,lontksp=lontksp,xmin_mj=xmin_mj,ymin_mj=ymin_mj,
-                         tkmajlg=tkmajlg,tkminlg=tkminlg,glalpha=glalpha,glcolor=glcolor,
-                         lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,
-                         tklblsz=tklblsz,proj=proj,top=topax,bot=botax,left=leftax,right=rightax)
-
-    if central_lon_180 == True:
-      # Modification for central_longitude = 180.
-      rlonw = rlonw if rlonw < 0 else rlonw - 180
-      rlone = rlone if rlone < 0 else rlone - 180
-
-    # Draw rectangle over region for which water tagging results will be calculated
-    draw_region_box(ax=axp,slat=rlats,nlat=rlatn,wlon=rlonw,elon=rlone,linestyle=regline,
-                    facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=regzorder)
-
-    # Title above precipitation plots
-    axp.set_title(str(case)+' Precip ('+p_units+') for '+str(tag+1)+'. '+tagnames[tag],
-                  fontsize=ttlfs,loc=ttlloc,pad=ttlpad)
-
-    # Make contour plots 
-    if cntr_type == 'AreaFill': 
-     prect_c[tag,:,:].plot.contourf(ax=axp,transform=ccrs.PlateCarree(),cmap=colorp,
-                        levels=p_levels,
-                        add_colorbar=True,add_labels=False,extend=p_extnd,
-                        cbar_kwargs={'orientation':cbar_orient,'shrink':cbar_shrk,'pad':cbar_pad,
-                        'label':p_units,'ticks':p_mantick,'format': '{}'.format})
-    elif cntr_type == 'RasterFill':
-     prect_c[tag,:,:].plot(ax=axp,transform=ccrs.PlateCarree(),cmap=colorp,
-                        levels=p_levels,
-                        add_colorbar=True,add_labels=False,extend=p_extnd,
-                        cbar_kwargs={'orientation':cbar_orient,'shrink':cbar_shrk,'pad':cbar_pad,
-                        'label':p_units,'ticks':p_mantick,'format': '{}'.format})
-
-    # Overlay wind vectors if turned on
-    if overlay_vec == True:
-     vecp = axp.quiver(prect_c.lon[skip1D],prect_c.lat[skip1D],uc[skip2D],vc[skip2D],scale_units='height',pivot='mid',
-               scale=vec_scale,width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
-     qkeyp = axp.quiverkey(vecp,0.8,0.2,vec_ref,str(int(vec_ref))+str(vec_units),labelpos='N',coordinates='figure',color='k')
-
-    # Draw corresponding land or ocean tag region on plot
-    if tag <= (num_landtags-1):
-     draw_land_tags(numtag=tag,ax=axp,lw=taglw,major=tagmaj,minor=tagmin,color=tagcol,zorder=tagzorder)
-    elif tag > (num_landtags-1):
-     draw_ocean_tags(numtag=tag,ax=axp,lw=taglw,major=tagmaj,minor=tagmin,color=tagcol,zorder=tagzorder)
+  settings = locals()
+  draw_page = functools.partial(_draw_tag_page,**{name: settings.get(name) for name in _tag_page_settings})
 
   #--------------------------------------------------------
-  # Make d18Op plots if specified
+  # Pages: precipitation maps, then d18Op maps, if specified
   #--------------------------------------------------------
 
+  pages = []
+  if P == True:
+   pages += [('prect',tag) for tag in range(len(tagnames))]
   if O == True:
+   pages += [('d18Op',tag) for tag in range(len(tagnames))]
+
+  #--------------------------------
+  # Make PDF output file
+  #--------------------------------
+
+  # Determine if prect/d18Op are included in output file name 
+  Ptext = ''
+  Otext = ''
+  if P == True:
+   Ptext = '_prect'
+  if O == True: 
+   Otext = '_d18Op'
+
+  # Setting file output name parameters
+  if overlay_vec == True:
+   vec_name = ''.join(('_',vec_name))
+  if reg_name != '':
+   reg_name = ''.join(('_',reg_name))
+  if extra_name != '':
+   extra_name = ''.join(('_',extra_name))
+
+  filename = './'+str(folderpath)+'/'+str(case)+'_'+str(season)+'_watertagged'+Ptext+Otext+      \
+             vec_name+reg_name+extra_name+str(filesuf)
+
+  if pdf != None or workers == None or workers == 1:
+
+   # Draw every page, writing each to the output file and closing it as soon as it is drawn
+   output = PdfSink(filename) if pdf == None else pdf
+   try:
+    for page in pages:
+     output.add(draw_page(page))
+   finally:
+    # Only a file opened here is closed; a 'pdf' passed in stays open for more pages
+    if pdf == None:
+     output.close()
+
+  else:
 
-   for tag in range(len(tagnames)):
-
-    # Ignore unnecessary warning from matplotlib about having multiple figures open
-    simplefilter(action="ignore", category=RuntimeWarning)
-
-    # Define figure and axis
-    figo = plt.figure(figsize=(figw,figh),dpi=fdpi)
-    axo = figo.add_subplot(111, projection=proj)
-
-    # Default is global plot, will change if LonMin, etc. are modified
-    axo.set_extent([LonMin,LonMax,LatMin,LatMax],proj)
-
-    # Add features to map as indicated in parameters
-    if coast == True:
-     axo.add_feature(cfeature.COASTLINE,linewidths=coastlw)
-    if lake == True:
-     axo.add_feature(cfeature.LAKES,linewidths=lakelw,facecolor='none',edgecolor='k')
-    if border == True:
-     axo.add_feature(cfeature.BORDERS,linewidths=borderlw)
-    if usstate == True:
-     axo.add_feature(cfeature.STATES,linewidths=usstatelw)
-
-    # Add ticks and labels to map as indicated in parameters
-    map_ticks_and_labels(ax=axo,LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,
-                         lattksp=lattksp,lontksp=lontksp,xmin_mj=xmin_mj,ymin_mj=ymin_mj,
-                         tkmajlg=tkmajlg,tkminlg=tkminlg,glalpha=glalpha,glcolor=glcolor,
-                         lonlblsp=lonlblsp,latlblsp=latlblsp,xpads=xpads,ypads=ypads,
-                         tklblsz=tklblsz,proj=proj,top=topax,bot=botax,left=leftax,right=rightax)
-
-    if central_lon_180 == True:
-      # Modification for central_longitude = 180.
-      rlonw = rlonw if rlonw < 0 else rlonw - 180
-      rlone = rlone if rlone < 0 else rlone - 180
-
-    # Draw rectangle over region for which water tagging results will be calculated
-    draw_region_box(ax=axo,slat=rlats,nlat=rlatn,wlon=rlonw,elon=rlone,linestyle=regline,
-                    facecolor='none',edgecolor=regcol,linewidth=reglw,zorder=regzorder)
-
-    # Title above d18Op plots
-    axo.set_title(str(case)+r' $\delta^{18} O_{P}$ ('+o_units+') for '+str(tag+1)+'. '+tagnames[tag],
-                  fontsize=ttlfs,loc=ttlloc,pad=ttlpad)
-
-    # Make contour plots 
-    if cntr_type == 'AreaFill':
-     d18Op_c[tag,:,:].plot.contourf(ax=axo,transform=ccrs.PlateCarree(),cmap=coloro,
-                        levels=np.arange(o_loval,o_hival+o_spval,o_spval),
-                        add_colorbar=True,add_labels=False,extend=o_extnd,
-                        cbar_kwargs={'orientation':cbar_orient,'shrink':cbar_shrk,'pad':cbar_pad,
-                        'spacing':'proportional','ticks':MultipleLocator(o_tkstd),'label':o_units})
-    elif cntr_type == 'RasterFill':
-     d18Op_c[tag,:,:].plot(ax=axo,transform=ccrs.PlateCarree(),cmap=coloro,
-                        levels=np.arange(o_loval,o_hival+o_spval,o_spval),
-                        add_colorbar=True,add_labels=False,extend=o_extnd,
-                        cbar_kwargs={'orientation':cbar_orient,'shrink':cbar_shrk,'pad':cbar_pad,
-                        'spacing':'proportional','ticks':MultipleLocator(o_tkstd),'label':o_units})
-
-    # Overlay wind vectors if turned on
-    if overlay_vec == True:
-     veco = axo.quiver(d18Op_c.lon[skip1D],d18Op_c.lat[skip1D],uc[skip2D],vc[skip2D],scale_units='height',pivot='mid',
-                scale=vec_scale,width=vec_wid,headlength=vec_hdl,headwidth=vec_hdw,headaxislength=vec_hal)
-     qkeyo = axo.quiverkey(veco,0.8,0.2,vec_ref,str(int(vec_ref))+str(vec_units),labelpos='N',coordinates='figure',color='k')
-
-    # Draw corresponding land or ocean tag region on plot
-    if tag <= (num_landtags-1):
-     draw_land_tags(numtag=tag,ax=axo,lw=taglw,major=tagmaj,minor=tagmin,color=tagcol,zorder=tagzorder)
-    elif tag > (num_landtags-1):
-     draw_ocean_tags(numtag=tag,ax=axo,lw=taglw,major=tagmaj,minor=tagmin,color=tagcol,zorder=tagzorder)
-
-   #--------------------------------
-   # Make PDF output file
-   #--------------------------------
-
-   # Determine if prect/d18Op are included in output file name 
-   Ptext = ''
-   Otext = ''
-   if P == True:
-    Ptext = '_prect'
-   if O == True: 
-    Otext = '_d18Op'
-
-   # Setting file output name parameters
-   if overlay_vec == True:
-    vec_name = ''.join(('_',vec_name))
-   if reg_name != '':
-    reg_name = ''.join(('_',reg_name))
-   if extra_name != '':
-    extra_name = ''.join(('_',extra_name))
-
-   # Save multi image PDF file and close all figures when finished
-   save_multi_image('./'+str(folderpath)+'/'+str(case)+'_'+str(season)+'_watertagged'+Ptext+Otext+      \
-                    vec_name+reg_name+extra_name+str(filesuf))
-   plt.close('all')
+   # Draw pages in 'workers' processes, each to its own file, then merge them into the PDF file
+   render_pages_parallel(draw_page,pages,filename,workers=workers)
@@ -0,0 +1,102 @@
+#########################################################################################################
+#
+# Benchmark of the fill types of the map plotting functions ('AreaFill', 'RasterAreaFill', 'RasterFill'
+# and 'ImageFill'): time to draw and write a seasonal cycle page of 12 maps and the size of the PDF file
+#
+# Uses a synthetic field, so it runs anywhere without model output
+#
+#########################################################################################################
+
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # package directory
+import time
+import tempfile
+import numpy as np
+import xarray as xr
+import matplotlib
+matplotlib.use('Agg')
+import cartopy.crs as ccrs
+from ESMplot.plotting.plot_functions import PdfSink, fill_types
+from ESMplot.plotting import plot_seascycle_functions as plotseas
+
+#########################################################################################################
+#
+# Specifications for the benchmark are made here
+#
+#########################################################################################################
+
+# Grids to test as (name, number of latitudes, number of longitudes): f19 = 1.9x2.5, f09 = 0.9x1.25
+grids = [('f19',96,144),('f09',192,288)]
+
+# Fill types to test
+cntr_types = fill_types
+
+# Number of times each page is drawn (the fastest time is reported)
+repeats = 2
+
+# Map projection, resolution (dots per inch) of the figure and of the raster images in the PDF file
+proj = ccrs.PlateCarree()
+fdpi = 300.
+
+# Draw coastlines and borders (needs the Natural Earth data, downloaded by cartopy on first use)
+coast = True
+border = True
+
+#########################################################################################################
+#
+# Synthetic seasonal cycle [case x months x lat x lon]
+#
+#########################################################################################################
+
+def synthetic_seasonal_cycle(nlat,nlon,ncases=1,seed=0):
+
+  # Large-scale pattern that moves with the seasons plus small-scale noise, similar to a precipitation
+  # field in the number of contour shapes it produces
+  rng = np.random.default_rng(seed)
+  lat = np.linspace(-90.,90.,nlat)
+  lon = np.linspace(-180.,180.,nlon,endpoint=False)
+  months = np.arange(1,13)
+
+  phase = np.deg2rad(30.*months)[:,None,None]
+  LAT = np.deg2rad(lat)[None,:,None]
+  LON = np.deg2rad(lon)[None,None,:]
+  base = 5.*np.cos(LAT-0.3*np.sin(phase))**2 + 2.*np.sin(3.*LON+phase)*np.cos(2.*LAT)
+  values = np.stack([base+0.8*rng.standard_normal(base.shape) for _ in range(ncases)])
+
+  return xr.DataArray(values,dims=['case','months','lat','lon'],
+                      coords=dict(case=np.arange(ncases),months=months,lat=lat,lon=lon))
+
+#########################################################################################################
+#
+# Time each fill type
+#
+#########################################################################################################
+
+folder = tempfile.mkdtemp(prefix='benchmark_fill_')
+
+print('')
+print('{:<6}{:<16}{:>12}{:>14}'.format('grid','cntr_type','time (s)','PDF size (MB)'))
+print('-'*48)
+
+for grid, nlat, nlon in grids:
+
+ var = synthetic_seasonal_cycle(nlat,nlon)
+
+ for cntr_type in cntr_types:
+
+  filename = os.path.join(folder,grid+'_'+cntr_type+'.pdf')
+  best = None
+
+  for n in range(repeats):
+   start = time.perf_counter()
+   with PdfSink(filename,dpi=fdpi) as pdf:
+    plotseas.plot_seasonal_cycle(var=var,cases=[grid],var_name='VAR',units='units',fdpi=fdpi,
+                                 lineplot=False,proj=proj,coast=coast,border=border,cntr_type=cntr_type,
+                                 loval=0.,hival=8.,spval=0.5,tkstd=1.,pdf=pdf)
+   elapsed = time.perf_counter()-start
+   best = elapsed if best == None else min(best,elapsed)
+
+  print('{:<6}{:<16}{:>12.2f}{:>14.2f}'.format(grid,cntr_type,best,os.path.getsize(filename)/1e6))
+
+print('')
+print('PDF files in '+folder)
@@ -0,0 +1,116 @@
+#########################################################################################################
+#
+# Benchmark of the time to import each ESMplot module in a fresh Python process, and check that none of
+# them imports the plotting libraries (cartopy, cmaps, geocat.viz, matplotlib.pyplot) or geocat.comp
+# when imported. Those are loaded when a plot is first drawn, so a job that only calculates and prints
+# values starts quickly on a compute node. Exit status is 1 if a module is slower than 'max_seconds' or
+# imports one of the 'deferred' modules.
+#
+# Run from any directory with "python benchmarks/benchmark_imports.py"
+#
+#########################################################################################################
+
+import sys, os
+import json
+import argparse
+import subprocess
+
+package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#########################################################################################################
+#
+# Specifications for the benchmark are made here
+#
+#########################################################################################################
+
+# Modules to time, each imported on its own. 'all' imports every module together, as a driver script does
+modules = ['xarray',
+           'ESMplot.climate_analysis.seas_cycle_TLL',
+           'ESMplot.climate_analysis.seas_cycle_TSLL',
+           'ESMplot.climate_analysis.seas_avg_LL',
+           'ESMplot.climate_analysis.case_executor',
+           'ESMplot.print_values.print_spatial_average',
+           'ESMplot.watertagging.seas_avg_LL_watertags',
+           'ESMplot.watertagging.case_reader',
+           'ESMplot.watertagging.print_watertag_values',
+           'ESMplot.watertagging.combine_tagged_regions',
+           'ESMplot.plotting.plot_functions',
+           'ESMplot.plotting.plot_map_avg_functions',
+           'ESMplot.plotting.plot_seascycle_functions',
+           'ESMplot.watertagging.watertag_plots',
+           'all']
+
+# Modules that must not be imported by importing ESMplot modules
+deferred = ['cartopy','cmaps','geocat.viz','geocat.comp','geocat.f2py','matplotlib.pyplot','icecream']
+
+# Number of fresh processes per module (the fastest time is reported)
+repeats = 3
+
+# Largest allowed import time in seconds
+max_seconds = 1.0
+
+#########################################################################################################
+#
+# Import a module in a fresh process
+#
+#########################################################################################################
+
+# Run in the child process: time the import and list the deferred modules it loaded
+child = '''
+import sys, time, json
+sys.path.insert(0,{package_dir!r})
+names = {names!r}
+start = time.perf_counter()
+for name in names:
+  __import__(name)
+seconds = time.perf_counter() - start
+print(json.dumps(dict(seconds=seconds,loaded=[m for m in {deferred!r} if m in sys.modules])))
+'''
+
+def time_import(module,nrepeats=repeats):
+
+  names = [m for m in modules if m.startswith('ESMplot.')] if module == 'all' else [module]
+  code = child.format(package_dir=package_dir,names=names,deferred=deferred)
+
+  best = None
+  for _ in range(nrepeats):
+   output = subprocess.run([sys.executable,'-c',code],capture_output=True,text=True)
+   if output.returncode != 0:
+    error = output.stderr.strip().splitlines()
+    return dict(seconds=None,loaded=[],error=error[-1] if error else 'failed')
+   result = json.loads(output.stdout.strip().splitlines()[-1])
+   if best == None or result['seconds'] < best['seconds']:
+    best = result
+
+  return best
+
+#########################################################################################################
+#
+# Run the benchmark
+#
+#########################################################################################################
+
+if __name__ == '__main__':
+
+  parser = argparse.ArgumentParser(description='Time the import of each ESMplot module in a fresh process.')
+  parser.add_argument('--repeats',type=int,default=repeats,help='processes per module (default: '+str(repeats)+')')
+  parser.add_argument('--max-seconds',type=float,default=max_seconds,
+                      help='largest allowed import time (default: '+str(max_seconds)+')')
+  args = parser.parse_args()
+
+  print(f"{'module':<46}{'import (s)':>12}   deferred modules loaded")
+  print('-'*90)
+
+  failed = False
+  for module in modules:
+   result = time_import(module,args.repeats)
+   if result['seconds'] == None:
+    print(f"{module:<46}{'FAILED':>12}   {result['error'][:60]}")
+    continue
+   loaded = ', '.join(result['loaded'])
+   slow = module != 'xarray' and result['seconds'] > args.max_seconds
+   if module != 'xarray' and (slow or loaded != ''):
+    failed = True
+   print(f"{module:<46}{result['seconds']:>12.2f}   {loaded}{'  (slow)' if slow else ''}")
+
+  sys.exit(1 if failed else 0)
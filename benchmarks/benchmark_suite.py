@@ -0,0 +1,529 @@
+#########################################################################################################
+#
+# End-to-end benchmark of ESMplot on synthetic CAM/CLM water tagged output: time and peak memory of every
+# seascyc_*, seasavg_*, water tag and plotting entry point at several problem sizes, with stored
+# baselines for regression comparison
+#
+# Each measurement runs in a fresh (forked) process, so the dataset, interpolation plan and basemap caches
+# start empty and the peak memory belongs to that measurement alone. Time is the fastest of 'repeats'
+# runs; memory is measured in one extra run as the growth of the process's peak resident set size (RSS)
+# and with tracemalloc (peak NumPy and Python allocations). Synthetic files are written once per size (see
+# synthetic_data.py) and reused by later runs.
+#
+# Examples (from the repository directory):
+#
+#   python benchmarks/benchmark_suite.py                                  # sizes 'small' and 'medium'
+#   python benchmarks/benchmark_suite.py --sizes small --only seasavg     # entries whose name contains 'seasavg'
+#   python benchmarks/benchmark_suite.py --save-baseline                  # store results as the baseline
+#   python benchmarks/benchmark_suite.py --compare                        # compare with the baseline
+#
+#########################################################################################################
+
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # package directory
+import gc
+import json
+import time
+import argparse
+import platform
+import tempfile
+import importlib
+import traceback
+import tracemalloc
+import multiprocessing
+import numpy as np
+import xarray as xr
+import matplotlib
+matplotlib.use('Agg')
+from synthetic_data import synthetic_case_files, month_days
+
+#########################################################################################################
+#
+# Specifications for the benchmark are made here
+#
+#########################################################################################################
+
+# Problem sizes: grid (f19 = 1.9x2.5, f09 = 0.9x1.25), years of monthly output, hybrid levels and tags
+sizes = {'small':  dict(grid='f19',years=2,nlev=26,ntags=4),
+         'medium': dict(grid='f19',years=10,nlev=30,ntags=14),
+         'large':  dict(grid='f09',years=10,nlev=30,ntags=40)}
+default_sizes = ['small','medium']
+
+# Number of timed runs of each entry (the fastest time is reported)
+repeats = 2
+
+# Measure peak allocations with tracemalloc in the memory run. This makes that run several times slower
+# for the plotting entries; with False only the growth of the peak RSS is measured.
+trace_allocations = True
+
+# Folder for the synthetic files (several GB for 'large'), and for plots and Excel files written by entries
+data_folder = os.path.join(tempfile.gettempdir(),'ESMplot_benchmark_data')
+
+# Default baseline file
+baseline_file = os.path.join(os.path.dirname(os.path.abspath(__file__)),'baselines','baseline.json')
+
+# A result is a regression if it is slower (or uses more memory) than the baseline by more than this
+# fraction, and by more than the absolute noise floor
+tolerance = 0.25
+min_seconds = 0.05
+min_mb = 5.
+
+# Season and its monthly weights (length of each month), pressure level (hPa) and region (Guatemala, as
+# in the water tag drivers) used by the entries
+MON = [5,6,7]
+wgt_mon = xr.DataArray(month_days[MON]/np.sum(month_days[MON]),dims=['time'])
+level = 850
+region = dict(slat=13.26,nlat=18.95,wlon=-93.75,elon=-88.75)
+
+#########################################################################################################
+#
+# Entry points
+#
+# Each entry is (name, setup). setup(case) receives the synthetic case (dict with paths 'cam' and 'clm'
+# and 'tagcodes') and returns the function to time, so that reading inputs for the plotting entries is
+# not part of their time. Entries run in the size's output folder, where plots and Excel files are
+# written. Modules are imported in setup, so an entry whose optional dependencies are missing is reported
+# as skipped instead of stopping the suite.
+#
+#########################################################################################################
+
+def _module(name):
+  return importlib.import_module('ESMplot.'+name)
+
+def _function(module,func,args,**kwargs):
+  # Setup of an entry that calls 'func' from 'module' with the arguments args(case) and 'kwargs'
+  def setup(case):
+   function, arguments = getattr(_module(module),func), args(case)
+   return lambda: function(*arguments,**kwargs)
+  return setup
+
+def _seascyc(func,args,**kwargs):
+  return _function('climate_analysis.seas_cycle_TLL',func,args,**kwargs)
+
+def _seascyc_soil(func,args,**kwargs):
+  return _function('climate_analysis.seas_cycle_TSLL',func,args,**kwargs)
+
+def _seasavg(func,args,**kwargs):
+  return _function('climate_analysis.seas_avg_LL',func,args,wgt_mon=wgt_mon,**kwargs)
+
+cam = lambda *first: lambda case: list(first)+[case['cam']]
+clm = lambda *first: lambda case: list(first)+[case['clm']]
+
+entries = [
+
+  # Seasonal cycles [12 x lat x lon]
+  ('seascyc_var_TLL',             _seascyc('seascyc_var_TLL',cam('TS'))),
+  ('seascyc_var_TLL_850hPa',      _seascyc('seascyc_var_TLL',cam('T'),level=level)),
+  ('seascyc_prect_TLL',           _seascyc('seascyc_prect_TLL',cam())),
+  ('seascyc_PminE_TLL',           _seascyc('seascyc_PminE_TLL',cam())),
+  ('seascyc_soilvar_TLL',         _seascyc('seascyc_soilvar_TLL',clm('H2OSOI'))),
+  ('seascyc_rainiso_TLL',         _seascyc('seascyc_rainiso_TLL',cam('d18O'))),
+  ('seascyc_soiliso_TLL',         _seascyc('seascyc_soiliso_TLL',clm('d18O'))),
+  ('seascyc_vaporiso_TLL',        _seascyc('seascyc_vaporiso_TLL',cam('d18O'),level=level)),
+  ('seascyc_isoroot_TLL',         _seascyc('seascyc_isoroot_TLL',clm('d18O'))),
+  ('seascyc_wind_vec_TLL',        _seascyc('seascyc_wind_vec_TLL',cam(),level=level)),
+  ('seascyc_IVT_vec_TLL',         _seascyc('seascyc_IVT_vec_TLL',cam())),
+  ('seascyc_IVT_vec_TLL_hybrid',  _seascyc('seascyc_IVT_vec_TLL',cam(),engine='hybrid')),
+  ('seascyc_soilvar_TSLL',        _seascyc_soil('seascyc_soilvar_TSLL',clm('H2OSOI'))),
+  ('seascyc_soiliso_TSLL',        _seascyc_soil('seascyc_soiliso_TSLL',clm('d18O'))),
+
+  # Seasonal averages [lat x lon]
+  ('seasavg_var_LL',              _seasavg('seasavg_var_LL',cam('TS',MON))),
+  ('seasavg_var_LL_850hPa',       _seasavg('seasavg_var_LL',cam('T',MON),level=level)),
+  ('seasavg_prect_LL',            _seasavg('seasavg_prect_LL',cam(MON))),
+  ('seasavg_PminE_LL',            _seasavg('seasavg_PminE_LL',cam(MON))),
+  ('seasavg_soilvar_LL',          _seasavg('seasavg_soilvar_LL',clm('H2OSOI',MON))),
+  ('seasavg_rainiso_LL',          _seasavg('seasavg_rainiso_LL',cam('d18O',MON))),
+  ('seasavg_soiliso_LL',          _seasavg('seasavg_soiliso_LL',clm('d18O',MON))),
+  ('seasavg_vaporiso_LL',         _seasavg('seasavg_vaporiso_LL',lambda case: ['d18O',MON,case['cam'],level])),
+  ('seasavg_isoroot_LL',          _seasavg('seasavg_isoroot_LL',clm('d18O',MON))),
+  ('seasavg_wind_vec_LL',         _seasavg('seasavg_wind_vec_LL',cam(MON),level=level)),
+  ('seasavg_IVT_vec_LL',          _seasavg('seasavg_IVT_vec_LL',cam(MON))),
+  ('seasavg_IVT_vec_LL_hybrid',   _seasavg('seasavg_IVT_vec_LL',cam(MON),engine='hybrid')),
+]
+
+#-------------------------------------------------------------------------------------------------------
+# Zarr stores (written in the output folder, not next to the synthetic file, so the other entries keep
+# reading the netCDF file)
+#-------------------------------------------------------------------------------------------------------
+
+def _history_to_zarr(case):
+  convert = _module('climate_analysis.zarr_store').history_to_zarr
+  return lambda: convert(case['cam'],store='synthetic.zarr',overwrite=True)
+
+def _seascyc_zarr(case):
+  store = _module('climate_analysis.zarr_store').history_to_zarr(case['cam'],store='read.zarr',
+                                                                 variables=['PRECC','PRECL'],overwrite=True)
+  func = _module('climate_analysis.seas_cycle_TLL').seascyc_prect_TLL
+  return lambda: func(store,chunks={})
+
+entries += [
+  ('history_to_zarr',                  _history_to_zarr),
+  ('seascyc_prect_TLL_zarr',           _seascyc_zarr),
+]
+
+#-------------------------------------------------------------------------------------------------------
+# Water tags
+#-------------------------------------------------------------------------------------------------------
+
+def _watertagging_vars(case):
+  func = _module('watertagging.seas_avg_LL_watertags').seasavg_watertagging_vars
+  return lambda: func(case['tagcodes'][0],MON,case['cam'],wgt_mon=wgt_mon)
+
+def _watertagging_batch(case):
+  func = _module('watertagging.seas_avg_LL_watertags').seasavg_watertagging_batch
+  return lambda: func(case['tagcodes'],MON,case['cam'],wgt_mon=wgt_mon)
+
+def _case_products(case):
+  func = _module('watertagging.case_reader').watertag_case_products
+  return lambda: func(case['cam'],case['tagcodes'],MON,wgt_mon=wgt_mon)
+
+def _excel(case):
+  func = _module('watertagging.print_watertag_values').monthly_watertag_values_to_excel
+  return lambda: func(CASES=[case['cam']],cases=['synthetic'],tagnames=case['tagcodes'],tagcodes=case['tagcodes'],**region)
+
+def _combine_regions(case):
+  combine = _module('watertagging.combine_tagged_regions').combine_regions_to_new_tag
+  def run():
+   with xr.open_dataset(case['cam']) as ds:
+    combine(ds,regions=case['tagcodes'][:2],new_region='CMBA').to_netcdf('combReg.nc')
+  return run
+
+def _combine_regions_multi(case):
+  combine = _module('watertagging.combine_tagged_regions').combine_regions_to_new_tags
+  codes = case['tagcodes']
+  return lambda: combine(case['cam'],{'CMBA':codes[:2],'CMBB':codes[2:4]},path='combReg.nc')
+
+entries += [
+  ('seasavg_watertagging_vars',        _watertagging_vars),
+  ('seasavg_watertagging_batch',       _watertagging_batch),
+  ('watertag_case_products',           _case_products),
+  ('monthly_watertag_values_to_excel', _excel),
+  ('combine_regions_to_new_tag',       _combine_regions),
+  ('combine_regions_to_new_tags',      _combine_regions_multi),
+]
+
+#-------------------------------------------------------------------------------------------------------
+# Plots (inputs are built from the file in setup; only drawing and writing the PDF is timed)
+#-------------------------------------------------------------------------------------------------------
+
+def _two_cases(var):
+  # The same field twice along 'case' (the second slightly changed), as for a comparison of two cases
+  return xr.concat([var,var*1.1],dim=xr.DataArray(['case1','case2'],dims=['case'],name='case'))
+
+def _precip_fields(case):
+  # Seasonal cycle and seasonal average of precipitation (mm/day), read without ESMplot's readers
+  with xr.open_dataset(case['cam']) as ds:
+   prect = ((ds.PRECC+ds.PRECL)*86400000.).load()
+  cycle = prect.groupby('time.month').mean('time').rename(month='months')
+  return cycle, cycle.isel(months=MON).mean('months')
+
+def _plot_seasonal_cycle(case):
+  plot = _module('plotting.plot_seascycle_functions').plot_seasonal_cycle
+  cycle = _precip_fields(case)[0].expand_dims(case=['synthetic'])
+  return lambda: plot(var=cycle,cases=['synthetic'],var_name='PRECT',units='mm/day',lineplot=False,
+                      loval=0.,hival=12.,spval=1.,tkstd=2.)
+
+def _plot_contour_map_avg(case):
+  plot = _module('plotting.plot_map_avg_functions').plot_contour_map_avg
+  avg = _two_cases(_precip_fields(case)[1])
+  return lambda: plot(var=avg,cases=['case1','case2'],var_name='PRECT',seas='JJA',units='mm/day',
+                      loval=0.,hival=12.,spval=1.,tkstd=2.)
+
+def _plot_diff_contour_map_avg(case):
+  plot = _module('plotting.plot_map_avg_functions').plot_diff_contour_map_avg
+  avg = _two_cases(_precip_fields(case)[1])
+  return lambda: plot(var=avg,cases=['case1','case2'],var_name='PRECT',seas='JJA',units='mm/day',
+                      loval=-2.,hival=2.,spval=0.25,tkstd=1.)
+
+def _tag_products(case):
+  # Seasonally averaged tagged precipitation and d18O [tag x lat x lon]
+  batch = _module('watertagging.seas_avg_LL_watertags').seasavg_watertagging_batch
+  return batch(case['tagcodes'],MON,case['cam'],wgt_mon=wgt_mon)
+
+def _plot_tagged_precip_and_d18Op(case):
+  plot = _module('watertagging.watertag_plots').plot_tagged_precip_and_d18Op
+  Pi, d18Opsink = _tag_products(case)
+  ntags = len(case['tagcodes'])
+  return lambda: plot(P=True,O=True,prect=Pi,d18Op=d18Opsink,case='synthetic',tagnames=case['tagcodes'],
+                      num_landtags=ntags//2,num_oceantags=ntags-ntags//2,season='JJA',lat=Pi.lat,lon=Pi.lon,**region)
+
+def _watertagging_values_on_map(case):
+  plot = _module('watertagging.watertag_plots').watertagging_values_on_map
+  coords = _module('climate_analysis.coordinate_functions')
+  Pi, d18Opsink = _tag_products(case)
+  weights = coords.region_weights(lat=Pi.lat,lon=Pi.lon,**region)
+  precip, d18Op = coords.region_mean(Pi,weights), coords.region_mean(d18Opsink,weights)
+  ntags = len(case['tagcodes'])
+  nland = ntags//2
+  rng = np.random.default_rng(0)
+  return lambda: plot(precip=precip,d18Op=d18Op,case='synthetic',tagnames=case['tagcodes'],num_landtags=nland,
+                      num_oceantags=ntags-nland,path=case['cam'],season='JJA',lat=Pi.lat,lon=Pi.lon,
+                      landlat=list(rng.uniform(-60.,60.,nland)),landlon=list(rng.uniform(-180.,180.,nland)),
+                      oceanlat=list(rng.uniform(-60.,60.,ntags-nland)),oceanlon=list(rng.uniform(-180.,180.,ntags-nland)),**region)
+
+entries += [
+  ('plot_seasonal_cycle',          _plot_seasonal_cycle),
+  ('plot_contour_map_avg',         _plot_contour_map_avg),
+  ('plot_diff_contour_map_avg',    _plot_diff_contour_map_avg),
+  ('plot_tagged_precip_and_d18Op', _plot_tagged_precip_and_d18Op),
+  ('watertagging_values_on_map',   _watertagging_values_on_map),
+]
+
+#########################################################################################################
+#
+# Measurements
+#
+#########################################################################################################
+
+def _rss() -> float:
+
+  # Current and peak resident set size of this process in bytes (None if unknown)
+  try:
+   with open('/proc/self/status') as status:
+    fields = dict(line.split(':',1) for line in status)
+   return float(fields['VmRSS'].split()[0])*1024., float(fields['VmHWM'].split()[0])*1024.
+  except (OSError,KeyError):
+   return None, None
+
+def _measure(setup,
+             case: dict,
+             memory: bool,
+             trace: bool) -> dict:
+
+  # One run of an entry: wall time, CPU time, and with 'memory' the RSS growth (and the tracemalloc peak
+  # if 'trace')
+  cwd = os.getcwd()
+  os.chdir(case['folder'])
+  try:
+   run = setup(case)
+   gc.collect()
+   rss_start = _rss()[0]
+   if memory and trace:
+    tracemalloc.start()
+   wall, cpu = time.perf_counter(), time.process_time()
+   run()
+   wall, cpu = time.perf_counter()-wall, time.process_time()-cpu
+   result = dict(seconds=wall,cpu_seconds=cpu)
+   if memory and trace:
+    result['alloc_mb'] = tracemalloc.get_traced_memory()[1]/1e6
+    tracemalloc.stop()
+   if memory:
+    peak = _rss()[1]
+    result['rss_mb'] = None if peak == None or rss_start == None else max(peak-rss_start,0.)/1e6
+  finally:
+   os.chdir(cwd)
+  return result
+
+def _child(queue,setup,case,memory,trace):
+
+  # Runs one measurement in a forked process and sends back its result or error
+  try:
+   queue.put(_measure(setup,case,memory,trace))
+  except BaseException as error:
+   queue.put(dict(error=type(error).__name__+': '+str(error),
+                  skipped=isinstance(error,ImportError),trace=traceback.format_exc()))
+
+def measure(setup,
+            case: dict,
+            memory: bool = False,
+            trace: bool = trace_allocations) -> dict:
+
+  '''Measures one run of an entry in a fresh forked process (in this process where fork is not
+  available, after clearing ESMplot's caches). Returns dict(seconds, cpu_seconds) and, if 'memory' is
+  True, rss_mb (growth of the peak RSS) and, if 'trace' is also True, alloc_mb (tracemalloc peak); or
+  dict(error, skipped) if the entry failed.'''
+
+  if 'fork' not in multiprocessing.get_all_start_methods():
+   for module, clear in [('climate_analysis.dataset_cache','clear_dataset_cache'),
+                         ('climate_analysis.vertical_interp','clear_interp_plan_cache'),
+                         ('plotting.basemap','clear_basemap_cache')]:
+    try:
+     getattr(_module(module),clear)()
+    except ImportError:
+     pass
+   try:
+    return _measure(setup,case,memory,trace)
+   except ImportError as error:
+    return dict(error=type(error).__name__+': '+str(error),skipped=True)
+
+  context = multiprocessing.get_context('fork')
+  queue = context.Queue()
+  process = context.Process(target=_child,args=(queue,setup,case,memory,trace))
+  process.start()
+  try:
+   result = queue.get()
+  except (EOFError,OSError):
+   result = dict(error='worker process died',skipped=False)
+  process.join()
+  if process.exitcode not in [0,None] and 'error' not in result:
+   result = dict(error='worker process exited with code '+str(process.exitcode),skipped=False)
+
+  return result
+
+def run_suite(size_names: list,
+              only: list = None,
+              nrepeats: int = repeats,
+              folder: str = data_folder,
+              trace: bool = trace_allocations) -> dict:
+
+  '''Runs every entry whose name contains one of the strings in 'only' (all entries if None) at each
+  size in 'size_names' and returns {size: {entry: result}}, printing each result as it is measured.'''
+
+  results = {}
+
+  for size in size_names:
+
+   print('')
+   print('Size '+size+': '+', '.join(key+'='+str(value) for key, value in sizes[size].items()))
+   start = time.perf_counter()
+   case = synthetic_case_files(folder,**sizes[size])
+   case['folder'] = os.path.join(folder,'output_'+size)
+   os.makedirs(case['folder'],exist_ok=True)
+   print('Synthetic files ready in {:.1f} s ({:.0f} MB)'.format(time.perf_counter()-start,
+         sum(os.path.getsize(case[f]) for f in ['cam','clm'])/1e6))
+   print('')
+   print('{:<36}{:>10}{:>10}{:>12}{:>10}'.format('entry','time (s)','cpu (s)','alloc (MB)','rss (MB)'))
+   print('-'*78)
+
+   results[size] = {}
+   for name, setup in entries:
+    if only != None and not any(text in name for text in only):
+     continue
+
+    runs = [measure(setup,case) for _ in range(int(nrepeats))]
+    failed = [run for run in runs if 'error' in run]
+    if failed:
+     results[size][name] = failed[0]
+     label = 'skipped' if failed[0]['skipped'] else 'FAILED'
+     print('{:<36}{}'.format(name,label+' ('+failed[0]['error'].splitlines()[0][:60]+')'))
+     continue
+
+    best = min(runs,key=lambda run: run['seconds'])
+    result = dict(best,**{key: value for key, value in measure(setup,case,memory=True,trace=trace).items()
+                          if key in ['alloc_mb','rss_mb','error']})
+    results[size][name] = result
+    print('{:<36}{:>10.2f}{:>10.2f}{:>12}{:>10}'.format(name,result['seconds'],result['cpu_seconds'],
+          _format(result.get('alloc_mb')),_format(result.get('rss_mb'))))
+
+  return results
+
+def _format(value) -> str:
+  return '-' if value == None else '{:.1f}'.format(value)
+
+#########################################################################################################
+#
+# Baselines
+#
+#########################################################################################################
+
+def save_baseline(results: dict,
+                  path: str = baseline_file):
+
+  '''Stores 'results' in the JSON file at 'path', merged into any sizes and entries already there, with
+  a description of the machine they were measured on.'''
+
+  baseline = load_baseline(path) or dict(results={})
+  for size in results:
+   baseline['results'].setdefault(size,{}).update({name: result for name, result in results[size].items()
+                                                   if 'error' not in result})
+  baseline['machine'] = dict(node=platform.node(),platform=platform.platform(),python=platform.python_version(),
+                             cpus=os.cpu_count(),numpy=np.__version__,xarray=xr.__version__)
+  baseline['saved'] = time.strftime('%Y-%m-%d %H:%M:%S')
+
+  os.makedirs(os.path.dirname(os.path.abspath(path)),exist_ok=True)
+  with open(path,'w') as f:
+   json.dump(baseline,f,indent=1,sort_keys=True)
+
+def load_baseline(path: str = baseline_file) -> dict:
+
+  '''Returns the baseline stored at 'path', or None if there is none.'''
+
+  if not os.path.exists(path):
+   return None
+  with open(path) as f:
+   return json.load(f)
+
+def compare(results: dict,
+            baseline: dict,
+            tol: float = tolerance) -> list:
+
+  '''Prints each result next to its baseline and returns the list of regressions as (size, entry,
+  measure, ratio): results more than 'tol' slower, or using more than 'tol' more memory, than the
+  baseline (and by more than min_seconds or min_mb).'''
+
+  regressions = []
+
+  print('')
+  print('Comparison with baseline saved '+baseline.get('saved','?')+' on '+baseline.get('machine',{}).get('node','?'))
+  print('')
+  print('{:<8}{:<36}{:>10}{:>10}{:>9}{:>12}{:>10}{:>9}{:>12}'.format('size','entry','time (s)','base (s)','change',
+                                                                   'alloc (MB)','base (MB)','change','rss change'))
+  print('-'*116)
+
+  for size in results:
+   for name, result in results[size].items():
+    base = baseline['results'].get(size,{}).get(name)
+    if 'error' in result or base == None:
+     continue
+
+    flags = []
+    for key, floor, label in [('seconds',min_seconds,'time'),('alloc_mb',min_mb,'alloc'),('rss_mb',min_mb,'rss')]:
+     if result.get(key) != None and base.get(key):
+      if result[key] > base[key]*(1.+tol) and result[key]-base[key] > floor:
+       regressions.append((size,name,label,result[key]/base[key]))
+       flags.append(label)
+
+    print('{:<8}{:<36}{:>10.2f}{:>10.2f}{:>9}{:>12}{:>10}{:>9}{:>12}  {}'.format(size,name,result['seconds'],
+          base['seconds'],_change(result.get('seconds'),base.get('seconds')),_format(result.get('alloc_mb')),
+          _format(base.get('alloc_mb')),_change(result.get('alloc_mb'),base.get('alloc_mb')),
+          _change(result.get('rss_mb'),base.get('rss_mb')),'REGRESSION ('+', '.join(flags)+')' if flags else ''))
+
+  print('')
+  print(str(len(regressions))+' regression(s) beyond '+str(int(tol*100))+' %')
+
+  return regressions
+
+def _change(value,base) -> str:
+  return '-' if value == None or not base else '{:+.0f}%'.format((value/base-1.)*100.)
+
+#########################################################################################################
+#
+# Command line
+#
+#########################################################################################################
+
+if __name__ == '__main__':
+
+ parser = argparse.ArgumentParser(description='Time and memory-profile ESMplot on synthetic output.')
+ parser.add_argument('--sizes',nargs='+',default=default_sizes,choices=list(sizes),
+                     help='problem sizes to run (default: '+' '.join(default_sizes)+')')
+ parser.add_argument('--only',nargs='+',help='run only entries whose name contains one of these strings')
+ parser.add_argument('--repeats',type=int,default=repeats,help='timed runs per entry (default: '+str(repeats)+')')
+ parser.add_argument('--data',default=data_folder,help='folder for synthetic files (default: '+data_folder+')')
+ parser.add_argument('--save-baseline',nargs='?',const=baseline_file,metavar='FILE',
+                     help='store the results as the baseline (default file: benchmarks/baselines/baseline.json)')
+ parser.add_argument('--compare',nargs='?',const=baseline_file,metavar='FILE',
+                     help='compare with a baseline and exit with status 1 on regressions')
+ parser.add_argument('--rss-only',action='store_true',help='measure memory by peak RSS only, without tracemalloc')
+ parser.add_argument('--tolerance',type=float,default=tolerance,help='allowed slowdown as a fraction (default: '+str(tolerance)+')')
+ args = parser.parse_args()
+
+ results = run_suite(args.sizes,only=args.only,nrepeats=args.repeats,folder=args.data,
+                     trace=trace_allocations and not args.rss_only)
+
+ status = 0
+ if args.compare != None:
+  baseline = load_baseline(args.compare)
+  if baseline == None:
+   print('')
+   print('No baseline at '+args.compare)
+  elif compare(results,baseline,tol=args.tolerance):
+   status = 1
+
+ if args.save_baseline != None:
+  save_baseline(results,args.save_baseline)
+  print('')
+  print('Baseline saved to '+args.save_baseline)
+
+ sys.exit(status)
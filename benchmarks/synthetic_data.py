@@ -0,0 +1,563 @@
+#########################################################################################################
+#
+# Synthetic CAM and CLM water tagged history files for benchmarking ESMplot without model output
+#
+# The files have the variable names, dimensions, units and rough magnitudes of monthly iCESM h0 output
+# (PRECC/PRECL, the PRECRC_*r/PRECSC_*s/PRECRL_*R/PRECSL_*S isotope and tag families, H2OV/H216OV/H218OV/
+# HDOV, U/V/Q/T on hybrid levels with hyam/hybm/hyai/hybi/PS, LANDFRAC, and the CLM H2OSOI_* and
+# ROOTR_COLUMN soil variables), so every seascyc_*, seasavg_*, water tag and plotting function can read
+# them. Values are smooth large-scale patterns plus noise: tagged precipitation sums to the total and
+# delta values are within the usual range, but nothing here is physically consistent beyond that.
+#
+# Used by benchmark_suite.py, or from the command line to write a case, ex.
+#
+#   python benchmarks/synthetic_data.py --grid f09 --years 20 --nlev 30 --ntags 40 --folder /scratch/synth
+#
+#########################################################################################################
+
+import os
+import json
+import argparse
+import functools
+import numpy as np
+import xarray as xr
+
+# Optional: with dask the fields are generated and written one year at a time, so memory use does not
+# grow with the length of the record
+try:
+ import dask.array as dsa
+except ImportError:
+ dsa = None
+
+# Grids as (number of latitudes, number of longitudes): f45 = 4x5, f19 = 1.9x2.5, f09 = 0.9x1.25
+grids = {'f45': (46,72), 'f19': (96,144), 'f09': (192,288)}
+
+# Tag region codes of the 40 tag water tagging experiments (see examples/calculate_watertags_RCP85_progress.py)
+default_tagcodes = ['ANTA','WNAM','ENAM','SAME','EURO',
+                    'NASA','INDA','SASA','AFRI','SLCB',
+                    'SAHL','AUST','AMAZ','CONG',
+                    'ENPA','WNPA','WNAT','ENAT','ARCT',
+                    'TPNE','CARB','TANW','TANE','MEDI',
+                    'ARAB','BOFB','SOCB','TPNW','TPNC',
+                    'TPSE','TASW','TASE','TISW','TISC',
+                    'TISE','SAHO','TPSC','SPAC','SATL','SIND']
+
+# Reference pressure (Pa), model top as a fraction of it, and the level where hybrid levels become
+# pure pressure levels
+p0 = 100000.
+eta_top = 0.00365
+eta_pure = 0.1
+
+# Version of the generated fields; files written by another version are not reused
+generator_version = 1
+
+# Number of soil levels in the CLM files
+default_nlevgrnd = 15
+
+# Days in each month of the 'noleap' calendar used by CESM
+month_days = np.array([31,28,31,30,31,30,31,31,30,31,30,31])
+
+#########################################################################################################
+# Vertical coordinates
+#########################################################################################################
+
+def hybrid_coefficients(nlev: int) -> tuple:
+
+  '''Returns hybrid coefficients (hyam, hybm, hyai, hybi) for 'nlev' levels, ordered from the model top
+  to the surface as in CAM. Levels are closer together near the surface and the top, the upper levels
+  (above eta_pure) are pure pressure levels and the lowest interface is the surface (hybi = 1).'''
+
+  s = np.linspace(0.,1.,nlev+1)
+  eta = np.exp(np.log(eta_top)*(1.-s)**1.5)
+  hybi = np.clip((eta-eta_pure)/(1.-eta_pure),0.,1.)
+  hyai = eta - hybi
+  hyam = 0.5*(hyai[1:]+hyai[:-1])
+  hybm = 0.5*(hybi[1:]+hybi[:-1])
+
+  return hyam, hybm, hyai, hybi
+
+def soil_levels(nlevgrnd: int = default_nlevgrnd) -> tuple:
+
+  '''Returns the depths (m) and thicknesses (m) of CLM's exponentially spaced soil levels.'''
+
+  j = np.arange(1,nlevgrnd+1)
+  zsoi = 0.025*(np.exp(0.5*(j-0.5))-1.)
+  edges = np.concatenate([[0.],0.5*(zsoi[1:]+zsoi[:-1]),[zsoi[-1]+0.5*(zsoi[-1]-zsoi[-2])]])
+
+  return zsoi, np.diff(edges)
+
+#########################################################################################################
+# A synthetic case
+#########################################################################################################
+
+def _smooth_field(rng: np.random.Generator,
+                  lat: np.ndarray,
+                  lon: np.ndarray,
+                  nwaves: int = 8) -> np.ndarray:
+
+  # Sum of a few random large-scale waves, scaled to zero mean and unit standard deviation [lat x lon]
+  latr = np.deg2rad(lat)[:,np.newaxis]
+  lonr = np.deg2rad(lon)[np.newaxis,:]
+  field = np.zeros((len(lat),len(lon)))
+  for _ in range(nwaves):
+   m, n = rng.integers(1,5), rng.integers(1,4)
+   field += rng.normal()*np.cos(m*lonr+rng.uniform(0.,2.*np.pi))*np.cos(n*latr+rng.uniform(0.,np.pi))
+  return (field-field.mean())/field.std()
+
+def _red_noise(rng: np.random.Generator,
+               shape: tuple) -> np.ndarray:
+
+  # Normal noise [... x lat x lon] correlated over neighbouring grid cells (two passes of a 3-point
+  # filter in latitude and longitude), rescaled to unit standard deviation. Uncorrelated noise would
+  # give far more contour shapes than model output does.
+  noise = rng.standard_normal(shape)
+  for _ in range(2):
+   noise = (np.roll(noise,1,axis=-1)+noise+np.roll(noise,-1,axis=-1))/3.
+   padded = np.concatenate([noise[...,:1,:],noise,noise[...,-1:,:]],axis=-2)
+   noise = (padded[...,:-2,:]+padded[...,1:-1,:]+padded[...,2:,:])/3.
+  return noise/noise.std()
+
+class SyntheticCase:
+
+  '''Synthetic monthly water tagged iCESM output on a regular latitude-longitude grid.
+
+  Required Parameters
+  --------------------------------------------------------------------------------------------------------
+  grid
+   class: 'string', Name of the grid, one of the keys of 'grids'. Ex. 'f19'
+
+  years
+   class: 'int', Number of years of monthly output.
+
+  Optional Parameters
+  --------------------------------------------------------------------------------------------------------
+  nlev: class 'int', Number of hybrid levels of the atmosphere. Default = 30
+  ntags: class 'int', Number of tagged regions, named by the first 'ntags' of 'default_tagcodes' (then
+                      T040, T041, ...). Default = 40
+  nlevgrnd: class 'int', Number of soil levels of the land model. Default = 15
+  seed: class 'int', Seed of the random numbers. The same seed gives the same files. Default = 0
+  _______________________________________________________________________________________________________
+
+  Example
+  ---------------------
+  case = SyntheticCase('f19',years=10,nlev=30,ntags=14)
+  case.write_cam('synthetic.cam.h0.nc')
+  case.write_clm('synthetic.clm2.h0.nc')
+
+  '''
+
+  def __init__(self,
+               grid: str,
+               years: int,
+               nlev: int = 30,
+               ntags: int = 40,
+               nlevgrnd: int = default_nlevgrnd,
+               seed: int = 0):
+
+    if grid not in grids:
+     raise ValueError('grid must be one of '+str(list(grids)))
+
+    self.grid = str(grid)
+    self.years = int(years)
+    self.nlev = int(nlev)
+    self.nlevgrnd = int(nlevgrnd)
+    self.seed = int(seed)
+    self.tagcodes = (default_tagcodes + ['T'+str(n).zfill(3) for n in range(len(default_tagcodes),int(ntags))])[:int(ntags)]
+
+    nlat, nlon = grids[self.grid]
+    self.lat = np.linspace(-90.,90.,nlat)
+    self.lon = np.arange(nlon)*(360./nlon)
+    self.hyam, self.hybm, self.hyai, self.hybi = hybrid_coefficients(self.nlev)
+    self.zsoi, self.dzsoi = soil_levels(self.nlevgrnd)
+
+    #-----------------------------------------------------------
+    # Fields that do not change from year to year [lat x lon]
+    #-----------------------------------------------------------
+
+    rng = np.random.default_rng([self.seed,0])
+
+    # About 30 % land with fractional coastal cells, and topography over land
+    land = _smooth_field(rng,self.lat,self.lon)
+    self.landfrac = np.clip((land-np.quantile(land,0.7))/0.3,0.,1.)
+    self.topo = self.landfrac*np.clip(0.5+0.5*_smooth_field(rng,self.lat,self.lon,nwaves=12),0.,1.)
+
+    # Each tag region's share of precipitation, which moves with the seasons, and its d18O offset
+    self.tag_logits = np.stack([3.*_smooth_field(rng,self.lat,self.lon) for _ in self.tagcodes]) if self.tagcodes else None
+    self.tag_phase = rng.uniform(0.,2.*np.pi,len(self.tagcodes))
+    self.tag_d18O = rng.uniform(-5.,5.,len(self.tagcodes))
+
+  @property
+  def spec(self) -> dict:
+
+    '''Parameters that determine the contents of the files.'''
+
+    return dict(grid=self.grid,years=self.years,nlev=self.nlev,ntags=len(self.tagcodes),
+                nlevgrnd=self.nlevgrnd,seed=self.seed,version=generator_version)
+
+  #-------------------------------------------------------------------------------------------------------
+  # Fields of one year [12 months x ...]
+  #-------------------------------------------------------------------------------------------------------
+
+  def _phase(self) -> np.ndarray:
+
+    # Seasonal phase of each month, shaped to broadcast against [month x lat x lon]
+    return (2.*np.pi*(np.arange(12)+0.5)/12.)[:,np.newaxis,np.newaxis]
+
+  @functools.lru_cache(maxsize=2)
+  def surface(self,
+              year: int) -> dict:
+
+    '''Returns the surface fields of one year [12 x lat x lon]: convective and large-scale precipitation
+    (m/s), the fraction falling as snow, d18O and dD of precipitation (per mil), evaporation (kg/m2/s),
+    surface pressure (Pa) and surface temperature (K).'''
+
+    rng = np.random.default_rng([self.seed,1,int(year)])
+    phase = self._phase()
+    lat = self.lat[np.newaxis,:,np.newaxis]
+    shape = (12,len(self.lat),len(self.lon))
+
+    # Rain belt that follows the sun, storm tracks and log-normal noise (mm/day)
+    itcz = 8.*np.exp(-((lat+8.*np.cos(phase))/10.)**2)
+    storms = 3.*np.exp(-((np.abs(lat)-45.)/12.)**2)
+    prect = (1.+itcz+storms)*np.exp(0.6*_red_noise(rng,shape)-0.18)
+    conv = np.clip(0.8*np.exp(-(lat/25.)**2)+0.1,0.,1.)
+    pc, pl = prect*conv/86400000., prect*(1.-conv)/86400000.
+
+    # Surface temperature and snow where it is below freezing
+    hemi = np.sign(lat)*np.cos(phase)
+    ts = 300.-45.*np.sin(np.deg2rad(lat))**2-12.*hemi*np.abs(np.sin(np.deg2rad(lat)))-20.*self.topo \
+         +1.5*_red_noise(rng,shape)
+    snow = 1./(1.+np.exp((ts-271.)/2.))
+
+    # Temperature and amount effects on d18O of precipitation, dD near the global meteoric water line
+    d18O = -4.+0.35*(ts-300.)-0.08*prect+0.8*_red_noise(rng,shape)
+    dD = 8.*d18O+10.+2.*rng.standard_normal(shape)
+
+    qflx = (3.+2.*np.cos(np.deg2rad(lat))*(1.-self.landfrac))*np.exp(0.3*_red_noise(rng,shape))/86400.
+    ps = p0*(1.-0.4*self.topo)+600.*np.sin(phase)*np.sin(np.deg2rad(lat))+300.*rng.standard_normal(shape)
+
+    return dict(PC=pc,PL=pl,snow=snow,d18O=d18O,dD=dD,QFLX=qflx,PS=ps,TS=ts)
+
+  def precip(self,
+             year: int,
+             name: str) -> np.ndarray:
+
+    '''Returns one of the precipitation variables [12 x lat x lon] (m/s): PRECC, PRECL, or a member
+    of the PRECRC_*r, PRECSC_*s, PRECRL_*R and PRECSL_*S families for a water species or a tag.'''
+
+    sfc = self.surface(year)
+    if name in ['PRECC','PRECL']:
+     return sfc['PC'] if name == 'PRECC' else sfc['PL']
+
+    # Convective or large-scale, rain or snow
+    kind, species = name[:6], name[7:-1]
+    total = sfc['PC'] if kind in ['PRECRC','PRECSC'] else sfc['PL']
+    total = total*(1.-sfc['snow']) if kind in ['PRECRC','PRECRL'] else total*sfc['snow']
+
+    # Untagged species, light (the 16O variables hold total water) or heavy
+    if species in ['H2O','H216O']:
+     return total
+    if species == 'H218O':
+     return total*(1.+sfc['d18O']/1000.)
+    if species == 'HDO':
+     return total*(1.+sfc['dD']/1000.)
+
+    # Tagged species: the tag's share of the total, with its own d18O if heavy
+    heavy = species.endswith('18O')
+    t = self.tagcodes.index(species[:-3] if heavy else species)
+    share = self.tag_share(t)
+    if heavy:
+     return total*share*(1.+(sfc['d18O']+self.tag_d18O[t])/1000.)
+    return total*share
+
+  def tag_share(self,
+                t: int) -> np.ndarray:
+
+    '''Returns the share of precipitation from tag region 't' in each month [12 x lat x lon]. Shares of
+    all tags add up to 1.'''
+
+    return self._tag_shares()[:,t]
+
+  @functools.lru_cache(maxsize=1)
+  def _tag_shares(self) -> np.ndarray:
+
+    # Softmax over tags of the seasonally shifting logits [12 x tag x lat x lon]
+    logits = self.tag_logits[np.newaxis] + 1.5*np.sin(self._phase()[:,np.newaxis]+self.tag_phase[:,np.newaxis,np.newaxis])
+    logits -= logits.max(axis=1,keepdims=True)
+    shares = np.exp(logits)
+    return (shares/shares.sum(axis=1,keepdims=True)).astype(np.float32)
+
+  def level_field(self,
+                  year: int,
+                  name: str) -> np.ndarray:
+
+    '''Returns one of the hybrid level variables [12 x lev x lat x lon]: U, V (m/s), T (K), Q (kg/kg)
+    or the vapor variables H2OV, H216OV, H218OV and HDOV (kg/kg).'''
+
+    code = ['U','V','T','Q','H2OV','H216OV','H218OV','HDOV'].index(name)
+    rng = np.random.default_rng([self.seed,2,int(year),min(code,3)])
+    # Single precision throughout, so a year of a field on f09 takes a few hundred MB
+    phase = self._phase()[:,np.newaxis].astype(np.float32)
+    eta = (self.hyam+self.hybm).astype(np.float32)[np.newaxis,:,np.newaxis,np.newaxis]
+    lat = self.lat.astype(np.float32)[np.newaxis,np.newaxis,:,np.newaxis]
+    lon = np.deg2rad(self.lon).astype(np.float32)[np.newaxis,np.newaxis,np.newaxis,:]
+    shape = (12,self.nlev,len(self.lat),len(self.lon))
+    noise = rng.standard_normal(shape,dtype=np.float32)
+
+    if name == 'U':
+     jet = 35.*np.exp(-((np.abs(lat)-35.-5.*np.sign(lat)*np.cos(phase))/12.)**2)*4.*eta**0.5*(1.-eta)
+     return jet-8.*np.exp(-(lat/20.)**2)*eta**2+3.*noise
+    if name == 'V':
+     return 3.*np.sin(np.deg2rad(2.*lat))*np.cos(2.*lon+phase)*eta+2.*noise
+    if name == 'T':
+     return np.maximum(self.surface(year)['TS'].astype(np.float32)[:,np.newaxis]*eta**0.19,200.)+noise
+
+    # Specific humidity, highest near the surface in the tropics
+    q = (0.018*np.cos(np.deg2rad(lat))**4+0.0005)*eta**3*np.exp(0.15*noise)
+    q = np.maximum(q,1.E-7)
+    if name in ['Q','H2OV','H216OV']:
+     return q
+
+    # Vapor gets isotopically lighter with height and latitude
+    d18O = -12.-15.*np.abs(np.sin(np.deg2rad(lat)))-25.*(1.-eta)
+    if name == 'H218OV':
+     return q*(1.+d18O/1000.)
+    return q*(1.+(8.*d18O+10.)/1000.)
+
+  def soil_field(self,
+                 year: int,
+                 name: str) -> np.ndarray:
+
+    '''Returns one of the soil variables [12 x levgrnd x lat x lon] over land (NaN over ocean, as in CLM
+    output): H2OSOI (mm3/mm3), TSOI (K), H2OSOI_H2OTR, H2OSOI_H218O, H2OSOI_HDO (kg/m2) or ROOTR_COLUMN.'''
+
+    code = ['H2OSOI','TSOI','H2OSOI_H2OTR','H2OSOI_H218O','H2OSOI_HDO','ROOTR_COLUMN'].index(name)
+    rng = np.random.default_rng([self.seed,3,int(year),code])
+    sfc = self.surface(year)
+    z = self.zsoi[np.newaxis,:,np.newaxis,np.newaxis]
+    shape = (12,self.nlevgrnd,len(self.lat),len(self.lon))
+    ocean = (self.landfrac <= 0.)[np.newaxis,np.newaxis]
+
+    # Wetter soil where it rains more, and deep soil that remembers the annual mean
+    prect = ((sfc['PC']+sfc['PL'])*86400000.)[:,np.newaxis]
+    damp = np.exp(-z/0.5)
+    h2osoi = np.clip(0.1+0.04*(damp*prect+(1.-damp)*prect.mean(axis=0))+0.02*rng.standard_normal(shape),0.02,0.5)
+
+    if name == 'H2OSOI':
+     field = h2osoi
+    elif name == 'TSOI':
+     ts = sfc['TS'][:,np.newaxis]
+     field = damp*ts+(1.-damp)*ts.mean(axis=0)+0.5*rng.standard_normal(shape)
+    elif name == 'ROOTR_COLUMN':
+     roots = np.exp(-z/0.3)*(z < 3.)*np.exp(0.2*rng.standard_normal(shape))
+     field = roots/roots.sum(axis=1,keepdims=True)
+    else:
+     water = h2osoi*self.dzsoi[np.newaxis,:,np.newaxis,np.newaxis]*1000.
+     d18O = damp*sfc['d18O'][:,np.newaxis]+(1.-damp)*sfc['d18O'].mean(axis=0)+2.*np.exp(-z/0.1)
+     if name == 'H2OSOI_H2OTR':
+      field = water
+     elif name == 'H2OSOI_H218O':
+      field = water*(1.+d18O/1000.)
+     else:
+      field = water*(1.+(8.*d18O+10.)/1000.)
+
+    return np.where(ocean,np.nan,field)
+
+  #-------------------------------------------------------------------------------------------------------
+  # Datasets
+  #-------------------------------------------------------------------------------------------------------
+
+  def _time_coords(self) -> dict:
+
+    # Monthly time at the end of each month ('days since 0001-01-01', noleap), with bounds, as in h0 files
+    ends = np.cumsum(np.tile(month_days,self.years)).astype(float)
+    bnds = np.stack([ends-np.tile(month_days,self.years),ends],axis=1)
+    time = xr.DataArray(ends,dims=['time'],attrs=dict(long_name='time',units='days since 0001-01-01 00:00:00',
+                                                      calendar='noleap',bounds='time_bnds'))
+    return dict(time=time,time_bnds=xr.DataArray(bnds,dims=['time','nbnd']))
+
+  def _variable(self,
+                block,
+                shape: tuple,
+                dims: list,
+                attrs: dict) -> xr.DataArray:
+
+    # Variable [time x ...] built by block(year) one year (12 months) at a time; lazily with dask if
+    # available so that it is written year by year
+    if dsa != None:
+     chunks = ((12,)*self.years,) + tuple((n,) for n in shape)
+     data = dsa.map_blocks(lambda block_id=None: block(block_id[0]).astype(np.float32),
+                           chunks=chunks,dtype=np.float32,meta=np.array((),dtype=np.float32))
+    else:
+     data = np.concatenate([block(year).astype(np.float32) for year in range(self.years)])
+    return xr.DataArray(data,dims=['time']+list(dims),attrs=attrs)
+
+  def cam_dataset(self) -> xr.Dataset:
+
+    '''Returns the CAM history as an xr.Dataset [time x (lev) x lat x lon], lazy if dask is installed.'''
+
+    nlat, nlon = len(self.lat), len(self.lon)
+    ll = (nlat,nlon)
+    lll = (self.nlev,nlat,nlon)
+    variables = {}
+
+    # Surface fields
+    variables['PS'] = self._variable(lambda y: self.surface(y)['PS'],ll,['lat','lon'],dict(units='Pa',long_name='Surface pressure'))
+    variables['TS'] = self._variable(lambda y: self.surface(y)['TS'],ll,['lat','lon'],dict(units='K',long_name='Surface temperature (radiative)'))
+    variables['QFLX'] = self._variable(lambda y: self.surface(y)['QFLX'],ll,['lat','lon'],dict(units='kg/m2/s',long_name='Surface water flux'))
+    variables['LANDFRAC'] = self._variable(lambda y: np.broadcast_to(self.landfrac,(12,)+ll),ll,['lat','lon'],
+                                           dict(units='fraction',long_name='Fraction of sfc area covered by land'))
+
+    # Precipitation: totals, untagged water species and tags
+    names = ['PRECC','PRECL']
+    for species in ['H2O','H216O','H218O','HDO']:
+     names += ['PRECRC_'+species+'r','PRECSC_'+species+'s','PRECRL_'+species+'R','PRECSL_'+species+'S']
+    for tagcode in self.tagcodes:
+     for species in ['','18O']:
+      names += ['PRECRC_'+tagcode+species+'r','PRECSC_'+tagcode+species+'s',
+                'PRECRL_'+tagcode+species+'R','PRECSL_'+tagcode+species+'S']
+    for name in names:
+     variables[name] = self._variable(functools.partial(self.precip,name=name),ll,['lat','lon'],
+                                      dict(units='m/s',long_name=name+' precipitation rate'))
+
+    # Hybrid level fields
+    units = dict(U='m/s',V='m/s',T='K',Q='kg/kg',H2OV='kg/kg',H216OV='kg/kg',H218OV='kg/kg',HDOV='kg/kg')
+    for name in units:
+     variables[name] = self._variable(functools.partial(self.level_field,name=name),lll,['lev','lat','lon'],
+                                      dict(units=units[name],long_name=name))
+
+    coords = dict(lat=('lat',self.lat,dict(units='degrees_north',long_name='latitude')),
+                  lon=('lon',self.lon,dict(units='degrees_east',long_name='longitude')),
+                  lev=('lev',1000.*(self.hyam+self.hybm),dict(units='hPa',positive='down',
+                                                              long_name='hybrid level at midpoints (1000*(A+B))')),
+                  ilev=('ilev',1000.*(self.hyai+self.hybi),dict(units='hPa',positive='down',
+                                                                long_name='hybrid level at interfaces (1000*(A+B))')))
+    time = self._time_coords()
+    ds = xr.Dataset(variables,coords=dict(coords,time=time['time']))
+    ds['time_bnds'] = time['time_bnds']
+    ds['hyam'] = xr.DataArray(self.hyam,dims=['lev'],attrs=dict(long_name='hybrid A coefficient at layer midpoints'))
+    ds['hybm'] = xr.DataArray(self.hybm,dims=['lev'],attrs=dict(long_name='hybrid B coefficient at layer midpoints'))
+    ds['hyai'] = xr.DataArray(self.hyai,dims=['ilev'],attrs=dict(long_name='hybrid A coefficient at layer interfaces'))
+    ds['hybi'] = xr.DataArray(self.hybi,dims=['ilev'],attrs=dict(long_name='hybrid B coefficient at layer interfaces'))
+    ds['P0'] = xr.DataArray(p0,attrs=dict(units='Pa',long_name='reference pressure'))
+    ds.attrs = dict(source='CAM',title='ESMplot synthetic water tagged history',synthetic_spec=json.dumps(self.spec))
+
+    return ds
+
+  def clm_dataset(self) -> xr.Dataset:
+
+    '''Returns the CLM history as an xr.Dataset [time x (levgrnd) x lat x lon], lazy if dask is installed.'''
+
+    nlat, nlon = len(self.lat), len(self.lon)
+    slll = (self.nlevgrnd,nlat,nlon)
+    units = dict(H2OSOI='mm3/mm3',TSOI='K',H2OSOI_H2OTR='kg/m2',H2OSOI_H218O='kg/m2',H2OSOI_HDO='kg/m2',
+                 ROOTR_COLUMN='proportion')
+    variables = {name: self._variable(functools.partial(self.soil_field,name=name),slll,['levgrnd','lat','lon'],
+                                      dict(units=units[name],long_name=name))
+                 for name in units}
+    variables['landfrac'] = xr.DataArray(self.landfrac,dims=['lat','lon'],attrs=dict(long_name='land fraction'))
+
+    coords = dict(lat=('lat',self.lat,dict(units='degrees_north',long_name='coordinate latitude')),
+                  lon=('lon',self.lon,dict(units='degrees_east',long_name='coordinate longitude')),
+                  levgrnd=('levgrnd',self.zsoi,dict(units='m',long_name='coordinate soil levels')))
+    time = self._time_coords()
+    ds = xr.Dataset(variables,coords=dict(coords,time=time['time']))
+    ds['time_bnds'] = time['time_bnds']
+    ds.attrs = dict(source='Community Land Model CLM4.0',title='ESMplot synthetic water tagged history',
+                    synthetic_spec=json.dumps(self.spec))
+
+    return ds
+
+  #-------------------------------------------------------------------------------------------------------
+  # Files
+  #-------------------------------------------------------------------------------------------------------
+
+  def _write(self,
+             ds: xr.Dataset,
+             path: str) -> str:
+
+    # Written uncompressed with an unlimited time dimension, as CESM writes h0 files. Coordinates and
+    # time-invariant variables get no fill value.
+    encoding = {name: dict(_FillValue=None) for name in ds.variables
+                if name in ds.coords or name == 'time_bnds' or 'time' not in ds[name].dims}
+    ds.to_netcdf(path,unlimited_dims=['time'],encoding=encoding)
+    return path
+
+  def write_cam(self,
+                path: str) -> str:
+
+    '''Writes the CAM history file to 'path' and returns 'path'.'''
+
+    return self._write(self.cam_dataset(),str(path))
+
+  def write_clm(self,
+                path: str) -> str:
+
+    '''Writes the CLM history file to 'path' and returns 'path'.'''
+
+    return self._write(self.clm_dataset(),str(path))
+
+#########################################################################################################
+# Write (or reuse) the files of a case
+#########################################################################################################
+
+def _matches(path: str,
+             spec: dict) -> bool:
+
+  # True if 'path' is a synthetic file written with the same parameters
+  if not os.path.exists(path):
+   return False
+  try:
+   with xr.open_dataset(path,decode_times=False) as ds:
+    return json.loads(ds.attrs.get('synthetic_spec','{}')) == spec
+  except (OSError,ValueError):
+   return False
+
+def synthetic_case_files(folder: str,
+                         grid: str = 'f19',
+                         years: int = 2,
+                         nlev: int = 30,
+                         ntags: int = 40,
+                         nlevgrnd: int = default_nlevgrnd,
+                         seed: int = 0,
+                         overwrite: bool = False) -> dict:
+
+  '''Writes the CAM and CLM files of a SyntheticCase to 'folder' (named after its parameters) and
+  returns dict(cam=path, clm=path, tagcodes=list). Files written earlier with the same parameters are
+  reused unless 'overwrite' is True.'''
+
+  case = SyntheticCase(grid,years,nlev=nlev,ntags=ntags,nlevgrnd=nlevgrnd,seed=seed)
+  os.makedirs(str(folder),exist_ok=True)
+  name = 'synthetic.{grid}.{years}yr.L{nlev}.{ntags}tags.s{seed}'.format(**case.spec)
+  files = dict(cam=os.path.join(str(folder),name+'.cam.h0.nc'),
+               clm=os.path.join(str(folder),name+'.clm2.h0.nc'),
+               tagcodes=case.tagcodes)
+
+  if overwrite or not _matches(files['cam'],case.spec):
+   case.write_cam(files['cam'])
+  if overwrite or not _matches(files['clm'],case.spec):
+   case.write_clm(files['clm'])
+
+  return files
+
+#########################################################################################################
+# Command line
+#########################################################################################################
+
+if __name__ == '__main__':
+
+ parser = argparse.ArgumentParser(description='Write synthetic CAM and CLM water tagged history files.')
+ parser.add_argument('--folder',default='.',help='output folder (default: current directory)')
+ parser.add_argument('--grid',default='f19',choices=list(grids),help='grid (default: f19)')
+ parser.add_argument('--years',type=int,default=2,help='years of monthly output (default: 2)')
+ parser.add_argument('--nlev',type=int,default=30,help='hybrid levels (default: 30)')
+ parser.add_argument('--ntags',type=int,default=40,help='tagged regions (default: 40)')
+ parser.add_argument('--nlevgrnd',type=int,default=default_nlevgrnd,help='soil levels (default: 15)')
+ parser.add_argument('--seed',type=int,default=0,help='random seed (default: 0)')
+ parser.add_argument('--overwrite',action='store_true',help='rewrite files that already exist')
+ args = parser.parse_args()
+
+ files = synthetic_case_files(args.folder,grid=args.grid,years=args.years,nlev=args.nlev,ntags=args.ntags,
+                              nlevgrnd=args.nlevgrnd,seed=args.seed,overwrite=args.overwrite)
+ print('Wrote '+files['cam'])
+ print('Wrote '+files['clm'])
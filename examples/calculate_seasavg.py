@@ -18,6 +18,8 @@ from cartopy.mpl.gridliner import LongitudeFormatter, LatitudeFormatter
 import cmaps
 import geocat.viz.util as gv
 from ESMplot.climate_analysis import seas_cycle_TLL as seascyc
+from ESMplot.climate_analysis.derived_cache import set_derived_cache, derived_cache_info
+from ESMplot.climate_analysis.case_executor import run_cases
 from ESMplot.climate_analysis import seas_avg_LL as seasavg
 from ESMplot.climate_analysis.mon_wgt_avg import mon_wgt_avg
 from ESMplot.print_values import print_spatial_average 
@@ -237,7 +239,7 @@ else:
 
 Ind_plots    = True                    # Include individual map plots in output file
 proj         = ccrs.PlateCarree()      # Map projection
-Contour_type = 'AreaFill'            # 'RasterFill' or 'AreaFill'
+Contour_type = 'AreaFill'            # 'AreaFill', 'RasterAreaFill', 'RasterFill' or 'ImageFill'
 ColCntr      = cmaps.cmp_haxby_r       # Contour plot color table 
 ColDiff      = cmaps.BlueYellowRed_r   # "_r" at end reverses color table 
 folderpath   = 'pdfs'                  # folder to output file to
@@ -251,203 +253,241 @@ contour_kwargs = dict(figh=14.5,figw=9.,lonlblsp=30.,xmin_mj=3,ymin_mj=3,lontksp
 
 dffrnce_kwargs = dict(figh=7.,figw=8.,ttlfts=10.,lonlblsp=30.,xmin_mj=3,ymin_mj=3,lontksp=13)
 
-#########################################################################################################
-#
-# Read in and calculate seasonally averaged variables here 
-#
-#########################################################################################################
+#-------------------------------------------------
+# Cache of calculated variables
+#-------------------------------------------------
 
-#-----------------------------------------------------------------
-# Create multidimensional variable(s) [# of cases x lat x lon] 
-#-----------------------------------------------------------------
-
-datasize = xr.open_dataset(CASES[0])
-var_avg_by_case = xr.DataArray(None,dims=['case','lat','lon'],coords=dict(case=cases,lat=datasize.lat,lon=datasize.lon)).astype(float)
-if overlay_vector == True:
- vecsize = xr.open_dataset(CASES_vec[0])
- u_avg_by_case = xr.DataArray(None,dims=['case','lat','lon'],coords=dict(case=cases,lat=vecsize.lat,lon=vecsize.lon)).astype(float)
- v_avg_by_case = xr.DataArray(None,dims=['case','lat','lon'],coords=dict(case=cases,lat=vecsize.lat,lon=vecsize.lon)).astype(float)
-
-#--------------------------------------------------------------------
-# Process a few variables before starting to loop through each case
-#--------------------------------------------------------------------
-
-# Read in dimension variables
-time = datasize.time
-lat = datasize.lat
-lon = datasize.lon
-
-# Make season string automatically from season indices
-month_by_letter = ['J','F','M','A','M','J','J','A','S','O','N','D']
-if len(MON) == 12:   # annual average
- season = 'ANN'
-else:
- season = ''.join([month_by_letter[i] for i in MON])
+# Directory to store calculated seasonal cycles/averages in, so re-running this script (ex. to change a 
+# color table) reads them from the cache instead of the model output files, ex. 'derived_cache'.
+# None = no cache
+derived_cache_dir = None
+derived_cache_gb  = 10.                # size limit of the cache directory in GB
 
-#------------------------------------------------------------
-# Loop through each case and calculate seasonal average 
-#------------------------------------------------------------
+#-------------------------------------------------
+# Parallel calculation of cases
+#-------------------------------------------------
 
-for i in range(len(cases)):
+# Number of cases calculated at once, each in its own process (1 = one case at a time in this process, as
+# before; set to None for one per core or to a number of cases to calculate them in parallel)
+max_workers = 1
+memory_gb   = None                     # memory in GB the cases may use together (None = 80% of available)
+
+# Worker processes (max_workers above) import this script to run, so the work below is only done when
+# the script itself is run
+if __name__ == '__main__':
+
+ #########################################################################################################
+ #
+ # Read in and calculate seasonally averaged variables here 
+ #
+ #########################################################################################################
+
+ #-----------------------------------------------------------------
+ # Turn on the cache of calculated variables, if specified
+ #-----------------------------------------------------------------
+
+ set_derived_cache(derived_cache_dir,max_size_gb=derived_cache_gb)
+
+ #-----------------------------------------------------------------
+ # Create multidimensional variable(s) [# of cases x lat x lon] 
+ #-----------------------------------------------------------------
+
+ datasize = xr.open_dataset(CASES[0])
+ var_avg_by_case = xr.DataArray(None,dims=['case','lat','lon'],coords=dict(case=cases,lat=datasize.lat,lon=datasize.lon)).astype(float)
+ if overlay_vector == True:
+  vecsize = xr.open_dataset(CASES_vec[0])
+  u_avg_by_case = xr.DataArray(None,dims=['case','lat','lon'],coords=dict(case=cases,lat=vecsize.lat,lon=vecsize.lon)).astype(float)
+  v_avg_by_case = xr.DataArray(None,dims=['case','lat','lon'],coords=dict(case=cases,lat=vecsize.lat,lon=vecsize.lon)).astype(float)
+
+ #--------------------------------------------------------------------
+ # Process a few variables before starting to loop through each case
+ #--------------------------------------------------------------------
+
+ # Read in dimension variables
+ time = datasize.time
+ lat = datasize.lat
+ lon = datasize.lon
+
+ # Make season string automatically from season indices
+ month_by_letter = ['J','F','M','A','M','J','J','A','S','O','N','D']
+ if len(MON) == 12:   # annual average
+  season = 'ANN'
+ else:
+  season = ''.join([month_by_letter[i] for i in MON])
+
+ #------------------------------------------------------------
+ # Choose the seasonal average function and its parameters
+ #------------------------------------------------------------
 
  # CONTOURS (non-isotope variables)
  if varfunc == 'var':
-  var_avg_by_case[i,:,:] = seasavg.seasavg_var_LL(var1=VAR1,path=CASES[i],begi=begi,endi=endi,var2=VAR2,math=MATH,mult=MULT,
-                                                   months=MON,wgt_mon=wgt_mon[i,:])
+  func, kwargs = seasavg.seasavg_var_LL, dict(var1=VAR1,var2=VAR2,math=MATH,mult=MULT)
  if varfunc == 'varlev':
-  var_avg_by_case[i,:,:] = seasavg.seasavg_var_LL(var1=VAR1,path=CASES[i],begi=begi,endi=endi,var2=VAR2,math=MATH,mult=MULT,
-                                                   level=LEVEL,plev=plev,months=MON,wgt_mon=wgt_mon[i,:]) 
+  func, kwargs = seasavg.seasavg_var_LL, dict(var1=VAR1,var2=VAR2,math=MATH,mult=MULT,level=LEVEL,plev=plev)
  if varfunc == 'prect':
-  var_avg_by_case[i,:,:] = seasavg.seasavg_prect_LL(path=CASES[i],begi=begi,endi=endi,months=MON,wgt_mon=wgt_mon[i,:]) 
+  func, kwargs = seasavg.seasavg_prect_LL, dict()
 
  if varfunc == 'PminE':
-  var_avg_by_case[i,:,:] = seasavg.seasavg_PminE_LL(path=CASES[i],begi=begi,endi=endi,months=MON,wgt_mon=wgt_mon[i,:])
+  func, kwargs = seasavg.seasavg_PminE_LL, dict()
 
  if varfunc == 'soilvar':
-  var_avg_by_case[i,:,:] = seasavg.seasavg_soilvar_LL(var1=VAR1,path=CASES[i],begi=begi,endi=endi,var2=VAR2,math=MATH,
-                                                       soillev=SOIL_LEV,mult=MULT,months=MON,wgt_mon=wgt_mon[i,:])
+  func, kwargs = seasavg.seasavg_soilvar_LL, dict(var1=VAR1,var2=VAR2,math=MATH,soillev=SOIL_LEV,mult=MULT)
 
  # CONTOURS (isotopic variables) 
  if varfunc == 'rainiso':
-  var_avg_by_case[i,:,:] = seasavg.seasavg_rainiso_LL(iso_type=ISO,path=CASES[i],begi=begi,endi=endi,ptiny=ptiny,
-                                                       months=MON,wgt_mon=wgt_mon[i,:])
+  func, kwargs = seasavg.seasavg_rainiso_LL, dict(iso_type=ISO,ptiny=ptiny)
  if varfunc == 'soiliso':
-  var_avg_by_case[i,:,:] = seasavg.seasavg_soiliso_LL(iso_type=ISO,path=CASES[i],begi=begi,endi=endi,ptiny=ptiny,
-                                                       soillev=SOIL_LEV,months=MON,wgt_mon=wgt_mon[i,:])
+  func, kwargs = seasavg.seasavg_soiliso_LL, dict(iso_type=ISO,ptiny=ptiny,soillev=SOIL_LEV)
  if varfunc == 'vaporiso':
-  var_avg_by_case[i,:,:] = seasavg.seasavg_vaporiso_LL(iso_type=ISO,path=CASES[i],begi=begi,endi=endi,ptiny=ptiny,
-                                                        level=LEVEL,plev=plev,months=MON,wgt_mon=wgt_mon[i,:])
+  func, kwargs = seasavg.seasavg_vaporiso_LL, dict(iso_type=ISO,ptiny=ptiny,level=LEVEL,plev=plev)
  if varfunc == 'isoroot':
-  var_avg_by_case[i,:,:] = seasavg.seasavg_isoroot_LL(iso_type=ISO,path=CASES[i],begi=begi,endi=endi,ptiny=ptiny,
-                                                        rootwgt=ROOTWGT,months=MON,wgt_mon=wgt_mon[i,:])
+  func, kwargs = seasavg.seasavg_isoroot_LL, dict(iso_type=ISO,ptiny=ptiny,rootwgt=ROOTWGT)
+
+ #------------------------------------------------------------
+ # Calculate the seasonal average of every case in parallel
+ #------------------------------------------------------------
+
+ # Parameters shared by every case, and the monthly weights of each case
+ kwargs.update(begi=begi,endi=endi,months=MON)
+ wgt_by_case = dict(wgt_mon=[wgt_mon[i,:] for i in range(len(cases))])
 
- print(var_avg_by_case[i,:,:])
+ var_avg_by_case[:,:,:] = run_cases(func,CASES,cases=cases,kwargs=kwargs,case_kwargs=wgt_by_case,
+                                    max_workers=max_workers,memory_gb=memory_gb)
+
+ for i in range(len(cases)):
+  print(var_avg_by_case[i,:,:])
 
  # VECTORS 
  if overlay_vector == True:
    
   if overlay_type == 'wind':
-   u_avg_by_case[i,:,:], v_avg_by_case[i,:,:] = seasavg.seasavg_wind_vec_LL(path=CASES_vec[i],begi=begi,endi=endi,
-                                                              level=WIND_LEVEL,plev=plev,months=MON,wgt_mon=wgt_mon[i,:])
+   u_avg_by_case[:,:,:], v_avg_by_case[:,:,:] = run_cases(seasavg.seasavg_wind_vec_LL,CASES_vec,cases=cases,
+                                                          kwargs=dict(begi=begi,endi=endi,level=WIND_LEVEL,plev=plev,months=MON),
+                                                          case_kwargs=wgt_by_case,max_workers=max_workers,memory_gb=memory_gb)
 
   if overlay_type == 'ivt':
-   u_avg_by_case[i,:,:], v_avg_by_case[i,:,:] = seasavg.seasavg_IVT_vec_LL(path=CASES_vec[i],begi=begi,endi=endi,ptop=ptop_lev,
-                                                                       pbot=pbot_lev,plev=plev,months=MON,wgt_mon=wgt_mon[i,:])
-
-#########################################################################################################
-#
-# Loop through cases and print spatially averaged values 
-#
-#########################################################################################################
-
-#-------------------------------------------------------------
-# Determine units based on isotopic or non-isotopic variable
-#-------------------------------------------------------------
-
-UNITS = UNITS if varfunc not in ['rainiso','soiliso','vaporiso','isoroot'] else IUNITS
-
-#-------------------
-# Print values
-#-------------------
-
-if Global == True or Region == True or Point == True:
- print("**************************")
- print("SPATIALLY AVERAGED VALUES")
- print("**************************")
-
-if Global == True:
- for i in range(len(cases)):
-  print_spatial_average.print_global_average(case=cases[i],variable=var_avg_by_case[i,:,:],units=UNITS)
-
-if Region == True:
- for i in range(len(cases)):
-  print_spatial_average.print_region_average(case=cases[i],variable=var_avg_by_case[i,:,:],units=UNITS,
-                                             slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon)
-
-if Point == True:
- for i in range(len(cases)):
-  print_spatial_average.print_point_average(case=cases[i],variable=var_avg_by_case[i,:,:],units=UNITS,
-                                            latpt=latpoint,lonpt=lonpoint)
-
-#########################################################################################################
-#
-# Plot the values 
-#
-#########################################################################################################
-
-#-------------------------------------------------------
-# A few things to specify to make the code run smoothly
-#-------------------------------------------------------
-
-# Manage non-specified variables 
-if VAR2 == None: VAR2, MATH = '', ''
-if ManLevCntr == False: c_loval,c_hival,c_spval,c_tkstd = None,None,None,None
-if ManLevDiff == False: d_loval,d_hival,d_spval,d_tkstd = None,None,None,None
-
-# Specify name of variable
-varnames = dict(var=f'{VAR1}{MATH}{VAR2}',varlev=f'{VAR1}{MATH}{VAR2}$_{{{LEVEL}hPa}}$',
-                prect='PRECT',PminE='PminE',soilvar=f'{VAR1}{MATH}{VAR2}')
-d18Onames = dict(rainiso='$\delta^{18}$O$_{P}$',soiliso='$\delta^{18}$O$_{S}$',
-                 vaporiso=f'$\delta^{{18}}$O$_{{VAPOR_{{{ILEVEL}hPa}}}}$',isoroot=f'$\delta^{{18}}$O$_{{S_{{rootwgt}}}}$')
-dHDOnames = dict(rainiso='$\delta$D$_{P}$',soiliso='$\delta$D$_{S}$',
-                 vaporiso=f'$\delta$D$_{{VAPOR_{{{ILEVEL}hPa}}}}$',isoroot=f'$\delta$D$_{{S_{{rootwgt}}}}$')                
-if varfunc in varnames.keys(): var_name = varnames[varfunc]
-if ISO == 'd18O': 
- if varfunc in d18Onames.keys(): var_name = d18Onames[varfunc]
-elif ISO == 'dHDO': 
- if varfunc in dHDOnames.keys(): var_name = dHDOnames[varfunc]
-
-#------------------
-# Make the maps
-#------------------
-
-# Contour map
-plotmap.plot_contour_map_avg(
-                             # Required variables for plot
-                              var=var_avg_by_case,cases=cases,seas=season,var_name=var_name,units=UNITS,
+   u_avg_by_case[:,:,:], v_avg_by_case[:,:,:] = run_cases(seasavg.seasavg_IVT_vec_LL,CASES_vec,cases=cases,
+                                                          kwargs=dict(begi=begi,endi=endi,ptop=ptop_lev,pbot=pbot_lev,plev=plev,months=MON),
+                                                          case_kwargs=wgt_by_case,max_workers=max_workers,memory_gb=memory_gb)
+
+ # Report use of the cache of calculated variables
+ if derived_cache_dir != None:
+  print(derived_cache_info())
+
+ #########################################################################################################
+ #
+ # Loop through cases and print spatially averaged values 
+ #
+ #########################################################################################################
+
+ #-------------------------------------------------------------
+ # Determine units based on isotopic or non-isotopic variable
+ #-------------------------------------------------------------
+
+ UNITS = UNITS if varfunc not in ['rainiso','soiliso','vaporiso','isoroot'] else IUNITS
+
+ #-------------------
+ # Print values
+ #-------------------
+
+ if Global == True or Region == True or Point == True:
+  print("**************************")
+  print("SPATIALLY AVERAGED VALUES")
+  print("**************************")
+
+ if Global == True:
+  for i in range(len(cases)):
+   print_spatial_average.print_global_average(case=cases[i],variable=var_avg_by_case[i,:,:],units=UNITS)
+
+ if Region == True:
+  for i in range(len(cases)):
+   print_spatial_average.print_region_average(case=cases[i],variable=var_avg_by_case[i,:,:],units=UNITS,
+                                              slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon)
+
+ if Point == True:
+  for i in range(len(cases)):
+   print_spatial_average.print_point_average(case=cases[i],variable=var_avg_by_case[i,:,:],units=UNITS,
+                                             latpt=latpoint,lonpt=lonpoint)
+
+ #########################################################################################################
+ #
+ # Plot the values 
+ #
+ #########################################################################################################
+
+ #-------------------------------------------------------
+ # A few things to specify to make the code run smoothly
+ #-------------------------------------------------------
+
+ # Manage non-specified variables 
+ if VAR2 == None: VAR2, MATH = '', ''
+ if ManLevCntr == False: c_loval,c_hival,c_spval,c_tkstd = None,None,None,None
+ if ManLevDiff == False: d_loval,d_hival,d_spval,d_tkstd = None,None,None,None
+
+ # Specify name of variable
+ varnames = dict(var=f'{VAR1}{MATH}{VAR2}',varlev=f'{VAR1}{MATH}{VAR2}$_{{{LEVEL}hPa}}$',
+                 prect='PRECT',PminE='PminE',soilvar=f'{VAR1}{MATH}{VAR2}')
+ d18Onames = dict(rainiso='$\delta^{18}$O$_{P}$',soiliso='$\delta^{18}$O$_{S}$',
+                  vaporiso=f'$\delta^{{18}}$O$_{{VAPOR_{{{ILEVEL}hPa}}}}$',isoroot=f'$\delta^{{18}}$O$_{{S_{{rootwgt}}}}$')
+ dHDOnames = dict(rainiso='$\delta$D$_{P}$',soiliso='$\delta$D$_{S}$',
+                  vaporiso=f'$\delta$D$_{{VAPOR_{{{ILEVEL}hPa}}}}$',isoroot=f'$\delta$D$_{{S_{{rootwgt}}}}$')                
+ if varfunc in varnames.keys(): var_name = varnames[varfunc]
+ if ISO == 'd18O': 
+  if varfunc in d18Onames.keys(): var_name = d18Onames[varfunc]
+ elif ISO == 'dHDO': 
+  if varfunc in dHDOnames.keys(): var_name = dHDOnames[varfunc]
+
+ #------------------
+ # Make the maps
+ #------------------
+
+ # Contour map
+ plotmap.plot_contour_map_avg(
+                              # Required variables for plot
+                               var=var_avg_by_case,cases=cases,seas=season,var_name=var_name,units=UNITS,
                              
-                             # Vector variables for plot
-                             overlay_vec=overlay_vector,u=u_avg_by_case,v=v_avg_by_case,**kwargs_vec,
+                              # Vector variables for plot
+                              overlay_vec=overlay_vector,u=u_avg_by_case,v=v_avg_by_case,**kwargs_vec,
  
-                             # Naming conventions for output file
-                             folderpath=folderpath,filesuf=filesuf,extra_name=extra_name,
+                              # Naming conventions for output file
+                              folderpath=folderpath,filesuf=filesuf,extra_name=extra_name,
                              
-                             # Mapping specifications                             
-                             LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,   
-                             loval=c_loval,hival=c_hival,spval=c_spval,tkstd=c_tkstd,extnd=c_extnd,
-                             proj=proj,cntr_type=Contour_type,colort=ColCntr,Ind_plots=Ind_plots,
-
-                             # Plotting region and point on map
-                             regbox=Region,regslat=southlat,regnlat=northlat,regwlon=westlon,regelon=eastlon,
-                             point=Point,ptlat=latpoint,ptlon=lonpoint,
-
-                             # All other specifications must be contained within contour_kwargs
-                             **contour_kwargs)
-
-# Difference map
-# Modify kwargs_vec to scale better with the contour map
-if 'vec_ref' in kwargs_vec or 'vec_scale' in kwargs_vec:
- diff_kwargs_vec = {key: value/2 if key == 'vec_ref' else value/1.7 if key == 'vec_scale' else value \
-                                                                for key, value in kwargs_vec.items()}
-plotmap.plot_diff_contour_map_avg(
-                                  # Required variables for plot
-                                  var=var_avg_by_case,cases=cases,seas=season,var_name=var_name,units=UNITS,
-
-                                  # Vector variables for plot
-                                  overlay_vec=overlay_vector,u=u_avg_by_case,v=v_avg_by_case,**diff_kwargs_vec,
-
-                                  # Naming conventions for output file
-                                  folderpath=folderpath,filesuf=filesuf,extra_name=extra_name,
-
-                                  # Mapping specifications                             
-                                  LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,
-                                  loval=d_loval,hival=d_hival,spval=d_spval,tkstd=d_tkstd,extnd=d_extnd,
-                                  proj=proj,cntr_type=Contour_type,colort=ColDiff,Ind_plots=Ind_plots,
-
-                                  # Plotting region and point on map
-                                  regbox=Region,regslat=southlat,regnlat=northlat,regwlon=westlon,regelon=eastlon,
-                                  point=Point,ptlat=latpoint,ptlon=lonpoint,
-
-                                  # All other specifications must be contained within dffrnce_kwargs
-                                  **dffrnce_kwargs)
+                              # Mapping specifications                             
+                              LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,   
+                              loval=c_loval,hival=c_hival,spval=c_spval,tkstd=c_tkstd,extnd=c_extnd,
+                              proj=proj,cntr_type=Contour_type,colort=ColCntr,Ind_plots=Ind_plots,
+
+                              # Plotting region and point on map
+                              regbox=Region,regslat=southlat,regnlat=northlat,regwlon=westlon,regelon=eastlon,
+                              point=Point,ptlat=latpoint,ptlon=lonpoint,
+
+                              # All other specifications must be contained within contour_kwargs
+                              **contour_kwargs)
+
+ # Difference map
+ # Modify kwargs_vec to scale better with the contour map
+ if 'vec_ref' in kwargs_vec or 'vec_scale' in kwargs_vec:
+  diff_kwargs_vec = {key: value/2 if key == 'vec_ref' else value/1.7 if key == 'vec_scale' else value \
+                                                                 for key, value in kwargs_vec.items()}
+ plotmap.plot_diff_contour_map_avg(
+                                   # Required variables for plot
+                                   var=var_avg_by_case,cases=cases,seas=season,var_name=var_name,units=UNITS,
+
+                                   # Vector variables for plot
+                                   overlay_vec=overlay_vector,u=u_avg_by_case,v=v_avg_by_case,**diff_kwargs_vec,
+
+                                   # Naming conventions for output file
+                                   folderpath=folderpath,filesuf=filesuf,extra_name=extra_name,
+
+                                   # Mapping specifications                             
+                                   LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,
+                                   loval=d_loval,hival=d_hival,spval=d_spval,tkstd=d_tkstd,extnd=d_extnd,
+                                   proj=proj,cntr_type=Contour_type,colort=ColDiff,Ind_plots=Ind_plots,
+
+                                   # Plotting region and point on map
+                                   regbox=Region,regslat=southlat,regnlat=northlat,regwlon=westlon,regelon=eastlon,
+                                   point=Point,ptlat=latpoint,ptlon=lonpoint,
+
+                                   # All other specifications must be contained within dffrnce_kwargs
+                                   **dffrnce_kwargs)
 
@@ -18,6 +18,8 @@ from cartopy.mpl.gridliner import LongitudeFormatter, LatitudeFormatter
 import cmaps
 import geocat.viz.util as gv
 from ESMplot.climate_analysis import seas_cycle_TLL as seascyc
+from ESMplot.climate_analysis.derived_cache import set_derived_cache, derived_cache_info
+from ESMplot.climate_analysis.case_executor import run_cases
 from ESMplot.print_values import print_spatial_average 
 from ESMplot.plotting import plot_seascycle_functions as plotseas
 
@@ -216,7 +218,7 @@ mapplot      = True                    # Include map plot
 mapdiff      = False                   # Are map plots difference plots? 
 makegif      = False                   # GIF file of each case's seasonal cycle
 proj         = ccrs.PlateCarree()      # Map projection
-Contour_type = 'AreaFill'              # 'RasterFill' or 'AreaFill'
+Contour_type = 'AreaFill'              # 'AreaFill', 'RasterAreaFill', 'RasterFill' or 'ImageFill'
 ColCntr      = cmaps.cmp_haxby         # Contour plot color table 
 ColDiff      = cmaps.BlueYellowRed_r   # "_r" at end reverses color table 
 folderpath   = 'pdfs'                  # folder to output file to
@@ -228,179 +230,215 @@ filesuf      = '.pdf'                  # type of output file
 
 plot_kwargs = dict(figh=8.,figw=8.,lonlblsp=30.,xmin_mj=3,ymin_mj=3,lontksp=13,spttlfts=18.,leg_loc='best')
 
-#########################################################################################################
-#
-# Read in and calculate seasonal cycle map variables here 
-#
-#########################################################################################################
+#-------------------------------------------------
+# Cache of calculated variables
+#-------------------------------------------------
+
+# Directory to store calculated seasonal cycles/averages in, so re-running this script (ex. to change a 
+# color table) reads them from the cache instead of the model output files, ex. 'derived_cache'.
+# None = no cache
+derived_cache_dir = None
+derived_cache_gb  = 10.                # size limit of the cache directory in GB
+
+#-------------------------------------------------
+# Parallel calculation of cases
+#-------------------------------------------------
 
-#----------------------------------------------------------------------------
-# Create multidimensional variable(s) [# of cases x 12 months x lat x lon] 
-#----------------------------------------------------------------------------
+# Number of cases calculated at once, each in its own process (1 = one case at a time in this process, as
+# before; set to None for one per core or to a number of cases to calculate them in parallel)
+max_workers = 1
+memory_gb   = None                     # memory in GB the cases may use together (None = 80% of available)
 
-datasize = xr.open_dataset(CASES[0])
-var_avg_by_case = xr.DataArray(None,dims=['case','time','lat','lon'],
-                               coords=dict(case=cases,time=np.arange(12),lat=datasize.lat,lon=datasize.lon)).astype(float)
-if overlay_vector == True:
- vecsize = xr.open_dataset(CASES_vec[0])
- u_avg_by_case = xr.DataArray(None,dims=['case','time','lat','lon'],coords=dict(case=cases,time=np.arange(12),
-                                                                                lat=vecsize.lat,lon=vecsize.lon)).astype(float)
- v_avg_by_case = xr.DataArray(None,dims=['case','time','lat','lon'],coords=dict(case=cases,time=np.arange(12),
-                                                                                lat=vecsize.lat,lon=vecsize.lon)).astype(float)
+# Worker processes (max_workers above) import this script to run, so the work below is only done when
+# the script itself is run
+if __name__ == '__main__':
 
-#------------------------------------------------------------
-# Loop through each case and calculate seasonal average 
-#------------------------------------------------------------
+ #########################################################################################################
+ #
+ # Read in and calculate seasonal cycle map variables here 
+ #
+ #########################################################################################################
 
-for i in range(len(cases)):
+ #-----------------------------------------------------------------
+ # Turn on the cache of calculated variables, if specified
+ #-----------------------------------------------------------------
+
+ set_derived_cache(derived_cache_dir,max_size_gb=derived_cache_gb)
+
+ #----------------------------------------------------------------------------
+ # Create multidimensional variable(s) [# of cases x 12 months x lat x lon] 
+ #----------------------------------------------------------------------------
+
+ datasize = xr.open_dataset(CASES[0])
+ var_avg_by_case = xr.DataArray(None,dims=['case','time','lat','lon'],
+                                coords=dict(case=cases,time=np.arange(12),lat=datasize.lat,lon=datasize.lon)).astype(float)
+ if overlay_vector == True:
+  vecsize = xr.open_dataset(CASES_vec[0])
+  u_avg_by_case = xr.DataArray(None,dims=['case','time','lat','lon'],coords=dict(case=cases,time=np.arange(12),
+                                                                                 lat=vecsize.lat,lon=vecsize.lon)).astype(float)
+  v_avg_by_case = xr.DataArray(None,dims=['case','time','lat','lon'],coords=dict(case=cases,time=np.arange(12),
+                                                                                 lat=vecsize.lat,lon=vecsize.lon)).astype(float)
+
+ #------------------------------------------------------------
+ # Choose the seasonal cycle function and its parameters
+ #------------------------------------------------------------
 
  # CALCULATE SEASONAL CYCLE
  if varfunc == 'var':
-  var_avg_by_case[i,:,:,:] = seascyc.seascyc_var_TLL(var1=VAR1,path=CASES[i],begi=begi,endi=endi,
-                                                      var2=VAR2,math=MATH,mult=MULT)
+  func, kwargs = seascyc.seascyc_var_TLL, dict(var1=VAR1,var2=VAR2,math=MATH,mult=MULT)
  if varfunc == 'varlev':
-  var_avg_by_case[i,:,:,:] = seascyc.seascyc_var_TLL(var1=VAR1,path=CASES[i],begi=begi,endi=endi,var2=VAR2,
-                                                    math=MATH,level=LEVEL,plev=plev,mult=MULT)
+  func, kwargs = seascyc.seascyc_var_TLL, dict(var1=VAR1,var2=VAR2,math=MATH,level=LEVEL,plev=plev,mult=MULT)
  if varfunc == 'prect':
-  var_avg_by_case[i,:,:,:] = seascyc.seascyc_prect_TLL(path=CASES[i],begi=begi,endi=endi)
+  func, kwargs = seascyc.seascyc_prect_TLL, dict()
 
  if varfunc == 'PminE':
-  var_avg_by_case[i,:,:,:] = seascyc.seascyc_PminE_TLL(path=CASES[i],begi=begi,endi=endi)
+  func, kwargs = seascyc.seascyc_PminE_TLL, dict()
 
  if varfunc == 'soilvar':
-  var_avg_by_case[i,:,:,:] = seascyc.seascyc_soilvar_TLL(var1=VAR1,path=CASES[i],begi=begi,endi=endi,var2=VAR2,
-                                                             math=MATH,soillev=SOIL_LEV,mult=MULT)
+  func, kwargs = seascyc.seascyc_soilvar_TLL, dict(var1=VAR1,var2=VAR2,math=MATH,soillev=SOIL_LEV,mult=MULT)
  if varfunc == 'rainiso':
-  var_avg_by_case[i,:,:,:] = seascyc.seascyc_rainiso_TLL(iso_type=ISO,path=CASES[i],begi=begi,endi=endi,ptiny=ptiny)
+  func, kwargs = seascyc.seascyc_rainiso_TLL, dict(iso_type=ISO,ptiny=ptiny)
 
  if varfunc == 'soiliso':
-  var_avg_by_case[i,:,:,:] = seascyc.seascyc_soiliso_TLL(iso_type=ISO,path=CASES[i],begi=begi,endi=endi,
-                                                             ptiny=ptiny,soillev=ISOIL_LEV)
+  func, kwargs = seascyc.seascyc_soiliso_TLL, dict(iso_type=ISO,ptiny=ptiny,soillev=ISOIL_LEV)
  if varfunc == 'vaporiso':
-  var_avg_by_case[i,:,:,:] = seascyc.seascyc_vaporiso_TLL(iso_type=ISO,path=CASES[i],begi=begi,endi=endi,
-                                              level=ILEVEL,plev=plev,ptiny=ptiny)
+  func, kwargs = seascyc.seascyc_vaporiso_TLL, dict(iso_type=ISO,level=ILEVEL,plev=plev,ptiny=ptiny)
  if varfunc == 'isoroot':
-  var_avg_by_case[i,:,:,:] = seascyc.seascyc_isoroot_TLL(iso_type=ISO,path=CASES[i],begi=begi,endi=endi,
-                                                               ptiny=ptiny,rootwgt=ROOTWGT)
-
- print(var_avg_by_case[i,:,:,:])
-
- # VECTORS
- if overlay_vector == True:
-
-  if overlay_type == 'wind':
-   u_avg_by_case[i,:,:,:], v_avg_by_case[i,:,:,:] = seascyc.seascyc_wind_vec_TLL(path=CASES_vec[i],begi=begi,endi=endi,
-                                                                  level=WIND_LEVEL,plev=plev)
-  if overlay_type == 'IVT':
-   u_avg_by_case[i,:,:,:], v_avg_by_case[i,:,:,:] = seascyc.seascyc_IVT_vec_TLL(path=CASES_vec[i],begi=begi,endi=endi,
-                                                                   ptop=ptop_lev,pbot=pbot_lev,plev=plev)
-
-#########################################################################################################
-#
-# Loop through cases and print spatially averaged values 
-#
-#########################################################################################################
-
-#-------------------------------------------------------------
-# Determine units based on isotopic or non-isotopic variable
-#-------------------------------------------------------------
-
-UNITS = UNITS if varfunc not in ['rainiso','soiliso','vaporiso','isoroot'] else IUNITS
-
-#-------------------
-# Print values
-#-------------------
+  func, kwargs = seascyc.seascyc_isoroot_TLL, dict(iso_type=ISO,ptiny=ptiny,rootwgt=ROOTWGT)
 
-if Global == True or Region == True or Point == True:
- print("**************************")
- print("SPATIALLY AVERAGED VALUES")
- print("**************************")
+ #------------------------------------------------------------
+ # Calculate the seasonal cycle of every case in parallel
+ #------------------------------------------------------------
 
-if Global == True:
- for i in range(len(cases)):
-  print_spatial_average.print_global_average(case=cases[i],variable=var_avg_by_case[i,:,:,:],units=UNITS)
+ kwargs.update(begi=begi,endi=endi)
 
-if Region == True:
- for i in range(len(cases)):
-  print_spatial_average.print_region_average(case=cases[i],variable=var_avg_by_case[i,:,:,:],units=UNITS,
-                                             slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon)
+ var_avg_by_case[:,:,:,:] = run_cases(func,CASES,cases=cases,kwargs=kwargs,max_workers=max_workers,memory_gb=memory_gb)
 
-if Point == True:
  for i in range(len(cases)):
-  print_spatial_average.print_point_average(case=cases[i],variable=var_avg_by_case[i,:,:,:],units=UNITS,
-                                            latpt=latpoint,lonpt=lonpoint)
+  print(var_avg_by_case[i,:,:,:])
 
-#########################################################################################################
-#
-# Plot the values 
-#
-#########################################################################################################
+ # VECTORS
+ if overlay_vector == True:
 
-#-------------------------------------------------------
-# A few things to specify to make the code run smoothly
-#-------------------------------------------------------
-
-# Manage unspecified variables
-if VAR2 == None: VAR2, MATH = '', ''
-if ManLevCntr == False: c_loval,c_hival,c_spval,c_tkstd = None,None,None,None
-if ManLevDiff == False: d_loval,d_hival,d_spval,d_tkstd = None,None,None,None
-if ManY == False: ybot,ytop = None,None
-
-# Specify which plot parameters to use
-colort = ColDiff if mapdiff == True else ColCntr
-loval,hival,spval,tkstd,extnd = (d_loval,d_hival,d_spval,d_tkstd,d_extnd) if mapdiff == True else \
-                                (c_loval,c_hival,c_spval,c_tkstd,c_extnd)
-if xybound == 'Global':
- southlat,northlat,westlon,eastlon = -90.,90.,-180.,180.
-elif xybound == 'Region': 
- southlat,northlat,westlon,eastlon = southlat,northlat,westlon,eastlon 
-elif xybound == 'Point': 
- southlat,northlat,westlon,eastlon = latpoint,latpoint,lonpoint,lonpoint
-
-# Specify name of variable
-varnames = dict(var=f'{VAR1}{MATH}{VAR2}',varlev=f'{VAR1}{MATH}{VAR2}$_{{{LEVEL}hPa}}$',
-                prect='PRECT',PminE='PminE',soilvar=f'{VAR1}{MATH}{VAR2}')
-d18Onames = dict(rainiso='$\delta^{18}$O$_{P}$',soiliso='$\delta^{18}$O$_{S}$',
-                 vaporiso=f'$\delta^{{18}}$O$_{{VAPOR_{{{ILEVEL}hPa}}}}$',isoroot=f'$\delta^{{18}}$O$_{{S_{{rootwgt}}}}$')
-dHDOnames = dict(rainiso='$\delta$D$_{P}$',soiliso='$\delta$D$_{S}$',
-                 vaporiso=f'$\delta$D$_{{VAPOR_{{{ILEVEL}hPa}}}}$',isoroot=f'$\delta$D$_{{S_{{rootwgt}}}}$')
-if varfunc in varnames.keys(): var_name = varnames[varfunc]
-if ISO == 'd18O':
- if varfunc in d18Onames.keys(): var_name = d18Onames[varfunc]
-elif ISO == 'dHDO':
- if varfunc in dHDOnames.keys(): var_name = dHDOnames[varfunc]
-
-#------------------
-# Make the plots
-#------------------
-
-plotseas.plot_seasonal_cycle(
-                             # Required variables for plot
-                             var=var_avg_by_case,cases=cases,var_name=var_name,units=UNITS,
-                             slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon,
-
-                             # Naming conventions for output file
-                             folderpath=folderpath,filesuf=filesuf,extra_name=extra_name,
-
-                             # Line plot specifications
-                             lineplot=lineplot,linestyle=linestyle,linewidth=linewidth,linecolor=linecolor,
-                             ybot=ybot,ytop=ytop,leg_title=leg_title,
-
-                             # Vector variables for map plots
-                             overlay_vec=overlay_vector,u=u_avg_by_case,v=v_avg_by_case,**kwargs_vec,
+  if overlay_type == 'wind':
+   u_avg_by_case[:,:,:,:], v_avg_by_case[:,:,:,:] = run_cases(seascyc.seascyc_wind_vec_TLL,CASES_vec,cases=cases,
+                                                              kwargs=dict(begi=begi,endi=endi,level=WIND_LEVEL,plev=plev),
+                                                              max_workers=max_workers,memory_gb=memory_gb)
+  if overlay_type == 'IVT':
+   u_avg_by_case[:,:,:,:], v_avg_by_case[:,:,:,:] = run_cases(seascyc.seascyc_IVT_vec_TLL,CASES_vec,cases=cases,
+                                                              kwargs=dict(begi=begi,endi=endi,ptop=ptop_lev,pbot=pbot_lev,plev=plev),
+                                                              max_workers=max_workers,memory_gb=memory_gb)
+
+ # Report use of the cache of calculated variables
+ if derived_cache_dir != None:
+  print(derived_cache_info())
+
+ #########################################################################################################
+ #
+ # Loop through cases and print spatially averaged values 
+ #
+ #########################################################################################################
+
+ #-------------------------------------------------------------
+ # Determine units based on isotopic or non-isotopic variable
+ #-------------------------------------------------------------
+
+ UNITS = UNITS if varfunc not in ['rainiso','soiliso','vaporiso','isoroot'] else IUNITS
+
+ #-------------------
+ # Print values
+ #-------------------
+
+ if Global == True or Region == True or Point == True:
+  print("**************************")
+  print("SPATIALLY AVERAGED VALUES")
+  print("**************************")
+
+ if Global == True:
+  for i in range(len(cases)):
+   print_spatial_average.print_global_average(case=cases[i],variable=var_avg_by_case[i,:,:,:],units=UNITS)
+
+ if Region == True:
+  for i in range(len(cases)):
+   print_spatial_average.print_region_average(case=cases[i],variable=var_avg_by_case[i,:,:,:],units=UNITS,
+                                              slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon)
+
+ if Point == True:
+  for i in range(len(cases)):
+   print_spatial_average.print_point_average(case=cases[i],variable=var_avg_by_case[i,:,:,:],units=UNITS,
+                                             latpt=latpoint,lonpt=lonpoint)
+
+ #########################################################################################################
+ #
+ # Plot the values 
+ #
+ #########################################################################################################
+
+ #-------------------------------------------------------
+ # A few things to specify to make the code run smoothly
+ #-------------------------------------------------------
+
+ # Manage unspecified variables
+ if VAR2 == None: VAR2, MATH = '', ''
+ if ManLevCntr == False: c_loval,c_hival,c_spval,c_tkstd = None,None,None,None
+ if ManLevDiff == False: d_loval,d_hival,d_spval,d_tkstd = None,None,None,None
+ if ManY == False: ybot,ytop = None,None
+
+ # Specify which plot parameters to use
+ colort = ColDiff if mapdiff == True else ColCntr
+ loval,hival,spval,tkstd,extnd = (d_loval,d_hival,d_spval,d_tkstd,d_extnd) if mapdiff == True else \
+                                 (c_loval,c_hival,c_spval,c_tkstd,c_extnd)
+ if xybound == 'Global':
+  southlat,northlat,westlon,eastlon = -90.,90.,-180.,180.
+ elif xybound == 'Region': 
+  southlat,northlat,westlon,eastlon = southlat,northlat,westlon,eastlon 
+ elif xybound == 'Point': 
+  southlat,northlat,westlon,eastlon = latpoint,latpoint,lonpoint,lonpoint
+
+ # Specify name of variable
+ varnames = dict(var=f'{VAR1}{MATH}{VAR2}',varlev=f'{VAR1}{MATH}{VAR2}$_{{{LEVEL}hPa}}$',
+                 prect='PRECT',PminE='PminE',soilvar=f'{VAR1}{MATH}{VAR2}')
+ d18Onames = dict(rainiso='$\delta^{18}$O$_{P}$',soiliso='$\delta^{18}$O$_{S}$',
+                  vaporiso=f'$\delta^{{18}}$O$_{{VAPOR_{{{ILEVEL}hPa}}}}$',isoroot=f'$\delta^{{18}}$O$_{{S_{{rootwgt}}}}$')
+ dHDOnames = dict(rainiso='$\delta$D$_{P}$',soiliso='$\delta$D$_{S}$',
+                  vaporiso=f'$\delta$D$_{{VAPOR_{{{ILEVEL}hPa}}}}$',isoroot=f'$\delta$D$_{{S_{{rootwgt}}}}$')
+ if varfunc in varnames.keys(): var_name = varnames[varfunc]
+ if ISO == 'd18O':
+  if varfunc in d18Onames.keys(): var_name = d18Onames[varfunc]
+ elif ISO == 'dHDO':
+  if varfunc in dHDOnames.keys(): var_name = dHDOnames[varfunc]
+
+ #------------------
+ # Make the plots
+ #------------------
+
+ plotseas.plot_seasonal_cycle(
+                              # Required variables for plot
+                              var=var_avg_by_case,cases=cases,var_name=var_name,units=UNITS,
+                              slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon,
+
+                              # Naming conventions for output file
+                              folderpath=folderpath,filesuf=filesuf,extra_name=extra_name,
+
+                              # Line plot specifications
+                              lineplot=lineplot,linestyle=linestyle,linewidth=linewidth,linecolor=linecolor,
+                              ybot=ybot,ytop=ytop,leg_title=leg_title,
+
+                              # Vector variables for map plots
+                              overlay_vec=overlay_vector,u=u_avg_by_case,v=v_avg_by_case,**kwargs_vec,
                            
-                             # Mapping specifications                             
-                             mapplot=mapplot,mapdiff=mapdiff,
-                             LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,
-                             loval=loval,hival=hival,spval=spval,tkstd=tkstd,extnd=extnd,
-                             proj=proj,cntr_type=Contour_type,colort=colort, 
+                              # Mapping specifications                             
+                              mapplot=mapplot,mapdiff=mapdiff,
+                              LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,
+                              loval=loval,hival=hival,spval=spval,tkstd=tkstd,extnd=extnd,
+                              proj=proj,cntr_type=Contour_type,colort=colort, 
 
-                             # Plotting region and point on map
-                             regbox=Region,regslat=southlat,regnlat=northlat,regwlon=westlon,regelon=eastlon,
-                             point=Point,ptlat=latpoint,ptlon=lonpoint,
+                              # Plotting region and point on map
+                              regbox=Region,regslat=southlat,regnlat=northlat,regwlon=westlon,regelon=eastlon,
+                              point=Point,ptlat=latpoint,ptlon=lonpoint,
 
-                             # GIF specifications
-                             makegif=makegif,
+                              # GIF specifications
+                              makegif=makegif,
 
-                             # All other specifications must be contained within plot_kwargs 
-                             **plot_kwargs)
+                              # All other specifications must be contained within plot_kwargs 
+                              **plot_kwargs)
@@ -28,9 +28,11 @@ import cmaps
 from matplotlib import colors
 from ESMplot.watertagging.print_watertag_values import print_watertag_values,monthly_watertag_values_to_excel
 from ESMplot.watertagging.watertag_plots import watertagging_values_on_map,plot_tagged_precip_and_d18Op
-from ESMplot.watertagging.seas_avg_LL_watertags import seasavg_watertagging_vars
+from ESMplot.watertagging.case_reader import watertag_case_products
 from ESMplot.climate_analysis import seas_avg_LL as seasavg
-from ESMplot.climate_analysis.coordinate_functions import lat_lon_index_array
+from ESMplot.climate_analysis.coordinate_functions import region_weights, region_mean
+from ESMplot.climate_analysis.dataset_cache import open_cached_dataset
+from ESMplot.climate_analysis.case_executor import run_cases
 
 #########################################################
 #
@@ -97,6 +99,16 @@ MON = [0,1,2,3,4,5,6,7,8,9,10,11]
 # Jan, Feb, Mar, Apr, May, Jun, Jul, Aug, Sep, Oct, Nov, Dec
 #   0,   1,   2,   3,   4,   5,   6,   7,   8,   9,  10,  11
 
+#--------------------------------
+# Parallel reading of cases
+#--------------------------------
+
+# Number of cases read at once, each in its own process (1 reads one case at a time in this process, as
+# before; set to None for one per core or to a number of cases to read them in parallel)
+max_workers = 1
+# Memory in GB the cases being read may use together (None uses 80% of the available memory)
+memory_gb = None
+
 #---------------------------------------------------------------------------------------
 # Specify monthly weights, if necessary
 #---------------------------------------------------------------------------------------
@@ -264,9 +276,10 @@ if overlay_vec == False: u_avg_by_case, v_avg_by_case = None, None
 #-------------------------------------------------
 
 proj         = ccrs.PlateCarree()  # Map projection
-Contour_type = 'RasterFill'        # 'RasterFill' or 'AreaFill'
+Contour_type = 'RasterFill'        # 'AreaFill', 'RasterAreaFill', 'RasterFill' or 'ImageFill'
 folderpath   = 'pdfs'                  # folder to output file to
 filesuf      = '.pdf'                  # type of output file
+render_workers = None                  # processes to draw tag map pages in (None = one at a time)
 
 # When DIFF == False, modify these to set color tables
 if DIFF == False:
@@ -287,164 +300,183 @@ kwargs_mapvals  = dict(tag_fs=3.0,bckgrnd_col='w',bckgrnd_pad=0.08,tag_zorder=1,
 kwargs_cntrplot = dict(figw=10.,figh=10.,fdpi=300.)
 kwargs_diffplot = dict(figw=10.,figh=10.,fdpi=300.,cutoff=0.) 
 
-###############################################################################
-#
-# Loop through each case to create variables        
-#
-###############################################################################
-
-#-------------------------------------------------------
-# Make season string automatically from season indices
-#-------------------------------------------------------
-
-month_by_letter = ['J','F','M','A','M','J','J','A','S','O','N','D']
-season = 'ANN' if len(MON) == 12 else ''.join([month_by_letter[i] for i in MON])
-
-#-----------------------------------------------------------------
-# Create multidimensional variable(s) [# of cases x lat x lon] 
-#-----------------------------------------------------------------
-
-# Dataset for dimensions
-ds = xr.open_dataset(CASES[0])
-
-# Global variables [case,lat,lon]
-prect_global = xr.DataArray(None,dims=['case','lat','lon'],
-                                 coords=dict(case=cases,lat=ds.lat,lon=ds.lon)).astype(float)
-d18Op_global = xr.DataArray(None,dims=['case','lat','lon'],
-                                 coords=dict(case=cases,lat=ds.lat,lon=ds.lon)).astype(float)
-
-# Variables by tag [case,tag,lat,lon]
-Pi_by_tag = xr.DataArray(None,dims=['case','tag','lat','lon'],
-                              coords=dict(case=cases,tag=tagcodes,lat=ds.lat,lon=ds.lon)).astype(float)
-d18Opsink_by_tag = xr.DataArray(None,dims=['case','tag','lat','lon'],
-                                     coords=dict(case=cases,tag=tagcodes,lat=ds.lat,lon=ds.lon)).astype(float)
-d18Opwt_by_tag = xr.DataArray(None,dims=['case','tag','lat','lon'],
-                                     coords=dict(case=cases,tag=tagcodes,lat=ds.lat,lon=ds.lon)).astype(float)
-# Average value for each tag [case,tag]
-prect = xr.DataArray(None,dims=['case','tag'],coords=dict(case=cases,tag=tagcodes))
-d18Op = xr.DataArray(None,dims=['case','tag'],coords=dict(case=cases,tag=tagcodes))
+# Worker processes (max_workers or render_workers above) import this script to run, so the work below
+# is only done when the script itself is run
+if __name__ == '__main__':
 
-# Global variable's average of the selected region
-prect_reg = xr.DataArray(None,dims=['case'],coords=dict(case=cases)) 
-d18Op_reg = xr.DataArray(None,dims=['case'],coords=dict(case=cases)) 
+ ###############################################################################
+ #
+ # Loop through each case to create variables        
+ #
+ ###############################################################################
 
-# Sum of all tagged region values
-prect_sum = xr.DataArray(None,dims=['case'],coords=dict(case=cases))
-d18Op_sum = xr.DataArray(None,dims=['case'],coords=dict(case=cases))
+ #-------------------------------------------------------
+ # Make season string automatically from season indices
+ #-------------------------------------------------------
 
-# Wind vectors if specified above
-if overlay_vec == True:
- U = xr.DataArray(None,dims=['case','lat','lon'],coords=dict(case=cases,lat=ds.lat,lon=ds.lon)).astype(float)
- V = xr.DataArray(None,dims=['case','lat','lon'],coords=dict(case=cases,lat=ds.lat,lon=ds.lon)).astype(float)
-
-#--------------------------
-# Loop through each case
-#--------------------------
-
-for i in range(len(CASES)):
-
- print('Working on '+str(cases[i]))
+ month_by_letter = ['J','F','M','A','M','J','J','A','S','O','N','D']
+ season = 'ANN' if len(MON) == 12 else ''.join([month_by_letter[i] for i in MON])
 
  #-----------------------------------------------------------------
- # Global variables: prect and d18Op
+ # Create multidimensional variable(s) [# of cases x lat x lon] 
  #-----------------------------------------------------------------
 
- # PRECT
- prect_global[i,:,:] = seasavg.seasavg_prect_LL(path=CASES[i],begi=begi,endi=endi,months=MON,
-                                                                        wgt_mon=wgt_mon[i,:]) 
- # d18Op
- d18Op_global[i,:,:] = seasavg.seasavg_rainiso_LL(iso_type='d18O',path=CASES[i],begi=begi,endi=endi,
-                                                        ptiny=1.E-18,months=MON,wgt_mon=wgt_mon[i,:]) 
+ # Dataset for dimensions
+ ds = open_cached_dataset(CASES[0])
+
+ # Global variables [case,lat,lon]
+ prect_global = xr.DataArray(None,dims=['case','lat','lon'],
+                                  coords=dict(case=cases,lat=ds.lat,lon=ds.lon)).astype(float)
+ d18Op_global = xr.DataArray(None,dims=['case','lat','lon'],
+                                  coords=dict(case=cases,lat=ds.lat,lon=ds.lon)).astype(float)
+
+ # Variables by tag [case,tag,lat,lon]
+ Pi_by_tag = xr.DataArray(None,dims=['case','tag','lat','lon'],
+                               coords=dict(case=cases,tag=tagcodes,lat=ds.lat,lon=ds.lon)).astype(float)
+ d18Opsink_by_tag = xr.DataArray(None,dims=['case','tag','lat','lon'],
+                                      coords=dict(case=cases,tag=tagcodes,lat=ds.lat,lon=ds.lon)).astype(float)
+ d18Opwt_by_tag = xr.DataArray(None,dims=['case','tag','lat','lon'],
+                                      coords=dict(case=cases,tag=tagcodes,lat=ds.lat,lon=ds.lon)).astype(float)
+ # Average value for each tag [case,tag]
+ prect = xr.DataArray(None,dims=['case','tag'],coords=dict(case=cases,tag=tagcodes))
+ d18Op = xr.DataArray(None,dims=['case','tag'],coords=dict(case=cases,tag=tagcodes))
+
+ # Global variable's average of the selected region
+ prect_reg = xr.DataArray(None,dims=['case'],coords=dict(case=cases)) 
+ d18Op_reg = xr.DataArray(None,dims=['case'],coords=dict(case=cases)) 
+
+ # Sum of all tagged region values
+ prect_sum = xr.DataArray(None,dims=['case'],coords=dict(case=cases))
+ d18Op_sum = xr.DataArray(None,dims=['case'],coords=dict(case=cases))
+
+ # Wind vectors if specified above
+ if overlay_vec == True:
+  U = xr.DataArray(None,dims=['case','lat','lon'],coords=dict(case=cases,lat=ds.lat,lon=ds.lon)).astype(float)
+  V = xr.DataArray(None,dims=['case','lat','lon'],coords=dict(case=cases,lat=ds.lat,lon=ds.lon)).astype(float)
 
- #-----------------------------
- # Loop through each tag
- #-----------------------------
+ # Area weights of the region for regional averaging, built once for every case and tag
+ region = region_weights(lat=ds.lat,lon=ds.lon,slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon)
 
- for tag in range(len(tagnames)):
+ #------------------------------------------------------------------------
+ # Read every case in parallel: prect, d18Op and every tag at once
+ #------------------------------------------------------------------------
 
-  Pi_by_tag[i,tag,:,:], d18Opsink_by_tag[i,tag,:,:] = seasavg_watertagging_vars(
+ print('Reading '+str(len(CASES))+' cases...')
 
-       # Inputs for functions:
-       tagcode=tagcodes[tag],months=MON,path=CASES[i],begi=begi,endi=endi,wgt_mon=wgt_mon[i,:]) 
+ # Each case is read in a single pass through its file, in its own process
+ products_by_case = run_cases(watertag_case_products,CASES,cases=cases,
+                              kwargs=dict(tagcodes=tagcodes[:len(tagnames)],months=MON,begi=begi,endi=endi,ptiny=1.E-18),
+                              case_kwargs=dict(wgt_mon=[wgt_mon[i,:] for i in range(len(CASES))]),
+                              max_workers=max_workers,memory_gb=memory_gb)
+ prect_global[:,:,:] = products_by_case[0]
+ d18Op_global[:,:,:] = products_by_case[1]
+ Pi_by_tag[:,:len(tagnames),:,:] = products_by_case[2]
+ d18Opsink_by_tag[:,:len(tagnames),:,:] = products_by_case[3]
 
- #-----------------------------------
- # Perform calculation on variables
- #-----------------------------------
+ # Wind vectors for every case, also in parallel
+ if overlay_vec == True:
+  kwargs_case = dict(months=MON,begi=begi,endi=endi,plev=plev)
+  wgt_by_case = dict(wgt_mon=[wgt_mon[i,:] for i in range(len(CASES))])
+  if overlay_type == 'wind':
+   U[:,:,:], V[:,:,:] = run_cases(seasavg.seasavg_wind_vec_LL,CASES,cases=cases,kwargs=dict(kwargs_case,level=WIND_LEVEL),
+                                  case_kwargs=wgt_by_case,max_workers=max_workers,memory_gb=memory_gb)
+  if overlay_type == 'IVT':
+   U[:,:,:], V[:,:,:] = run_cases(seasavg.seasavg_IVT_vec_LL,CASES,cases=cases,
+                                  kwargs=dict(kwargs_case,ptop=ptop_lev,pbot=pbot_lev),
+                                  case_kwargs=wgt_by_case,max_workers=max_workers,memory_gb=memory_gb)
+ elif overlay_vec == False:
+  U,V = None,None
 
- # Initialize latitude weights
- lat = ds.lat
- lon = ds.lon
- lat_wgts = np.cos(np.deg2rad(lat))
+ #--------------------------
+ # Loop through each case
+ #--------------------------
 
- # Create list arrays of lat and lon values for regional averaging
- latarray, lonarray = lat_lon_index_array(lat=ds.lat,lon=ds.lon,slat=southlat,nlat=northlat,
-                                                                 wlon=westlon,elon=eastlon)
+ for i in range(len(CASES)):
 
- # Loop through each tag to calculate prect and d18Op tag region values 
- for tag in range(len(tagnames)):
+  print('Working on '+str(cases[i]))
 
-  # Use water tagging equation: d18Opwt@gc = d18Op_tag@gc * ( total16Op_tag@gc / prect_global@gc )
-  d18Opwt_by_tag[i,tag,:,:] = d18Opsink_by_tag[i,tag,:,:] * ( Pi_by_tag[i,tag,:,:] / prect_global[i,:,:] )
+  #-----------------------------------
+  # Perform calculation on variables
+  #-----------------------------------
 
-  # Area weight prect and d18Op for tagged region average
-  prect_wgt    = Pi_by_tag[i,tag,latarray,lonarray].weighted(lat_wgts[latarray])
-  prect[i,tag] = prect_wgt.mean(('lon','lat')) 
-  d18Op_wgt    = d18Opwt_by_tag[i,tag,latarray,lonarray].weighted(lat_wgts[latarray])
-  d18Op[i,tag] = d18Op_wgt.mean(('lon','lat'))
+  # Coordinates
+  lat = ds.lat
+  lon = ds.lon
 
- # Calculate tagged region average with global variables to check against tagged variables
- prect_global_wgt = prect_global[i,latarray,lonarray].weighted(lat_wgts[latarray])
- prect_reg[i]      = prect_global_wgt.mean(('lon','lat'))
- d18Op_global_wgt = d18Op_global[i,latarray,lonarray].weighted(lat_wgts[latarray])
- d18Op_reg[i]      = d18Op_global_wgt.mean(('lon','lat'))
+  # Use water tagging equation for every tag at once: d18Opwt@gc = d18Op_tag@gc * ( total16Op_tag@gc / prect_global@gc )
+  d18Opwt_by_tag[i,:,:,:] = d18Opsink_by_tag[i,:,:,:] * ( Pi_by_tag[i,:,:,:] / prect_global[i,:,:] )
 
- # Sum tag values together
- prect_sum[i] = np.sum(prect[i,:])
- d18Op_sum[i] = np.sum(d18Op[i,:])
+  # Area weight prect and d18Op for tagged region average, every tag in one contraction
+  prect[i,:] = region_mean(Pi_by_tag[i,:,:,:],region)
+  d18Op[i,:] = region_mean(d18Opwt_by_tag[i,:,:,:],region)
 
- # Define wind vector variables if necessary
- if overlay_vec == True:
-  if overlay_type == 'wind':
-   U[i,:,:], V[i,:,:] = seasavg.seasavg_wind_vec_LL(path=CASES[i],begi=begi,endi=endi,level=WIND_LEVEL,
-                                                             plev=plev,months=MON,wgt_mon=wgt_mon[i,:])
-  if overlay_type == 'IVT':
-   U[i,:,:], V[i,:,:] = seasavg.seasavg_IVT_vec_LL(path=CASES[i],begi=begi,endi=endi,ptop=ptop_lev,
-                                                    pbot=pbot_lev,plev=plev,months=MON,wgt_mon=wgt_mon[i,:])
- elif overlay_vec == False:
-  U,V = None,None
+  # Calculate tagged region average with global variables to check against tagged variables
+  prect_reg[i] = region_mean(prect_global[i,:,:],region)
+  d18Op_reg[i] = region_mean(d18Op_global[i,:,:],region)
 
-########################################################################################################
-#
-# Make map/text plots for each case (diffs if specified above) 
-#
-########################################################################################################
+  # Sum tag values together
+  prect_sum[i] = np.sum(prect[i,:])
+  d18Op_sum[i] = np.sum(d18Op[i,:])
 
-if TEXT_MAPS == True:
- print('Plotting text maps...')
+ ########################################################################################################
+ #
+ # Make map/text plots for each case (diffs if specified above) 
+ #
+ ########################################################################################################
 
- #------------------------------------------------------------------
- # Determine if difference plots or not then loop through each case
- #------------------------------------------------------------------
+ if TEXT_MAPS == True:
+  print('Plotting text maps...')
+
+  #------------------------------------------------------------------
+  # Determine if difference plots or not then loop through each case
+  #------------------------------------------------------------------
+ 
+  if DIFF == False:
+ 
+   for i in range(len(CASES)): # loop through all cases
+ 
+    print(cases[i])
+ 
+    # Print tag values for each region to frame
+    if PRINT_VAL == True:
+     if DIFF == False:
+      print_watertag_values(precip=prect[i,:],d18Op=d18Op[i,:],precip_sum=prect_sum[i],d18Op_sum=d18Op_sum[i],
+                            precip_reg_gbl=prect_reg[i],d18Op_reg_gbl=d18Op_reg[i],
+                            lat=lat,lon=lon,case=cases[i],tagnames=tagnames,season=season,
+                            slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon)
  
- if DIFF == False:
  
-  for i in range(len(CASES)): # loop through all cases
+    # Make plots of values for each tagged region
+    if TEXT_MAPS == True:
+     if DIFF == False:
+      watertagging_values_on_map(precip=prect[i,:],d18Op=d18Op[i,:],case=cases[i],tagnames=tagnames,
+                                 num_landtags=num_landtags,num_oceantags=num_oceantags,path=CASES[i],
+                                 season=season,lat=lat,lon=lon,landlat=landlat,landlon=landlon,
+                                 oceanlat=oceanlat,oceanlon=oceanlon,slat=southlat,nlat=northlat,
+                                 wlon=westlon,elon=eastlon,folderpath=folderpath,filesuf=filesuf,
+                                 reg_name=reg_name,extra_name=extra_name,proj=proj,
+                                 LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,
+                                 **kwargs_mapvals)
  
-   print(cases[i])
+  elif DIFF == True:
  
-   # Print tag values for each region to frame
-   if PRINT_VAL == True:
-    if DIFF == False:
-     print_watertag_values(precip=prect[i,:],d18Op=d18Op[i,:],precip_sum=prect_sum[i],d18Op_sum=d18Op_sum[i],
-                           precip_reg_gbl=prect_reg[i],d18Op_reg_gbl=d18Op_reg[i],
-                           lat=lat,lon=lon,case=cases[i],tagnames=tagnames,season=season,
+   for i in range(1,len(CASES)): # Loop through cases 1:end, take difference with first case
+ 
+    print(cases[i]+'-'+cases[0])
+ 
+    # Print tag values for each region to frame
+    if PRINT_VAL == True:
+     print_watertag_values(precip=prect[i,:]-prect[0,:],d18Op=d18Op[i,:]-d18Op[0,:],
+                           precip_sum=prect_sum[i]-prect_sum[0],d18Op_sum=d18Op_sum[i]-d18Op_sum[0],
+                           precip_reg_gbl=prect_reg[i]-prect_reg[0],d18Op_reg_gbl=d18Op_reg[i]-d18Op_reg[0],
+                           lat=lat,lon=lon,case=str(cases[i]+'-'+cases[0]),tagnames=tagnames,season=season,
                            slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon)
  
  
-   # Make plots of values for each tagged region
-   if TEXT_MAPS == True:
-    if DIFF == False:
-     watertagging_values_on_map(precip=prect[i,:],d18Op=d18Op[i,:],case=cases[i],tagnames=tagnames,
+    # Make plots of values for each tagged region
+    if TEXT_MAPS == True:
+     watertagging_values_on_map(precip=prect[i,:],d18Op=d18Op[i,:],cntlp=prect[0,:],cntlo=d18Op[0,:],diff=True,
+                                case=f'$\Delta$({cases[i]} $\minus$ {cases[0]})',tagnames=tagnames,
                                 num_landtags=num_landtags,num_oceantags=num_oceantags,path=CASES[i],
                                 season=season,lat=lat,lon=lon,landlat=landlat,landlon=landlon,
                                 oceanlat=oceanlat,oceanlon=oceanlon,slat=southlat,nlat=northlat,
@@ -452,120 +484,93 @@ if TEXT_MAPS == True:
                                 reg_name=reg_name,extra_name=extra_name,proj=proj,
                                 LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,
                                 **kwargs_mapvals)
- 
- elif DIFF == True:
- 
-  for i in range(1,len(CASES)): # Loop through cases 1:end, take difference with first case
- 
-   print(cases[i]+'-'+cases[0])
- 
-   # Print tag values for each region to frame
-   if PRINT_VAL == True:
-    print_watertag_values(precip=prect[i,:]-prect[0,:],d18Op=d18Op[i,:]-d18Op[0,:],
-                          precip_sum=prect_sum[i]-prect_sum[0],d18Op_sum=d18Op_sum[i]-d18Op_sum[0],
-                          precip_reg_gbl=prect_reg[i]-prect_reg[0],d18Op_reg_gbl=d18Op_reg[i]-d18Op_reg[0],
-                          lat=lat,lon=lon,case=str(cases[i]+'-'+cases[0]),tagnames=tagnames,season=season,
-                          slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon)
- 
- 
-   # Make plots of values for each tagged region
-   if TEXT_MAPS == True:
-    watertagging_values_on_map(precip=prect[i,:],d18Op=d18Op[i,:],cntlp=prect[0,:],cntlo=d18Op[0,:],diff=True,
-                               case=f'$\Delta$({cases[i]} $\minus$ {cases[0]})',tagnames=tagnames,
-                               num_landtags=num_landtags,num_oceantags=num_oceantags,path=CASES[i],
-                               season=season,lat=lat,lon=lon,landlat=landlat,landlon=landlon,
-                               oceanlat=oceanlat,oceanlon=oceanlon,slat=southlat,nlat=northlat,
-                               wlon=westlon,elon=eastlon,folderpath=folderpath,filesuf=filesuf,
-                               reg_name=reg_name,extra_name=extra_name,proj=proj,
-                               LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,
-                               **kwargs_mapvals)
-
-
-#################################################################################################
-#
-# Make map plots for precipitation and d18Op for each tagged region (diffs if specified above) 
-#
-#################################################################################################
-
-if IND_PRECIP == True or IND_d18Op == True:
 
- print('Plotting maps for each tagged region...')
 
- if DIFF == False:
+ #################################################################################################
+ #
+ # Make map plots for precipitation and d18Op for each tagged region (diffs if specified above) 
+ #
+ #################################################################################################
 
-  for i in range(len(CASES)):
+ if IND_PRECIP == True or IND_d18Op == True:
 
-   print(cases[i])
-
-   plot_tagged_precip_and_d18Op(
-                                # Required variables for plot
-                                P=IND_PRECIP,O=IND_d18Op,season=season,
-                                prect=Pi_by_tag[i,:,:,:],d18Op=d18Opwt_by_tag[i,:,:,:],lat=lat,lon=lon,
-                                num_landtags=num_landtags,num_oceantags=num_oceantags,
-                                tagnames=tagnames,case=cases[i],
-                                
-                                # Vector variables for plot
-                                overlay_vec=overlay_vec,u=U[i,:,:],v=V[i,:,:],**kwargs_vec,
-
-                                # Mapping specifications
-                                colorp=colorp,coloro=coloro,proj=proj,
-                                cntr_type=Contour_type,p_hival=p_hival,p_loval=p_loval,p_spval=p_spval,
-                                p_mantick=p_mantick,p_extnd=p_extnd,o_hival=o_hival,o_loval=o_loval,
-                                o_spval=o_spval,o_tkstd=o_tkstd,o_extnd=o_extnd,
-                                slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon,
-                                LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,
+  print('Plotting maps for each tagged region...')
 
-                                # Naming conventions for output file
-                                folderpath=folderpath,filesuf=filesuf,
-                                reg_name=reg_name,extra_name=extra_name,
+  if DIFF == False:
 
-                                # All other specifications must be contained within kwargs_cntrplot
-                                **kwargs_cntrplot) 
+   for i in range(len(CASES)):
 
- elif DIFF == True:
+    print(cases[i])
 
-  for i in range(1,len(CASES)): # Loop through cases 1:end, take difference with first case
+    plot_tagged_precip_and_d18Op(
+                                 # Required variables for plot
+                                 P=IND_PRECIP,O=IND_d18Op,season=season,
+                                 prect=Pi_by_tag[i,:,:,:],d18Op=d18Opwt_by_tag[i,:,:,:],lat=lat,lon=lon,
+                                 num_landtags=num_landtags,num_oceantags=num_oceantags,
+                                 tagnames=tagnames,case=cases[i],
+                                
+                                 # Vector variables for plot
+                                 overlay_vec=overlay_vec,u=U[i,:,:],v=V[i,:,:],**kwargs_vec,
 
-   print(cases[i]+'-'+cases[0])
+                                 # Mapping specifications
+                                 colorp=colorp,coloro=coloro,proj=proj,
+                                 cntr_type=Contour_type,p_hival=p_hival,p_loval=p_loval,p_spval=p_spval,
+                                 p_mantick=p_mantick,p_extnd=p_extnd,o_hival=o_hival,o_loval=o_loval,
+                                 o_spval=o_spval,o_tkstd=o_tkstd,o_extnd=o_extnd,
+                                 slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon,
+                                 LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,
 
-   plot_tagged_precip_and_d18Op(
-                                # Required variables for plot
-                                P=IND_PRECIP,O=IND_d18Op,season=season,
-                                prect=Pi_by_tag[i,:,:,:]-Pi_by_tag[0,:,:,:],
-                                d18Op=d18Opwt_by_tag[i,:,:,:]-d18Opwt_by_tag[0,:,:,:],
-                                lat=lat,lon=lon,num_landtags=num_landtags,num_oceantags=num_oceantags,
-                                tagnames=tagnames,case=str(cases[i]+'-'+cases[0]),
-                           
-                                # Vector variables for plot
-                                overlay_vec=overlay_vec,u=U[i,:,:]-U[0,:,:],v=V[i,:,:]-V[0,:,:],**kwargs_vec,
-
-                                # Mapping specifications
-                                colorp=colorp,coloro=coloro,cntr_type=Contour_type,proj=proj,
-                                p_hival=p_hival,p_loval=p_loval,p_spval=p_spval,
-                                p_mantick=p_mantick,p_extnd=p_extnd,o_hival=o_hival,o_loval=o_loval,
-                                o_spval=o_spval,o_tkstd=o_tkstd,o_extnd=o_extnd,
-                                slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon,
-                                LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,
+                                 # Naming conventions for output file
+                                 folderpath=folderpath,filesuf=filesuf,workers=render_workers,
+                                 reg_name=reg_name,extra_name=extra_name,
 
-                                # Naming conventions for output file
-                                folderpath=folderpath,filesuf=filesuf,
-                                reg_name=reg_name,extra_name=extra_name,
+                                 # All other specifications must be contained within kwargs_cntrplot
+                                 **kwargs_cntrplot) 
 
-                                # All other specifications must be contained within kwargs_diffplot
-                                **kwargs_diffplot)
+  elif DIFF == True:
 
-#################################################################################################
-#
-# Make Excel file of monthly tagged values for each case 
-#
-#################################################################################################
+   for i in range(1,len(CASES)): # Loop through cases 1:end, take difference with first case
 
-if MAKE_EXCEL == True:
+    print(cases[i]+'-'+cases[0])
 
- monthly_watertag_values_to_excel(CASES=CASES,cases=cases,begi=begi,endi=endi,
-                                  tagnames=tagnames,tagcodes=tagcodes,folderpath=folderpath,
-                                  slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon,
-                                  reg_name=reg_name)
+    plot_tagged_precip_and_d18Op(
+                                 # Required variables for plot
+                                 P=IND_PRECIP,O=IND_d18Op,season=season,
+                                 prect=Pi_by_tag[i,:,:,:]-Pi_by_tag[0,:,:,:],
+                                 d18Op=d18Opwt_by_tag[i,:,:,:]-d18Opwt_by_tag[0,:,:,:],
+                                 lat=lat,lon=lon,num_landtags=num_landtags,num_oceantags=num_oceantags,
+                                 tagnames=tagnames,case=str(cases[i]+'-'+cases[0]),
+                           
+                                 # Vector variables for plot
+                                 overlay_vec=overlay_vec,u=U[i,:,:]-U[0,:,:],v=V[i,:,:]-V[0,:,:],**kwargs_vec,
+
+                                 # Mapping specifications
+                                 colorp=colorp,coloro=coloro,cntr_type=Contour_type,proj=proj,
+                                 p_hival=p_hival,p_loval=p_loval,p_spval=p_spval,
+                                 p_mantick=p_mantick,p_extnd=p_extnd,o_hival=o_hival,o_loval=o_loval,
+                                 o_spval=o_spval,o_tkstd=o_tkstd,o_extnd=o_extnd,
+                                 slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon,
+                                 LatMin=LatMin,LatMax=LatMax,LonMin=LonMin,LonMax=LonMax,
+
+                                 # Naming conventions for output file
+                                 folderpath=folderpath,filesuf=filesuf,workers=render_workers,
+                                 reg_name=reg_name,extra_name=extra_name,
+
+                                 # All other specifications must be contained within kwargs_diffplot
+                                 **kwargs_diffplot)
+
+ #################################################################################################
+ #
+ # Make Excel file of monthly tagged values for each case 
+ #
+ #################################################################################################
+
+ if MAKE_EXCEL == True:
+
+  monthly_watertag_values_to_excel(CASES=CASES,cases=cases,begi=begi,endi=endi,
+                                   tagnames=tagnames,tagcodes=tagcodes,folderpath=folderpath,
+                                   slat=southlat,nlat=northlat,wlon=westlon,elon=eastlon,
+                                   reg_name=reg_name)
 
 
 
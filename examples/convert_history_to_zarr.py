@@ -0,0 +1,19 @@
+import sys, os
+sys.path.append(os.path.dirname(os.getcwd()))
+from ESMplot.climate_analysis.zarr_store import history_to_zarr
+
+# Convert the concatenated water tagged time slice to a Zarr store next to it (same name, .zarr). Every
+# reader in ESMplot then opens the store in place of this .nc path, so the calculate_* scripts need no
+# changes. Re-run after the netCDF file changes; an older store is ignored.
+store = history_to_zarr('/RAID/datasets/f.ie12.BRCP85C5CN.f19_g16.LME.004_2100watertags.004/archive/atm/hist/' \
+'f.ie12.BRCP85C5CN.f19_g16.LME.004_2100watertags.004.cam.h0.210501-212412.nc',
+    chunk_mb=64.,      # target size of one uncompressed chunk
+    overwrite=True     # replace a previous conversion
+)
+print('Wrote '+store)
+
+# Or convert a directory of monthly h0 files into one store, to pass as 'path' to the readers
+#store = history_to_zarr('/RAID/datasets/f.ie12.BRCP85C5CN.f19_g16.LME.004_2100watertags.004/archive/atm/hist/',
+#    store='/RAID/datasets/f.ie12.BRCP85C5CN.f19_g16.LME.004_2100watertags.004/products/cam.h0.zarr',
+#    pattern='*.cam.h0.*.nc'
+#)
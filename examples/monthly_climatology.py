@@ -0,0 +1,25 @@
+import sys, os
+sys.path.append(os.path.dirname(os.getcwd()))
+from ESMplot.climate_analysis.monthly_climatology import monthly_climatology
+
+# The worker processes import this script, so the work below is only done when the script itself is run
+if __name__ == '__main__':
+
+ # Monthly climatology (time = 12 records, January first) of the water tagged time slice, as read by
+ # calculate_watertags_RCP85_progress.py and combine_tags_RCP85.py. Replaces averaging each month with
+ # ncks/ncra and joining the months with ncrcat. The same command from a shell:
+ #   python -m ESMplot.climate_analysis.monthly_climatology <time series file or directory> -o <output>
+ direct = '/RAID/datasets/f.ie12.BRCP85C5CN.f19_g16.LME.004_2100watertags.004/archive/atm/hist/'
+ path = monthly_climatology(direct+'f.ie12.BRCP85C5CN.f19_g16.LME.004_2100watertags.004.cam.h0.210501-212412.nc',
+     output=direct+'f.ie12.BRCP85C5CN.f19_g16.LME.004_2100watertags.004.cam.h0.2105-2124_monthly_climatology_cat.nc',
+     workers=None,      # one worker process per core
+     overwrite=True     # replace a previous climatology
+ )
+ print('Wrote '+path)
+
+ # Or average a directory of monthly h0 files (case.cam.h0.YYYY-MM.nc), each month by the month in its name.
+ # The pattern matches the years 2100-2129, so it includes every file of 2105-2124 in the directory.
+ #path = monthly_climatology(direct,
+ #    output=direct+'f.ie12.BRCP85C5CN.f19_g16.LME.004_2100watertags.004.cam.h0.2105-2124_monthly_climatology_cat.nc',
+ #    pattern='f.ie12.BRCP85C5CN.f19_g16.LME.004_2100watertags.004.cam.h0.21[0-2][0-9]-[01][0-9].nc'
+ #)
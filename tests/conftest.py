@@ -0,0 +1,62 @@
+#######################################################################################################
+#
+# Shared fixtures of the regression tests: a small CAM h0-like history file, written for each test, and
+# a synthetic water tagged case (see benchmarks/synthetic_data.py), written once per test session
+#
+#######################################################################################################
+
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # package directory
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),'benchmarks'))
+import numpy as np
+import pytest
+import xarray as xr
+from synthetic_data import synthetic_case_files
+from ESMplot.climate_analysis import dataset_cache, derived_cache, vertical_interp
+from ESMplot.watertagging import virtual_tags
+
+def write_history(path: str,
+                  years: int = 2,
+                  seed: int = 0) -> str:
+
+  '''Writes 'years' years of monthly PRECC, PRECL, PS and U on a 4 x 6 grid with 3 hybrid levels to the
+  netCDF file 'path' and returns 'path'.'''
+
+  rng = np.random.default_rng(seed)
+  ntime, nlev, nlat, nlon = 12*int(years), 3, 4, 6
+  dims3, dims4 = ['time','lat','lon'], ['time','lev','lat','lon']
+
+  time = xr.DataArray(15.+30.*np.arange(ntime),dims=['time'],
+                      attrs=dict(units='days since 0001-01-01 00:00:00',calendar='noleap'))
+  data = xr.Dataset(dict(PRECC=(dims3,rng.uniform(0.,5.e-8,(ntime,nlat,nlon)).astype(np.float32),dict(units='m/s')),
+                         PRECL=(dims3,rng.uniform(0.,5.e-8,(ntime,nlat,nlon)).astype(np.float32),dict(units='m/s')),
+                         PS=(dims3,rng.uniform(9.5e4,1.02e5,(ntime,nlat,nlon)).astype(np.float32),dict(units='Pa')),
+                         U=(dims4,rng.normal(0.,10.,(ntime,nlev,nlat,nlon)).astype(np.float32),dict(units='m/s')),
+                         hyam=(['lev'],np.array([0.2,0.1,0.])),
+                         hybm=(['lev'],np.array([0.,0.5,0.95]))),
+                    coords=dict(time=time,lev=[200.,550.,950.],lat=np.linspace(-60.,60.,nlat),
+                                lon=np.arange(nlon)*60.))
+  data.to_netcdf(path)
+
+  return path
+
+@pytest.fixture
+def history_file(tmp_path):
+
+  return write_history(str(tmp_path/'case.cam.h0.nc'))
+
+@pytest.fixture(scope='session')
+def case(tmp_path_factory):
+
+  # CAM and CLM files of 1 year on the 4x5 grid with 5 hybrid levels and the tags ANTA, WNAM, ENAM, SAME
+  return synthetic_case_files(str(tmp_path_factory.mktemp('synthetic')),grid='f45',years=1,nlev=5,ntags=4)
+
+@pytest.fixture(autouse=True)
+def clean_state():
+
+  # Every test starts without open datasets, interpolation plans, combined tags or derived product cache
+  yield
+  dataset_cache.clear_dataset_cache()
+  vertical_interp.clear_interp_plan_cache()
+  virtual_tags.clear_combined_tags()
+  derived_cache.set_derived_cache(None)
@@ -0,0 +1,25 @@
+#######################################################################################################
+#
+# Cases run in worker processes give the same results as cases run one at a time in this process
+#
+#######################################################################################################
+
+import numpy as np
+import xarray as xr
+from conftest import write_history
+from ESMplot.climate_analysis import dataset_cache
+from ESMplot.climate_analysis import seas_avg_LL as seasavg
+from ESMplot.climate_analysis.case_executor import run_cases
+
+def test_parallel_cases_match_serial(tmp_path):
+
+  paths = [write_history(str(tmp_path/('case'+str(i)+'.cam.h0.nc')),seed=i) for i in range(3)]
+  kwargs = dict(months=[5,6,7],wgt_mon=xr.DataArray(np.ones(3),dims=['time']))
+
+  # Files this process has open when the workers start are opened again by the workers
+  held = dataset_cache.open_cached_dataset(paths[0])
+  serial = run_cases(seasavg.seasavg_prect_LL,paths,cases=['a','b','c'],kwargs=kwargs,max_workers=1)
+  parallel = run_cases(seasavg.seasavg_prect_LL,paths,cases=['a','b','c'],kwargs=kwargs,max_workers=3)
+
+  xr.testing.assert_identical(parallel,serial)
+  assert float(held.PS.mean()) > 0.
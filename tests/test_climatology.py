@@ -0,0 +1,46 @@
+#######################################################################################################
+#
+# Climatologies accumulated block by block are identical to the in-memory ones
+#
+#######################################################################################################
+
+import numpy as np
+import pytest
+import xarray as xr
+from ESMplot.climate_analysis.climatology import clmMonTLL, clmMonTLLL
+
+def monthly_series(years: int,
+                   nlev: int = None,
+                   dtype = np.float32) -> xr.DataArray:
+
+  # Random monthly values on a 4 x 6 grid with a few missing values, as over the ocean in CLM output
+  rng = np.random.default_rng(1)
+  shape = (12*years,4,6) if nlev == None else (12*years,nlev,4,6)
+  values = rng.normal(280.,15.,shape).astype(dtype)
+  values[rng.random(shape) < 0.05] = np.nan
+  dims = ['time','lat','lon'] if nlev == None else ['time','plev','lat','lon']
+  coords = dict(lat=np.linspace(-60.,60.,4),lon=np.arange(6)*60.)
+  if nlev != None:
+   coords['plev'] = np.linspace(200.,1000.,nlev)
+
+  return xr.DataArray(values,dims=dims,coords=coords)
+
+@pytest.mark.parametrize('dtype',[np.float32,np.float64])
+@pytest.mark.parametrize('block_years',[1,3,7])
+def test_blocks_identical_TLL(dtype,block_years):
+
+  var = monthly_series(7,dtype=dtype)
+  expected = clmMonTLL(var)
+  result = clmMonTLL(var,block_years=block_years)
+
+  assert result.dtype == expected.dtype
+  np.testing.assert_array_equal(result.values,expected.values)
+
+def test_blocks_identical_TLLL():
+
+  var = monthly_series(5,nlev=3)
+  expected = clmMonTLLL(var)
+  result = clmMonTLLL(var,block_years=2)
+
+  assert result.dtype == expected.dtype
+  np.testing.assert_array_equal(result.values,expected.values)
@@ -0,0 +1,53 @@
+#######################################################################################################
+#
+# Combined tag regions: the one-pass (streamed) combiner against chained single-region combinations,
+# and combined tags read virtually against the same tags written to a combined file
+#
+#######################################################################################################
+
+import numpy as np
+import pytest
+import xarray as xr
+from ESMplot.watertagging.combine_tagged_regions import combine_regions_to_new_tag, combine_regions_to_new_tags
+from ESMplot.watertagging.virtual_tags import register_combined_tags, clear_combined_tags
+from ESMplot.watertagging.seas_avg_LL_watertags import seasavg_watertagging_vars
+
+new_regions = {'NSAM': ('WNAM','SAME'), 'ENAN': ('ENAM','ANTA')}
+
+@pytest.fixture
+def combined(case,tmp_path):
+
+  # Combined tags written chunk by chunk to a new file
+  return combine_regions_to_new_tags(case['cam'],new_regions,path=str(tmp_path/'combReg.nc'),chunk_mb=1.)
+
+def test_streamed_matches_chained(case,combined):
+
+  with xr.open_dataset(case['cam']) as data:
+   chained = data
+   for new_region, regions in new_regions.items():
+    chained = combine_regions_to_new_tag(chained,regions,new_region)
+   chained = chained.load()
+
+  with xr.open_dataset(combined) as streamed:
+   assert set(streamed.data_vars) == set(chained.data_vars)
+   for name in chained.data_vars:
+    xr.testing.assert_identical(streamed[name].load(),chained[name])
+
+@pytest.mark.parametrize('tagcode',list(new_regions))
+def test_virtual_matches_combined_file(case,combined,tagcode):
+
+  months = [5,6,7]
+  wgt_mon = np.ones(len(months))
+
+  # Read from the tag's own variables in the combined file
+  clear_combined_tags()
+  stored = seasavg_watertagging_vars(tagcode,months,combined,wgt_mon=wgt_mon)
+
+  # Read as the sum of the source tags in the original file
+  register_combined_tags(new_regions)
+  virtual = seasavg_watertagging_vars(tagcode,months,case['cam'],wgt_mon=wgt_mon)
+
+  # Sums are rounded to float32 in a different order (the combined file stores the summed variables),
+  # which the delta value amplifies to about 1e-4 permil
+  np.testing.assert_allclose(virtual[0].values,stored[0].values,rtol=1e-5)
+  np.testing.assert_allclose(virtual[1].values,stored[1].values,atol=1e-3)
@@ -0,0 +1,70 @@
+#######################################################################################################
+#
+# Evicted datasets are closed, but never while a caller still holds them
+#
+#######################################################################################################
+
+import os
+import pytest
+import xarray as xr
+from conftest import write_history
+from ESMplot.climate_analysis import dataset_cache
+
+@pytest.fixture
+def closed(monkeypatch):
+
+  # Paths of the datasets closed during the test
+  paths = []
+  close = xr.Dataset.close
+
+  def recording_close(self):
+   paths.append(self.encoding.get('source'))
+   close(self)
+
+  monkeypatch.setattr(xr.Dataset,'close',recording_close)
+  dataset_cache.set_dataset_cache_size(1)
+  yield paths
+  dataset_cache.set_dataset_cache_size(dataset_cache.default_cache_size)
+
+def test_unused_dataset_closed_on_eviction(history_file,tmp_path,closed):
+
+  other = write_history(str(tmp_path/'other.cam.h0.nc'),seed=1)
+  dataset_cache.open_cached_dataset(history_file)
+  dataset_cache.open_cached_dataset(other)
+
+  assert closed == [history_file]
+
+def test_held_dataset_closed_once_released(history_file,tmp_path,closed):
+
+  other = write_history(str(tmp_path/'other.cam.h0.nc'),seed=1)
+  data = dataset_cache.open_cached_dataset(history_file)
+  expected = data.PRECC.values
+
+  # Evicted while held: stays open and readable
+  dataset_cache.open_cached_dataset(other)
+  assert closed == []
+  assert (data.PRECC.values == expected).all()
+
+  # Released: closed the next time the cache is used
+  del data
+  dataset_cache.open_cached_dataset(other)
+  assert closed == [history_file]
+
+def test_rewritten_file_closes_stale_handle(history_file,closed):
+
+  dataset_cache.open_cached_dataset(history_file)
+  stat = os.stat(history_file)
+  os.utime(history_file,ns=(stat.st_atime_ns,stat.st_mtime_ns+10**9))
+  dataset_cache.open_cached_dataset(history_file)
+
+  assert closed == [history_file]
+
+def test_clear_closes_datasets(history_file,closed):
+
+  data = dataset_cache.open_cached_dataset(history_file)
+  dataset_cache.clear_dataset_cache()
+  assert closed == []
+
+  del data
+  dataset_cache.clear_dataset_cache()
+  assert closed == [history_file]
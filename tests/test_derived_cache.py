@@ -0,0 +1,90 @@
+#######################################################################################################
+#
+# Stored derived products are reused only while the calculation, its input files and the package
+# sources are unchanged
+#
+#######################################################################################################
+
+import os
+import numpy as np
+from ESMplot.climate_analysis import derived_cache
+from ESMplot.climate_analysis.dataset_cache import open_cached_dataset
+
+@derived_cache.cached_derived
+def total_precip(path: str,
+                 mult: float = 86400000.,
+                 chunks: dict = None):
+
+  data = open_cached_dataset(path,chunks=chunks)
+  return ((data.PRECC+data.PRECL)*mult).mean('time')
+
+@derived_cache.cached_derived
+def time_mean(var1: str,
+              path: str):
+
+  return open_cached_dataset(path)[var1].mean('time')
+
+def test_hit_on_unchanged_inputs(history_file,tmp_path):
+
+  derived_cache.set_derived_cache(str(tmp_path/'cache'))
+  first = total_precip(history_file)
+  second = total_precip(history_file)
+
+  info = derived_cache.derived_cache_info()
+  assert (info['misses'], info['hits']) == (1, 1)
+  np.testing.assert_array_equal(first.values,second.values)
+
+def test_arguments_are_part_of_key(history_file,tmp_path):
+
+  derived_cache.set_derived_cache(str(tmp_path/'cache'))
+  total_precip(history_file,mult=1.)
+  total_precip(history_file,mult=1)
+  total_precip(history_file,mult=2.)
+
+  info = derived_cache.derived_cache_info()
+  assert (info['misses'], info['hits']) == (2, 1)
+
+def test_rewritten_file_invalidates(history_file,tmp_path):
+
+  derived_cache.set_derived_cache(str(tmp_path/'cache'))
+  total_precip(history_file)
+
+  # Same path and size, new modification time
+  stat = os.stat(history_file)
+  os.utime(history_file,ns=(stat.st_atime_ns,stat.st_mtime_ns+10**9))
+  total_precip(history_file)
+
+  assert derived_cache.derived_cache_info()['misses'] == 2
+
+def test_computation_only_arguments_share_entry(history_file,tmp_path):
+
+  derived_cache.set_derived_cache(str(tmp_path/'cache'))
+  total_precip(history_file)
+  total_precip(history_file,chunks={'time': 12})
+
+  assert derived_cache.derived_cache_info()['hits'] == 1
+
+def test_package_change_invalidates(history_file,tmp_path,monkeypatch):
+
+  derived_cache.set_derived_cache(str(tmp_path/'cache'))
+  total_precip(history_file)
+
+  # An edit to any climate_analysis module changes the package hash
+  monkeypatch.setattr(derived_cache,'_source_hash','edited')
+  total_precip(history_file)
+
+  assert derived_cache.derived_cache_info()['misses'] == 2
+
+def test_only_path_arguments_fingerprinted(history_file,tmp_path,monkeypatch):
+
+  derived_cache.set_derived_cache(str(tmp_path/'cache'))
+  monkeypatch.chdir(tmp_path)
+  time_mean('PRECC',history_file)
+
+  # A file named like the variable in the working directory does not change the key
+  with open('PRECC','w') as unrelated:
+   unrelated.write('not model output')
+  time_mean('PRECC',history_file)
+
+  info = derived_cache.derived_cache_info()
+  assert (info['misses'], info['hits']) == (1, 1)
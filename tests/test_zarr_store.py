@@ -0,0 +1,46 @@
+#######################################################################################################
+#
+# Zarr stores hold the same values as the netCDF files they are made from, and are only used once
+# completely written
+#
+#######################################################################################################
+
+import os
+import pytest
+import xarray as xr
+from ESMplot.climate_analysis import dataset_cache
+
+zarr = pytest.importorskip('zarr')
+pytest.importorskip('dask')
+if int(zarr.__version__.split('.')[0]) >= 3:
+ pytest.skip('history_to_zarr needs zarr 2',allow_module_level=True)
+from ESMplot.climate_analysis.zarr_store import history_to_zarr
+
+def test_store_matches_netcdf(history_file):
+
+  store = history_to_zarr(history_file,variables=['PRECC','U'])
+  assert not os.path.exists(store+'.part')
+  assert dataset_cache.resolve_store(history_file) == store
+
+  with xr.open_dataset(history_file) as nc:
+   data = dataset_cache.open_cached_dataset(history_file)
+   assert 'PRECL' not in data
+   for name in ['PRECC','U','hyam','lat']:
+    xr.testing.assert_identical(data[name].load(),nc[name].load())
+
+def test_interrupted_conversion_leaves_no_store(history_file,monkeypatch):
+
+  to_zarr = xr.Dataset.to_zarr
+
+  # Writes the store, then fails as if interrupted before returning
+  def failing_to_zarr(self,*args,**kwargs):
+   to_zarr(self,*args,**kwargs)
+   raise KeyboardInterrupt
+
+  monkeypatch.setattr(xr.Dataset,'to_zarr',failing_to_zarr)
+  with pytest.raises(KeyboardInterrupt):
+   history_to_zarr(history_file,variables=['PRECC'])
+
+  store = os.path.splitext(history_file)[0]+'.zarr'
+  assert not os.path.exists(store) and not os.path.exists(store+'.part')
+  assert dataset_cache.resolve_store(history_file) == history_file